@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+İçtihat ve Mevzuat Tabloları için Ağırlıklı search_vector Migrasyonu
+
+ictihatlar ve mevzuatlar tabloları şu ana kadar yalnızca metin üzerindeki
+ifade (expression) GIN indekslerini kullanıyordu; bu yüzden sıralı (ts_rank)
+sorgularda eşleşen her satır için to_tsvector yeniden hesaplanıyordu. Bu script:
+
+  1. Tabloya `search_vector tsvector` kolonunu ekler (yalnızca katalog değişikliği)
+  2. INSERT'te ve kaynak kolonlardan biri gerçekten değiştiğinde kolonu
+     dolduran trigger'lar kurar
+     (A: birim adı / mevzuat_adi, B: esas/karar no / mevzuat no, D: metin)
+  3. Mevcut satırları kısa transaction'lar halinde, id aralıklarıyla doldurur
+  4. GIN indeksini CREATE INDEX CONCURRENTLY ile oluşturur
+  5. search_ictihat / search_mevzuat fonksiyonlarını yeni kolonu kullanacak
+     şekilde günceller
+
+--benchmark ile eski (ifade) ve yeni (stored) sıralı sorguların gecikmeleri
+karşılaştırılır.
+
+Kullanım:
+    python add_weighted_search_vectors.py
+    python add_weighted_search_vectors.py --tables ictihatlar --batch-size 2000 --pause 0.2
+    python add_weighted_search_vectors.py --benchmark --query "kira tespiti" --runs 20
+
+Gereksinimler:
+    pip install psycopg2-binary
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from typing import List
+
+from db_config import POSTGRES_CONFIG, create_connection
+
+try:
+    from psycopg2 import errors
+except ImportError:
+    print("❌ psycopg2 yüklü değil. Lütfen çalıştırın: pip install psycopg2-binary")
+    sys.exit(1)
+
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_QUERIES = ["tazminat", "kira tespiti", "işe iade", "boşanma nafaka", "haksız fiil"]
+
+# Ağırlıklı vektörün parçaları; {p} trigger içinde "NEW." olur, backfill'de boş kalır
+SEARCH_VECTORS = {
+    "ictihatlar": {
+        "parts": [
+            ("A", "COALESCE((SELECT adi FROM birimler WHERE id = {p}birim_ref), '')"),
+            ("B", "COALESCE({p}esas_no, '') || ' ' || COALESCE({p}karar_no, '')"),
+            ("D", "COALESCE({p}karar_metni, '')"),
+        ],
+        "source_columns": ["birim_ref", "esas_no", "karar_no", "karar_metni"],
+        # Tek tablo düzeninde çakışma anahtarı document_id, bölümlenmiş düzende
+        # (document_id, karar_no_yil[, item_type]); üst küme her iki düzende de güvenlidir
+        "key": ["document_id", "karar_no_yil", "item_type"],
+        "index": "idx_ictihatlar_search_vector",
+        "legacy_vector": "to_tsvector('turkish', COALESCE(karar_metni, ''))",
+    },
+    "mevzuatlar": {
+        "parts": [
+            ("A", "COALESCE({p}mevzuat_adi, '')"),
+            ("B", "COALESCE({p}mevzuat_no::text, '') || ' ' || COALESCE({p}resmi_gazete_sayisi, '')"),
+            ("D", "COALESCE({p}icerik, '')"),
+        ],
+        "source_columns": ["mevzuat_adi", "mevzuat_no", "resmi_gazete_sayisi", "icerik"],
+        "key": ["mevzuat_id"],
+        "index": "idx_mevzuatlar_search_vector",
+        "legacy_vector": "to_tsvector('turkish', COALESCE(icerik, ''))",
+    },
+}
+
+# search_vector dolduktan sonra arama fonksiyonlarının yeni tanımları
+SEARCH_FUNCTIONS = {
+    "mevzuatlar": """
+CREATE OR REPLACE FUNCTION search_mevzuat(
+    arama_metni TEXT,
+    mevzuat_turu VARCHAR(50) DEFAULT NULL,
+    sayfa INTEGER DEFAULT 1,
+    sayfa_boyutu INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id INTEGER,
+    mevzuat_id VARCHAR(50),
+    mevzuat_no INTEGER,
+    mevzuat_adi TEXT,
+    mevzuat_tur VARCHAR(50),
+    resmi_gazete_tarihi DATE,
+    rank REAL
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        m.id,
+        m.mevzuat_id,
+        m.mevzuat_no,
+        m.mevzuat_adi,
+        m.mevzuat_tur,
+        m.resmi_gazete_tarihi,
+        ts_rank(m.search_vector, plainto_tsquery('turkish', arama_metni)) as rank
+    FROM mevzuatlar m
+    WHERE
+        (mevzuat_turu IS NULL OR m.mevzuat_tur = mevzuat_turu)
+        AND m.search_vector @@ plainto_tsquery('turkish', arama_metni)
+    ORDER BY rank DESC
+    LIMIT sayfa_boyutu
+    OFFSET (sayfa - 1) * sayfa_boyutu;
+END;
+$$ LANGUAGE plpgsql;
+""",
+    "ictihatlar": """
+CREATE OR REPLACE FUNCTION search_ictihat(
+    arama_metni TEXT,
+    ictihat_turu VARCHAR(50) DEFAULT NULL,
+    birim VARCHAR(200) DEFAULT NULL,
+    sayfa INTEGER DEFAULT 1,
+    sayfa_boyutu INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id INTEGER,
+    document_id VARCHAR(50),
+    item_type VARCHAR(50),
+    birim_adi VARCHAR(200),
+    esas_no VARCHAR(50),
+    karar_no VARCHAR(50),
+    karar_tarihi DATE,
+    rank REAL
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        i.id,
+        i.document_id,
+        i.item_type,
+        b.adi,
+        i.esas_no,
+        i.karar_no,
+        i.karar_tarihi,
+        ts_rank(i.search_vector, plainto_tsquery('turkish', arama_metni)) as rank
+    FROM ictihatlar i
+    LEFT JOIN birimler b ON b.id = i.birim_ref
+    WHERE
+        (ictihat_turu IS NULL OR i.item_type = ictihat_turu)
+        AND (birim IS NULL OR b.adi ILIKE '%' || birim || '%')
+        AND i.search_vector @@ plainto_tsquery('turkish', arama_metni)
+    ORDER BY rank DESC, i.karar_tarihi DESC
+    LIMIT sayfa_boyutu
+    OFFSET (sayfa - 1) * sayfa_boyutu;
+END;
+$$ LANGUAGE plpgsql;
+""",
+}
+
+
+def vector_expression(table: str, prefix: str = "") -> str:
+    """Tablo için ağırlıklı tsvector ifadesini oluştur"""
+    return " || ".join(
+        f"setweight(to_tsvector('turkish', {expr.format(p=prefix)}), '{weight}')"
+        for weight, expr in SEARCH_VECTORS[table]["parts"]
+    )
+
+
+def add_column_and_trigger(conn, table: str):
+    """Kolonu ve onu güncel tutan trigger'ları ekle"""
+    spec = SEARCH_VECTORS[table]
+    function_name = f"{table}_search_vector_update"
+    columns = spec["source_columns"]
+    # Scraper upsert'leri değişmeyen satırları da yazar; vektör yalnızca kaynak
+    # kolonlardan biri gerçekten değiştiğinde yeniden hesaplanır
+    changed = " OR ".join(f"OLD.{column} IS DISTINCT FROM NEW.{column}" for column in columns)
+    key, *rest = spec["key"]
+    existing = " AND ".join([f"{key} = NEW.{key}"]
+                            + [f"{column} IS NOT DISTINCT FROM NEW.{column}" for column in rest])
+    with conn.cursor() as cur:
+        # Varsayılan değersiz kolon eklemek yalnızca katalog değişikliğidir; tablo yeniden yazılmaz
+        cur.execute("SET lock_timeout = '5s'")
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        cur.execute(f"""
+            CREATE OR REPLACE FUNCTION {function_name}()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                -- INSERT ... ON CONFLICT'te BEFORE INSERT, önerilen satır için de çalışır;
+                -- aynı çakışma anahtarlı satır zaten varsa vektör çakışma yolundaki UPDATE
+                -- trigger'ına bırakılır (bölüm anahtarı değişen satır yeni satır olarak eklenir)
+                IF TG_OP = 'INSERT' AND EXISTS (
+                    SELECT 1 FROM {table} WHERE {existing}
+                ) THEN
+                    RETURN NEW;
+                END IF;
+                NEW.search_vector := {vector_expression(table, 'NEW.')};
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        cur.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+        cur.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_insert ON {table}")
+        cur.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_update ON {table}")
+        cur.execute(f"""
+            CREATE TRIGGER {table}_search_vector_insert
+                BEFORE INSERT ON {table}
+                FOR EACH ROW
+                EXECUTE FUNCTION {function_name}()
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER {table}_search_vector_update
+                BEFORE UPDATE OF {', '.join(columns)} ON {table}
+                FOR EACH ROW
+                WHEN ({changed})
+                EXECUTE FUNCTION {function_name}()
+        """)
+    conn.commit()
+    print(f"✓ {table}.search_vector kolonu ve trigger'lar hazır")
+
+
+def backfill(conn, table: str, batch_size: int, pause: float):
+    """Boş search_vector değerlerini id aralıklarıyla, kısa transaction'larda doldur"""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT MIN(id), MAX(id) FROM {table} WHERE search_vector IS NULL")
+        min_id, max_id = cur.fetchone()
+    conn.commit()
+
+    if min_id is None:
+        print(f"✓ {table}: doldurulacak satır yok")
+        return
+
+    # updated_at trigger'ının backfill sırasında çalışmaması için (ES artımlı
+    # senkronizasyonu tüm tabloyu değişmiş sanmasın) replica rolü denenir
+    replica_role = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET session_replication_role = replica")
+        conn.commit()
+    except errors.InsufficientPrivilege:
+        conn.rollback()
+        replica_role = False
+        print("⚠ session_replication_role ayarlanamadı (superuser değil); "
+              "backfill updated_at değerlerini güncelleyecek")
+
+    expression = vector_expression(table)
+    started = time.time()
+    updated = 0
+    start = min_id
+    try:
+        while start <= max_id:
+            end = start + batch_size - 1
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    UPDATE {table}
+                    SET search_vector = {expression}
+                    WHERE id BETWEEN %s AND %s AND search_vector IS NULL
+                """, (start, end))
+                updated += cur.rowcount
+            conn.commit()
+
+            done = (end - min_id + 1) / (max_id - min_id + 1)
+            elapsed = time.time() - started
+            print(f"  {table}: id {end:,}/{max_id:,} ({min(done, 1):.1%}), "
+                  f"{updated:,} satır, {updated / elapsed if elapsed else 0:,.0f} satır/sn", end="\r")
+            start = end + 1
+            if pause:
+                time.sleep(pause)
+    finally:
+        if replica_role:
+            with conn.cursor() as cur:
+                cur.execute("SET session_replication_role = DEFAULT")
+            conn.commit()
+
+    print()
+    print(f"✓ {table}: {updated:,} satır {time.time() - started:.1f} sn'de dolduruldu")
+
+
+def create_index(table: str):
+    """GIN indeksini CONCURRENTLY oluştur (yarım kalmış geçersiz indeks varsa yeniden kur)"""
+    index_name = SEARCH_VECTORS[table]["index"]
+    conn = create_connection(autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT i.indisvalid FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = %s
+            """, (index_name,))
+            row = cur.fetchone()
+            if row is not None and not row[0]:
+                print(f"⚠ {index_name} geçersiz durumda, yeniden oluşturuluyor")
+                cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+
+            started = time.time()
+            cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                        f"ON {table} USING gin(search_vector)")
+            cur.execute(f"ANALYZE {table}")
+            print(f"✓ {index_name} oluşturuldu ({time.time() - started:.1f} sn)")
+    finally:
+        conn.close()
+
+
+def update_search_function(conn, table: str):
+    with conn.cursor() as cur:
+        cur.execute(SEARCH_FUNCTIONS[table])
+    conn.commit()
+    function_name = "search_ictihat" if table == "ictihatlar" else "search_mevzuat"
+    print(f"✓ {function_name} fonksiyonu search_vector kullanacak şekilde güncellendi")
+
+
+def time_query(conn, query: str, params: tuple, runs: int) -> List[float]:
+    timings = []
+    with conn.cursor() as cur:
+        for _ in range(runs):
+            started = time.perf_counter()
+            cur.execute(query, params)
+            cur.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def benchmark(conn, tables: List[str], queries: List[str], runs: int, limit: int):
+    """Eski ifade tabanlı ve yeni stored vektörlü sıralı sorguları karşılaştır"""
+    print(f"\n{'='*60}")
+    print(f"⏱  Sıralı sorgu gecikmesi (ilk {limit} sonuç, {runs} tekrar, ms)")
+    print("="*60)
+    print(f"{'Tablo':<12} {'Sorgu':<18} {'Eski p50':>9} {'Eski p95':>9} {'Yeni p50':>9} {'Yeni p95':>9}")
+
+    for table in tables:
+        legacy = SEARCH_VECTORS[table]["legacy_vector"]
+        legacy_sql = f"""
+            SELECT id, ts_rank({legacy}, q) AS rank
+            FROM {table}, plainto_tsquery('turkish', %s) q
+            WHERE {legacy} @@ q
+            ORDER BY rank DESC LIMIT {limit}
+        """
+        stored_sql = f"""
+            SELECT id, ts_rank(search_vector, q) AS rank
+            FROM {table}, plainto_tsquery('turkish', %s) q
+            WHERE search_vector @@ q
+            ORDER BY rank DESC LIMIT {limit}
+        """
+        for query in queries:
+            # İlk çalıştırma önbelleği ısıtır, ölçüme dahil edilmez
+            time_query(conn, legacy_sql, (query,), 1)
+            time_query(conn, stored_sql, (query,), 1)
+            old = sorted(time_query(conn, legacy_sql, (query,), runs))
+            new = sorted(time_query(conn, stored_sql, (query,), runs))
+            p95 = max(0, int(len(old) * 0.95) - 1)
+            print(f"{table:<12} {query[:18]:<18} {statistics.median(old):>9.1f} {old[p95]:>9.1f} "
+                  f"{statistics.median(new):>9.1f} {new[p95]:>9.1f}")
+        conn.rollback()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ağırlıklı search_vector kolonu migrasyonu")
+    parser.add_argument("--tables", "-t", nargs="+", choices=list(SEARCH_VECTORS.keys()),
+                        default=list(SEARCH_VECTORS.keys()),
+                        help="İşlenecek tablolar (varsayılan: tümü)")
+    parser.add_argument("--batch-size", "-b", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Backfill id aralığı genişliği")
+    parser.add_argument("--pause", type=float, default=0.0,
+                        help="Backfill batch'leri arasında bekleme (saniye)")
+    parser.add_argument("--skip-backfill", action="store_true",
+                        help="Kolonu ve trigger'ı ekle, mevcut satırları doldurma")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Yalnızca eski/yeni sıralı sorgu gecikmelerini karşılaştır")
+    parser.add_argument("--query", "-q", action="append",
+                        help="Benchmark sorgusu (birden fazla verilebilir)")
+    parser.add_argument("--runs", type=int, default=10,
+                        help="Benchmark tekrar sayısı")
+    parser.add_argument("--limit", type=int, default=20,
+                        help="Benchmark sonuç sayısı")
+    args = parser.parse_args()
+
+    if not POSTGRES_CONFIG["password"]:
+        print("❌ POSTGRES_PASSWORD tanımlı değil! .env dosyasını kontrol edin.")
+        sys.exit(1)
+
+    conn = create_connection()
+    try:
+        if args.benchmark:
+            benchmark(conn, args.tables, args.query or DEFAULT_QUERIES, args.runs, args.limit)
+            return
+
+        for table in args.tables:
+            print(f"\n{'='*60}")
+            print(f"🔤 {table}")
+            print("="*60)
+            add_column_and_trigger(conn, table)
+            if not args.skip_backfill:
+                backfill(conn, table, args.batch_size, args.pause)
+            create_index(table)
+            # Boş vektörlü satırlar aramada görünmeyeceği için fonksiyon yalnızca
+            # backfill tamamlandığında değiştirilir
+            if not args.skip_backfill:
+                update_search_function(conn, table)
+    finally:
+        conn.close()
+
+    print("\n✅ Migrasyon tamamlandı. Karşılaştırma için: --benchmark")
+
+
+if __name__ == "__main__":
+    main()
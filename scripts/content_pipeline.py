@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+İndirme (I/O) ve içerik işleme (CPU) aşamalarını ayıran boru hattı
+
+Saf Python HTMLParser GIL'i tutar; içerik çözme ağ döngüsüyle aynı süreçte
+çalıştığında indirmeler bekler. ContentPipeline'da:
+
+  I/O aşaması  iş parçacıkları getDocumentContent yanıtının ham gövdesini indirir
+               (`fetch_raw(document_id) -> bytes`)
+  CPU aşaması  ham gövdeler `batch_size`'lık gruplar halinde ProcessPoolExecutor'a
+               gönderilir; her süreç base64 + HTML çözme (content_stream), metin
+               normalizasyonu ve özet (sha1) hesaplamasını yapar
+
+Her iki aşamada da bekleyen iş sayısı sınırlıdır; kayıtlar tamamlandıkça
+(sıra gözetmeksizin) (kayıt, metin, özet) olarak döner. İşlem hızı süreç
+sayısıyla ölçeklenir, ağ tarafı yalnızca indirmeyle meşgul olur.
+
+Havuzlar ilk run() çağrısında kurulur ve close() (ya da `with` bloğunun sonu)
+çağrılana kadar sonraki run() çağrılarında yeniden kullanılır; süreç havuzunu
+sayfa / yıl başına kurup kapatmamak için boru hattı çalıştırma başına bir kez
+oluşturulmalıdır.
+"""
+
+import hashlib
+import logging
+import unicodedata
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from content_stream import DEFAULT_CHUNK_BYTES, ContentDecodeError, stream_document_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 8
+
+# (metin, özet, hata); metin None: içerik yok ya da çözülemedi (hata yalnızca loglanır).
+# Boş metin yazılırsa COALESCE saklı karar_metni'nin üzerine '' yazar
+Processed = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def normalize_text(text: str) -> str:
+    """NFC, CRLF -> LF; PostgreSQL TEXT'in kabul etmediği NUL karakterleri atılır"""
+    text = unicodedata.normalize("NFC", text)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n")
+    if "\x00" in text:
+        text = text.replace("\x00", "")
+    return text
+
+
+def content_digest(text: str) -> str:
+    """Metin özeti (değişmeyen içeriğin yeniden yazılmaması için)"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def process_body(body: bytes) -> Processed:
+    """Ham getDocumentContent yanıtından normalize edilmiş metin ve özet"""
+    view = memoryview(body)
+    chunks = (view[i:i + DEFAULT_CHUNK_BYTES].tobytes() for i in range(0, len(view), DEFAULT_CHUNK_BYTES))
+    try:
+        result, text = stream_document_text(chunks)
+    except ContentDecodeError as e:
+        return None, None, f"İçerik decode hatası: {e}"
+    metadata = result.get("metadata") or {}
+    if metadata.get("FMTY") != "SUCCESS":
+        return None, None, f"API hatası: {metadata.get('FMTE', 'Bilinmeyen hata')}"
+    if not text:
+        return None, None, None
+    text = normalize_text(text)
+    if not text:
+        return None, None, None
+    return text, content_digest(text), None
+
+
+def process_batch(bodies: List[bytes]) -> List[Processed]:
+    """Süreç havuzunda çalışan CPU aşaması"""
+    return [process_body(body) for body in bodies]
+
+
+class ContentPipeline:
+    """İndirmeyi iş parçacıklarında, içerik işlemeyi süreç havuzunda yürütür"""
+
+    def __init__(self, fetch_raw: Callable[[str], Optional[bytes]], processes: int = 4,
+                 download_workers: int = 1, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.fetch_raw = fetch_raw
+        self.processes = processes
+        self.download_workers = download_workers
+        self.batch_size = batch_size
+        # Bellekte bekleyen ham gövde sayısını sınırlar
+        self.max_downloads = download_workers * 2
+        self.max_batches = processes * 2
+        self._io: Optional[ThreadPoolExecutor] = None
+        self._cpu: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "ContentPipeline":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _executors(self) -> Tuple[ThreadPoolExecutor, ProcessPoolExecutor]:
+        if self._io is None:
+            self._io = ThreadPoolExecutor(max_workers=self.download_workers)
+            self._cpu = ProcessPoolExecutor(max_workers=self.processes)
+        return self._io, self._cpu
+
+    def close(self):
+        """İş parçacığı ve süreç havuzlarını kapat"""
+        if self._io is not None:
+            self._io.shutdown()
+            self._cpu.shutdown()
+            self._io = self._cpu = None
+
+    def run(self, records: Iterable[dict], key: Callable[[dict], Optional[str]]) -> Iterator[Tuple[dict, Optional[str], Optional[str]]]:
+        """Kayıtların içeriklerini indir ve işle; (kayıt, metin, özet) üret"""
+        downloads = {}
+        batches = {}
+        ready: deque = deque()
+        batch: List[Tuple[dict, bytes]] = []
+
+        def collect_downloads(block: bool):
+            done, _ = wait(downloads, return_when=FIRST_COMPLETED) if block else \
+                ([f for f in downloads if f.done()], None)
+            for future in done:
+                record = downloads.pop(future)
+                body = future.result()
+                if body is None:
+                    ready.append((record, None, None))
+                else:
+                    batch.append((record, body))
+
+        def submit_batch(cpu):
+            nonlocal batch
+            if batch:
+                batches[cpu.submit(process_batch, [body for _, body in batch])] = [r for r, _ in batch]
+                batch = []
+
+        def collect_batches(block: bool):
+            done, _ = wait(batches, return_when=FIRST_COMPLETED) if block else \
+                ([f for f in batches if f.done()], None)
+            for future in done:
+                batch_records = batches.pop(future)
+                for record, (text, digest, error) in zip(batch_records, future.result()):
+                    if error:
+                        logger.warning(f"{key(record)}: {error}")
+                    ready.append((record, text, digest))
+
+        io, cpu = self._executors()
+        try:
+            for record in records:
+                document_id = key(record)
+                if not document_id:
+                    ready.append((record, None, None))
+                else:
+                    downloads[io.submit(self.fetch_raw, document_id)] = record
+                    if len(downloads) >= self.max_downloads:
+                        collect_downloads(block=True)
+                    else:
+                        collect_downloads(block=False)
+
+                if len(batch) >= self.batch_size:
+                    submit_batch(cpu)
+                if len(batches) >= self.max_batches:
+                    collect_batches(block=True)
+                else:
+                    collect_batches(block=False)
+                while ready:
+                    yield ready.popleft()
+
+            while downloads:
+                collect_downloads(block=True)
+                if len(batch) >= self.batch_size:
+                    submit_batch(cpu)
+            submit_batch(cpu)
+            while batches:
+                collect_batches(block=True)
+                while ready:
+                    yield ready.popleft()
+            while ready:
+                yield ready.popleft()
+        except BrokenProcessPool:
+            # Ölen bir işçi süreci havuzu kullanılamaz bırakır; sonraki run() yenisini kurar
+            self.close()
+            raise
+        finally:
+            # Tüketici erken durursa bekleyen indirmeler bir sonraki run()'a taşınmaz
+            for future in downloads:
+                future.cancel()
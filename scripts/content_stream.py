@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Belge içeriğinin akış (streaming) halinde çözülmesi
+
+getDocumentContent yanıtı {"data": {"content": "<base64 HTML>", ...}, "metadata": {...}}
+biçimindedir. Yanıtı json() ile okuyup base64 -> bytes -> str -> HTML parçaları
+-> birleştirilmiş metin zincirini kurmak, aynı belgenin yaklaşık 6 kopyasını
+aynı anda bellekte tutar; büyük kanunlarda ve KHK'larda RSS sıçrar.
+
+Bu modülde yanıt gövdesi parça parça okunur:
+
+  ContentScanner          JSON içindeki "content" değerini ayıklar, geri kalan
+                          küçük iskeleti (metadata) ayrıca saklar
+  artımlı base64 + UTF-8  4 karakterlik bloklar halinde çözülür
+  StreamingTextExtractor  HTMLParser'a parça parça beslenir ve metni tek bir
+                          tampona yazar; tampon `spill_bytes`'ı aşınca geçici
+                          dosyaya taşınır (SpooledTemporaryFile)
+
+Sonuçta bellekte yalnızca bir okuma parçası, tampon ve en sonda üretilen metin
+bulunur. Eşik CONTENT_SPILL_MB ortam değişkeniyle ayarlanır.
+
+Bellek ölçümü (tracemalloc ile belge başına tepe bellek, eski yol ile karşılaştırma):
+    python content_stream.py --size-mb 20
+    python content_stream.py --size-mb 20 --max-ratio 3   # aşılırsa çıkış kodu 1
+
+Otomatik kontrol (--check): tepe bellek / metin oranını tampon bellekte kalırken
+ve geçici dosyaya taşarken CHECK_MAX_RATIO ile sınar; \\/ ve \\uXXXX kaçışlarının
+ortasından bölünen parçalarla çıktının eski yolla aynı olduğunu doğrular.
+Başarısızlıkta çıkış kodu 1:
+    python content_stream.py --check
+"""
+
+import os
+import re
+import io
+import sys
+import json
+import time
+import codecs
+import base64
+import argparse
+import tracemalloc
+from html.parser import HTMLParser
+from tempfile import SpooledTemporaryFile
+from typing import Iterable, Optional, Tuple
+
+DEFAULT_CHUNK_BYTES = 64 * 1024
+# --check: belge başına tepe bellek, sonuçtaki metin nesnesinin en fazla bu katı olabilir
+CHECK_MAX_RATIO = 3.5
+CHECK_SIZE_MB = 4
+DEFAULT_SPILL_BYTES = int(float(os.getenv("CONTENT_SPILL_MB", "8")) * 1024 * 1024)
+
+BASE64_ALPHABET = frozenset(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=")
+
+
+class ContentScanner:
+    """JSON yanıt akışından "content" dizgisini ayıklar, kalan iskeleti toplar"""
+
+    KEY_RE = re.compile(rb'"content"\s*:\s*"')
+    # JSON kaçışları; base64 içinde pratikte yalnızca \/ ve satır sonu kaçışları görülür
+    TOKEN_RE = re.compile(rb'\\u[0-9a-fA-F]{4}|\\[^u]|"')
+
+    def __init__(self):
+        self.skeleton = bytearray()
+        self.state = "before"
+        self._carry = b""
+        self._searched = 0
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Bir gövde parçasını işle, içindeki base64 baytlarını döndür"""
+        if self.state == "after":
+            self.skeleton += chunk
+            return b""
+        if self.state == "before":
+            self.skeleton += chunk
+            match = self.KEY_RE.search(self.skeleton, max(0, self._searched - 32))
+            if not match:
+                self._searched = len(self.skeleton)
+                return b""
+            chunk = bytes(self.skeleton[match.end():])
+            del self.skeleton[match.end():]
+            self.state = "content"
+
+        data = self._carry + chunk if self._carry else chunk
+        self._carry = b""
+        out = []
+        position = 0
+        for token in self.TOKEN_RE.finditer(data):
+            out.append(data[position:token.start()])
+            value = token.group()
+            if value == b'"':
+                # Kapanan tırnak: iskelet boş bir "content" dizgisiyle devam eder
+                self.state = "after"
+                self.skeleton += data[token.start():]
+                return b"".join(out)
+            if value.startswith(b"\\u"):
+                code = int(value[2:], 16)
+                if code in BASE64_ALPHABET:
+                    out.append(bytes((code,)))
+            elif value[1:] in (b"/", b"+", b"="):
+                out.append(value[1:])
+            position = token.end()
+        tail = data[position:]
+        # Parça sonunda yarım kalmış kaçış bir sonraki parçayla birleştirilir
+        backslash = tail.find(b"\\")
+        if backslash != -1:
+            self._carry = tail[backslash:]
+            tail = tail[:backslash]
+        out.append(tail)
+        return b"".join(out)
+
+    def metadata(self) -> dict:
+        """İçerik hariç yanıt (content boş dizgi olarak)"""
+        return json.loads(bytes(self.skeleton)) if self.skeleton.strip() else {}
+
+
+class Base64Stream:
+    """Parça parça gelen base64 metnini 4 karakterlik sınırlardan çözer"""
+
+    def __init__(self):
+        self._pending = b""
+
+    def feed(self, data: bytes) -> bytes:
+        data = self._pending + data.translate(None, b" \r\n\t")
+        usable = len(data) - len(data) % 4
+        self._pending = data[usable:]
+        return base64.b64decode(data[:usable]) if usable else b""
+
+    def close(self) -> bytes:
+        pending, self._pending = self._pending, b""
+        if not pending:
+            return b""
+        return base64.b64decode(pending + b"=" * (-len(pending) % 4))
+
+
+class StreamingTextExtractor(HTMLParser):
+    """
+    HTML'den düz metni tek bir tampona yazar. Çıktı, metin düğümlerini boşlukla
+    birleştirip baştaki / sondaki boşlukları atan eski `' '.join(parts).strip()`
+    ile aynıdır; sondaki boşluk, ardından metin gelene kadar bekletilir.
+    """
+
+    def __init__(self, spill_bytes: int = DEFAULT_SPILL_BYTES):
+        super().__init__()
+        self.buffer = SpooledTemporaryFile(max_size=spill_bytes, mode="w+b")
+        self._started = False
+        self._first = True
+        self._boundary = False
+        self._pending_space = ""
+
+    def _write(self, piece: str):
+        if not self._started:
+            piece = piece.lstrip()
+            if not piece:
+                return
+            self._started = True
+        stripped = piece.rstrip()
+        if stripped:
+            self.buffer.write((self._pending_space + stripped).encode("utf-8"))
+            self._pending_space = piece[len(stripped):]
+        else:
+            self._pending_space += piece
+
+    def handle_data(self, data):
+        # HTMLParser parça sınırında bir metin düğümünü birden fazla çağrıya bölebilir;
+        # ayırıcı boşluk yalnızca araya bir etiket / yorum girdiyse yazılır
+        if self._boundary and not self._first:
+            self._write(" ")
+        self._first = False
+        self._boundary = False
+        self._write(data)
+
+    def _mark_boundary(self, *args):
+        self._boundary = True
+
+    handle_starttag = handle_endtag = handle_startendtag = _mark_boundary
+    handle_comment = handle_decl = handle_pi = unknown_decl = _mark_boundary
+
+    def get_text(self) -> str:
+        self.close()
+        self.buffer.seek(0)
+        text = self.buffer.read().decode("utf-8")
+        self.buffer.close()
+        return text
+
+
+class ContentDecodeError(Exception):
+    """İçerik base64 / UTF-8 olarak çözülemedi"""
+
+
+def stream_document_text(chunks: Iterable[bytes],
+                         spill_bytes: int = DEFAULT_SPILL_BYTES) -> Tuple[dict, Optional[str]]:
+    """
+    Yanıt gövdesi parçalarından (metadata iskeleti, düz metin) üret. Yanıtta
+    content yoksa ya da boşsa metin None döner; base64 / UTF-8 hatasında ContentDecodeError.
+    """
+    scanner = ContentScanner()
+    decoder = Base64Stream()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    extractor = StreamingTextExtractor(spill_bytes)
+    received = False
+    try:
+        for chunk in chunks:
+            encoded = scanner.feed(chunk)
+            if encoded:
+                received = True
+                extractor.feed(utf8.decode(decoder.feed(encoded)))
+        if not received:
+            extractor.buffer.close()
+            return scanner.metadata(), None
+        extractor.feed(utf8.decode(decoder.close(), final=True))
+        return scanner.metadata(), extractor.get_text()
+    except (UnicodeDecodeError, ValueError) as e:
+        # binascii.Error ValueError'dan türer
+        extractor.buffer.close()
+        raise ContentDecodeError(str(e)) from e
+
+
+def legacy_document_text(body: bytes) -> str:
+    """Eski yol: tüm yanıtı json ile okuyup sırayla çöz (yalnızca karşılaştırma için)"""
+    content = json.loads(body)["data"]["content"]
+    html = base64.b64decode(content).decode("utf-8")
+    parts = []
+
+    class Extractor(HTMLParser):
+        def handle_data(self, data):
+            parts.append(data)
+
+    Extractor().feed(html)
+    return " ".join(parts).strip()
+
+
+def synthetic_response(size_mb: float) -> bytes:
+    """Belirtilen boyutta (HTML) sentetik bir getDocumentContent yanıtı"""
+    paragraph = ("<p>MADDE {n}- (1) Türk Medeni Kanunu uyarınca eşler, evlilik birliğinin "
+                 "sarsılması hâlinde boşanma davası açabilir; hâkim şartları değerlendirir.</p>\n")
+    pieces, size, n = [], 0, 1
+    target = int(size_mb * 1024 * 1024)
+    while size < target:
+        piece = paragraph.format(n=n)
+        pieces.append(piece)
+        size += len(piece.encode("utf-8"))
+        n += 1
+    html = "<html><body>" + "".join(pieces) + "</body></html>"
+    content = base64.b64encode(html.encode("utf-8")).decode("ascii")
+    # Sunucu gibi "/" karakterlerini \/ olarak kaçır
+    return json.dumps({"data": {"content": content, "mimeType": "text/html"},
+                       "metadata": {"FMTY": "SUCCESS"}}).replace("/", "\\/").encode("utf-8")
+
+
+def measure(function) -> Tuple[object, int, float]:
+    tracemalloc.start()
+    started = time.time()
+    result = function()
+    elapsed = time.time() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def escaped_response(html: str) -> bytes:
+    """Base64 içeriğinde "/" yerine \\/, harflerin bir kısmı yerine \\uXXXX kaçışları kullanan yanıt"""
+    content = base64.b64encode(html.encode("utf-8")).decode("ascii")
+    escaped = "".join(
+        "\\/" if char == "/" else f"\\u{ord(char):04x}" if char in "AQgw+" else char
+        for char in content
+    )
+    return ('{"data": {"content": "' + escaped + '", "mimeType": "text/html"}, '
+            '"metadata": {"FMTY": "SUCCESS"}}').encode("utf-8")
+
+
+def check() -> bool:
+    """Bellek sınırı, geçici dosyaya taşma ve parça sınırındaki kaçışlar için otomatik kontrol"""
+    ok = True
+
+    def report(passed: bool, message: str):
+        nonlocal ok
+        ok = ok and passed
+        print(f"{'✓' if passed else '❌'} {message}")
+
+    def chunked(body: bytes, size: int):
+        return (body[i:i + size] for i in range(0, len(body), size))
+
+    body = synthetic_response(CHECK_SIZE_MB)
+    expected = legacy_document_text(body)
+    peaks = {}
+    for label, spill_bytes in (("bellekte", len(body) * 4), ("geçici dosyada", 256 * 1024)):
+        (metadata, text), peak, _ = measure(lambda: stream_document_text(
+            chunked(body, DEFAULT_CHUNK_BYTES), spill_bytes))
+        ratio = peak / sys.getsizeof(expected)
+        peaks[label] = peak
+        report(text == expected and metadata.get("metadata", {}).get("FMTY") == "SUCCESS",
+               f"{label}: metin eski yolla aynı")
+        report(ratio <= CHECK_MAX_RATIO, f"{label}: tepe bellek metnin {ratio:.1f}x'i "
+                                         f"(sınır {CHECK_MAX_RATIO}x)")
+    report(peaks["geçici dosyada"] < peaks["bellekte"], "geçici dosyaya taşma tepe belleği düşürüyor")
+
+    # Tampon eşiği aşınca gerçekten dosyaya taşınmalı
+    extractor = StreamingTextExtractor(spill_bytes=1024)
+    extractor.feed("<p>" + "kira bedeli " * 1000 + "</p>")
+    report(extractor.buffer._rolled, "StreamingTextExtractor eşik aşılınca geçici dosyaya taşınıyor")
+    extractor.get_text()
+
+    # Parçalar \/ ve \uXXXX kaçışlarının ortasından bölünür (1-7 baytlık parçalar)
+    # ("???" base64'te "/" üretir)
+    html = "<p>İçtihat: 5/A maddesi??? – “kira” ölçütü; ğüşıöç</p>" * 40
+    escaped = escaped_response(html)
+    assert b"\\/" in escaped and b"\\u" in escaped
+    expected = legacy_document_text(escaped)
+    for size in (1, 2, 3, 5, 7):
+        try:
+            _, text = stream_document_text(chunked(escaped, size))
+        except ContentDecodeError as e:
+            text = f"<{e}>"
+        if text != expected:
+            report(False, f"{size} baytlık parçalarla kaçışlar yanlış çözüldü")
+            break
+    else:
+        report(True, "\\/ ve \\uXXXX kaçışlarının ortasından bölünen parçalar doğru çözülüyor")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Akış halinde içerik çözme: belge başına tepe bellek ölçümü")
+    parser.add_argument("--size-mb", type=float, default=20, help="Sentetik HTML boyutu (MB)")
+    parser.add_argument("--chunk-kb", type=int, default=DEFAULT_CHUNK_BYTES // 1024, help="Okuma parçası (KB)")
+    parser.add_argument("--spill-mb", type=float, default=DEFAULT_SPILL_BYTES / 1024 / 1024,
+                        help="Geçici dosyaya taşma eşiği (MB)")
+    parser.add_argument("--max-ratio", type=float,
+                        help="Akış yolunun tepe belleği / metin nesnesi boyutu bu oranı aşarsa hata ver")
+    parser.add_argument("--check", action="store_true",
+                        help="Otomatik kontrolleri çalıştır (bellek sınırı, taşma, kaçışlar)")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check() else 1)
+
+    body = synthetic_response(args.size_mb)
+    chunk_bytes = args.chunk_kb * 1024
+    spill_bytes = int(args.spill_mb * 1024 * 1024)
+
+    def chunks():
+        stream = io.BytesIO(body)
+        return iter(lambda: stream.read(chunk_bytes), b"")
+
+    legacy_text, legacy_peak, legacy_time = measure(lambda: legacy_document_text(body))
+    (_, text), stream_peak, stream_time = measure(lambda: stream_document_text(chunks(), spill_bytes))
+    if text != legacy_text:
+        print("❌ Akış yolu eski yoldan farklı metin üretti")
+        sys.exit(1)
+
+    # Oranlar, sonunda bellekte kalan metin nesnesinin boyutuna göredir
+    mb = 1024 * 1024
+    text_size = sys.getsizeof(text)
+    print(f"Yanıt {len(body) / mb:.1f} MB, metin nesnesi {text_size / mb:.1f} MB "
+          f"(yanıt gövdesi ölçüme dahil değil)")
+    print(f"  eski yol : tepe {legacy_peak / mb:7.1f} MB ({legacy_peak / text_size:.1f}x), {legacy_time:.2f} sn")
+    print(f"  akış yolu: tepe {stream_peak / mb:7.1f} MB ({stream_peak / text_size:.1f}x), {stream_time:.2f} sn")
+    if args.max_ratio and stream_peak / text_size > args.max_ratio:
+        print(f"❌ Akış yolu tepe belleği {args.max_ratio}x sınırını aşıyor")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Birden fazla makinede içtihat çekimi için PostgreSQL iş kuyruğu
+
+Çekim (içtihat türü, yıl, birim, sayfa aralığı) işlerine bölünür ve crawl_jobs
+tablosuna yazılır. Her düğümdeki işçi bir işi `FOR UPDATE SKIP LOCKED` ile alır
+(aynı işi iki işçi alamaz, işçiler birbirini beklemez), süreli bir kira
+(lease) tutar ve her sayfadan sonra kirayı ilerlemeyle birlikte yeniler. Kirası
+dolan iş (çöken / bağlantısı kopan işçi) başka bir işçi tarafından kaldığı
+sayfadan devralınır; `max_attempts` denemeden sonra failed olarak işaretlenir.
+Sonuçlar normal upsert yolundan yazıldığından bir sayfanın yeniden işlenmesi
+güvenlidir.
+
+Kuyruk işlemleri upsert'lerden bağımsız, autocommit bir bağlantıda yapılır.
+"""
+
+import os
+import math
+import socket
+from typing import Dict, List, Optional
+
+from psycopg2.extras import execute_values
+
+PAGE_SIZE = 100
+DEFAULT_PAGES_PER_JOB = 10
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 5
+
+CRAWL_JOBS_SQL = """
+CREATE TABLE IF NOT EXISTS crawl_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    item_type VARCHAR(50) NOT NULL,
+    year INTEGER NOT NULL,
+    birim_id VARCHAR(50) NOT NULL DEFAULT '',
+    page_start INTEGER NOT NULL,
+    page_end INTEGER NOT NULL,
+    next_page INTEGER NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'pending',
+    attempts SMALLINT NOT NULL DEFAULT 0,
+    worker VARCHAR(100),
+    lease_until TIMESTAMP,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (item_type, year, birim_id, page_start)
+);
+
+-- Yalnızca alınabilir işler taranır; tamamlanan işler indekste yer tutmaz
+CREATE INDEX IF NOT EXISTS idx_crawl_jobs_open ON crawl_jobs(id)
+    WHERE status IN ('pending', 'running');
+"""
+
+CLAIM_SQL = """
+UPDATE crawl_jobs SET
+    status = 'running',
+    worker = %(worker)s,
+    attempts = attempts + 1,
+    lease_until = CURRENT_TIMESTAMP + make_interval(secs => %(lease)s),
+    updated_at = CURRENT_TIMESTAMP
+WHERE id = (
+    SELECT id FROM crawl_jobs
+    WHERE (status = 'pending' OR (status = 'running' AND lease_until < CURRENT_TIMESTAMP))
+      AND attempts < %(max_attempts)s
+    ORDER BY id
+    FOR UPDATE SKIP LOCKED
+    LIMIT 1
+)
+RETURNING id, item_type, year, birim_id, page_start, page_end, next_page, attempts
+"""
+
+# Kirası dolmuş ve deneme hakkı bitmiş işler
+EXPIRE_SQL = """
+UPDATE crawl_jobs SET status = 'failed', error = COALESCE(error, 'kira süresi doldu'),
+    updated_at = CURRENT_TIMESTAMP
+WHERE status = 'running' AND lease_until < CURRENT_TIMESTAMP AND attempts >= %s
+"""
+
+
+def default_worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def page_ranges(total: int, pages_per_job: int, page_size: int = PAGE_SIZE) -> List[tuple]:
+    """Toplam kayıt sayısından (ilk sayfa, son sayfa) iş aralıkları"""
+    pages = math.ceil(total / page_size)
+    return [(start, min(start + pages_per_job - 1, pages)) for start in range(1, pages + 1, pages_per_job)]
+
+
+class CrawlQueue:
+    """crawl_jobs tablosu üzerinde iş ekleme, alma, kira yenileme ve sonuçlandırma"""
+
+    def __init__(self, conn, worker: Optional[str] = None, lease_seconds: int = DEFAULT_LEASE_SECONDS,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.conn = conn
+        self.conn.autocommit = True
+        self.worker = worker or default_worker_name()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def install(self):
+        with self.conn.cursor() as cur:
+            cur.execute(CRAWL_JOBS_SQL)
+
+    def enqueue(self, item_type: str, year: int, total: int, pages_per_job: int = DEFAULT_PAGES_PER_JOB,
+                birim_id: Optional[str] = None) -> int:
+        """Bir (tür, yıl, birim) için sayfa aralığı işlerini ekle; var olanlar atlanır, eklenen iş sayısı döner"""
+        ranges = page_ranges(total, pages_per_job)
+        if not ranges:
+            return 0
+        with self.conn.cursor() as cur:
+            # Yalnızca gerçekten eklenen satırlar döner; çakışıp atlananlar sayılmaz
+            inserted = execute_values(cur, """
+                INSERT INTO crawl_jobs (item_type, year, birim_id, page_start, page_end, next_page)
+                VALUES %s
+                ON CONFLICT (item_type, year, birim_id, page_start) DO NOTHING
+                RETURNING id
+            """, [(item_type, year, birim_id or "", start, end, start) for start, end in ranges], fetch=True)
+        return len(inserted)
+
+    def claim(self) -> Optional[Dict]:
+        """Bekleyen ya da kirası dolmuş bir işi al"""
+        with self.conn.cursor() as cur:
+            cur.execute(EXPIRE_SQL, (self.max_attempts,))
+            cur.execute(CLAIM_SQL, {"worker": self.worker, "lease": self.lease_seconds,
+                                    "max_attempts": self.max_attempts})
+            row = cur.fetchone()
+            if row is None:
+                return None
+            columns = [column.name for column in cur.description]
+        return dict(zip(columns, row))
+
+    def renew(self, job_id: int, next_page: Optional[int] = None) -> bool:
+        """Kirayı (ve ilerlemeyi) yenile; iş başka bir işçiye geçtiyse False"""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE crawl_jobs SET
+                    lease_until = CURRENT_TIMESTAMP + make_interval(secs => %s),
+                    next_page = COALESCE(%s, next_page),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND worker = %s AND status = 'running'
+            """, (self.lease_seconds, next_page, job_id, self.worker))
+            return cur.rowcount == 1
+
+    def complete(self, job_id: int) -> bool:
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE crawl_jobs SET status = 'done', lease_until = NULL, error = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND worker = %s AND status = 'running'
+            """, (job_id, self.worker))
+            return cur.rowcount == 1
+
+    def fail(self, job_id: int, error: str):
+        """Hatalı işi bırak: deneme hakkı varsa tekrar pending, yoksa failed"""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                UPDATE crawl_jobs SET
+                    status = CASE WHEN attempts < %s THEN 'pending' ELSE 'failed' END,
+                    lease_until = NULL, error = %s, updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND worker = %s AND status = 'running'
+            """, (self.max_attempts, error[:1000], job_id, self.worker))
+
+    def status(self) -> List[tuple]:
+        """(durum, iş sayısı, kalan sayfa) özetleri; süresi dolmuş kiralar ayrıca sayılır"""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT CASE WHEN status = 'running' AND lease_until < CURRENT_TIMESTAMP
+                            THEN 'expired' ELSE status END AS durum,
+                       COUNT(*), SUM(page_end - next_page + 1) FILTER (WHERE status <> 'done')
+                FROM crawl_jobs
+                GROUP BY durum
+                ORDER BY durum
+            """)
+            return cur.fetchall()
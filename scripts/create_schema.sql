@@ -12,7 +12,6 @@ CREATE TABLE IF NOT EXISTS mevzuatlar (
     mevzuat_no INTEGER,
     mevzuat_adi TEXT NOT NULL,
     mevzuat_tur VARCHAR(50),
-    mevzuat_tur_adi VARCHAR(200),
     mevzuat_tertip INTEGER,
     kayit_tarihi TIMESTAMP,
     guncelleme_tarihi TIMESTAMP,
@@ -20,6 +19,8 @@ CREATE TABLE IF NOT EXISTS mevzuatlar (
     resmi_gazete_sayisi VARCHAR(50),
     url TEXT,
     icerik TEXT,
+    -- icerik çekildiğinde listedeki guncelleme_tarihi (içerik yalnızca daha yeniyse yeniden çekilir)
+    icerik_guncelleme_tarihi TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -35,6 +36,52 @@ CREATE INDEX IF NOT EXISTS idx_mevzuatlar_adi_gin ON mevzuatlar
 CREATE INDEX IF NOT EXISTS idx_mevzuatlar_icerik_gin ON mevzuatlar 
     USING gin(to_tsvector('turkish', COALESCE(icerik, '')));
 
+-- Madde düzeyinde mevzuat metinleri (mevzuat_id = mevzuatlar.id);
+-- mevzuat_scraper.py / split_mevzuat_articles.py doldurur
+CREATE TABLE IF NOT EXISTS mevzuat_maddeleri (
+    mevzuat_id INTEGER NOT NULL REFERENCES mevzuatlar(id) ON DELETE CASCADE,
+    madde_no VARCHAR(20) NOT NULL,
+    sira INTEGER NOT NULL,
+    baslangic INTEGER NOT NULL,
+    bitis INTEGER NOT NULL,
+    metin TEXT NOT NULL,
+    search_vector tsvector GENERATED ALWAYS AS (to_tsvector('turkish', metin)) STORED,
+    PRIMARY KEY (mevzuat_id, madde_no)
+);
+
+CREATE INDEX IF NOT EXISTS idx_mevzuat_maddeleri_search_vector ON mevzuat_maddeleri
+    USING gin(search_vector);
+
+-- Değişen mevzuat metinlerinin önceki sürümleri (mevzuat_id = mevzuatlar.id);
+-- mevzuat_scraper.py yeni metni yazmadan önce farklıysa eskisini buraya taşır
+CREATE TABLE IF NOT EXISTS mevzuat_versiyonlari (
+    id BIGSERIAL PRIMARY KEY,
+    mevzuat_id INTEGER NOT NULL REFERENCES mevzuatlar(id) ON DELETE CASCADE,
+    guncelleme_tarihi TIMESTAMP,
+    icerik TEXT NOT NULL,
+    arsivlenme_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_mevzuat_versiyonlari_mevzuat
+    ON mevzuat_versiyonlari(mevzuat_id, guncelleme_tarihi);
+
+-- Bir mevzuatın verilen tarihte geçerli olan metni (güncel ya da arşivlenmiş sürüm)
+CREATE OR REPLACE FUNCTION mevzuat_icerik_tarihinde(p_mevzuat_id VARCHAR, p_tarih TIMESTAMP)
+RETURNS TEXT AS $$
+    SELECT icerik FROM (
+        SELECT COALESCE(m.icerik_guncelleme_tarihi, m.guncelleme_tarihi) AS tarih, m.icerik
+        FROM mevzuatlar m
+        WHERE m.mevzuat_id = p_mevzuat_id AND m.icerik IS NOT NULL
+        UNION ALL
+        SELECT v.guncelleme_tarihi, v.icerik
+        FROM mevzuat_versiyonlari v JOIN mevzuatlar m ON m.id = v.mevzuat_id
+        WHERE m.mevzuat_id = p_mevzuat_id
+    ) surumler
+    WHERE tarih <= p_tarih
+    ORDER BY tarih DESC
+    LIMIT 1
+$$ LANGUAGE sql STABLE;
+
 -- Mevzuat türleri referans tablosu
 CREATE TABLE IF NOT EXISTS mevzuat_turleri (
     id SERIAL PRIMARY KEY,
@@ -64,35 +111,107 @@ ON CONFLICT (kod) DO NOTHING;
 -- İÇTİHAT TABLOLARI
 -- ============================================================
 
+-- Tekrar eden metadata için sözlük tabloları (satırlar tamsayı id saklar)
+CREATE TABLE IF NOT EXISTS birimler (
+    id SERIAL PRIMARY KEY,
+    adi VARCHAR(200) UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS karar_turleri (
+    id SMALLSERIAL PRIMARY KEY,
+    adi VARCHAR(100) UNIQUE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS kesinlesme_durumlari (
+    id SMALLSERIAL PRIMARY KEY,
+    adi VARCHAR(50) UNIQUE NOT NULL
+);
+
 -- Ana içtihat tablosu
+-- Karar yılına göre bölümlenmiş yerleşim için:
+--   psql -v ictihat_partitioned=1 -f create_schema.sql
+-- Yıl bölümlerini ayrıca içtihat türüne göre alt bölümlemek için ek olarak:
+--   -v ictihat_subpartitioned=1
+\if :{?ictihat_subpartitioned}
+\set ictihat_partition_keys 'karar_no_yil, item_type'
+\set ictihat_by_type true
+\else
+\set ictihat_partition_keys 'karar_no_yil'
+\set ictihat_by_type false
+\endif
+
+\if :{?ictihat_partitioned}
+CREATE SEQUENCE IF NOT EXISTS ictihatlar_id_seq;
+CREATE TABLE IF NOT EXISTS ictihatlar (
+    id INTEGER NOT NULL DEFAULT nextval('ictihatlar_id_seq'),
+    document_id VARCHAR(50) NOT NULL,
+    item_type VARCHAR(50) NOT NULL,
+    birim_id VARCHAR(50),
+    birim_ref INTEGER REFERENCES birimler(id),
+    esas_no_yil INTEGER,
+    esas_no_sira INTEGER,
+    karar_no_yil INTEGER NOT NULL DEFAULT 0,
+    karar_no_sira INTEGER,
+    esas_no VARCHAR(50),
+    karar_no VARCHAR(50),
+    karar_turu_id SMALLINT REFERENCES karar_turleri(id),
+    karar_tarihi DATE,
+    karar_tarihi_str VARCHAR(20),
+    kesinlesme_durumu_id SMALLINT REFERENCES kesinlesme_durumlari(id),
+    karar_metni TEXT,
+    -- Benzer (şablon) kararların grubu ve grubun temsilcisi; detect_near_duplicates.py doldurur
+    duplicate_group_id INTEGER,
+    canonical_id INTEGER,
+    metin_ozeti CHAR(40),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, :ictihat_partition_keys),
+    UNIQUE (document_id, :ictihat_partition_keys)
+) PARTITION BY RANGE (karar_no_yil);
+ALTER SEQUENCE ictihatlar_id_seq OWNED BY ictihatlar.id;
+\endif
+
+-- Tek tablo yerleşimi (bölümlenmiş tablo oluşturulduysa atlanır)
 CREATE TABLE IF NOT EXISTS ictihatlar (
     id SERIAL PRIMARY KEY,
     document_id VARCHAR(50) UNIQUE NOT NULL,
     item_type VARCHAR(50) NOT NULL,
-    item_type_adi VARCHAR(200),
     birim_id VARCHAR(50),
-    birim_adi VARCHAR(200),
+    birim_ref INTEGER REFERENCES birimler(id),
     esas_no_yil INTEGER,
     esas_no_sira INTEGER,
     karar_no_yil INTEGER,
     karar_no_sira INTEGER,
     esas_no VARCHAR(50),
     karar_no VARCHAR(50),
-    karar_turu VARCHAR(100),
+    karar_turu_id SMALLINT REFERENCES karar_turleri(id),
     karar_tarihi DATE,
     karar_tarihi_str VARCHAR(20),
-    kesinlesme_durumu VARCHAR(50),
+    kesinlesme_durumu_id SMALLINT REFERENCES kesinlesme_durumlari(id),
     karar_metni TEXT,
+    -- Benzer (şablon) kararların grubu ve grubun temsilcisi; detect_near_duplicates.py doldurur
+    duplicate_group_id INTEGER,
+    canonical_id INTEGER,
+    metin_ozeti CHAR(40),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 -- İçtihat indeksleri
 CREATE INDEX IF NOT EXISTS idx_ictihatlar_type ON ictihatlar(item_type);
-CREATE INDEX IF NOT EXISTS idx_ictihatlar_birim ON ictihatlar(birim_adi);
+CREATE INDEX IF NOT EXISTS idx_ictihatlar_birim_ref ON ictihatlar(birim_ref);
 CREATE INDEX IF NOT EXISTS idx_ictihatlar_esas ON ictihatlar(esas_no_yil, esas_no_sira);
 CREATE INDEX IF NOT EXISTS idx_ictihatlar_karar ON ictihatlar(karar_no_yil, karar_no_sira);
 CREATE INDEX IF NOT EXISTS idx_ictihatlar_tarih ON ictihatlar(karar_tarihi);
+CREATE INDEX IF NOT EXISTS idx_ictihatlar_kesinlesme ON ictihatlar(kesinlesme_durumu_id, karar_tarihi);
+
+-- refresh_finality.py'nin kesinleşme durumunu son sorguladığı zaman; ayrı
+-- tabloda tutulur ki yalnızca kontrol edilen satırlarda updated_at trigger'ı
+-- çalışmasın (ES artımlı senkronu bu satırları yeniden göndermesin)
+CREATE TABLE IF NOT EXISTS kesinlesme_kontrolleri (
+    document_id VARCHAR(50) PRIMARY KEY,
+    kontrol_tarihi TIMESTAMP NOT NULL
+);
 
 -- İçtihat full-text search indeksi
 CREATE INDEX IF NOT EXISTS idx_ictihatlar_metin_gin ON ictihatlar 
@@ -116,21 +235,127 @@ INSERT INTO ictihat_turleri (kod, adi) VALUES
     ('KYB', 'Kanun Yararına Bozma Kararları')
 ON CONFLICT (kod) DO NOTHING;
 
+-- getBirimler önbelleği (reference_cache.py); tür listeleri ictihat_turleri /
+-- mevzuat_turleri'nde tutulur, her kaynağın son yenilenmesi referans_yenilemeleri'nde
+CREATE TABLE IF NOT EXISTS ictihat_birimleri (
+    item_type VARCHAR(50) NOT NULL,
+    birim_id VARCHAR(50) NOT NULL,
+    adi VARCHAR(200) NOT NULL,
+    aktif BOOLEAN NOT NULL DEFAULT TRUE,
+    PRIMARY KEY (item_type, birim_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ictihat_birimleri_adi ON ictihat_birimleri(adi);
+
+CREATE TABLE IF NOT EXISTS referans_yenilemeleri (
+    kaynak VARCHAR(100) PRIMARY KEY,
+    yenilenme_tarihi TIMESTAMP NOT NULL
+);
+
+-- Karar yılı bölümü oluşturma (yalnızca bölümlenmiş ictihatlar tablosunda kullanılır).
+-- Yılı bilinmeyen kararlar karar_no_yil = 0 ile ictihatlar_yil_yok bölümüne düşer.
+CREATE OR REPLACE FUNCTION ictihat_yil_bolumu_olustur(yil INTEGER, tur_bazli BOOLEAN DEFAULT FALSE)
+RETURNS TEXT AS $$
+DECLARE
+    bolum TEXT := CASE WHEN yil < 1 THEN 'ictihatlar_yil_yok' ELSE 'ictihatlar_y' || yil END;
+    sinir TEXT := CASE WHEN yil < 1 THEN 'FROM (MINVALUE) TO (1)'
+                       ELSE format('FROM (%s) TO (%s)', yil, yil + 1) END;
+    tur RECORD;
+BEGIN
+    IF to_regclass(bolum) IS NOT NULL THEN
+        RETURN bolum;
+    END IF;
+
+    IF tur_bazli THEN
+        EXECUTE format('CREATE TABLE %I PARTITION OF ictihatlar FOR VALUES %s PARTITION BY LIST (item_type)',
+                       bolum, sinir);
+        FOR tur IN SELECT kod FROM ictihat_turleri LOOP
+            EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES IN (%L)',
+                           bolum || '_' || lower(tur.kod), bolum, tur.kod);
+        END LOOP;
+        EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', bolum || '_diger', bolum);
+    ELSE
+        EXECUTE format('CREATE TABLE %I PARTITION OF ictihatlar FOR VALUES %s', bolum, sinir);
+    END IF;
+    RETURN bolum;
+END;
+$$ LANGUAGE plpgsql;
+
+\if :{?ictihat_partitioned}
+-- 2000'den gelecek yıla kadar yıl bölümleri, yılı bilinmeyenler ve varsayılan bölüm
+SELECT ictihat_yil_bolumu_olustur(yil, :ictihat_by_type)
+FROM generate_series(2000, EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + 1) AS yil;
+SELECT ictihat_yil_bolumu_olustur(0, :ictihat_by_type);
+CREATE TABLE IF NOT EXISTS ictihatlar_varsayilan PARTITION OF ictihatlar DEFAULT;
+\endif
+
 -- ============================================================
 -- UYUMLULUK VIEW'LARI
 -- ============================================================
 
+-- Sözlük tablolarına taşınan kolonları eski adlarıyla sunan view'lar
+-- (Elasticsearch migrasyonu bu view'lardan okur)
+CREATE OR REPLACE VIEW ictihatlar_detay AS
+SELECT
+    i.id,
+    i.document_id,
+    i.item_type,
+    t.adi AS item_type_adi,
+    i.birim_id,
+    b.adi AS birim_adi,
+    i.esas_no_yil,
+    i.esas_no_sira,
+    i.karar_no_yil,
+    i.karar_no_sira,
+    i.esas_no,
+    i.karar_no,
+    kt.adi AS karar_turu,
+    i.karar_tarihi,
+    i.karar_tarihi_str,
+    kd.adi AS kesinlesme_durumu,
+    i.karar_metni,
+    i.created_at,
+    i.updated_at,
+    i.duplicate_group_id,
+    i.canonical_id
+FROM ictihatlar i
+LEFT JOIN ictihat_turleri t ON t.kod = i.item_type
+LEFT JOIN birimler b ON b.id = i.birim_ref
+LEFT JOIN karar_turleri kt ON kt.id = i.karar_turu_id
+LEFT JOIN kesinlesme_durumlari kd ON kd.id = i.kesinlesme_durumu_id;
+
+CREATE OR REPLACE VIEW mevzuatlar_detay AS
+SELECT
+    m.id,
+    m.mevzuat_id,
+    m.mevzuat_no,
+    m.mevzuat_adi,
+    m.mevzuat_tur,
+    t.adi AS mevzuat_tur_adi,
+    m.mevzuat_tertip,
+    m.kayit_tarihi,
+    m.guncelleme_tarihi,
+    m.resmi_gazete_tarihi,
+    m.resmi_gazete_sayisi,
+    m.url,
+    m.icerik,
+    m.created_at,
+    m.updated_at
+FROM mevzuatlar m
+LEFT JOIN mevzuat_turleri t ON t.kod = m.mevzuat_tur;
+
 -- Mevcut kararlar tablosuyla uyumluluk için view
 CREATE OR REPLACE VIEW kararlar_view AS
 SELECT 
-    id,
-    birim_adi as yargitay_dairesi,
-    esas_no,
-    karar_no,
-    karar_tarihi,
-    karar_metni
-FROM ictihatlar
-WHERE item_type = 'YARGITAYKARARI';
+    i.id,
+    b.adi as yargitay_dairesi,
+    i.esas_no,
+    i.karar_no,
+    i.karar_tarihi,
+    i.karar_metni
+FROM ictihatlar i
+LEFT JOIN birimler b ON b.id = i.birim_ref
+WHERE i.item_type = 'YARGITAYKARARI';
 
 -- ============================================================
 -- İSTATİSTİK FONKSİYONLARI
@@ -147,11 +372,11 @@ BEGIN
     RETURN QUERY
     SELECT 
         m.mevzuat_tur,
-        COALESCE(mt.adi, m.mevzuat_tur_adi) as tur_adi,
+        mt.adi as tur_adi,
         COUNT(*) as kayit_sayisi
     FROM mevzuatlar m
     LEFT JOIN mevzuat_turleri mt ON m.mevzuat_tur = mt.kod
-    GROUP BY m.mevzuat_tur, mt.adi, m.mevzuat_tur_adi
+    GROUP BY m.mevzuat_tur, mt.adi
     ORDER BY kayit_sayisi DESC;
 END;
 $$ LANGUAGE plpgsql;
@@ -167,11 +392,11 @@ BEGIN
     RETURN QUERY
     SELECT 
         i.item_type,
-        COALESCE(it.adi, i.item_type_adi) as tur_adi,
+        it.adi as tur_adi,
         COUNT(*) as kayit_sayisi
     FROM ictihatlar i
     LEFT JOIN ictihat_turleri it ON i.item_type = it.kod
-    GROUP BY i.item_type, it.adi, i.item_type_adi
+    GROUP BY i.item_type, it.adi
     ORDER BY kayit_sayisi DESC;
 END;
 $$ LANGUAGE plpgsql;
@@ -273,7 +498,7 @@ BEGIN
         i.id,
         i.document_id,
         i.item_type,
-        i.birim_adi,
+        b.adi,
         i.esas_no,
         i.karar_no,
         i.karar_tarihi,
@@ -282,9 +507,10 @@ BEGIN
             plainto_tsquery('turkish', arama_metni)
         ) as rank
     FROM ictihatlar i
+    LEFT JOIN birimler b ON b.id = i.birim_ref
     WHERE 
         (ictihat_turu IS NULL OR i.item_type = ictihat_turu)
-        AND (birim IS NULL OR i.birim_adi ILIKE '%' || birim || '%')
+        AND (birim IS NULL OR b.adi ILIKE '%' || birim || '%')
         AND (
             to_tsvector('turkish', COALESCE(i.karar_metni, '')) 
             @@ plainto_tsquery('turkish', arama_metni)
@@ -295,6 +521,231 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Madde düzeyinde mevzuat arama fonksiyonu
+CREATE OR REPLACE FUNCTION search_mevzuat_maddeleri(
+    arama_metni TEXT,
+    mevzuat_turu VARCHAR(50) DEFAULT NULL,
+    sayfa INTEGER DEFAULT 1,
+    sayfa_boyutu INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id INTEGER,
+    mevzuat_no INTEGER,
+    mevzuat_adi TEXT,
+    madde_no VARCHAR(20),
+    metin TEXT,
+    rank REAL
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        m.id,
+        m.mevzuat_no,
+        m.mevzuat_adi,
+        mm.madde_no,
+        mm.metin,
+        ts_rank(mm.search_vector, plainto_tsquery('turkish', arama_metni)) as rank
+    FROM mevzuat_maddeleri mm
+    JOIN mevzuatlar m ON m.id = mm.mevzuat_id
+    WHERE
+        (mevzuat_turu IS NULL OR m.mevzuat_tur = mevzuat_turu)
+        AND mm.search_vector @@ plainto_tsquery('turkish', arama_metni)
+    ORDER BY rank DESC
+    LIMIT sayfa_boyutu
+    OFFSET (sayfa - 1) * sayfa_boyutu;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================
+-- ÇEKİM İŞ KUYRUĞU
+-- ============================================================
+
+-- ictihat_scraper.py --enqueue / --worker; işçiler FOR UPDATE SKIP LOCKED ile iş alır
+CREATE TABLE IF NOT EXISTS crawl_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    item_type VARCHAR(50) NOT NULL,
+    year INTEGER NOT NULL,
+    birim_id VARCHAR(50) NOT NULL DEFAULT '',
+    page_start INTEGER NOT NULL,
+    page_end INTEGER NOT NULL,
+    next_page INTEGER NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'pending',
+    attempts SMALLINT NOT NULL DEFAULT 0,
+    worker VARCHAR(100),
+    lease_until TIMESTAMP,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (item_type, year, birim_id, page_start)
+);
+
+-- Yalnızca alınabilir işler taranır; tamamlanan işler indekste yer tutmaz
+CREATE INDEX IF NOT EXISTS idx_crawl_jobs_open ON crawl_jobs(id)
+    WHERE status IN ('pending', 'running');
+
+-- ictihat_scraper.py --phrases-file; arama ifadesi -> bulunan kararlar (sıra numarasıyla)
+CREATE TABLE IF NOT EXISTS ictihat_arama_sonuclari (
+    arama_ifadesi VARCHAR(200) NOT NULL,
+    document_id VARCHAR(50) NOT NULL,
+    item_type VARCHAR(50) NOT NULL,
+    sira INTEGER NOT NULL,
+    bulunma_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (arama_ifadesi, document_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ictihat_arama_sonuclari_document
+    ON ictihat_arama_sonuclari(document_id);
+
+-- ============================================================
+-- ATIF GRAFİĞİ
+-- ============================================================
+
+-- Kararlardan kararlara (esas/karar no) ve mevzuata (kanun no + madde) atıflar;
+-- extract_citations.py doldurur, hedef id'ler çözümlenebildiğinde yazılır
+CREATE TABLE IF NOT EXISTS atiflar (
+    id BIGSERIAL PRIMARY KEY,
+    kaynak_id INTEGER NOT NULL,
+    atif_turu VARCHAR(10) NOT NULL,
+    esas_yil SMALLINT,
+    esas_sira INTEGER,
+    karar_yil SMALLINT,
+    karar_sira INTEGER,
+    birim VARCHAR(100),
+    kanun VARCHAR(20),
+    kanun_no INTEGER,
+    madde VARCHAR(20),
+    adet SMALLINT NOT NULL DEFAULT 1,
+    konum INTEGER,
+    hedef_ictihat_id INTEGER,
+    hedef_mevzuat_id INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_atiflar_kaynak ON atiflar(kaynak_id);
+CREATE INDEX IF NOT EXISTS idx_atiflar_esas ON atiflar(esas_yil, esas_sira) WHERE atif_turu = 'karar';
+CREATE INDEX IF NOT EXISTS idx_atiflar_karar ON atiflar(karar_yil, karar_sira) WHERE atif_turu = 'karar';
+CREATE INDEX IF NOT EXISTS idx_atiflar_kanun_madde ON atiflar(kanun_no, madde) WHERE atif_turu = 'mevzuat';
+CREATE INDEX IF NOT EXISTS idx_atiflar_hedef_ictihat ON atiflar(hedef_ictihat_id) WHERE hedef_ictihat_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_atiflar_hedef_mevzuat ON atiflar(hedef_mevzuat_id, madde) WHERE hedef_mevzuat_id IS NOT NULL;
+
+-- ============================================================
+-- İSTATİSTİK SAYAÇLARI
+-- ============================================================
+
+-- Tür / yıl / içerik kırılımında kayıt sayıları; ifade düzeyinde trigger'larla
+-- güncellenir, böylece istatistikler tam tablo taraması gerektirmez
+CREATE TABLE IF NOT EXISTS kayit_sayaclari (
+    tablo VARCHAR(50) NOT NULL,
+    tur VARCHAR(50) NOT NULL,
+    yil INTEGER NOT NULL,
+    icerikli BOOLEAN NOT NULL,
+    adet BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (tablo, tur, yil, icerikli)
+);
+
+CREATE OR REPLACE FUNCTION kayit_sayaclari_sifirla()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM kayit_sayaclari WHERE tablo = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION mevzuatlar_sayaclari_guncelle()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO kayit_sayaclari (tablo, tur, yil, icerikli, adet)
+        SELECT 'mevzuatlar', COALESCE(mevzuat_tur, '') AS tur, COALESCE(EXTRACT(YEAR FROM resmi_gazete_tarihi)::int, 0) AS yil, COALESCE(icerik, '') <> '' AS icerikli, COUNT(*) FROM yeni_satirlar GROUP BY tur, yil, icerikli
+        ON CONFLICT (tablo, tur, yil, icerikli)
+        DO UPDATE SET adet = kayit_sayaclari.adet + EXCLUDED.adet;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO kayit_sayaclari (tablo, tur, yil, icerikli, adet)
+        SELECT 'mevzuatlar', COALESCE(mevzuat_tur, '') AS tur, COALESCE(EXTRACT(YEAR FROM resmi_gazete_tarihi)::int, 0) AS yil, COALESCE(icerik, '') <> '' AS icerikli, -COUNT(*) FROM eski_satirlar GROUP BY tur, yil, icerikli
+        ON CONFLICT (tablo, tur, yil, icerikli)
+        DO UPDATE SET adet = kayit_sayaclari.adet + EXCLUDED.adet;
+    ELSE
+        -- Boyutları değişmeyen satırlar birbirini götürür
+        INSERT INTO kayit_sayaclari (tablo, tur, yil, icerikli, adet)
+        SELECT 'mevzuatlar', d.tur, d.yil, d.icerikli, SUM(d.fark)
+        FROM (
+            SELECT COALESCE(mevzuat_tur, '') AS tur, COALESCE(EXTRACT(YEAR FROM resmi_gazete_tarihi)::int, 0) AS yil, COALESCE(icerik, '') <> '' AS icerikli, 1 AS fark FROM yeni_satirlar
+            UNION ALL
+            SELECT COALESCE(mevzuat_tur, ''), COALESCE(EXTRACT(YEAR FROM resmi_gazete_tarihi)::int, 0), COALESCE(icerik, '') <> '', -1 FROM eski_satirlar
+        ) d
+        GROUP BY d.tur, d.yil, d.icerikli
+        HAVING SUM(d.fark) <> 0
+        ON CONFLICT (tablo, tur, yil, icerikli)
+        DO UPDATE SET adet = kayit_sayaclari.adet + EXCLUDED.adet;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger'lar yoksa sayaçları mevcut kayıtlarla doldur ve kur
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger WHERE tgrelid = 'mevzuatlar'::regclass AND tgname = 'mevzuatlar_sayac_ekle'
+    ) THEN
+        LOCK TABLE mevzuatlar IN SHARE ROW EXCLUSIVE MODE;
+        DELETE FROM kayit_sayaclari WHERE tablo = 'mevzuatlar';
+        INSERT INTO kayit_sayaclari (tablo, tur, yil, icerikli, adet)
+        SELECT 'mevzuatlar', COALESCE(mevzuat_tur, '') AS tur, COALESCE(EXTRACT(YEAR FROM resmi_gazete_tarihi)::int, 0) AS yil, COALESCE(icerik, '') <> '' AS icerikli, COUNT(*) FROM mevzuatlar GROUP BY tur, yil, icerikli;
+        CREATE TRIGGER mevzuatlar_sayac_ekle AFTER INSERT ON mevzuatlar REFERENCING NEW TABLE AS yeni_satirlar FOR EACH STATEMENT EXECUTE FUNCTION mevzuatlar_sayaclari_guncelle();
+        CREATE TRIGGER mevzuatlar_sayac_guncelle AFTER UPDATE ON mevzuatlar REFERENCING OLD TABLE AS eski_satirlar NEW TABLE AS yeni_satirlar FOR EACH STATEMENT EXECUTE FUNCTION mevzuatlar_sayaclari_guncelle();
+        CREATE TRIGGER mevzuatlar_sayac_sil AFTER DELETE ON mevzuatlar REFERENCING OLD TABLE AS eski_satirlar FOR EACH STATEMENT EXECUTE FUNCTION mevzuatlar_sayaclari_guncelle();
+        CREATE TRIGGER mevzuatlar_sayac_bosalt AFTER TRUNCATE ON mevzuatlar FOR EACH STATEMENT EXECUTE FUNCTION kayit_sayaclari_sifirla();
+    END IF;
+END $$;
+
+CREATE OR REPLACE FUNCTION ictihatlar_sayaclari_guncelle()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO kayit_sayaclari (tablo, tur, yil, icerikli, adet)
+        SELECT 'ictihatlar', COALESCE(item_type, '') AS tur, COALESCE(karar_no_yil, 0) AS yil, COALESCE(karar_metni, '') <> '' AS icerikli, COUNT(*) FROM yeni_satirlar GROUP BY tur, yil, icerikli
+        ON CONFLICT (tablo, tur, yil, icerikli)
+        DO UPDATE SET adet = kayit_sayaclari.adet + EXCLUDED.adet;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO kayit_sayaclari (tablo, tur, yil, icerikli, adet)
+        SELECT 'ictihatlar', COALESCE(item_type, '') AS tur, COALESCE(karar_no_yil, 0) AS yil, COALESCE(karar_metni, '') <> '' AS icerikli, -COUNT(*) FROM eski_satirlar GROUP BY tur, yil, icerikli
+        ON CONFLICT (tablo, tur, yil, icerikli)
+        DO UPDATE SET adet = kayit_sayaclari.adet + EXCLUDED.adet;
+    ELSE
+        -- Boyutları değişmeyen satırlar birbirini götürür
+        INSERT INTO kayit_sayaclari (tablo, tur, yil, icerikli, adet)
+        SELECT 'ictihatlar', d.tur, d.yil, d.icerikli, SUM(d.fark)
+        FROM (
+            SELECT COALESCE(item_type, '') AS tur, COALESCE(karar_no_yil, 0) AS yil, COALESCE(karar_metni, '') <> '' AS icerikli, 1 AS fark FROM yeni_satirlar
+            UNION ALL
+            SELECT COALESCE(item_type, ''), COALESCE(karar_no_yil, 0), COALESCE(karar_metni, '') <> '', -1 FROM eski_satirlar
+        ) d
+        GROUP BY d.tur, d.yil, d.icerikli
+        HAVING SUM(d.fark) <> 0
+        ON CONFLICT (tablo, tur, yil, icerikli)
+        DO UPDATE SET adet = kayit_sayaclari.adet + EXCLUDED.adet;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger'lar yoksa sayaçları mevcut kayıtlarla doldur ve kur
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger WHERE tgrelid = 'ictihatlar'::regclass AND tgname = 'ictihatlar_sayac_ekle'
+    ) THEN
+        LOCK TABLE ictihatlar IN SHARE ROW EXCLUSIVE MODE;
+        DELETE FROM kayit_sayaclari WHERE tablo = 'ictihatlar';
+        INSERT INTO kayit_sayaclari (tablo, tur, yil, icerikli, adet)
+        SELECT 'ictihatlar', COALESCE(item_type, '') AS tur, COALESCE(karar_no_yil, 0) AS yil, COALESCE(karar_metni, '') <> '' AS icerikli, COUNT(*) FROM ictihatlar GROUP BY tur, yil, icerikli;
+        CREATE TRIGGER ictihatlar_sayac_ekle AFTER INSERT ON ictihatlar REFERENCING NEW TABLE AS yeni_satirlar FOR EACH STATEMENT EXECUTE FUNCTION ictihatlar_sayaclari_guncelle();
+        CREATE TRIGGER ictihatlar_sayac_guncelle AFTER UPDATE ON ictihatlar REFERENCING OLD TABLE AS eski_satirlar NEW TABLE AS yeni_satirlar FOR EACH STATEMENT EXECUTE FUNCTION ictihatlar_sayaclari_guncelle();
+        CREATE TRIGGER ictihatlar_sayac_sil AFTER DELETE ON ictihatlar REFERENCING OLD TABLE AS eski_satirlar FOR EACH STATEMENT EXECUTE FUNCTION ictihatlar_sayaclari_guncelle();
+        CREATE TRIGGER ictihatlar_sayac_bosalt AFTER TRUNCATE ON ictihatlar FOR EACH STATEMENT EXECUTE FUNCTION kayit_sayaclari_sifirla();
+    END IF;
+END $$;
+
 -- ============================================================
 -- TAMAMLANDI
 -- ============================================================
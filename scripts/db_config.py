@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Ortak PostgreSQL Ayarları
+
+Script'lerin paylaştığı .env okuma, bağlantı konfigürasyonu ve bağlantı
+oluşturma yardımcıları. Modül import edildiğinde proje kökündeki .env
+dosyası okunur; ortamda zaten tanımlı değişkenler ezilmez.
+
+Kullanım:
+    from db_config import POSTGRES_CONFIG, create_connection
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# .env dosyasını oku
+def load_env_file():
+    """Proje kök dizinindeki .env dosyasını oku"""
+    env_path = Path(__file__).parent.parent / '.env'
+    if env_path.exists():
+        with open(env_path) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    key = key.strip()
+                    value = value.strip().strip('"').strip("'")
+                    if key not in os.environ:
+                        os.environ[key] = value
+
+load_env_file()
+
+try:
+    import psycopg2
+except ImportError:
+    print("❌ psycopg2 yüklü değil. Lütfen çalıştırın: pip install psycopg2-binary")
+    sys.exit(1)
+
+
+# PostgreSQL Konfigürasyonu
+POSTGRES_CONFIG = {
+    "host": os.getenv("POSTGRES_HOST", "localhost"),
+    "port": int(os.getenv("POSTGRES_PORT", "5432")),
+    "database": os.getenv("POSTGRES_DB", "yargisalzeka"),
+    "user": os.getenv("POSTGRES_USER", "postgres"),
+    "password": os.getenv("POSTGRES_PASSWORD", ""),
+}
+
+
+def create_connection(autocommit: bool = False):
+    """PostgreSQL bağlantısı oluştur"""
+    try:
+        conn = psycopg2.connect(**POSTGRES_CONFIG)
+        conn.autocommit = autocommit
+        return conn
+    except Exception as e:
+        print(f"❌ PostgreSQL bağlantı hatası: {e}")
+        sys.exit(1)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Yoğun vektör (dense vector) kodlayıcıları
+
+encode_dense_vectors.py tarafından kullanılan, CPU üzerinde çalışan ve harici
+servis gerektirmeyen kodlayıcılar. Her kodlayıcı `name`, `dims` ve
+`encode(texts) -> np.ndarray (len(texts), dims) float32` sağlar; çıktılar L2
+normalize edilir (Elasticsearch'te cosineSimilarity / dotProduct aynı sırayı verir).
+
+  hashing  Bağımlılıksız varsayılan: kelime ve kelime ikilisi özetleri her biri
+           birkaç boyuta ±1 ağırlıkla dağıtılır (hashing vectorizer + seyrek
+           rastgele izdüşüm). Eğitim ya da model dosyası gerekmez.
+  npz      Yerel bir NumPy model dosyası: aynı özet uzayından (`n_features`)
+           öğrenilmiş bir izdüşüm matrisi (`projection`, n_features × dims) ve
+           isteğe bağlı `idf` ağırlıkları (örn. LSA ile offline hazırlanır).
+
+Başka bir kodlayıcı `paket.modul:Sinif` biçiminde verilebilir; sınıf
+`model_file` anahtar argümanını kabul etmeli ve aynı arayüzü sağlamalıdır.
+"""
+
+import re
+import zlib
+import importlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Kelime ikilisi özetinde kelime sırasını ayırt eden çarpan (64 bitte taşarak hesaplanır)
+BIGRAM_PRIME = np.uint64(1099511628211)
+DEFAULT_DIMS = 256
+DEFAULT_HASHES_PER_FEATURE = 4
+# Çok uzun metinlerde ilk N kelime yeterli temsil sağlar, süreyi sınırlar
+DEFAULT_MAX_TOKENS = 20000
+
+
+def hashed_features(text: str, max_tokens: Optional[int] = DEFAULT_MAX_TOKENS) -> Tuple[np.ndarray, np.ndarray]:
+    """Metnin tekil kelime / kelime ikilisi özetleri ve 1 + log(tf) ağırlıkları"""
+    tokens = TOKEN_RE.findall(text.lower()) if text else []
+    if max_tokens:
+        tokens = tokens[:max_tokens]
+    if not tokens:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.float32)
+    unigrams = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tokens),
+                           dtype=np.uint64, count=len(tokens))
+    bigrams = unigrams[:-1] * BIGRAM_PRIME + unigrams[1:] + np.uint64(1)
+    features, counts = np.unique(np.concatenate([unigrams, bigrams]), return_counts=True)
+    return features, (1.0 + np.log(counts)).astype(np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class HashingProjectionEncoder:
+    """Hashing vectorizer + seyrek rastgele izdüşüm (bağımlılıksız varsayılan)"""
+
+    name = "hashing"
+
+    def __init__(self, dims: int = DEFAULT_DIMS, hashes_per_feature: int = DEFAULT_HASHES_PER_FEATURE,
+                 seed: int = 42, max_tokens: Optional[int] = DEFAULT_MAX_TOKENS, model_file=None):
+        rng = np.random.default_rng(seed)
+        self.dims = dims
+        self.max_tokens = max_tokens
+        # Her özellik k farklı boyuta düşer; işaret ayrı bir çarpanın en üst bitinden gelir
+        self.index_multipliers = rng.integers(1, 2**63, size=hashes_per_feature, dtype=np.uint64) | np.uint64(1)
+        self.sign_multipliers = rng.integers(1, 2**63, size=hashes_per_feature, dtype=np.uint64) | np.uint64(1)
+
+    def encode_one(self, text: str) -> np.ndarray:
+        features, weights = hashed_features(text, self.max_tokens)
+        if not len(features):
+            return np.zeros(self.dims, dtype=np.float32)
+        index = ((features[:, None] * self.index_multipliers[None, :]) >> np.uint64(32)) % np.uint64(self.dims)
+        signs = ((features[:, None] * self.sign_multipliers[None, :]) >> np.uint64(63)).astype(np.float32) * 2 - 1
+        return np.bincount(index.ravel().astype(np.int64), weights=(signs * weights[:, None]).ravel(),
+                           minlength=self.dims).astype(np.float32)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return _normalize(np.vstack([self.encode_one(text) for text in texts]))
+
+
+class NpzProjectionEncoder:
+    """Yerel .npz dosyasındaki öğrenilmiş izdüşüm matrisiyle kodlama"""
+
+    name = "npz"
+
+    def __init__(self, model_file: str, max_tokens: Optional[int] = DEFAULT_MAX_TOKENS):
+        with np.load(model_file) as model:
+            self.projection = model["projection"].astype(np.float32)
+            self.idf = model["idf"].astype(np.float32) if "idf" in model else None
+        self.n_features, self.dims = self.projection.shape
+        self.max_tokens = max_tokens
+
+    def encode_one(self, text: str) -> np.ndarray:
+        features, weights = hashed_features(text, self.max_tokens)
+        if not len(features):
+            return np.zeros(self.dims, dtype=np.float32)
+        buckets = (features % np.uint64(self.n_features)).astype(np.int64)
+        if self.idf is not None:
+            weights = weights * self.idf[buckets]
+        return weights @ self.projection[buckets]
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return _normalize(np.vstack([self.encode_one(text) for text in texts]))
+
+
+ENCODERS = {
+    HashingProjectionEncoder.name: HashingProjectionEncoder,
+    NpzProjectionEncoder.name: NpzProjectionEncoder,
+}
+
+
+def load_encoder(name: str, model_file: Optional[str] = None, dims: int = DEFAULT_DIMS):
+    """Ada ya da `paket.modul:Sinif` yoluna göre kodlayıcı oluştur"""
+    if name == HashingProjectionEncoder.name:
+        return HashingProjectionEncoder(dims=dims)
+    if name == NpzProjectionEncoder.name:
+        if not model_file:
+            raise ValueError("npz kodlayıcısı için --model-file gerekli")
+        return NpzProjectionEncoder(model_file)
+    if ":" not in name:
+        raise ValueError(f"Bilinmeyen kodlayıcı: {name} (seçenekler: {', '.join(ENCODERS)} "
+                         "veya paket.modul:Sinif)")
+    module_name, class_name = name.split(":", 1)
+    encoder_class = getattr(importlib.import_module(module_name), class_name)
+    return encoder_class(model_file=model_file) if model_file else encoder_class()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Neredeyse Aynı (Şablon) Kararların MinHash/LSH ile Tespiti
+
+Yerel Hukuk ve İstinaf kararlarının önemli bir kısmı yalnızca taraf adları ve
+tarihlerle farklılaşan şablon metinlerdir; Elasticsearch index'ini büyütür ve
+arama sonuçlarını aynı metnin kopyalarıyla doldurur. Bu script ictihatlar
+tablosunda seçilen türlerin karar_metni kolonları üzerinde:
+
+  1. Metni kelimelere ayırıp k-kelimelik shingle'ların 64 bitlik özetlerini çıkarır
+  2. NumPy ile MinHash imzaları hesaplar (çarp-kaydır hash ailesi)
+  3. İmzaları bantlara bölerek (LSH) aday çiftleri bulur, imza benzerliği eşiği
+     geçen çiftleri union-find ile gruplar
+  4. Grup üyelerine duplicate_group_id (grubun en küçük id'si) ve canonical_id
+     (en uzun metne sahip üye) yazar; tekil kararlarda iki kolon da NULL olur
+
+Gruplar her içtihat türü içinde ayrı ayrı hesaplanır. Yalnızca değeri değişen
+satırlar güncellenir; updated_at trigger'ı sayesinde artımlı ES senkronizasyonu
+değişen kararları alır. Yalnızca kanonik kararları indekslemek için:
+
+    python migrate_tables_to_elasticsearch.py --tables ictihatlar --filter canonical
+
+Kullanım:
+    python detect_near_duplicates.py --dry-run
+    python detect_near_duplicates.py
+    python detect_near_duplicates.py --item-types YERELHUKUK --threshold 0.9
+    python detect_near_duplicates.py --num-perm 128 --bands 16 --shingle-size 5
+
+Gereksinimler:
+    pip install psycopg2-binary numpy
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre
+"""
+
+import re
+import sys
+import time
+import zlib
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ numpy yüklü değil. Lütfen çalıştırın: pip install numpy")
+    sys.exit(1)
+
+try:
+    from psycopg2.extras import execute_values
+except ImportError:
+    print("❌ psycopg2 yüklü değil. Lütfen çalıştırın: pip install psycopg2-binary")
+    sys.exit(1)
+
+from db_config import POSTGRES_CONFIG, create_connection
+from ictihat_scraper import ICTIHAT_TURLERI
+
+DEFAULT_ITEM_TYPES = ["YERELHUKUK", "ISTINAFHUKUK"]
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 16
+DEFAULT_SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_BATCH_SIZE = 2000
+# Çok kısa metinlerde birkaç shingle benzerliği anlamsız yükseltir
+MIN_SHINGLES = 20
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Shingle özetinde kelime konumlarını ayırt eden çarpan (64 bitte taşarak hesaplanır)
+SHINGLE_PRIME = np.uint64(1099511628211)
+
+# id -> (duplicate_group_id, canonical_id)
+Assignment = Tuple[Optional[int], Optional[int]]
+
+
+class MinHasher:
+    """Shingle özetlerinden sabit uzunlukta MinHash imzası üretir"""
+
+    def __init__(self, num_perm: int, shingle_size: int, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        # h(x) = (a*x + b) mod 2^64 >> 32; tek a değerleriyle evrensel hash ailesi
+        self.a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Metnin k-kelimelik shingle'larının tekil 64 bitlik özetleri"""
+        tokens = TOKEN_RE.findall(text.lower())
+        if len(tokens) < self.shingle_size:
+            return np.empty(0, dtype=np.uint64)
+        token_hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tokens),
+                                   dtype=np.uint64, count=len(tokens))
+        count = len(tokens) - self.shingle_size + 1
+        hashes = np.zeros(count, dtype=np.uint64)
+        for offset in range(self.shingle_size):
+            hashes = hashes * SHINGLE_PRIME + token_hashes[offset:offset + count]
+        return np.unique(hashes)
+
+    def signature(self, shingles: np.ndarray) -> np.ndarray:
+        hashed = self.a[:, None] * shingles[None, :] + self.b[:, None]
+        return (hashed >> np.uint64(32)).astype(np.uint32).min(axis=1)
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        root = self.parent.setdefault(x, x)
+        while root != self.parent[root]:
+            root = self.parent[root]
+        while x != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, x: int, y: int):
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[max(rx, ry)] = min(rx, ry)
+
+
+def load_signatures(conn, item_type: str, hasher: MinHasher, batch_size: int):
+    """Türün kararlarını sunucu taraflı cursor ile okuyup imzalarını hesapla"""
+    ids: List[int] = []
+    lengths: List[int] = []
+    signatures: List[np.ndarray] = []
+    current: Dict[int, Assignment] = {}
+
+    started = time.time()
+    scanned = 0
+    with conn.cursor(name=f"near_duplicates_{item_type.lower()}") as cur:
+        cur.itersize = batch_size
+        cur.execute("""
+            SELECT id, karar_metni, duplicate_group_id, canonical_id
+            FROM ictihatlar
+            WHERE item_type = %s
+            ORDER BY id
+        """, (item_type,))
+        for doc_id, text, group_id, canonical_id in cur:
+            scanned += 1
+            if group_id is not None or canonical_id is not None:
+                current[doc_id] = (group_id, canonical_id)
+            shingles = hasher.shingles(text) if text else None
+            if shingles is not None and len(shingles) >= MIN_SHINGLES:
+                ids.append(doc_id)
+                lengths.append(len(text))
+                signatures.append(hasher.signature(shingles))
+            if scanned % 10000 == 0:
+                elapsed = time.time() - started
+                print(f"  {item_type}: {scanned:,} karar, {scanned / elapsed:,.0f} karar/sn", end="\r")
+    conn.commit()
+    print(f"  {item_type}: {scanned:,} karar okundu, {len(ids):,} imza "
+          f"({time.time() - started:.1f} sn)" + " " * 10)
+
+    matrix = np.vstack(signatures) if signatures else np.empty((0, hasher.num_perm), dtype=np.uint32)
+    return np.array(ids, dtype=np.int64), np.array(lengths, dtype=np.int64), matrix, current
+
+
+def find_groups(ids: np.ndarray, signatures: np.ndarray, bands: int,
+                threshold: float) -> Tuple[UnionFind, int]:
+    """LSH bantlarında çakışan adayları imza benzerliğiyle doğrulayıp birleştir"""
+    uf = UnionFind()
+    rows = signatures.shape[1] // bands
+    pairs = 0
+    for band in range(bands):
+        # Bant değerlerini tek bir 64 bitlik anahtara indir; aynı anahtarlı satırlar adaydır
+        keys = np.zeros(len(ids), dtype=np.uint64)
+        for column in range(band * rows, (band + 1) * rows):
+            keys = keys * SHINGLE_PRIME + signatures[:, column].astype(np.uint64)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        boundaries = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+        for bucket in np.split(order, boundaries):
+            if len(bucket) < 2:
+                continue
+            # Her üye kovadaki temsilcilerle karşılaştırılır; eşleşmeyen üye yeni temsilci
+            # olur. Şablon kovalarında temsilci sayısı küçük kalır, O(n²) karşılaştırma olmaz.
+            representatives = [bucket[0]]
+            for member in bucket[1:]:
+                similarity = (signatures[representatives] == signatures[member]).mean(axis=1)
+                best = int(similarity.argmax())
+                if similarity[best] >= threshold:
+                    if uf.find(int(ids[member])) != uf.find(int(ids[representatives[best]])):
+                        uf.union(int(ids[member]), int(ids[representatives[best]]))
+                        pairs += 1
+                else:
+                    representatives.append(member)
+    return uf, pairs
+
+
+def build_assignments(uf: UnionFind, ids: np.ndarray, lengths: np.ndarray) -> Dict[int, Assignment]:
+    """Her grup için (en küçük id, en uzun metne sahip üye) ataması"""
+    length_of = dict(zip(ids.tolist(), lengths.tolist()))
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for doc_id in uf.parent:
+        groups[uf.find(doc_id)].append(doc_id)
+
+    assignments: Dict[int, Assignment] = {}
+    for root, members in groups.items():
+        if len(members) < 2:
+            continue
+        canonical = min(members, key=lambda m: (-length_of[m], m))
+        for member in members:
+            assignments[member] = (root, canonical)
+    return assignments
+
+
+def apply_assignments(conn, current: Dict[int, Assignment], assignments: Dict[int, Assignment],
+                      batch_size: int) -> int:
+    """Yalnızca değeri değişen satırları kısa transaction'larda güncelle"""
+    changes = [
+        (doc_id, *assignments.get(doc_id, (None, None)))
+        for doc_id in sorted(set(current) | set(assignments))
+        if assignments.get(doc_id, (None, None)) != current.get(doc_id, (None, None))
+    ]
+    for i in range(0, len(changes), batch_size):
+        with conn.cursor() as cur:
+            execute_values(cur, """
+                UPDATE ictihatlar i
+                SET duplicate_group_id = v.group_id, canonical_id = v.canonical_id
+                FROM (VALUES %s) AS v(id, group_id, canonical_id)
+                WHERE i.id = v.id
+            """, changes[i:i + batch_size], template="(%s, %s::integer, %s::integer)")
+        conn.commit()
+    return len(changes)
+
+
+def process_item_type(conn, item_type: str, hasher: MinHasher, bands: int, threshold: float,
+                      batch_size: int, dry_run: bool) -> Dict:
+    print(f"\n{'='*60}")
+    print(f"🧬 {item_type} ({ICTIHAT_TURLERI.get(item_type, item_type)})")
+    print("="*60)
+
+    ids, lengths, signatures, current = load_signatures(conn, item_type, hasher, batch_size)
+    started = time.time()
+    uf, pairs = find_groups(ids, signatures, bands, threshold)
+    assignments = build_assignments(uf, ids, lengths)
+    groups = len({group_id for group_id, _ in assignments.values()})
+    duplicates = len(assignments) - groups
+    print(f"✓ LSH {time.time() - started:.1f} sn: {pairs:,} benzer çift, {groups:,} grup, "
+          f"{duplicates:,} kopya karar ({duplicates / len(ids) if len(ids) else 0:.1%})")
+
+    updated = 0
+    if not dry_run:
+        updated = apply_assignments(conn, current, assignments, batch_size)
+        print(f"✓ {updated:,} satır güncellendi")
+    return {"documents": len(ids), "groups": groups, "duplicates": duplicates, "updated": updated}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ictihatlar'da neredeyse aynı kararları MinHash/LSH ile grupla")
+    parser.add_argument("--item-types", nargs="+", choices=list(ICTIHAT_TURLERI.keys()),
+                        default=DEFAULT_ITEM_TYPES,
+                        help=f"İşlenecek içtihat türleri (varsayılan: {' '.join(DEFAULT_ITEM_TYPES)})")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Aynı gruba alınmak için gereken tahmini Jaccard benzerliği")
+    parser.add_argument("--num-perm", type=int, default=DEFAULT_NUM_PERM,
+                        help="MinHash imza uzunluğu")
+    parser.add_argument("--bands", type=int, default=DEFAULT_BANDS,
+                        help="LSH bant sayısı (num-perm'i tam bölmeli)")
+    parser.add_argument("--shingle-size", type=int, default=DEFAULT_SHINGLE_SIZE,
+                        help="Shingle başına kelime sayısı")
+    parser.add_argument("--batch-size", "-b", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Okuma ve güncelleme batch boyutu")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Yalnızca grupları raporla, veritabanına yazma")
+    args = parser.parse_args()
+
+    if args.num_perm % args.bands:
+        parser.error("--num-perm, --bands değerine tam bölünmeli")
+
+    if not POSTGRES_CONFIG["password"]:
+        print("❌ POSTGRES_PASSWORD tanımlı değil! .env dosyasını kontrol edin.")
+        sys.exit(1)
+
+    rows = args.num_perm // args.bands
+    print(f"MinHash: {args.num_perm} permütasyon, {args.bands} bant × {rows} satır "
+          f"(LSH eşiği ≈ {(1 / args.bands) ** (1 / rows):.2f}), doğrulama eşiği {args.threshold}")
+
+    hasher = MinHasher(args.num_perm, args.shingle_size)
+    conn = create_connection()
+    try:
+        results = {
+            item_type: process_item_type(conn, item_type, hasher, args.bands, args.threshold,
+                                         args.batch_size, args.dry_run)
+            for item_type in args.item_types
+        }
+    finally:
+        conn.close()
+
+    print(f"\n{'='*60}")
+    print("📊 Özet")
+    print("="*60)
+    total_documents = sum(r["documents"] for r in results.values())
+    total_duplicates = sum(r["duplicates"] for r in results.values())
+    for item_type, r in results.items():
+        print(f"   {item_type:<16} {r['documents']:>10,} karar {r['groups']:>8,} grup "
+              f"{r['duplicates']:>10,} kopya")
+    if total_documents:
+        print(f"\n   Kanonik filtre ile index {total_duplicates:,} belge "
+              f"({total_duplicates / total_documents:.1%}) küçülür")
+    if args.dry_run:
+        print("\nℹ --dry-run: veritabanına yazılmadı")
+
+
+if __name__ == "__main__":
+    main()
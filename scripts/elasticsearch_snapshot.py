@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+PostgreSQL → Dosya Snapshot'ı → Elasticsearch Yükleme Aracı
+
+Bu script iki komut içerir:
+
+  export  ictihatlar, kararlar ve mevzuatlar tablolarını sıkıştırılmış, parçalı
+          NDJSON (doğrudan `_bulk` formatında) veya Parquet dosyalarına yazar ve
+          bir manifest.json üretir. Snapshot bir kez alınır, tüm ortamlarda
+          (dev, staging, Hetzner production) tekrar kullanılır.
+
+  load    Snapshot dosyalarını memory-map ederek Elasticsearch'e paralel
+          yükler. Yükleme sırasında PostgreSQL'e hiç bağlanılmaz.
+
+Kullanım:
+    python elasticsearch_snapshot.py export --output snapshots/2024-06-01
+    python elasticsearch_snapshot.py export --format parquet --tables mevzuatlar
+    python elasticsearch_snapshot.py load --input snapshots/2024-06-01 --workers 4
+
+Gereksinimler:
+    pip install psycopg2-binary elasticsearch
+    pip install pyarrow   # yalnızca --format parquet için
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre (yalnızca export için)
+    ELASTICSEARCH_URL - Elasticsearch URL (varsayılan: http://localhost:9200)
+"""
+
+import sys
+import gzip
+import json
+import mmap
+import time
+import hashlib
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Generator, List, Optional, Tuple
+from pathlib import Path
+
+from db_config import POSTGRES_CONFIG, create_connection
+from migrate_tables_to_elasticsearch import (
+    create_elasticsearch_client,
+    DeadLetterQueue,
+    fetch_records,
+    send_bulk,
+    load_table_specs,
+    table_exists,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+FETCH_BATCH_SIZE = 1000
+DEFAULT_CHUNK_DOCS = 50000
+DEFAULT_CHUNK_BYTES = 256 * 1024 * 1024   # Sıkıştırılmamış NDJSON boyutu
+DEFAULT_BULK_BYTES = 10 * 1024 * 1024     # Tek bir _bulk isteğinin boyutu
+
+# Snapshot'a alınabilecek tablolar elasticsearch_table_specs.json'dan gelir
+TABLE_SPECS = load_table_specs()
+
+
+def file_sha256(path: Path) -> str:
+    """Dosyanın SHA-256 özetini hesapla"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ChunkWriter:
+    """Belge akışını belirli boyutlarda parça dosyalarına böler"""
+
+    def __init__(self, output_dir: Path, table_name: str, fmt: str, compression: str,
+                 chunk_docs: int, chunk_bytes: int):
+        self.output_dir = output_dir
+        self.table_name = table_name
+        self.fmt = fmt
+        self.compression = compression
+        self.chunk_docs = chunk_docs
+        self.chunk_bytes = chunk_bytes
+        self.chunks: List[dict] = []
+        self._file = None
+        self._rows: List[dict] = []
+        self._path: Optional[Path] = None
+        self._docs = 0
+        self._bytes = 0
+
+    def _chunk_path(self) -> Path:
+        index = len(self.chunks)
+        if self.fmt == "parquet":
+            suffix = ".parquet"
+        else:
+            suffix = ".ndjson.gz" if self.compression == "gzip" else ".ndjson"
+        return self.output_dir / f"{self.table_name}-{index:05d}{suffix}"
+
+    def _open(self):
+        self._path = self._chunk_path()
+        self._docs = 0
+        self._bytes = 0
+        if self.fmt == "ndjson":
+            if self.compression == "gzip":
+                self._file = gzip.open(self._path, "wb", compresslevel=6)
+            else:
+                self._file = open(self._path, "wb")
+
+    def write(self, doc_id: str, source: dict):
+        if self._path is None:
+            self._open()
+
+        if self.fmt == "ndjson":
+            # Loader bu satırları olduğu gibi `_bulk` gövdesine koyar; index adı
+            # yükleme anında URL'den verildiği için action satırında yer almaz.
+            line = (json.dumps({"index": {"_id": doc_id}}) + "\n" +
+                    json.dumps(source, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+            self._file.write(line)
+            self._bytes += len(line)
+        else:
+            row = dict(source)
+            row["_id"] = doc_id
+            self._rows.append(row)
+            self._bytes += sum(len(v) for v in source.values() if isinstance(v, str))
+
+        self._docs += 1
+        if self._docs >= self.chunk_docs or self._bytes >= self.chunk_bytes:
+            self._flush()
+
+    def _flush(self):
+        if self._path is None:
+            return
+        if self.fmt == "ndjson":
+            self._file.close()
+            self._file = None
+        else:
+            pq.write_table(pa.Table.from_pylist(self._rows), self._path, compression="zstd")
+            self._rows = []
+
+        self.chunks.append({
+            "file": self._path.name,
+            "documents": self._docs,
+            "raw_bytes": self._bytes,
+            "file_bytes": self._path.stat().st_size,
+            "sha256": file_sha256(self._path),
+        })
+        print(f"  ✓ {self._path.name}: {self._docs:,} belge, "
+              f"{self._path.stat().st_size / 1024 / 1024:.1f} MB")
+        self._path = None
+
+    def close(self) -> List[dict]:
+        self._flush()
+        return self.chunks
+
+
+def export_table(conn, table_name: str, output_dir: Path, fmt: str, compression: str,
+                 chunk_docs: int, chunk_bytes: int) -> dict:
+    """Tek bir tabloyu snapshot parçalarına yaz"""
+    print(f"\n{'='*60}")
+    print(f"📦 {table_name} dışa aktarılıyor ({fmt})")
+    print("="*60)
+
+    spec = TABLE_SPECS[table_name]
+    writer = ChunkWriter(output_dir, table_name, fmt, compression, chunk_docs, chunk_bytes)
+
+    started = time.time()
+    total = 0
+    for record in fetch_records(conn, spec, batch_size=FETCH_BATCH_SIZE,
+                                cursor_name=f"snapshot_{table_name}"):
+        writer.write(str(record[spec.id_position]), spec.to_source(record))
+        total += 1
+
+    chunks = writer.close()
+    elapsed = time.time() - started
+    print(f"✓ {total:,} belge {len(chunks)} parçaya yazıldı ({elapsed:.1f} sn)")
+
+    return {
+        "index": spec.index,
+        "documents": total,
+        "mapping": spec.load_mapping(),
+        "chunks": chunks,
+    }
+
+
+def export_snapshot(args):
+    """export komutu"""
+    if args.format == "parquet" and pa is None:
+        print("❌ pyarrow yüklü değil. Lütfen çalıştırın: pip install pyarrow")
+        sys.exit(1)
+
+    if not POSTGRES_CONFIG["password"]:
+        print("❌ POSTGRES_PASSWORD tanımlı değil! .env dosyasını kontrol edin.")
+        sys.exit(1)
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if (output_dir / MANIFEST_NAME).exists() and not args.force:
+        print(f"❌ {output_dir} içinde zaten bir snapshot var (üzerine yazmak için --force)")
+        sys.exit(1)
+
+    conn = create_connection()
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "source": f"{POSTGRES_CONFIG['host']}:{POSTGRES_CONFIG['port']}/{POSTGRES_CONFIG['database']}",
+        "format": args.format,
+        "compression": "zstd" if args.format == "parquet" else args.compression,
+        "tables": {},
+    }
+
+    try:
+        # Tüm tablolar aynı anlık görüntüden okunsun
+        conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+        for table_name in args.tables:
+            if not table_exists(conn, TABLE_SPECS[table_name].table):
+                print(f"⚠ {table_name} tablosu bulunamadı, atlanıyor")
+                continue
+            manifest["tables"][table_name] = export_table(
+                conn, table_name, output_dir, args.format, args.compression,
+                args.chunk_docs, args.chunk_bytes
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+    with open(output_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    total = sum(t["documents"] for t in manifest["tables"].values())
+    print(f"\n✅ Snapshot hazır: {output_dir} ({total:,} belge)")
+
+
+BulkPairs = List[Tuple[bytes, bytes]]
+
+
+def iter_ndjson_batches(path: Path, compression: str, max_bytes: int) -> Generator[BulkPairs, None, None]:
+    """Memory-map edilmiş NDJSON parçasından (action, kaynak) satır çiftleri üret"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        stream = gzip.GzipFile(fileobj=mm) if compression == "gzip" else mm
+        pairs: BulkPairs = []
+        size = 0
+        while True:
+            action = stream.readline()
+            if not action:
+                break
+            source = stream.readline()
+            pairs.append((action, source))
+            size += len(action) + len(source)
+            if size >= max_bytes:
+                yield pairs
+                pairs, size = [], 0
+        if pairs:
+            yield pairs
+
+
+def iter_parquet_batches(path: Path, max_bytes: int) -> Generator[BulkPairs, None, None]:
+    """Memory-map edilmiş Parquet parçasından (action, kaynak) satır çiftleri üret"""
+    table = pq.read_table(path, memory_map=True)
+    for batch in table.to_batches(max_chunksize=1000):
+        pairs: BulkPairs = []
+        size = 0
+        for row in batch.to_pylist():
+            doc_id = row.pop("_id")
+            action = (json.dumps({"index": {"_id": doc_id}}) + "\n").encode("utf-8")
+            source = (json.dumps(row, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+            pairs.append((action, source))
+            size += len(action) + len(source)
+            if size >= max_bytes:
+                yield pairs
+                pairs, size = [], 0
+        if pairs:
+            yield pairs
+
+
+def load_chunk(es, input_dir: Path, manifest: dict, chunk: dict, index_name: str,
+               bulk_bytes: int, verify: bool, dead_letters: DeadLetterQueue) -> Tuple[int, int]:
+    """Tek bir parça dosyasını Elasticsearch'e yükle"""
+    path = input_dir / chunk["file"]
+    if verify and file_sha256(path) != chunk["sha256"]:
+        raise ValueError(f"{chunk['file']} SHA-256 doğrulaması başarısız")
+
+    if manifest["format"] == "parquet":
+        batches = iter_parquet_batches(path, bulk_bytes)
+    else:
+        batches = iter_ndjson_batches(path, manifest["compression"], bulk_bytes)
+
+    success = 0
+    failed = 0
+    for pairs in batches:
+        batch_success, failures = send_bulk(es, pairs, index_name, dead_letters)
+        success += batch_success
+        failed += len(failures)
+        for failure in failures[:3]:
+            print(f"   - {chunk['file']} / {failure['id']}: {failure['status']} {failure['error']}")
+    return success, failed
+
+
+def prepare_index(es, index_name: str, mapping: dict, recreate: bool) -> Optional[dict]:
+    """Index'i oluştur ve toplu yükleme için refresh/replica ayarlarını kapat"""
+    if es.indices.exists(index=index_name):
+        if not recreate:
+            print(f"⚠ Index '{index_name}' mevcut, belgeler üzerine yazılacak")
+        else:
+            print(f"⚠ Index '{index_name}' zaten mevcut. Siliniyor...")
+            es.indices.delete(index=index_name)
+
+    if not es.indices.exists(index=index_name):
+        es.indices.create(index=index_name, body=mapping)
+        print(f"✓ Index '{index_name}' oluşturuldu")
+
+    settings = es.indices.get_settings(index=index_name)[index_name]["settings"]["index"]
+    original = {
+        "refresh_interval": settings.get("refresh_interval", "1s"),
+        "number_of_replicas": settings.get("number_of_replicas", "0"),
+    }
+    es.indices.put_settings(index=index_name, body={
+        "index": {"refresh_interval": "-1", "number_of_replicas": 0}
+    })
+    return original
+
+
+def load_snapshot(args):
+    """load komutu"""
+    input_dir = Path(args.input)
+    manifest_path = input_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        print(f"❌ Manifest bulunamadı: {manifest_path}")
+        sys.exit(1)
+
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest["format"] == "parquet" and pa is None:
+        print("❌ pyarrow yüklü değil. Lütfen çalıştırın: pip install pyarrow")
+        sys.exit(1)
+
+    print(f"📁 Snapshot: {input_dir} ({manifest['created_at']}, {manifest['format']})")
+    es = create_elasticsearch_client()
+
+    tables = args.tables or list(manifest["tables"].keys())
+    total_success = 0
+    total_failed = 0
+
+    for table_name in tables:
+        table = manifest["tables"].get(table_name)
+        if table is None:
+            print(f"⚠ {table_name} snapshot içinde yok, atlanıyor")
+            continue
+
+        index_name = f"{args.index_prefix}{table['index']}"
+        print(f"\n{'='*60}")
+        print(f"📊 {table_name} -> {index_name} ({len(table['chunks'])} parça, "
+              f"{table['documents']:,} belge)")
+        print("="*60)
+
+        original_settings = prepare_index(es, index_name, table["mapping"], args.recreate)
+        dead_letters = DeadLetterQueue()
+        started = time.time()
+        success = 0
+        failed = 0
+
+        try:
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                futures = {
+                    executor.submit(load_chunk, es, input_dir, manifest, chunk,
+                                    index_name, args.bulk_bytes, args.verify, dead_letters): chunk
+                    for chunk in table["chunks"]
+                }
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    chunk_success, chunk_failed = future.result()
+                    success += chunk_success
+                    failed += chunk_failed
+                    print(f"  ✓ {chunk['file']}: {chunk_success:,} belge")
+        finally:
+            es.indices.put_settings(index=index_name, body={"index": original_settings})
+            es.indices.refresh(index=index_name)
+
+        elapsed = time.time() - started
+        rate = success / elapsed if elapsed > 0 else 0
+        print(f"✓ {success:,} belge yüklendi, {failed:,} hatalı ({elapsed:.1f} sn, {rate:,.0f} belge/sn)")
+        if failed:
+            print(f"  Hatalı belgeler: {dead_letters.path_for(index_name)} "
+                  f"(yeniden göndermek için: migrate_tables_to_elasticsearch.py --replay-dlq --index {index_name})")
+        total_success += success
+        total_failed += failed
+
+    print()
+    print("=" * 60)
+    print("📈 YÜKLEME SONUÇLARI")
+    print("=" * 60)
+    print(f"  Başarılı        : {total_success:,}")
+    print(f"  Hatalı          : {total_failed:,}")
+    print()
+
+    if total_failed == 0 and total_success > 0:
+        print("✅ Snapshot yüklemesi başarıyla tamamlandı!")
+    elif total_success > 0:
+        print("⚠ Snapshot yüklemesi bazı hatalarla tamamlandı.")
+    else:
+        print("❌ Snapshot yüklemesi başarısız!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Elasticsearch snapshot dışa aktarma ve yükleme aracı")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="PostgreSQL tablolarını snapshot dosyalarına yaz")
+    export_parser.add_argument("--output", "-o", required=True,
+                               help="Snapshot dizini")
+    export_parser.add_argument("--tables", nargs="+", choices=list(TABLE_SPECS.keys()),
+                               default=list(TABLE_SPECS.keys()),
+                               help="Dışa aktarılacak tablolar (varsayılan: tümü)")
+    export_parser.add_argument("--format", "-f", choices=["ndjson", "parquet"], default="ndjson",
+                               help="Dosya formatı (varsayılan: ndjson)")
+    export_parser.add_argument("--compression", choices=["gzip", "none"], default="gzip",
+                               help="NDJSON sıkıştırması (varsayılan: gzip)")
+    export_parser.add_argument("--chunk-docs", type=int, default=DEFAULT_CHUNK_DOCS,
+                               help="Parça başına maksimum belge sayısı")
+    export_parser.add_argument("--chunk-bytes", type=int, default=DEFAULT_CHUNK_BYTES,
+                               help="Parça başına maksimum ham veri boyutu (byte)")
+    export_parser.add_argument("--force", action="store_true",
+                               help="Mevcut snapshot'ın üzerine yaz")
+
+    load_parser = subparsers.add_parser("load", help="Snapshot dosyalarını Elasticsearch'e yükle")
+    load_parser.add_argument("--input", "-i", required=True,
+                             help="Snapshot dizini")
+    load_parser.add_argument("--tables", nargs="+", choices=list(TABLE_SPECS.keys()),
+                             help="Yüklenecek tablolar (varsayılan: snapshot'taki tümü)")
+    load_parser.add_argument("--workers", "-w", type=int, default=4,
+                             help="Paralel yükleme iş parçacığı sayısı")
+    load_parser.add_argument("--bulk-bytes", type=int, default=DEFAULT_BULK_BYTES,
+                             help="Tek bir _bulk isteğinin maksimum boyutu (byte)")
+    load_parser.add_argument("--index-prefix", default="",
+                             help="Index adlarına eklenecek önek (örn: staging-)")
+    load_parser.add_argument("--recreate", action="store_true",
+                             help="Mevcut index'i silip yeniden oluştur")
+    load_parser.add_argument("--verify", action="store_true",
+                             help="Yüklemeden önce parça SHA-256 özetlerini doğrula")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_snapshot(args)
+    else:
+        load_snapshot(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Offline Yoğun Vektör Üretimi ve Elasticsearch'e Yükleme
+
+Anlamsal arama için karar/mevzuat metinlerinden vektör üretir. Üç komut içerir:
+
+  encode     Metinleri spec'teki tablodan server-side cursor ile akıtır, batch'ler
+             halinde (isteğe bağlı birden fazla süreçte) seçilen CPU kodlayıcısından
+             geçirir ve vektörleri tek bir float16 dizi dosyasına yazar
+             (vectors.f16 + ids.i64 + manifest.json). Bellekte yalnızca bir batch tutulur.
+  index      Vektör dosyasını memory-map ederek alanı `dense_vector` olarak
+             mapping'e ekler ve belgeleri kısmi update ile günceller.
+
+vectors/<tablo>/ var olduğu sürece migrate_tables_to_elasticsearch.py da
+(tam aktarım, artımlı senkron, --resync, snapshot) vektörü mapping'e ve her
+belgeye kendisi ekler; sonradan eklenen belgeler ancak encode yeniden
+çalıştırıldıktan sonraki senkronda vektör alır.
+  benchmark  Örnek metinlerle kodlayıcı hızını süreç sayısına göre ölçer
+             (belge/sn ve çekirdek başına belge/sn).
+
+Kodlayıcılar dense_encoders.py içindedir: varsayılan `hashing` bağımlılıksızdır,
+`npz` yerel bir model dosyası kullanır, `paket.modul:Sinif` ile başka bir
+kodlayıcı takılabilir.
+
+Kullanım:
+    python encode_dense_vectors.py encode --tables ictihatlar --processes 4
+    python encode_dense_vectors.py encode --tables ictihatlar --encoder npz --model-file lsa_256.npz
+    python encode_dense_vectors.py index --tables ictihatlar
+    python encode_dense_vectors.py benchmark --sample 2000 --processes 4
+
+Gereksinimler:
+    pip install psycopg2-binary elasticsearch numpy
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre (encode / benchmark için)
+    ELASTICSEARCH_URL - Elasticsearch URL (varsayılan: http://localhost:9200)
+"""
+
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from itertools import islice
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Generator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ numpy yüklü değil. Lütfen çalıştırın: pip install numpy")
+    sys.exit(1)
+
+from db_config import POSTGRES_CONFIG, create_connection
+from migrate_tables_to_elasticsearch import (
+    DEFAULT_VECTOR_FIELD,
+    VECTOR_FILE_NAME,
+    VECTOR_IDS_NAME,
+    VECTOR_MANIFEST_NAME,
+    VECTORS_DIR,
+    DeadLetterQueue,
+    TableSpec,
+    build_filters,
+    create_elasticsearch_client,
+    load_table_specs,
+    send_bulk,
+    table_exists,
+)
+from psycopg2 import sql
+
+from dense_encoders import DEFAULT_DIMS, load_encoder
+
+DEFAULT_OUTPUT_DIR = VECTORS_DIR
+DEFAULT_BATCH_SIZE = 256
+INDEX_BATCH_SIZE = 500
+DEFAULT_FIELD = DEFAULT_VECTOR_FIELD
+MANIFEST_NAME = VECTOR_MANIFEST_NAME
+VECTORS_NAME = VECTOR_FILE_NAME
+IDS_NAME = VECTOR_IDS_NAME
+
+# Tablo -> vektörü üretilecek metin kolonu
+TEXT_COLUMNS = {
+    "ictihatlar": "karar_metni",
+    "kararlar": "karar_metni",
+    "mevzuatlar": "icerik",
+}
+
+# Süreç başına kodlayıcı (Pool initializer ile bir kez oluşturulur)
+_worker_encoder = None
+
+
+def _init_worker(encoder_name: str, model_file: Optional[str], dims: int):
+    global _worker_encoder
+    _worker_encoder = load_encoder(encoder_name, model_file, dims)
+
+
+def _encode_batch(batch: Tuple[List[int], List[str]]) -> Tuple[List[int], np.ndarray]:
+    ids, texts = batch
+    return ids, _worker_encoder.encode(texts).astype(np.float16)
+
+
+def fetch_text_batches(conn, spec: TableSpec, text_column: str, batch_size: int,
+                       limit: Optional[int] = None) -> Generator[Tuple[List[int], List[str]], None, None]:
+    """(id'ler, metinler) batch'lerini server-side cursor ile getir"""
+    where, params = build_filters(spec)
+    query = sql.SQL("SELECT {id}, {text} FROM {table}{where} ORDER BY {id}").format(
+        id=sql.Identifier(spec.id_column), text=sql.Identifier(text_column),
+        table=sql.Identifier(spec.table), where=where,
+    )
+    if limit:
+        query = query + sql.SQL(" LIMIT %s")
+        params = params + [limit]
+    with conn.cursor(name="vector_cursor") as cur:
+        cur.itersize = batch_size
+        cur.execute(query, params)
+        ids: List[int] = []
+        texts: List[str] = []
+        for doc_id, text in cur:
+            ids.append(doc_id)
+            texts.append(text or "")
+            if len(ids) >= batch_size:
+                yield ids, texts
+                ids, texts = [], []
+        if ids:
+            yield ids, texts
+
+
+def encoded_batches(batches, encoder_name: str, model_file: Optional[str], dims: int, processes: int):
+    """Batch'leri sırayı koruyarak tek süreçte ya da süreç havuzunda kodla"""
+    if processes <= 1:
+        _init_worker(encoder_name, model_file, dims)
+        for batch in batches:
+            yield _encode_batch(batch)
+        return
+    # Pool.imap girdiyi sonuna kadar okuyacağından batch'ler sınırlı pencerelerle verilir;
+    # böylece bellekte en fazla birkaç batch metin tutulur
+    with Pool(processes, initializer=_init_worker, initargs=(encoder_name, model_file, dims)) as pool:
+        while True:
+            window = list(islice(batches, processes * 2))
+            if not window:
+                break
+            yield from pool.imap(_encode_batch, window)
+
+
+def encode_table(spec: TableSpec, output_dir: Path, encoder_name: str, model_file: Optional[str],
+                 dims: int, batch_size: int, processes: int) -> dict:
+    text_column = TEXT_COLUMNS[spec.name]
+    target = output_dir / spec.name
+    target.mkdir(parents=True, exist_ok=True)
+    print(f"\n{'='*60}")
+    print(f"🧮 {spec.table}.{text_column} -> {target}")
+    print("="*60)
+
+    # index --field ile seçilen alan adı yeniden kodlamada korunur
+    field = DEFAULT_FIELD
+    if (target / MANIFEST_NAME).exists():
+        with open(target / MANIFEST_NAME, encoding="utf-8") as f:
+            field = json.load(f).get("field", DEFAULT_FIELD)
+
+    conn = create_connection()
+    started = time.time()
+    count = 0
+    vector_dims = None
+    try:
+        with open(target / VECTORS_NAME, "wb") as vectors_file, open(target / IDS_NAME, "wb") as ids_file:
+            batches = fetch_text_batches(conn, spec, text_column, batch_size)
+            for ids, vectors in encoded_batches(batches, encoder_name, model_file, dims, processes):
+                vector_dims = vectors.shape[1]
+                vectors_file.write(vectors.tobytes())
+                ids_file.write(np.asarray(ids, dtype=np.int64).tobytes())
+                count += len(ids)
+                elapsed = time.time() - started
+                print(f"  {count:,} belge, {count / elapsed:,.0f} belge/sn", end="\r")
+    finally:
+        conn.close()
+
+    elapsed = time.time() - started
+    manifest = {
+        "table": spec.name,
+        "index": spec.index,
+        "text_column": text_column,
+        "encoder": encoder_name,
+        "model_file": model_file,
+        "field": field,
+        "dims": vector_dims or dims,
+        "dtype": "float16",
+        "count": count,
+        "filter": spec.where,
+        "processes": processes,
+        "docs_per_sec": round(count / elapsed, 1) if elapsed else None,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(target / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    size = (target / VECTORS_NAME).stat().st_size
+    print()
+    print(f"✓ {count:,} vektör ({manifest['dims']} boyut, {size / 1024 / 1024:,.1f} MB) "
+          f"{elapsed:.1f} sn'de yazıldı ({manifest['docs_per_sec'] or 0:,.0f} belge/sn, {processes} süreç)")
+    return manifest
+
+
+def load_vectors(directory: Path) -> Tuple[dict, np.ndarray, np.ndarray]:
+    """Manifest'i oku, vektör ve id dosyalarını memory-map et"""
+    with open(directory / MANIFEST_NAME, encoding="utf-8") as f:
+        manifest = json.load(f)
+    count, dims = manifest["count"], manifest["dims"]
+    ids = np.memmap(directory / IDS_NAME, dtype=np.int64, mode="r", shape=(count,))
+    vectors = np.memmap(directory / VECTORS_NAME, dtype=np.float16, mode="r", shape=(count, dims))
+    return manifest, ids, vectors
+
+
+def index_vectors(es, directory: Path, index_name: Optional[str], field: str,
+                  batch_size: int) -> Tuple[int, int]:
+    """Vektörleri dense_vector alanı olarak mevcut belgelere kısmi update ile yaz"""
+    manifest, ids, vectors = load_vectors(directory)
+    index_name = index_name or manifest["index"]
+    print(f"\n{'='*60}")
+    print(f"📥 {directory} -> {index_name}.{field} ({manifest['count']:,} × {manifest['dims']})")
+    print("="*60)
+
+    if not es.indices.exists(index=index_name):
+        print(f"❌ Index '{index_name}' bulunamadı; önce migrate_tables_to_elasticsearch.py çalıştırın")
+        return 0, 0
+    # dense_vector boyutu kodlayıcıya bağlı olduğundan mapping dosyasında değil, burada eklenir
+    es.indices.put_mapping(index=index_name, body={
+        "properties": {field: {"type": "dense_vector", "dims": manifest["dims"]}}
+    })
+    es.indices.put_settings(index=index_name, body={"index": {"refresh_interval": "-1"}})
+    # Migrasyon motoru tam index action'larına vektörü bu alan adıyla ekler
+    if manifest.get("field") != field:
+        manifest["field"] = field
+        with open(directory / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    dead_letters = DeadLetterQueue()
+    started = time.time()
+    success = 0
+    failed = 0
+    try:
+        for start in range(0, manifest["count"], batch_size):
+            end = min(start + batch_size, manifest["count"])
+            batch = vectors[start:end].astype(np.float32).round(5).tolist()
+            pairs = [
+                ((json.dumps({"update": {"_index": index_name, "_id": str(int(doc_id))}}) + "\n").encode("utf-8"),
+                 (json.dumps({"doc": {field: vector}}) + "\n").encode("utf-8"))
+                for doc_id, vector in zip(ids[start:end], batch)
+            ]
+            batch_success, failures = send_bulk(es, pairs, dead_letters=dead_letters)
+            success += batch_success
+            failed += len(failures)
+            elapsed = time.time() - started
+            print(f"  {end:,}/{manifest['count']:,} belge, {end / elapsed:,.0f} belge/sn", end="\r")
+    finally:
+        es.indices.put_settings(index=index_name, body={"index": {"refresh_interval": "1s"}})
+        es.indices.refresh(index=index_name)
+
+    print()
+    print(f"✓ {success:,} belge güncellendi ({time.time() - started:.1f} sn)")
+    if failed:
+        print(f"⚠ {failed:,} belge güncellenemedi, dead-letter kuyruğuna yazıldı: "
+              f"{dead_letters.path_for(index_name)}")
+    return success, failed
+
+
+def benchmark(spec: TableSpec, encoder_name: str, model_file: Optional[str], dims: int,
+              batch_size: int, sample: int, max_processes: int):
+    """Örnek metinlerle süreç sayısına göre kodlama hızını ölç"""
+    text_column = TEXT_COLUMNS[spec.name]
+    conn = create_connection()
+    try:
+        batches = list(fetch_text_batches(conn, spec, text_column, batch_size, limit=sample))
+    finally:
+        conn.close()
+    docs = sum(len(ids) for ids, _ in batches)
+    chars = sum(len(text) for _, texts in batches for text in texts)
+    if not docs:
+        print("⚠ Örnek metin bulunamadı")
+        return
+    print(f"\n📏 {encoder_name}: {docs:,} belge, ortalama {chars / docs:,.0f} karakter")
+    print(f"   {'Süreç':>6} {'belge/sn':>12} {'belge/sn/çekirdek':>18} {'MB/sn':>8}")
+
+    process_counts = sorted({1, *[p for p in (2, 4, 8, 16) if p < max_processes], max_processes})
+    for processes in process_counts:
+        started = time.perf_counter()
+        for _ in encoded_batches(iter(batches), encoder_name, model_file, dims, processes):
+            pass
+        elapsed = time.perf_counter() - started
+        print(f"   {processes:>6} {docs / elapsed:>12,.0f} {docs / elapsed / processes:>18,.0f} "
+              f"{chars / elapsed / 1024 / 1024:>8,.1f}")
+
+
+def main():
+    specs = load_table_specs()
+    vector_tables = [name for name in specs if name in TEXT_COLUMNS]
+
+    parser = argparse.ArgumentParser(description="Offline yoğun vektör üretimi ve Elasticsearch'e yükleme")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_encoder_args(p):
+        p.add_argument("--encoder", "-e", default="hashing",
+                       help="Kodlayıcı: hashing, npz veya paket.modul:Sinif (varsayılan: hashing)")
+        p.add_argument("--model-file", type=str,
+                       help="Kodlayıcının okuyacağı yerel model dosyası (npz için zorunlu)")
+        p.add_argument("--dims", type=int, default=DEFAULT_DIMS,
+                       help=f"hashing kodlayıcısının vektör boyutu (varsayılan: {DEFAULT_DIMS})")
+        p.add_argument("--batch-size", "-b", type=int, default=DEFAULT_BATCH_SIZE,
+                       help="Kodlama batch boyutu")
+        p.add_argument("--processes", "-p", type=int, default=1,
+                       help="Kodlama süreç sayısı")
+
+    encode_parser = subparsers.add_parser("encode", help="Metinleri vektör dosyasına kodla")
+    encode_parser.add_argument("--tables", "-t", nargs="+", choices=vector_tables, default=["ictihatlar"],
+                               help="Kodlanacak tablolar (varsayılan: ictihatlar)")
+    encode_parser.add_argument("--output", "-o", type=Path, default=DEFAULT_OUTPUT_DIR,
+                               help="Vektör dosyalarının yazılacağı dizin")
+    encode_parser.add_argument("--filter", action="append",
+                               choices=sorted({name for spec in specs.values() for name in spec.filters}),
+                               help="Spec'te tanımlı filtreyi uygula (index --filter ile oluşturulduysa)")
+    add_encoder_args(encode_parser)
+
+    index_parser = subparsers.add_parser("index", help="Vektör dosyalarını Elasticsearch'e yükle")
+    index_parser.add_argument("--tables", "-t", nargs="+", choices=vector_tables, default=["ictihatlar"],
+                              help="Yüklenecek tablolar (varsayılan: ictihatlar)")
+    index_parser.add_argument("--input", "-i", type=Path, default=DEFAULT_OUTPUT_DIR,
+                              help="Vektör dosyalarının bulunduğu dizin")
+    index_parser.add_argument("--index", type=str,
+                              help="Hedef index adı (yalnızca tek tablo ile)")
+    index_parser.add_argument("--field", default=DEFAULT_FIELD,
+                              help=f"dense_vector alan adı (varsayılan: {DEFAULT_FIELD})")
+    index_parser.add_argument("--batch-size", "-b", type=int, default=INDEX_BATCH_SIZE,
+                              help="Bulk batch boyutu")
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="Kodlayıcı hızını ölç")
+    benchmark_parser.add_argument("--table", choices=vector_tables, default="ictihatlar",
+                                  help="Örnek metinlerin alınacağı tablo")
+    benchmark_parser.add_argument("--sample", type=int, default=2000,
+                                  help="Örnek belge sayısı")
+    add_encoder_args(benchmark_parser)
+
+    args = parser.parse_args()
+
+    if args.command == "index":
+        if args.index and len(args.tables) > 1:
+            print("❌ --index yalnızca tek tablo ile kullanılabilir")
+            sys.exit(1)
+        es = create_elasticsearch_client()
+        total_failed = 0
+        for name in args.tables:
+            _, failed = index_vectors(es, args.input / name, args.index, args.field, args.batch_size)
+            total_failed += failed
+        if total_failed:
+            print("  Yeniden göndermek için: migrate_tables_to_elasticsearch.py --replay-dlq")
+        return
+
+    if not POSTGRES_CONFIG["password"]:
+        print("❌ POSTGRES_PASSWORD tanımlı değil! .env dosyasını kontrol edin.")
+        sys.exit(1)
+
+    try:
+        load_encoder(args.encoder, args.model_file, args.dims)
+    except (ValueError, ImportError, AttributeError, OSError) as e:
+        print(f"❌ Kodlayıcı yüklenemedi: {e}")
+        sys.exit(1)
+
+    if args.command == "benchmark":
+        benchmark(specs[args.table], args.encoder, args.model_file, args.dims,
+                  args.batch_size, args.sample, args.processes)
+        return
+
+    conn = create_connection()
+    try:
+        tables = [name for name in args.tables if table_exists(conn, specs[name].table)]
+    finally:
+        conn.close()
+    for name in tables:
+        specs[name].use_filters(args.filter)
+        encode_table(specs[name], args.output, args.encoder, args.model_file, args.dims,
+                     args.batch_size, args.processes)
+
+
+if __name__ == "__main__":
+    main()
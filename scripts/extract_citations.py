@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Karar ve Mevzuat Atıf Grafiği Çıkarımı
+
+"E. 2019/1234 K. 2020/567 sayılı karara atıf yapan kararlar" ya da "TMK m.166'yı
+uygulayan kararlar" aramaları bugün karar_metni üzerinde yavaş bir ifade
+(phrase) sorgusudur. Bu script ictihatlar.karar_metni üzerinde derlenmiş
+düzenli ifadelerle:
+
+  - esas / karar numaralarını (E. 2019/1234, 2019/1234 Esas, Esas No: ...),
+    yakınında geçiyorsa daire adıyla birlikte,
+  - kanun kısaltması + madde (TMK m.166, HMK'nın 353. maddesi) ve
+    kanun numarası + madde (6100 sayılı Kanun'un 353. maddesi) atıflarını
+
+bulur ve indeksli `atiflar` kenar tablosuna yazar. Metinler id aralıklarına
+bölünüp süreçler arasında paralel işlenir; her aralık tek transaction'da
+silinip yeniden yazılır, böylece script tekrar çalıştırılabilir. Atıf yapılan
+karar (esas + karar numarası tek bir karara karşılık geliyorsa) ve kanun
+(mevzuatlar.mevzuat_no) aynı transaction'da çözümlenir; sonradan yüklenen
+hedefler için --resolve-only çalıştırılır.
+
+Kullanım:
+    python extract_citations.py --processes 8
+    python extract_citations.py --since "2024-06-01" --processes 4
+    python extract_citations.py --resolve-only
+
+Gereksinimler:
+    pip install psycopg2-binary
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre
+"""
+
+import re
+import sys
+import time
+import argparse
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from psycopg2.extras import execute_values
+except ImportError:
+    print("❌ psycopg2 yüklü değil. Lütfen çalıştırın: pip install psycopg2-binary")
+    sys.exit(1)
+
+from db_config import POSTGRES_CONFIG, create_connection
+
+DEFAULT_CHUNK_SIZE = 20000
+DEFAULT_BATCH_SIZE = 1000
+
+ATIFLAR_SQL = """
+CREATE TABLE IF NOT EXISTS atiflar (
+    id BIGSERIAL PRIMARY KEY,
+    kaynak_id INTEGER NOT NULL,
+    atif_turu VARCHAR(10) NOT NULL,
+    esas_yil SMALLINT,
+    esas_sira INTEGER,
+    karar_yil SMALLINT,
+    karar_sira INTEGER,
+    birim VARCHAR(100),
+    kanun VARCHAR(20),
+    kanun_no INTEGER,
+    madde VARCHAR(20),
+    adet SMALLINT NOT NULL DEFAULT 1,
+    konum INTEGER,
+    hedef_ictihat_id INTEGER,
+    hedef_mevzuat_id INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_atiflar_kaynak ON atiflar(kaynak_id);
+CREATE INDEX IF NOT EXISTS idx_atiflar_esas ON atiflar(esas_yil, esas_sira) WHERE atif_turu = 'karar';
+CREATE INDEX IF NOT EXISTS idx_atiflar_karar ON atiflar(karar_yil, karar_sira) WHERE atif_turu = 'karar';
+CREATE INDEX IF NOT EXISTS idx_atiflar_kanun_madde ON atiflar(kanun_no, madde) WHERE atif_turu = 'mevzuat';
+CREATE INDEX IF NOT EXISTS idx_atiflar_hedef_ictihat ON atiflar(hedef_ictihat_id) WHERE hedef_ictihat_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_atiflar_hedef_mevzuat ON atiflar(hedef_mevzuat_id, madde) WHERE hedef_mevzuat_id IS NOT NULL;
+"""
+
+# Kararlarda sık geçen kanun kısaltmaları -> kanun numarası
+LAW_ABBREVIATIONS = {
+    "TMK": 4721, "MK": 743, "TBK": 6098, "BK": 818, "HMK": 6100, "HUMK": 1086,
+    "İİK": 2004, "IIK": 2004, "TCK": 5237, "CMK": 5271, "CMUK": 1412, "TTK": 6102,
+    "İYUK": 2577, "IYUK": 2577, "KMK": 634, "FSEK": 5846, "TKHK": 6502,
+    "SGK": 5510, "İşK": 4857, "AY": 2709,
+}
+
+_ABBREVIATIONS = "|".join(sorted(map(re.escape, LAW_ABBREVIATIONS), key=len, reverse=True))
+# Madde ifadesi: "m.166", "md. 166", "madde 166" ya da "166. maddesi", "353/1-b. maddesi"
+_ARTICLE = (r"(?:(?:m\.|md\.|madde(?:si(?:nin|ne|nde)?)?)\s*(?P<madde1>\d{1,4})"
+            r"|(?P<madde2>\d{1,4})(?:/[\w-]+)?\s*\.?\s*(?:madde\w*|md\.|m\.))")
+
+ESAS_RE = re.compile(
+    r"(?:\b(?:E|Esas)\s*(?:No\s*)?[.:]?\s*(?P<yil1>(?:19|20)\d{2})\s*/\s*(?P<sira1>\d{1,6})\b"
+    r"|\b(?P<yil2>(?:19|20)\d{2})\s*/\s*(?P<sira2>\d{1,6})\s*(?:E\.|Esas\b(?!\s*No)))"
+)
+KARAR_RE = re.compile(
+    r"(?:\b(?:K|Karar)\s*(?:No\s*)?[.:]?\s*(?P<yil1>(?:19|20)\d{2})\s*/\s*(?P<sira1>\d{1,6})\b"
+    r"|\b(?P<yil2>(?:19|20)\d{2})\s*/\s*(?P<sira2>\d{1,6})\s*(?:K\.|Karar\b(?!\s*No)))"
+)
+BIRIM_RE = re.compile(
+    r"\b(?P<daire>\d{1,2})\.\s*(?P<tur>Hukuk|Ceza|İdari Dava)?\s*Daire(?:si)?"
+    r"|\b(?P<genel>Hukuk Genel Kurulu|Ceza Genel Kurulu|HGK|CGK)\b"
+)
+LAW_ABBR_RE = re.compile(
+    rf"(?<![\wİ])(?P<kanun>{_ABBREVIATIONS})(?:['’]\w+)?\s*(?:{_ARTICLE}|(?!(?:19|20)\d\d\b)(?P<madde3>\d{{1,4}})\b)"
+)
+SENTENCE_BOUNDARY_RE = re.compile(r"(?<!\d)[.;]\s|\n")
+LAW_NO_RE = re.compile(r"(?<![\d/.])\b(?P<kanun_no>\d{3,4})\s+[Ss]ayılı\b")
+ARTICLE_RE = re.compile(_ARTICLE)
+
+# Esas numarasından sonra karar numarasının aranacağı, önce de daire adının aranacağı mesafe
+KARAR_WINDOW = 60
+BIRIM_WINDOW = 120
+# "N sayılı ..." ifadesinden sonra madde numarasının aranacağı mesafe
+LAW_ARTICLE_WINDOW = 120
+
+# (esas_yil, esas_sira, karar_yil, karar_sira) ve (kanun_no, madde) anahtarlı kenarlar
+Edge = Tuple
+
+
+def _year_seq(match) -> Tuple[int, int]:
+    if match.group("yil1"):
+        return int(match.group("yil1")), int(match.group("sira1"))
+    return int(match.group("yil2")), int(match.group("sira2"))
+
+
+def _birim_before(text: str, position: int) -> Optional[str]:
+    """Atıftan hemen önce geçen daire / genel kurul adı"""
+    found = None
+    start = max(0, position - BIRIM_WINDOW)
+    # Önceki cümlede geçen daire adı bu atıfa ait değildir ("9. Hukuk" içindeki nokta cümle sonu sayılmaz)
+    for boundary in SENTENCE_BOUNDARY_RE.finditer(text, start, position):
+        start = boundary.end()
+    for match in BIRIM_RE.finditer(text, start, position):
+        if match.group("genel"):
+            found = {"HGK": "Hukuk Genel Kurulu", "CGK": "Ceza Genel Kurulu"}.get(
+                match.group("genel"), match.group("genel"))
+        else:
+            found = f"{match.group('daire')}. {match.group('tur') + ' ' if match.group('tur') else ''}Dairesi"
+    return found
+
+
+def extract_citations(text: str, own_numbers: Tuple = ()) -> List[dict]:
+    """Metindeki karar ve kanun atıflarını (tekrarlar birleştirilmiş) döndür"""
+    if not text:
+        return []
+    citations: Dict[Edge, dict] = {}
+
+    def add(key: Edge, position: int, **values):
+        if key in citations:
+            citations[key]["adet"] += 1
+        else:
+            citations[key] = {"konum": position, "adet": 1, **values}
+
+    # Karar numaraları: her esas numarası, hemen ardından gelen karar numarasıyla eşlenir
+    karar_matches = list(KARAR_RE.finditer(text))
+    karar_starts = [karar.start() for karar in karar_matches]
+    used_karar = set()
+    for esas in ESAS_RE.finditer(text):
+        esas_yil, esas_sira = _year_seq(esas)
+        karar_yil = karar_sira = None
+        index = bisect_left(karar_starts, esas.end())
+        if index < len(karar_starts) and karar_starts[index] - esas.end() <= KARAR_WINDOW:
+            karar_yil, karar_sira = _year_seq(karar_matches[index])
+            used_karar.add(index)
+        numbers = (esas_yil, esas_sira, karar_yil, karar_sira)
+        # Kararın kendi başlığındaki esas/karar numarası atıf değildir
+        if numbers in own_numbers or (karar_yil is None and numbers[:2] in {n[:2] for n in own_numbers}):
+            continue
+        add(("karar",) + numbers, esas.start(), atif_turu="karar",
+            esas_yil=esas_yil, esas_sira=esas_sira, karar_yil=karar_yil, karar_sira=karar_sira,
+            birim=_birim_before(text, esas.start()))
+    for index, karar in enumerate(karar_matches):
+        if index in used_karar:
+            continue
+        karar_yil, karar_sira = _year_seq(karar)
+        if (karar_yil, karar_sira) in {n[2:] for n in own_numbers}:
+            continue
+        add(("karar", None, None, karar_yil, karar_sira), karar.start(), atif_turu="karar",
+            esas_yil=None, esas_sira=None, karar_yil=karar_yil, karar_sira=karar_sira,
+            birim=_birim_before(text, karar.start()))
+
+    # Kanun kısaltması + madde
+    for match in LAW_ABBR_RE.finditer(text):
+        kanun = match.group("kanun")
+        madde = match.group("madde1") or match.group("madde2") or match.group("madde3")
+        kanun_no = LAW_ABBREVIATIONS[kanun]
+        add(("mevzuat", kanun_no, madde), match.start(), atif_turu="mevzuat",
+            kanun=kanun, kanun_no=kanun_no, madde=madde)
+
+    # Kanun numarası (+ aynı cümlede geçiyorsa madde)
+    for match in LAW_NO_RE.finditer(text):
+        kanun_no = int(match.group("kanun_no"))
+        window = text[match.end():match.end() + LAW_ARTICLE_WINDOW]
+        # Başka bir kanun numarası ya da satır sonu maddenin bu kanuna ait olmadığını gösterir
+        window = re.split(r"\n|;|\d{3,4}\s+sayılı", window, maxsplit=1)[0]
+        article = ARTICLE_RE.search(window)
+        madde = (article.group("madde1") or article.group("madde2")) if article else None
+        add(("mevzuat", kanun_no, madde), match.start(), atif_turu="mevzuat",
+            kanun=str(kanun_no), kanun_no=kanun_no, madde=madde)
+
+    return list(citations.values())
+
+
+COLUMNS = ["kaynak_id", "atif_turu", "esas_yil", "esas_sira", "karar_yil", "karar_sira", "birim",
+           "kanun", "kanun_no", "madde", "adet", "konum"]
+
+RESOLVE_ICTIHAT_SQL = """
+    UPDATE atiflar a
+    SET hedef_ictihat_id = t.hedef_id
+    FROM (
+        SELECT a2.id AS atif_id, MIN(i.id) AS hedef_id
+        FROM atiflar a2
+        JOIN ictihatlar i
+          ON i.esas_no_yil = a2.esas_yil AND i.esas_no_sira = a2.esas_sira
+         AND i.karar_no_yil = a2.karar_yil AND i.karar_no_sira = a2.karar_sira
+        WHERE a2.atif_turu = 'karar' AND a2.hedef_ictihat_id IS NULL
+          AND a2.esas_yil IS NOT NULL AND a2.karar_yil IS NOT NULL {scope}
+        GROUP BY a2.id
+        HAVING COUNT(*) = 1
+    ) t
+    WHERE a.id = t.atif_id
+"""
+
+RESOLVE_MEVZUAT_SQL = """
+    UPDATE atiflar a
+    SET hedef_mevzuat_id = m.id
+    FROM (
+        SELECT DISTINCT ON (mevzuat_no) mevzuat_no, id
+        FROM mevzuatlar
+        WHERE mevzuat_tur = 'KANUN' AND mevzuat_no IS NOT NULL
+        ORDER BY mevzuat_no, mevzuat_tertip DESC NULLS LAST, id
+    ) m
+    WHERE a.atif_turu = 'mevzuat' AND a.hedef_mevzuat_id IS NULL
+      AND m.mevzuat_no = a.kanun_no {scope}
+"""
+
+
+def resolve(cur, id_range: Optional[Tuple[int, int]] = None) -> Tuple[int, int]:
+    """Henüz çözümlenmemiş atıfların hedef karar / mevzuat id'lerini doldur"""
+    scope = ""
+    params: tuple = ()
+    if id_range is not None:
+        scope = "AND {alias}.kaynak_id BETWEEN %s AND %s"
+        params = id_range
+    cur.execute(RESOLVE_ICTIHAT_SQL.format(scope=scope.format(alias="a2")), params)
+    decisions = cur.rowcount
+    cur.execute(RESOLVE_MEVZUAT_SQL.format(scope=scope.format(alias="a")), params)
+    return decisions, cur.rowcount
+
+
+def process_range(id_range: Tuple[int, int], since: Optional[str], batch_size: int) -> Tuple[int, int, int]:
+    """Bir id aralığının atıflarını tek transaction'da yeniden yaz (süreç başına bir bağlantı)"""
+    conn = create_connection()
+    documents = 0
+    rows: List[tuple] = []
+    processed: List[int] = []
+    try:
+        condition = "id BETWEEN %s AND %s"
+        params: list = list(id_range)
+        if since:
+            condition += " AND updated_at > %s"
+            params.append(since)
+        with conn.cursor(name="citation_cursor") as cur:
+            cur.itersize = batch_size
+            cur.execute(f"""
+                SELECT id, karar_metni, esas_no_yil, esas_no_sira, karar_no_yil, karar_no_sira
+                FROM ictihatlar
+                WHERE {condition}
+            """, params)
+            for doc_id, text, esas_yil, esas_sira, karar_yil, karar_sira in cur:
+                documents += 1
+                processed.append(doc_id)
+                own = {(esas_yil, esas_sira, karar_yil, karar_sira)}
+                for citation in extract_citations(text, own):
+                    citation["kaynak_id"] = doc_id
+                    rows.append(tuple(citation.get(column) for column in COLUMNS))
+
+        with conn.cursor() as cur:
+            if since:
+                cur.execute("DELETE FROM atiflar WHERE kaynak_id = ANY(%s)", (processed,))
+            else:
+                cur.execute("DELETE FROM atiflar WHERE kaynak_id BETWEEN %s AND %s", id_range)
+            for i in range(0, len(rows), batch_size):
+                execute_values(cur, f"INSERT INTO atiflar ({', '.join(COLUMNS)}) VALUES %s",
+                               rows[i:i + batch_size])
+            decisions, laws = resolve(cur, id_range)
+        conn.commit()
+        return documents, len(rows), decisions + laws
+    finally:
+        conn.close()
+
+
+def split_ranges(min_id: int, max_id: int, chunk_size: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + chunk_size - 1, max_id)) for start in range(min_id, max_id + 1, chunk_size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ictihatlar.karar_metni'nden atıf grafiği çıkarımı")
+    parser.add_argument("--processes", "-p", type=int, default=4,
+                        help="Paralel süreç sayısı")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Bir sürecin tek seferde işlediği id aralığı genişliği")
+    parser.add_argument("--batch-size", "-b", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Cursor ve insert batch boyutu")
+    parser.add_argument("--since", type=str,
+                        help="Yalnızca updated_at bu zamandan sonra olan kararları işle")
+    parser.add_argument("--resolve-only", action="store_true",
+                        help="Yalnızca çözümlenmemiş atıfların hedeflerini yeniden ara")
+    args = parser.parse_args()
+
+    if not POSTGRES_CONFIG["password"]:
+        print("❌ POSTGRES_PASSWORD tanımlı değil! .env dosyasını kontrol edin.")
+        sys.exit(1)
+
+    conn = create_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(ATIFLAR_SQL)
+            if args.resolve_only:
+                started = time.time()
+                decisions, laws = resolve(cur)
+                conn.commit()
+                print(f"✓ {decisions:,} karar ve {laws:,} kanun atıfı çözümlendi "
+                      f"({time.time() - started:.1f} sn)")
+                return
+            cur.execute("SELECT MIN(id), MAX(id) FROM ictihatlar")
+            min_id, max_id = cur.fetchone()
+        conn.commit()
+    finally:
+        conn.close()
+
+    if min_id is None:
+        print("⚠ ictihatlar tablosunda kayıt yok")
+        return
+
+    ranges = split_ranges(min_id, max_id, args.chunk_size)
+    print(f"🔗 id {min_id:,}-{max_id:,}, {len(ranges)} aralık, {args.processes} süreç"
+          + (f", updated_at > {args.since}" if args.since else ""))
+
+    started = time.time()
+    documents = citations = resolved = 0
+    with ProcessPoolExecutor(max_workers=args.processes) as executor:
+        futures = [executor.submit(process_range, id_range, args.since, args.batch_size)
+                   for id_range in ranges]
+        for done, future in enumerate(as_completed(futures), 1):
+            range_documents, range_citations, range_resolved = future.result()
+            documents += range_documents
+            citations += range_citations
+            resolved += range_resolved
+            elapsed = time.time() - started
+            print(f"  {done}/{len(ranges)} aralık, {documents:,} karar, {citations:,} atıf, "
+                  f"{documents / elapsed:,.0f} karar/sn", end="\r")
+
+    print()
+    print(f"✓ {documents:,} karardan {citations:,} atıf çıkarıldı, {resolved:,} hedef çözümlendi "
+          f"({time.time() - started:.1f} sn)")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ Kullanım:
     python fetch_all_data.py --mode mevzuat  # Sadece mevzuatlar
     python fetch_all_data.py --mode ictihat  # Sadece içtihatlar
     python fetch_all_data.py --mode full     # Tüm veriler (DİKKAT!)
+    python fetch_all_data.py --daemon        # Sürekli artımlı senkronizasyon servisi
 
 Gereksinimler:
     pip install requests psycopg2-binary tqdm
@@ -98,7 +99,7 @@ def mevzuat_mode(with_content: bool = False):
 
 
 def ictihat_mode(year_start: int = None, year_end: int = None, 
-                 with_content: bool = False):
+                 with_content: bool = False, defer_indexes: bool = False):
     """İçtihatları çeker"""
     current_year = datetime.now().year
     
@@ -133,10 +134,18 @@ def ictihat_mode(year_start: int = None, year_end: int = None,
         if with_content:
             cmd.append("--with-content")
         
+        if defer_indexes:
+            # İndeksler her tür sonunda değil, tüm yükleme bittikten sonra bir kez oluşturulur
+            cmd.extend(["--defer-indexes", "--no-index-rebuild"])
+        
         run_command(cmd, f"{ictihat_tur} çekiliyor ({year_start}-{year_end})...")
+    
+    if defer_indexes:
+        run_command(["python3", str(ictihat_script), "--build-indexes"],
+                    "İçtihat indeksleri oluşturuluyor (CONCURRENTLY)...")
 
 
-def full_mode(with_content: bool = False):
+def full_mode(with_content: bool = False, defer_indexes: bool = False):
     """Tüm verileri çeker"""
     print("\n" + "="*60)
     print("⚠️  TAM VERİ MODU")
@@ -154,7 +163,7 @@ def full_mode(with_content: bool = False):
     
     # Sonra içtihatlar (son 10 yıl)
     current_year = datetime.now().year
-    ictihat_mode(current_year - 10, current_year, with_content)
+    ictihat_mode(current_year - 10, current_year, with_content, defer_indexes)
 
 
 def estimate_time():
@@ -181,6 +190,28 @@ def estimate_time():
     print("\n💡 İpucu: İçtihatları yıl bazlı parçalara bölerek çekmeniz önerilir.")
 
 
+def daemon_mode(args):
+    """Sıcak bağlantılarla takvime göre artımlı senkronizasyon (scraper_daemon.py)"""
+    from scraper_daemon import ScraperDaemon, parse_schedules
+
+    try:
+        schedules = parse_schedules(args.schedule)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print("\n" + "="*60)
+    print("🔁 SERVİS MODU")
+    for name, interval in schedules.items():
+        print(f"  {name:<16} her {interval} sn")
+    print(f"Sağlık / durum: http://localhost:{args.port}/health, /status")
+    print("="*60)
+
+    ScraperDaemon(schedules, with_content=args.with_content, delay=args.delay, port=args.port,
+                  stop_after_known=args.stop_after_known, processes=args.processes,
+                  download_workers=args.download_workers).run()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Adalet Bakanlığı Mevzuat Bilgi Sistemi - Tam Veri Çekme",
@@ -191,11 +222,13 @@ def main():
   %(prog)s --mode mevzuat                 # Sadece mevzuatlar
   %(prog)s --mode ictihat --year 2024     # 2024 yılı içtihatları
   %(prog)s --mode ictihat --year-range 2020 2024  # 2020-2024 içtihatları
+  %(prog)s --mode full --defer-indexes    # Toplu yükleme, indeksler en sonda
   %(prog)s --mode estimate                # Tahmini süre hesapla
+  %(prog)s --daemon --schedule YARGITAYKARARI=30m --schedule mevzuat=1d
         """
     )
     
-    parser.add_argument("--mode", "-m", required=True,
+    parser.add_argument("--mode", "-m",
                         choices=["test", "mevzuat", "ictihat", "full", "estimate"],
                         help="Çalışma modu")
     parser.add_argument("--year", "-y", type=int,
@@ -205,27 +238,48 @@ def main():
                         help="İçtihat için yıl aralığı")
     parser.add_argument("--with-content", "-c", action="store_true",
                         help="İçerikleri de çek (çok yavaş)")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="İçtihat ikincil/GIN indekslerini yükleme sonunda oluştur (toplu yükleme)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Sürekli çalışan artımlı senkronizasyon servisi")
+    parser.add_argument("--schedule", action="append", metavar="TÜR=ARALIK",
+                        help="Servis takvimi, örn. YARGITAYKARARI=1h, mevzuat=1d, KYB=0 (kapalı); tekrarlanabilir")
+    parser.add_argument("--port", type=int, default=8085,
+                        help="Servis /health ve /status portu (varsayılan: 8085)")
+    parser.add_argument("--delay", type=float, default=0.5,
+                        help="Servis istekleri arası bekleme süresi (saniye)")
+    parser.add_argument("--stop-after-known", type=int, default=2,
+                        help="Servis: art arda bu kadar tamamen bilinen sayfa gelince türü bitir")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Servis: içerik işleme süreç sayısı (--with-content ile)")
+    parser.add_argument("--download-workers", type=int, default=1,
+                        help="Servis: eşzamanlı içerik indirme sayısı (--with-content ile)")
     
     args = parser.parse_args()
+    if not args.mode and not args.daemon:
+        parser.error("--mode ya da --daemon gerekli")
     
     print("\n" + "="*60)
     print("🏛️  ADALET BAKANLIĞI MEVZUAT BİLGİ SİSTEMİ")
     print("    Veri Çekme Aracı")
     print("="*60)
     
-    if args.mode == "test":
+    if args.daemon:
+        daemon_mode(args)
+    elif args.mode == "test":
         test_mode()
     elif args.mode == "mevzuat":
         mevzuat_mode(args.with_content)
     elif args.mode == "ictihat":
         if args.year:
-            ictihat_mode(args.year, args.year, args.with_content)
+            ictihat_mode(args.year, args.year, args.with_content, args.defer_indexes)
         elif args.year_range:
-            ictihat_mode(args.year_range[0], args.year_range[1], args.with_content)
+            ictihat_mode(args.year_range[0], args.year_range[1], args.with_content,
+                         args.defer_indexes)
         else:
-            ictihat_mode(with_content=args.with_content)
+            ictihat_mode(with_content=args.with_content, defer_indexes=args.defer_indexes)
     elif args.mode == "full":
-        full_mode(args.with_content)
+        full_mode(args.with_content, args.defer_indexes)
     elif args.mode == "estimate":
         estimate_time()
 
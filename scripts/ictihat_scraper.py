@@ -19,34 +19,15 @@ Ortam Değişkenleri:
     POSTGRES_PASSWORD - Şifre
 """
 
-import os
 import sys
 import json
 import time
-import base64
 import argparse
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Generator
-from pathlib import Path
-from html.parser import HTMLParser
-
-# .env dosyasını oku
-def load_env_file():
-    """Proje kök dizinindeki .env dosyasını oku"""
-    env_path = Path(__file__).parent.parent / '.env'
-    if env_path.exists():
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip().strip('"').strip("'")
-                    if key not in os.environ:
-                        os.environ[key] = value
-
-load_env_file()
+from typing import Dict, Iterable, Iterator, List, Optional, Generator, Union
+
+from db_config import POSTGRES_CONFIG
 
 try:
     import requests
@@ -67,6 +48,17 @@ except ImportError:
     def tqdm(iterable, **kwargs):
         return iterable
 
+from lookup_cache import LookupCache
+from content_stream import DEFAULT_CHUNK_BYTES, ContentDecodeError, stream_document_text
+from content_pipeline import ContentPipeline, DEFAULT_BATCH_SIZE as CONTENT_BATCH_SIZE, content_digest, normalize_text
+from stats_counters import install_counters, read_counters, exact_counts
+from crawl_queue import (CrawlQueue, PAGE_SIZE, DEFAULT_PAGES_PER_JOB, DEFAULT_LEASE_SECONDS,
+                         DEFAULT_MAX_ATTEMPTS)
+from reference_cache import ReferenceCache
+from records import IctihatRecord, batched
+from phrase_search import (DEFAULT_PHRASE_WORKERS, PhraseFanout, install_phrase_hits, read_phrases,
+                           save_hits)
+
 # Logging ayarları
 logging.basicConfig(
     level=logging.INFO,
@@ -95,47 +87,202 @@ ICTIHAT_TURLERI = {
     "KYB": "Kanun Yararına Bozma Kararları"
 }
 
-# PostgreSQL Konfigürasyonu
-POSTGRES_CONFIG = {
-    "host": os.getenv("POSTGRES_HOST", "localhost"),
-    "port": int(os.getenv("POSTGRES_PORT", "5432")),
-    "database": os.getenv("POSTGRES_DB", "yargisalzeka"),
-    "user": os.getenv("POSTGRES_USER", "postgres"),
-    "password": os.getenv("POSTGRES_PASSWORD", ""),
-}
+# İçerikli kayıtlar (büyük metinler) toplu yazımda sayfa yerine bu boyda gruplanır
+CONTENT_WRITE_BATCH = 10
 
+# Tablo yerleşimleri: tek tablo, karar yılına göre bölümlenmiş, yıl + içtihat türüne göre bölümlenmiş
+PARTITION_LAYOUTS = ["none", "year", "year-type"]
 
-class HTMLTextExtractor(HTMLParser):
-    """HTML'den düz metin çıkarır"""
-    def __init__(self):
-        super().__init__()
-        self.text_parts = []
-        
-    def handle_data(self, data):
-        self.text_parts.append(data)
-        
-    def get_text(self):
-        return ' '.join(self.text_parts).strip()
+# Tanımlı bir yıl bölümüne düşmeyen satırlar için varsayılan bölüm
+DEFAULT_PARTITION = "ictihatlar_varsayilan"
 
 
-def extract_text_from_html(html_content: str) -> str:
-    """HTML içeriğinden düz metin çıkarır"""
-    parser = HTMLTextExtractor()
-    try:
-        parser.feed(html_content)
-        return parser.get_text()
-    except:
-        return html_content
+# Kısıt dışı indeksler (ad, tanım); --defer-indexes ile yükleme sonrasına ertelenir
+ICTIHAT_INDEXES = [
+    ("idx_ictihatlar_type", "(item_type)"),
+    ("idx_ictihatlar_birim_ref", "(birim_ref)"),
+    ("idx_ictihatlar_esas", "(esas_no_yil, esas_no_sira)"),
+    ("idx_ictihatlar_karar", "(karar_no_yil, karar_no_sira)"),
+    ("idx_ictihatlar_tarih", "(karar_tarihi)"),
+    # Kesinleşmemiş kararların yaşa göre seçimi (refresh_finality.py)
+    ("idx_ictihatlar_kesinlesme", "(kesinlesme_durumu_id, karar_tarihi)"),
+    # Full-text search için
+    ("idx_ictihatlar_metin_gin", "USING gin(to_tsvector('turkish', COALESCE(karar_metni, '')))"),
+]
 
 
-def decode_content(base64_content: str) -> str:
-    """Base64 encoded içeriği decode eder"""
-    try:
-        decoded = base64.b64decode(base64_content).decode('utf-8')
-        return decoded
-    except Exception as e:
-        logger.warning(f"İçerik decode hatası: {e}")
-        return ""
+# Tekrar eden metadata için sözlük tabloları; satırlar tamsayı id saklar,
+# içtihat türü adı ise mevcut ictihat_turleri tablosundan kod ile okunur
+LOOKUP_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS ictihat_turleri (
+    id SERIAL PRIMARY KEY,
+    kod VARCHAR(50) UNIQUE NOT NULL,
+    adi VARCHAR(200) NOT NULL,
+    aciklama TEXT,
+    aktif BOOLEAN DEFAULT TRUE
+);
+CREATE TABLE IF NOT EXISTS birimler (
+    id SERIAL PRIMARY KEY,
+    adi VARCHAR(200) UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS karar_turleri (
+    id SMALLSERIAL PRIMARY KEY,
+    adi VARCHAR(100) UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS kesinlesme_durumlari (
+    id SMALLSERIAL PRIMARY KEY,
+    adi VARCHAR(50) UNIQUE NOT NULL
+);
+"""
+
+# İlk şemadan sonra eklenen kolonlar; eski tablolara create_tables'ta eklenir
+ICTIHAT_ADDED_COLUMNS = [
+    ("birim_ref", "INTEGER REFERENCES birimler(id)"),
+    ("karar_turu_id", "SMALLINT REFERENCES karar_turleri(id)"),
+    ("kesinlesme_durumu_id", "SMALLINT REFERENCES kesinlesme_durumlari(id)"),
+    # detect_near_duplicates.py doldurur
+    ("duplicate_group_id", "INTEGER"),
+    ("canonical_id", "INTEGER"),
+    # Normalize karar_metni'nin sha1 özeti; değişmeyen metin yeniden yazılmaz
+    ("metin_ozeti", "CHAR(40)"),
+]
+
+# Sözlük tablolarına taşınan eski metin kolonları; normalize_lookup_columns.py
+# --drop-columns ile kaldırılana kadar id kolonlarıyla birlikte yazılmaya devam eder
+LEGACY_LOOKUP_COLUMNS = ["item_type_adi", "birim_adi", "karar_turu", "kesinlesme_durumu"]
+
+ICTIHAT_UPSERT_COLUMNS = [
+    "document_id", "item_type", "birim_id", "birim_ref", "esas_no_yil", "esas_no_sira",
+    "karar_no_yil", "karar_no_sira", "esas_no", "karar_no", "karar_turu_id",
+    "karar_tarihi", "karar_tarihi_str", "kesinlesme_durumu_id", "karar_metni", "metin_ozeti",
+]
+
+# Eski kolon adlarını bekleyen okuyucular (kararlar_view, ES migrasyonu) için view'lar
+ICTIHAT_VIEWS_SQL = """
+CREATE OR REPLACE VIEW ictihatlar_detay AS
+SELECT
+    i.id,
+    i.document_id,
+    i.item_type,
+    t.adi AS item_type_adi,
+    i.birim_id,
+    b.adi AS birim_adi,
+    i.esas_no_yil,
+    i.esas_no_sira,
+    i.karar_no_yil,
+    i.karar_no_sira,
+    i.esas_no,
+    i.karar_no,
+    kt.adi AS karar_turu,
+    i.karar_tarihi,
+    i.karar_tarihi_str,
+    kd.adi AS kesinlesme_durumu,
+    i.karar_metni,
+    i.created_at,
+    i.updated_at,
+    i.duplicate_group_id,
+    i.canonical_id
+FROM ictihatlar i
+LEFT JOIN ictihat_turleri t ON t.kod = i.item_type
+LEFT JOIN birimler b ON b.id = i.birim_ref
+LEFT JOIN karar_turleri kt ON kt.id = i.karar_turu_id
+LEFT JOIN kesinlesme_durumlari kd ON kd.id = i.kesinlesme_durumu_id;
+
+-- Mevcut kararlar tablosuyla uyumluluk için view
+CREATE OR REPLACE VIEW kararlar_view AS
+SELECT
+    i.id,
+    b.adi AS yargitay_dairesi,
+    i.esas_no,
+    i.karar_no,
+    i.karar_tarihi,
+    i.karar_metni
+FROM ictihatlar i
+LEFT JOIN birimler b ON b.id = i.birim_ref
+WHERE i.item_type = 'YARGITAYKARARI';
+"""
+
+# Eski metin kolonları henüz kaldırılmamış (backfill tamamlanmamış) tablolar için
+LEGACY_ICTIHAT_VIEWS_SQL = """
+CREATE OR REPLACE VIEW ictihatlar_detay AS
+SELECT
+    id, document_id, item_type, item_type_adi, birim_id, birim_adi,
+    esas_no_yil, esas_no_sira, karar_no_yil, karar_no_sira, esas_no, karar_no,
+    karar_turu, karar_tarihi, karar_tarihi_str, kesinlesme_durumu,
+    karar_metni, created_at, updated_at, duplicate_group_id, canonical_id
+FROM ictihatlar;
+
+CREATE OR REPLACE VIEW kararlar_view AS
+SELECT
+    id,
+    birim_adi as yargitay_dairesi,
+    esas_no,
+    karar_no,
+    karar_tarihi,
+    karar_metni
+FROM ictihatlar
+WHERE item_type = 'YARGITAYKARARI';
+"""
+
+
+def year_partition_name(year: int) -> str:
+    """Karar yılının bölüm tablosu adı (yılı bilinmeyen kararlar 0 olarak saklanır)"""
+    return "ictihatlar_yil_yok" if year < 1 else f"ictihatlar_y{year}"
+
+
+def year_partition_sql(parent: str, year: int, by_type: bool = False) -> List[str]:
+    """Bir karar yılı için bölüm DDL'i; by_type ile türe göre LIST alt bölümleri de oluşturulur"""
+    name = year_partition_name(year)
+    bounds = "FROM (MINVALUE) TO (1)" if year < 1 else f"FROM ({year}) TO ({year + 1})"
+    if not by_type:
+        return [f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} FOR VALUES {bounds}"]
+
+    statements = [f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} "
+                  f"FOR VALUES {bounds} PARTITION BY LIST (item_type)"]
+    for kod in ICTIHAT_TURLERI:
+        statements.append(f"CREATE TABLE IF NOT EXISTS {name}_{kod.lower()} "
+                          f"PARTITION OF {name} FOR VALUES IN ('{kod}')")
+    statements.append(f"CREATE TABLE IF NOT EXISTS {name}_diger PARTITION OF {name} DEFAULT")
+    return statements
+
+
+def default_partition_sql(parent: str) -> str:
+    return f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {parent} DEFAULT"
+
+
+def build_partitioned_index(cur, table: str, index: str, definition: str, suffix: str):
+    """Bölümlenmiş tabloda indeksi yazmaları bloklamadan oluştur.
+
+    Üst tabloda ON ONLY ile geçersiz bir indeks açılır, her bölümde yerel indeks
+    CONCURRENTLY oluşturulup ATTACH edilir; tüm bölümler bağlanınca üst indeks
+    geçerli hale gelir. cur autocommit bir bağlantıya ait olmalıdır.
+    """
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {index} ON ONLY {table} {definition}")
+    cur.execute("""
+        SELECT c.relname, c.relkind = 'p' FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        ORDER BY c.relname
+    """, (table,))
+    for child, is_partitioned in cur.fetchall():
+        child_index = f"{child}_{suffix}_idx"
+        if is_partitioned:
+            build_partitioned_index(cur, child, child_index, definition, suffix)
+        else:
+            # Yarıda kalmış CONCURRENTLY denemesinden geçersiz indeks kalmış olabilir
+            cur.execute("""
+                SELECT i.indisvalid FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = %s
+            """, (child_index,))
+            row = cur.fetchone()
+            if row is not None and not row[0]:
+                cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {child_index}")
+            cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child_index} ON {child} {definition}")
+
+        cur.execute("SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(%s)", (child_index,))
+        if cur.fetchone() is None:
+            cur.execute(f"ALTER INDEX {index} ATTACH PARTITION {child_index}")
 
 
 class IctihatAPI:
@@ -165,6 +312,28 @@ class IctihatAPI:
         except requests.exceptions.RequestException as e:
             logger.error(f"İstek hatası ({endpoint}): {e}")
             return None
+
+    def _stream_document_text(self, endpoint: str, data: dict) -> Optional[str]:
+        """Belge içeriğini yanıtı bütünüyle belleğe almadan düz metne çevirir"""
+        url = f"{BASE_URL}{endpoint}"
+        try:
+            time.sleep(self.rate_limit_delay)
+            with self.session.post(url, json=data, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                result, text = stream_document_text(response.iter_content(DEFAULT_CHUNK_BYTES))
+        except requests.exceptions.RequestException as e:
+            logger.error(f"İstek hatası ({endpoint}): {e}")
+            return None
+        except ContentDecodeError as e:
+            # Boş metin kaydedilirse saklı karar_metni silinir; çekilemedi sayılır
+            logger.warning(f"İçerik decode hatası: {e}")
+            return None
+
+        if result.get("metadata", {}).get("FMTY") != "SUCCESS":
+            error_msg = result.get("metadata", {}).get("FMTE", "Bilinmeyen hata")
+            logger.warning(f"API hatası: {error_msg}")
+            return None
+        return text
     
     def get_item_types(self) -> List[dict]:
         """İçtihat türlerini getirir"""
@@ -184,8 +353,8 @@ class IctihatAPI:
     def search_ictihat(self, item_type: str, page_number: int = 1, 
                        page_size: int = 100, phrase: str = None,
                        birim_id: str = None, esas_yil: int = None,
-                       karar_yil: int = None) -> Optional[dict]:
-        """İçtihat arar"""
+                       karar_yil: int = None, sort_direction: str = "desc") -> Optional[dict]:
+        """İçtihat arar (varsayılan: en yeni karar önce)"""
         
         # En az bir filtre gerekli
         data_params = {
@@ -193,7 +362,7 @@ class IctihatAPI:
             "pageNumber": page_number,
             "itemTypeList": [item_type],
             "sortFields": ["KARAR_TARIHI"],
-            "sortDirection": "desc"
+            "sortDirection": sort_direction
         }
         
         # Filtreler
@@ -226,14 +395,26 @@ class IctihatAPI:
             "data": {"documentId": document_id},
             "applicationName": "UyapMevzuat"
         }
-        result = self._make_request("/emsal-karar/getDocumentContent", payload)
-        if result and result.get("content"):
-            html_content = decode_content(result["content"])
-            return extract_text_from_html(html_content)
-        return None
+        return self._stream_document_text("/emsal-karar/getDocumentContent", payload)
+
+    def get_ictihat_content_raw(self, document_id: str) -> Optional[bytes]:
+        """İçerik yanıtının ham gövdesi (çözme ContentPipeline'ın süreç havuzunda yapılır)"""
+        url = f"{BASE_URL}/emsal-karar/getDocumentContent"
+        payload = {
+            "data": {"documentId": document_id},
+            "applicationName": "UyapMevzuat"
+        }
+        try:
+            time.sleep(self.rate_limit_delay)
+            response = self.session.post(url, json=payload, timeout=30)
+            response.raise_for_status()
+            return response.content
+        except requests.exceptions.RequestException as e:
+            logger.error(f"İstek hatası ({document_id}): {e}")
+            return None
     
     def fetch_ictihat_by_year(self, item_type: str, year: int,
-                              limit: Optional[int] = None) -> Generator[dict, None, None]:
+                              limit: Optional[int] = None) -> Generator[IctihatRecord, None, None]:
         """Belirli yıldaki içtihatları getirir"""
         page_number = 1
         page_size = 100
@@ -247,7 +428,7 @@ class IctihatAPI:
             if not result or not result.get("emsalKararList"):
                 break
                 
-            karar_list = result["emsalKararList"]
+            karar_list = IctihatRecord.from_page(result["emsalKararList"])
             total = result.get("total", 0)
             
             for karar in karar_list:
@@ -265,7 +446,7 @@ class IctihatAPI:
         logger.info(f"Toplam {total_fetched} içtihat çekildi ({item_type}, {year})")
     
     def fetch_ictihat_by_phrase(self, item_type: str, phrase: str,
-                                limit: Optional[int] = None) -> Generator[dict, None, None]:
+                                limit: Optional[int] = None) -> Generator[IctihatRecord, None, None]:
         """Anahtar kelimeye göre içtihat arar"""
         page_number = 1
         page_size = 100
@@ -279,7 +460,7 @@ class IctihatAPI:
             if not result or not result.get("emsalKararList"):
                 break
                 
-            karar_list = result["emsalKararList"]
+            karar_list = IctihatRecord.from_page(result["emsalKararList"])
             total = result.get("total", 0)
             
             for karar in karar_list:
@@ -302,6 +483,14 @@ class IctihatDatabase:
     
     def __init__(self):
         self.conn = None
+        # Tablo yerleşimi create_tables sırasında katalogdan okunur
+        self.partitioned = False
+        self.by_type = False
+        self.conflict_columns = ["document_id"]
+        self.partitions = set()
+        self.legacy_columns = []
+        self.lookups = {}
+        self._upsert_sql = None
         
     def connect(self):
         """Veritabanına bağlan"""
@@ -317,145 +506,472 @@ class IctihatDatabase:
         if self.conn:
             self.conn.close()
             
-    def create_tables(self):
-        """İçtihat tablolarını oluştur"""
+    def create_tables(self, partition_layout: str = "none", create_indexes: bool = True):
+        """İçtihat tablolarını oluştur (tablo yoksa istenen yerleşimle)"""
         create_sql = """
         -- Ana içtihat tablosu
         CREATE TABLE IF NOT EXISTS ictihatlar (
             id SERIAL PRIMARY KEY,
             document_id VARCHAR(50) UNIQUE NOT NULL,
             item_type VARCHAR(50) NOT NULL,
-            item_type_adi VARCHAR(200),
             birim_id VARCHAR(50),
-            birim_adi VARCHAR(200),
+            birim_ref INTEGER REFERENCES birimler(id),
             esas_no_yil INTEGER,
             esas_no_sira INTEGER,
             karar_no_yil INTEGER,
             karar_no_sira INTEGER,
             esas_no VARCHAR(50),
             karar_no VARCHAR(50),
-            karar_turu VARCHAR(100),
+            karar_turu_id SMALLINT REFERENCES karar_turleri(id),
             karar_tarihi DATE,
             karar_tarihi_str VARCHAR(20),
-            kesinlesme_durumu VARCHAR(50),
+            kesinlesme_durumu_id SMALLINT REFERENCES kesinlesme_durumlari(id),
             karar_metni TEXT,
+            duplicate_group_id INTEGER,
+            canonical_id INTEGER,
+            metin_ozeti CHAR(40),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         
-        -- İndeksler
-        CREATE INDEX IF NOT EXISTS idx_ictihatlar_type ON ictihatlar(item_type);
-        CREATE INDEX IF NOT EXISTS idx_ictihatlar_birim ON ictihatlar(birim_adi);
-        CREATE INDEX IF NOT EXISTS idx_ictihatlar_esas ON ictihatlar(esas_no_yil, esas_no_sira);
-        CREATE INDEX IF NOT EXISTS idx_ictihatlar_karar ON ictihatlar(karar_no_yil, karar_no_sira);
-        CREATE INDEX IF NOT EXISTS idx_ictihatlar_tarih ON ictihatlar(karar_tarihi);
-        
-        -- Full-text search için
-        CREATE INDEX IF NOT EXISTS idx_ictihatlar_metin_gin ON ictihatlar 
-            USING gin(to_tsvector('turkish', COALESCE(karar_metni, '')));
-            
-        -- Mevcut kararlar tablosuyla uyumluluk için view
-        CREATE OR REPLACE VIEW kararlar_view AS
-        SELECT 
-            id,
-            birim_adi as yargitay_dairesi,
-            esas_no,
-            karar_no,
-            karar_tarihi,
-            karar_metni
-        FROM ictihatlar
-        WHERE item_type = 'YARGITAYKARARI';
+        -- Ertelenmiş yükleme modunda kaldırılan indekslerin tanımları
+        CREATE TABLE IF NOT EXISTS ertelenen_indeksler (
+            index_name VARCHAR(63) PRIMARY KEY,
+            table_name VARCHAR(63) NOT NULL,
+            definition TEXT NOT NULL,
+            deferred_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
         """
         
         with self.conn.cursor() as cur:
+            cur.execute(LOOKUP_TABLES_SQL)
+            cur.execute("SELECT to_regclass('ictihatlar')")
+            if partition_layout != "none" and cur.fetchone()[0] is None:
+                self._create_partitioned_table(cur, by_type=partition_layout == "year-type")
             cur.execute(create_sql)
+            
+            # Sonradan eklenen kolonları eski tablolara ekle
+            # (ALTER TABLE kolonlar zaten varsa hiç çalıştırılmaz; tablo kilidi alınmaz)
+            cur.execute("""
+                SELECT attname FROM pg_attribute
+                WHERE attrelid = 'ictihatlar'::regclass AND attnum > 0 AND NOT attisdropped
+            """)
+            existing = {row[0] for row in cur.fetchall()}
+            missing = [(name, definition) for name, definition in ICTIHAT_ADDED_COLUMNS
+                       if name not in existing]
+            if missing:
+                cur.execute("ALTER TABLE ictihatlar " + ", ".join(
+                    f"ADD COLUMN IF NOT EXISTS {name} {definition}" for name, definition in missing))
+            
+            if create_indexes:
+                # Bölümlenmiş tabloda üst tabloya eklenen indeksler her bölümde yerel olarak oluşur
+                for name, definition in ICTIHAT_INDEXES:
+                    cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ictihatlar {definition}")
         self.conn.commit()
-        logger.info("İçtihat tabloları oluşturuldu")
+        self._load_layout()
         
-    def upsert_ictihat(self, ictihat: dict, karar_metni: Optional[str] = None):
-        """İçtihat ekle veya güncelle"""
-        upsert_sql = """
-        INSERT INTO ictihatlar (
-            document_id, item_type, item_type_adi, birim_id, birim_adi,
-            esas_no_yil, esas_no_sira, karar_no_yil, karar_no_sira,
-            esas_no, karar_no, karar_turu, karar_tarihi, karar_tarihi_str,
-            kesinlesme_durumu, karar_metni, updated_at
-        ) VALUES (
-            %(document_id)s, %(item_type)s, %(item_type_adi)s, %(birim_id)s,
-            %(birim_adi)s, %(esas_no_yil)s, %(esas_no_sira)s, %(karar_no_yil)s,
-            %(karar_no_sira)s, %(esas_no)s, %(karar_no)s, %(karar_turu)s,
-            %(karar_tarihi)s, %(karar_tarihi_str)s, %(kesinlesme_durumu)s,
-            %(karar_metni)s, CURRENT_TIMESTAMP
-        )
-        ON CONFLICT (document_id) DO UPDATE SET
-            item_type = EXCLUDED.item_type,
-            item_type_adi = EXCLUDED.item_type_adi,
-            birim_id = EXCLUDED.birim_id,
-            birim_adi = EXCLUDED.birim_adi,
-            esas_no_yil = EXCLUDED.esas_no_yil,
-            esas_no_sira = EXCLUDED.esas_no_sira,
-            karar_no_yil = EXCLUDED.karar_no_yil,
-            karar_no_sira = EXCLUDED.karar_no_sira,
-            esas_no = EXCLUDED.esas_no,
-            karar_no = EXCLUDED.karar_no,
-            karar_turu = EXCLUDED.karar_turu,
-            karar_tarihi = EXCLUDED.karar_tarihi,
-            karar_tarihi_str = EXCLUDED.karar_tarihi_str,
-            kesinlesme_durumu = EXCLUDED.kesinlesme_durumu,
-            karar_metni = COALESCE(EXCLUDED.karar_metni, ictihatlar.karar_metni),
-            updated_at = CURRENT_TIMESTAMP
-        """
-        
-        # Tarih dönüşümü
-        karar_tarihi = None
-        if ictihat.get("kararTarihi"):
-            try:
-                karar_tarihi = datetime.fromisoformat(
-                    ictihat["kararTarihi"].replace("Z", "+00:00").split(".")[0]
-                ).date()
-            except:
-                pass
+        with self.conn.cursor() as cur:
+            cur.execute(LEGACY_ICTIHAT_VIEWS_SQL if self.legacy_columns else ICTIHAT_VIEWS_SQL)
+        self.conn.commit()
         
-        item_type = ictihat.get("itemType", {})
+        if install_counters(self.conn, "ictihatlar"):
+            logger.info("İstatistik sayaçları kuruldu ve mevcut kayıtlarla dolduruldu")
         
-        params = {
-            "document_id": ictihat.get("documentId"),
-            "item_type": item_type.get("name") if isinstance(item_type, dict) else None,
-            "item_type_adi": item_type.get("description") if isinstance(item_type, dict) else None,
-            "birim_id": ictihat.get("birimId"),
-            "birim_adi": ictihat.get("birimAdi"),
-            "esas_no_yil": ictihat.get("esasNoYil"),
-            "esas_no_sira": ictihat.get("esasNoSira"),
-            "karar_no_yil": ictihat.get("kararNoYil"),
-            "karar_no_sira": ictihat.get("kararNoSira"),
-            "esas_no": ictihat.get("esasNo"),
-            "karar_no": ictihat.get("kararNo"),
-            "karar_turu": ictihat.get("kararTuru"),
-            "karar_tarihi": karar_tarihi,
-            "karar_tarihi_str": ictihat.get("kararTarihiStr"),
-            "kesinlesme_durumu": ictihat.get("kesinlesmeDurumu"),
-            "karar_metni": karar_metni
+        self.lookups = {
+            "item_type": LookupCache(self.conn, "ictihat_turleri", key_column="kod", label_column="adi").load(),
+            "birim": LookupCache(self.conn, "birimler").load(),
+            "karar_turu": LookupCache(self.conn, "karar_turleri").load(),
+            "kesinlesme": LookupCache(self.conn, "kesinlesme_durumlari").load(),
         }
-        
+        logger.info("İçtihat tabloları oluşturuldu"
+                    + (f" (bölümlenmiş: {', '.join(self.conflict_columns[1:])})" if self.partitioned else ""))
+        if self.legacy_columns:
+            logger.info("Eski metin kolonları hâlâ mevcut, id kolonlarıyla birlikte yazılacak "
+                        "(normalize_lookup_columns.py)")
+
+    def _create_partitioned_table(self, cur, by_type: bool):
+        """karar_no_yil'e göre RANGE bölümlenmiş ictihatlar tablosunu oluştur"""
+        keys = "karar_no_yil, item_type" if by_type else "karar_no_yil"
+        cur.execute(f"""
+        CREATE SEQUENCE IF NOT EXISTS ictihatlar_id_seq;
+        CREATE TABLE ictihatlar (
+            id INTEGER NOT NULL DEFAULT nextval('ictihatlar_id_seq'),
+            document_id VARCHAR(50) NOT NULL,
+            item_type VARCHAR(50) NOT NULL,
+            birim_id VARCHAR(50),
+            birim_ref INTEGER REFERENCES birimler(id),
+            esas_no_yil INTEGER,
+            esas_no_sira INTEGER,
+            karar_no_yil INTEGER NOT NULL DEFAULT 0,
+            karar_no_sira INTEGER,
+            esas_no VARCHAR(50),
+            karar_no VARCHAR(50),
+            karar_turu_id SMALLINT REFERENCES karar_turleri(id),
+            karar_tarihi DATE,
+            karar_tarihi_str VARCHAR(20),
+            kesinlesme_durumu_id SMALLINT REFERENCES kesinlesme_durumlari(id),
+            karar_metni TEXT,
+            duplicate_group_id INTEGER,
+            canonical_id INTEGER,
+            metin_ozeti CHAR(40),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id, {keys}),
+            UNIQUE (document_id, {keys})
+        ) PARTITION BY RANGE (karar_no_yil);
+        ALTER SEQUENCE ictihatlar_id_seq OWNED BY ictihatlar.id;
+        """)
+        for year in (0, datetime.now().year):
+            for statement in year_partition_sql("ictihatlar", year, by_type):
+                cur.execute(statement)
+        cur.execute(default_partition_sql("ictihatlar"))
+
+    def _load_layout(self):
+        """Tablonun bölümlenip bölümlenmediğini ve upsert çakışma hedefini katalogdan oku"""
         with self.conn.cursor() as cur:
-            cur.execute(upsert_sql, params)
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = 'ictihatlar'::regclass")
+            self.partitioned = cur.fetchone()[0] == "p"
+
+            # document_id'yi içeren benzersizlik kısıtı; bölümlenmiş tabloda bölüm anahtarlarını da içerir
+            cur.execute("""
+                SELECT array_agg(a.attname::text ORDER BY k.ord)
+                FROM pg_constraint con
+                CROSS JOIN LATERAL unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+                JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+                WHERE con.conrelid = 'ictihatlar'::regclass AND con.contype IN ('u', 'p')
+                GROUP BY con.oid
+            """)
+            for (columns,) in cur.fetchall():
+                if "document_id" in columns:
+                    self.conflict_columns = columns
+                    break
+
+            cur.execute("""
+                SELECT c.relname FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'ictihatlar'::regclass
+            """)
+            self.partitions = {name for (name,) in cur.fetchall()}
+
+            cur.execute("""
+                SELECT attname FROM pg_attribute
+                WHERE attrelid = 'ictihatlar'::regclass AND attnum > 0 AND NOT attisdropped
+            """)
+            columns = {name for (name,) in cur.fetchall()}
         self.conn.commit()
+        self.by_type = "item_type" in self.conflict_columns
+        self.legacy_columns = [c for c in LEGACY_LOOKUP_COLUMNS if c in columns]
         
-    def get_stats(self) -> dict:
-        """Veritabanı istatistiklerini getir"""
+        columns = ICTIHAT_UPSERT_COLUMNS + self.legacy_columns
+        updates = ",\n            ".join(
+            f"{c} = EXCLUDED.{c}" for c in columns if c not in ("document_id", "karar_metni", "metin_ozeti")
+        )
+        # Kayıtlar execute_values ile çok satırlı VALUES olarak yazılır
+        self._upsert_template = f"({', '.join(f'%({c})s' for c in columns)}, CURRENT_TIMESTAMP)"
+        self._upsert_sql = f"""
+        INSERT INTO ictihatlar ({', '.join(columns)}, updated_at)
+        VALUES %s
+        ON CONFLICT ({', '.join(self.conflict_columns)}) DO UPDATE SET
+            {updates},
+            -- Özet aynıysa eski değer (ve TOAST kaydı) korunur
+            karar_metni = CASE WHEN EXCLUDED.metin_ozeti = ictihatlar.metin_ozeti THEN ictihatlar.karar_metni
+                               ELSE COALESCE(EXCLUDED.karar_metni, ictihatlar.karar_metni) END,
+            metin_ozeti = COALESCE(EXCLUDED.metin_ozeti, ictihatlar.metin_ozeti),
+            updated_at = CURRENT_TIMESTAMP
+        """
+
+    def ensure_year_partition(self, year: int):
+        """Karar yılının bölümü yoksa oluştur"""
+        name = year_partition_name(year)
+        if not self.partitioned or name in self.partitions:
+            return
+        try:
+            with self.conn.cursor() as cur:
+                for statement in year_partition_sql("ictihatlar", year, self.by_type):
+                    cur.execute(statement)
+            self.conn.commit()
+            logger.info(f"Bölüm oluşturuldu: {name}")
+        except psycopg2.Error as e:
+            # Varsayılan bölümde bu yıla ait satır varsa yeni bölüm eklenemez;
+            # kayıtlar varsayılan bölüme yazılmaya devam eder
+            self.conn.rollback()
+            logger.warning(f"{name} bölümü oluşturulamadı, varsayılan bölüm kullanılacak: {e}")
+        self.partitions.add(name)
+
+    def drop_secondary_indexes(self):
+        """Toplu yükleme öncesi kısıt dışı indeksleri kaldır, tanımlarını ertelenen_indeksler'e yaz"""
         with self.conn.cursor() as cur:
             cur.execute("""
-                SELECT item_type, COUNT(*) as count 
-                FROM ictihatlar 
-                GROUP BY item_type 
-                ORDER BY count DESC
+                SELECT c.relname, pg_get_indexdef(i.indexrelid)
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                LEFT JOIN pg_constraint con ON con.conindid = i.indexrelid AND con.conrelid = i.indrelid
+                WHERE i.indrelid = 'ictihatlar'::regclass AND con.oid IS NULL AND NOT i.indisunique
             """)
-            stats = dict(cur.fetchall())
-            
-            cur.execute("SELECT COUNT(*) FROM ictihatlar")
-            total = cur.fetchone()[0]
-            
-        return {"total": total, "by_type": stats}
+            indexes = cur.fetchall()
+            for name, indexdef in indexes:
+                cur.execute("""
+                    INSERT INTO ertelenen_indeksler (index_name, table_name, definition)
+                    VALUES (%s, 'ictihatlar', %s)
+                    ON CONFLICT (index_name) DO NOTHING
+                """, (name, "USING " + indexdef.split(" USING ", 1)[1]))
+                cur.execute(f"DROP INDEX IF EXISTS {name}")
+        self.conn.commit()
+        if indexes:
+            logger.info(f"Ertelenmiş yükleme: {len(indexes)} indeks kaldırıldı "
+                        f"({', '.join(name for name, _ in indexes)})")
+
+    def build_indexes(self, maintenance_work_mem: str = "2GB",
+                      parallel_workers: int = 4) -> List[tuple]:
+        """Eksik indeksleri CREATE INDEX CONCURRENTLY ile oluştur, (indeks, süre) listesi döndür"""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT index_name, definition FROM ertelenen_indeksler WHERE table_name = 'ictihatlar'")
+            definitions = dict(ICTIHAT_INDEXES)
+            definitions.update(dict(cur.fetchall()))
+        self.conn.commit()
+
+        # CONCURRENTLY transaction içinde çalışamaz; ayrı autocommit bağlantı kullanılır
+        conn = psycopg2.connect(**POSTGRES_CONFIG)
+        conn.autocommit = True
+        timings = []
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT set_config('maintenance_work_mem', %s, false)", (maintenance_work_mem,))
+                cur.execute("SELECT set_config('max_parallel_maintenance_workers', %s, false)",
+                            (str(parallel_workers),))
+                for name, definition in definitions.items():
+                    cur.execute("""
+                        SELECT i.indisvalid FROM pg_index i
+                        JOIN pg_class c ON c.oid = i.indexrelid
+                        WHERE c.relname = %s
+                    """, (name,))
+                    row = cur.fetchone()
+                    if row is not None and row[0]:
+                        cur.execute("DELETE FROM ertelenen_indeksler WHERE index_name = %s", (name,))
+                        continue
+
+                    started = time.time()
+                    if self.partitioned:
+                        suffix = name[len("idx_ictihatlar_"):] if name.startswith("idx_ictihatlar_") else name
+                        build_partitioned_index(cur, "ictihatlar", name, definition, suffix)
+                    else:
+                        if row is not None:
+                            # Yarıda kalmış CONCURRENTLY denemesinden kalan geçersiz indeks
+                            cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                        cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON ictihatlar {definition}")
+                    elapsed = time.time() - started
+                    cur.execute("DELETE FROM ertelenen_indeksler WHERE index_name = %s", (name,))
+                    timings.append((name, elapsed))
+                    logger.info(f"İndeks oluşturuldu: {name} ({elapsed:.1f} sn)")
+                if timings:
+                    cur.execute("ANALYZE ictihatlar")
+        finally:
+            conn.close()
+        return timings
+        
+    def upsert_ictihat(self, ictihat: Union[IctihatRecord, dict], karar_metni: Optional[str] = None,
+                       metin_ozeti: Optional[str] = None):
+        """İçtihat ekle veya güncelle (metin_ozeti verilmezse metinden hesaplanır)"""
+        self.upsert_ictihat_batch([(ictihat, karar_metni, metin_ozeti)])
+
+    def _prepare(self, record: IctihatRecord, karar_metni: Optional[str],
+                 metin_ozeti: Optional[str]) -> IctihatRecord:
+        """Sözlük id'lerini ve içeriği kayda yaz"""
+        # Boş içerik saklı karar_metni'nin üzerine yazılmaz (upsert'teki COALESCE için None)
+        if not karar_metni:
+            karar_metni = metin_ozeti = None
+        elif metin_ozeti is None:
+            karar_metni = normalize_text(karar_metni)
+            metin_ozeti = content_digest(karar_metni)
+        record.karar_metni = karar_metni
+        record.metin_ozeti = metin_ozeti
+        
+        # Tür kodu satırda kalır; adı ictihat_turleri'nden okunur
+        self.lookups["item_type"].get_id(record.item_type, record.item_type_adi)
+        record.birim_ref = self.lookups["birim"].get_id(record.birim_adi)
+        record.karar_turu_id = self.lookups["karar_turu"].get_id(record.karar_turu)
+        record.kesinlesme_durumu_id = self.lookups["kesinlesme"].get_id(record.kesinlesme_durumu)
+        
+        if self.partitioned:
+            # Bölüm anahtarı NULL olamaz; yılı bilinmeyen kararlar 0 olarak saklanır
+            record.karar_no_yil = int(record.karar_no_yil or 0)
+            self.ensure_year_partition(record.karar_no_yil)
+        return record
+
+    def upsert_ictihat_batch(self, rows: Iterable[tuple]) -> int:
+        """(kayıt, karar_metni, metin_ozeti) satırlarını tek INSERT ... ON CONFLICT ile yaz"""
+        records: Dict[str, IctihatRecord] = {}
+        for ictihat, karar_metni, metin_ozeti in rows:
+            if isinstance(ictihat, dict):
+                ictihat = IctihatRecord.from_api(ictihat)
+            # Aynı komutta bir satır iki kez güncellenemez; tekrarlarda son kayıt geçerli
+            records[ictihat.document_id] = self._prepare(ictihat, karar_metni, metin_ozeti)
+        if not records:
+            return 0
+        with self.conn.cursor() as cur:
+            execute_values(cur, self._upsert_sql, list(records.values()),
+                           template=self._upsert_template, page_size=len(records))
+        self.conn.commit()
+        return len(records)
+        
+    def get_stats(self, exact: bool = False) -> dict:
+        """Veritabanı istatistiklerini getir (varsayılan: sayaçlardan, exact ile tam sayım)"""
+        if exact:
+            return exact_counts(self.conn, "ictihatlar")
+        return read_counters(self.conn, "ictihatlar")
+
+
+def rebuild_indexes(db: IctihatDatabase, args):
+    """Ertelenmiş indeksleri oluştur ve süreleri raporla"""
+    print(f"\n🔨 İndeksler oluşturuluyor (maintenance_work_mem={args.maintenance_work_mem}, "
+          f"paralel işçi={args.maintenance_workers})...")
+    timings = db.build_indexes(args.maintenance_work_mem, args.maintenance_workers)
+    if not timings:
+        print("   Tüm indeksler zaten mevcut")
+        return
+    for name, elapsed in timings:
+        print(f"   ✓ {name}: {elapsed:.1f} sn")
+    print(f"   Toplam: {sum(elapsed for _, elapsed in timings):.1f} sn")
+
+
+def create_content_pipeline(api: IctihatAPI, args) -> Optional[ContentPipeline]:
+    """--with-content --processes > 0 ise çalıştırma boyunca paylaşılan boru hattı (yoksa None)"""
+    if not (args.with_content and args.processes > 0):
+        return None
+    return ContentPipeline(api.get_ictihat_content_raw, processes=args.processes,
+                           download_workers=args.download_workers,
+                           batch_size=args.content_batch_size)
+
+
+def iter_with_content(api: IctihatAPI, ictihatlar: Iterable[IctihatRecord], args,
+                      pipeline: Optional[ContentPipeline] = None) -> Iterator[tuple]:
+    """Kayıtları (ictihat, karar_metni, metin_ozeti) olarak üret; --processes > 0 ise içerikler
+    indirme iş parçacıkları + süreç havuzu boru hattında işlenir. Havuzlar her çağrıda
+    kurulmasın diye çağıran, create_content_pipeline ile bir kez oluşturduğu boru hattını verir."""
+    if not args.with_content:
+        for ictihat in ictihatlar:
+            yield ictihat, None, None
+    elif args.processes > 0:
+        if pipeline is None:
+            with create_content_pipeline(api, args) as pipeline:
+                yield from pipeline.run(ictihatlar, key=lambda ictihat: ictihat.document_id)
+        else:
+            yield from pipeline.run(ictihatlar, key=lambda ictihat: ictihat.document_id)
+    else:
+        for ictihat in ictihatlar:
+            doc_id = ictihat.document_id
+            yield ictihat, api.get_ictihat_content(doc_id) if doc_id else None, None
+
+
+def write_batch_size(args) -> int:
+    """upsert_ictihat_batch boyu: içeriksiz bir API sayfası ya da CONTENT_WRITE_BATCH içerikli kayıt"""
+    return CONTENT_WRITE_BATCH if args.with_content else PAGE_SIZE
+
+
+def enqueue_jobs(api: IctihatAPI, queue: CrawlQueue, types: List[str], years: List[int], args,
+                 reference: ReferenceCache) -> int:
+    """Tür / yıl (--by-birim ile birim) başına toplam kaydı sorgulayıp sayfa aralığı işleri ekle"""
+    created = 0
+    for item_type in types:
+        birimler = [None]
+        if args.by_birim:
+            # Birim listesi referans önbelleğinden (TTL dolmadıkça ağ isteği yapılmaz)
+            birimler = list(reference.birimler(item_type)) or [None]
+        for year in years:
+            for birim_id in birimler:
+                result = api.search_ictihat(item_type, 1, 1, birim_id=birim_id, karar_yil=year)
+                total = (result or {}).get("total", 0)
+                jobs = queue.enqueue(item_type, year, total, args.pages_per_job, birim_id)
+                created += jobs
+                print(f"  {item_type} {year}{f' ({birim_id})' if birim_id else ''}: "
+                      f"{total:,} kayıt, {jobs} yeni iş")
+    return created
+
+
+def run_worker(api: IctihatAPI, db: Optional[IctihatDatabase], queue: CrawlQueue, args,
+               pipeline: Optional[ContentPipeline] = None) -> int:
+    """Kuyruktan iş alıp sayfalarını çek; alınabilir iş kalmayınca dön"""
+    total_count = 0
+    jobs = 0
+    while args.max_jobs is None or jobs < args.max_jobs:
+        job = queue.claim()
+        if job is None:
+            break
+        jobs += 1
+        birim_id = job["birim_id"] or None
+        label = f"{job['item_type']} {job['year']}{f' ({birim_id})' if birim_id else ''} " \
+                f"s.{job['next_page']}-{job['page_end']}"
+        logger.info(f"İş #{job['id']} alındı: {label} (deneme {job['attempts']})")
+        try:
+            for page in range(job["next_page"], job["page_end"] + 1):
+                result = api.search_ictihat(job["item_type"], page, PAGE_SIZE,
+                                            birim_id=birim_id, karar_yil=job["year"])
+                if result is None:
+                    raise RuntimeError(f"Sayfa {page} çekilemedi")
+                records = IctihatRecord.from_page(result.get("emsalKararList") or [])
+                renewed_at = time.time()
+                contents = iter_with_content(api, records, args, pipeline)
+                for rows in batched(contents, write_batch_size(args)):
+                    if db:
+                        db.upsert_ictihat_batch(rows)
+                    total_count += len(rows)
+                    # İçerikli uzun sayfalarda kira sayfa bitmeden de yenilenir
+                    if time.time() - renewed_at > queue.lease_seconds / 3:
+                        if not queue.renew(job["id"]):
+                            raise LookupError
+                        renewed_at = time.time()
+                if not queue.renew(job["id"], next_page=page + 1):
+                    raise LookupError
+                if len(records) < PAGE_SIZE:
+                    break
+            queue.complete(job["id"])
+            logger.info(f"İş #{job['id']} tamamlandı: {label}")
+        except LookupError:
+            logger.warning(f"İş #{job['id']} kirası başka bir işçiye geçti, bırakılıyor")
+        except KeyboardInterrupt:
+            # Kira dolmasını beklemeden işi kuyruğa geri bırak
+            queue.fail(job["id"], "işçi durduruldu")
+            raise
+        except Exception as e:
+            logger.error(f"İş #{job['id']} hatası: {e}")
+            queue.fail(job["id"], str(e))
+    return total_count
+
+
+def run_phrase_fanout(api: IctihatAPI, db: Optional[IctihatDatabase], types: List[str], args,
+                      pipeline: Optional[ContentPipeline] = None) -> int:
+    """--phrases-file: ifadeleri eşzamanlı ara, her kararı bir kez işle, isabetleri eşle"""
+    phrases = read_phrases(args.phrases_file)
+    if args.phrase and args.phrase not in phrases:
+        phrases.append(args.phrase)
+    if db:
+        install_phrase_hits(db.conn)
+    fanout = PhraseFanout(lambda: IctihatAPI(rate_limit_delay=args.delay), phrases, types,
+                          workers=args.phrase_workers, limit=args.limit)
+    print(f"🔎 {len(phrases)} ifade x {len(types)} tür, {fanout.workers} eşzamanlı arama")
+
+    count = 0
+    rows = tqdm(iter_with_content(api, fanout.run(), args, pipeline), desc="ifadeler")
+    for batch in batched(rows, write_batch_size(args)):
+        if db:
+            db.upsert_ictihat_batch(batch)
+            if len(fanout.hits) >= 1000:
+                save_hits(db.conn, fanout.take_hits())
+        count += len(batch)
+    if db:
+        save_hits(db.conn, fanout.take_hits())
+
+    print(f"  ✓ {fanout.hit_count} isabet, {count} tekil karar işlendi "
+          f"({fanout.duplicates} tekrar atlandı)")
+    if fanout.failed_jobs:
+        print(f"  ⚠ {fanout.failed_jobs} arama hata verdi (ayrıntılar logda)")
+    return count
+
+
+def print_queue_status(queue: CrawlQueue):
+    print("\n📋 crawl_jobs durumu:")
+    for durum, count, pages in queue.status():
+        print(f"   - {durum}: {count} iş" + (f", {pages} sayfa kaldı" if pages else ""))
 
 
 def main():
@@ -468,14 +984,59 @@ def main():
                         help="Yıl aralığı (örn: 2020 2024)")
     parser.add_argument("--phrase", "-p", type=str,
                         help="Arama kelimesi")
+    parser.add_argument("--phrases-file", type=str,
+                        help="Satır başına bir arama ifadesi; ifadeler eşzamanlı aranır, "
+                             "her karar bir kez çekilir, isabetler ictihat_arama_sonuclari'na yazılır")
+    parser.add_argument("--phrase-workers", type=int, default=DEFAULT_PHRASE_WORKERS,
+                        help="--phrases-file ile eşzamanlı arama sayısı (her biri --delay'e uyar)")
     parser.add_argument("--limit", "-l", type=int,
                         help="Her tür/yıl için maksimum kayıt sayısı")
     parser.add_argument("--with-content", "-c", action="store_true",
                         help="İçerikleri de çek (yavaş)")
     parser.add_argument("--delay", "-d", type=float, default=0.5,
                         help="İstekler arası bekleme süresi (saniye)")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="İçerik çözme (base64 + HTML) için süreç sayısı (0: indirmeyle aynı süreçte)")
+    parser.add_argument("--download-workers", type=int, default=1,
+                        help="--processes ile eşzamanlı içerik indiren iş parçacığı sayısı "
+                             "(her biri --delay'e uyar)")
+    parser.add_argument("--content-batch-size", type=int, default=CONTENT_BATCH_SIZE,
+                        help="Süreç havuzuna tek seferde gönderilen ham içerik sayısı")
     parser.add_argument("--dry-run", action="store_true",
                         help="Veritabanına kaydetmeden test et")
+    parser.add_argument("--exact", action="store_true",
+                        help="İstatistikleri sayaçlar yerine tam tablo taramasıyla hesapla")
+    parser.add_argument("--partition-layout", choices=PARTITION_LAYOUTS, default="none",
+                        help="ictihatlar tablosu yoksa kullanılacak yerleşim "
+                             "(year: karar yılına göre, year-type: yıl + içtihat türü)")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="Toplu yükleme: ikincil/GIN indeksleri kaldır, yükleme sonunda yeniden oluştur")
+    parser.add_argument("--no-index-rebuild", action="store_true",
+                        help="--defer-indexes ile indeksleri yeniden oluşturmayı atla (--build-indexes ile sonra)")
+    parser.add_argument("--build-indexes", action="store_true",
+                        help="Yalnızca eksik/ertelenmiş indeksleri CONCURRENTLY oluştur")
+    parser.add_argument("--maintenance-work-mem", default="2GB",
+                        help="İndeks oluşturma için maintenance_work_mem")
+    parser.add_argument("--maintenance-workers", type=int, default=4,
+                        help="İndeks oluşturma için max_parallel_maintenance_workers")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="Çekmek yerine --type / --year(-range) için crawl_jobs işleri oluştur")
+    parser.add_argument("--by-birim", action="store_true",
+                        help="--enqueue ile işleri birim (daire) başına da böl")
+    parser.add_argument("--pages-per-job", type=int, default=DEFAULT_PAGES_PER_JOB,
+                        help=f"Bir işteki sayfa sayısı ({PAGE_SIZE} kayıt/sayfa)")
+    parser.add_argument("--worker", action="store_true",
+                        help="crawl_jobs kuyruğundan iş alarak çek (birden fazla düğümde çalıştırılabilir)")
+    parser.add_argument("--lease", type=int, default=DEFAULT_LEASE_SECONDS,
+                        help="İş kirası süresi (saniye); yenilenmeyen iş başka işçiye geçer")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help="Bir işin failed sayılmadan önceki deneme sayısı")
+    parser.add_argument("--max-jobs", type=int,
+                        help="--worker ile en fazla bu kadar iş al")
+    parser.add_argument("--queue-status", action="store_true",
+                        help="crawl_jobs özetini göster ve çık")
+    parser.add_argument("--refresh-reference", action="store_true",
+                        help="İçtihat türleri ve birim listelerini TTL'den bağımsız olarak API'den yenile ve çık")
     
     args = parser.parse_args()
     
@@ -496,7 +1057,47 @@ def main():
             
         db = IctihatDatabase()
         db.connect()
-        db.create_tables()
+        # Ertelenmiş yüklemede indeksler yükleme bittikten sonra CONCURRENTLY oluşturulur
+        db.create_tables(args.partition_layout,
+                         create_indexes=not (args.defer_indexes or args.build_indexes))
+        if args.defer_indexes:
+            db.drop_secondary_indexes()
+        
+        if args.build_indexes:
+            rebuild_indexes(db, args)
+            db.close()
+            return
+    elif args.enqueue or args.worker or args.queue_status:
+        print("❌ Kuyruk modları veritabanı gerektirir (--dry-run ile kullanılamaz)")
+        sys.exit(1)
+
+    # Tür adları ve birim listeleri için referans önbelleği
+    reference = None
+    type_names = ICTIHAT_TURLERI
+    if db:
+        reference = ReferenceCache(db.conn, ictihat_api=api).install()
+        if args.refresh_reference:
+            type_names = reference.item_types(seed=ICTIHAT_TURLERI, force=True)
+            print(f"🔄 {len(type_names)} içtihat türü")
+            for item_type in ([args.type] if args.type else list(ICTIHAT_TURLERI)):
+                print(f"   - {item_type}: {len(reference.birimler(item_type, force=True))} birim")
+            db.close()
+            return
+        type_names = reference.item_types(seed=ICTIHAT_TURLERI)
+    elif args.refresh_reference:
+        print("❌ --refresh-reference veritabanı gerektirir (--dry-run ile kullanılamaz)")
+        sys.exit(1)
+
+    queue = None
+    if args.enqueue or args.worker or args.queue_status:
+        queue = CrawlQueue(psycopg2.connect(**POSTGRES_CONFIG), lease_seconds=args.lease,
+                           max_attempts=args.max_attempts)
+        queue.install()
+        if args.queue_status:
+            print_queue_status(queue)
+            queue.conn.close()
+            db.close()
+            return
     
     # Çekilecek türler
     types_to_fetch = [args.type] if args.type else list(ICTIHAT_TURLERI.keys())
@@ -511,27 +1112,39 @@ def main():
         years = [current_year]  # Varsayılan olarak sadece güncel yıl
     
     total_count = 0
+    # Süreç havuzu çalıştırma boyunca bir kez kurulur (sayfa / yıl / ifade başına değil)
+    pipeline = create_content_pipeline(api, args)
     
     try:
+        if args.enqueue:
+            print("📋 crawl_jobs işleri oluşturuluyor...")
+            created = enqueue_jobs(api, queue, types_to_fetch, years, args, reference)
+            print(f"  ✓ {created} yeni iş eklendi (mevcut işler atlandı)")
+            print_queue_status(queue)
+            types_to_fetch = []
+        elif args.worker:
+            print(f"👷 Kuyruk işçisi: {queue.worker} (kira {args.lease} sn)")
+            total_count = run_worker(api, db, queue, args, pipeline)
+            print_queue_status(queue)
+            types_to_fetch = []
+        elif args.phrases_file:
+            total_count = run_phrase_fanout(api, db, types_to_fetch, args, pipeline)
+            types_to_fetch = []
+
         for ictihat_tur in types_to_fetch:
-            print(f"\n📁 {ICTIHAT_TURLERI[ictihat_tur]} çekiliyor...")
+            print(f"\n📁 {type_names.get(ictihat_tur, ictihat_tur)} çekiliyor...")
             
             if args.phrase:
                 # Anahtar kelime ile arama
                 count = 0
-                for ictihat in tqdm(api.fetch_ictihat_by_phrase(ictihat_tur, args.phrase, args.limit),
-                                   desc=f"{ictihat_tur} ({args.phrase})"):
-                    
-                    karar_metni = None
-                    if args.with_content:
-                        doc_id = ictihat.get("documentId")
-                        if doc_id:
-                            karar_metni = api.get_ictihat_content(doc_id)
-                    
+                records = api.fetch_ictihat_by_phrase(ictihat_tur, args.phrase, args.limit)
+                rows = tqdm(iter_with_content(api, records, args, pipeline),
+                            desc=f"{ictihat_tur} ({args.phrase})")
+                for batch in batched(rows, write_batch_size(args)):
                     if db:
-                        db.upsert_ictihat(ictihat, karar_metni)
+                        db.upsert_ictihat_batch(batch)
                         
-                    count += 1
+                    count += len(batch)
                     
                 print(f"  ✓ {count} kayıt işlendi")
                 total_count += count
@@ -539,19 +1152,14 @@ def main():
                 # Yıl bazlı çekim
                 for year in years:
                     count = 0
-                    for ictihat in tqdm(api.fetch_ictihat_by_year(ictihat_tur, year, args.limit),
-                                       desc=f"{ictihat_tur} ({year})"):
-                        
-                        karar_metni = None
-                        if args.with_content:
-                            doc_id = ictihat.get("documentId")
-                            if doc_id:
-                                karar_metni = api.get_ictihat_content(doc_id)
-                        
+                    records = api.fetch_ictihat_by_year(ictihat_tur, year, args.limit)
+                    rows = tqdm(iter_with_content(api, records, args, pipeline),
+                                desc=f"{ictihat_tur} ({year})")
+                    for batch in batched(rows, write_batch_size(args)):
                         if db:
-                            db.upsert_ictihat(ictihat, karar_metni)
+                            db.upsert_ictihat_batch(batch)
                             
-                        count += 1
+                        count += len(batch)
                         
                     print(f"  ✓ {year}: {count} kayıt işlendi")
                     total_count += count
@@ -560,12 +1168,20 @@ def main():
         print("\n\n⚠ İşlem kullanıcı tarafından durduruldu")
         
     finally:
+        if pipeline:
+            pipeline.close()
+        if queue:
+            queue.conn.close()
         if db:
-            stats = db.get_stats()
-            print(f"\n📊 Veritabanı İstatistikleri:")
-            print(f"   Toplam: {stats['total']} kayıt")
+            if args.defer_indexes and not args.no_index_rebuild:
+                rebuild_indexes(db, args)
+            stats = db.get_stats(exact=args.exact)
+            print(f"\n📊 Veritabanı İstatistikleri{' (tam sayım)' if args.exact else ''}:")
+            print(f"   Toplam: {stats['total']} kayıt ({stats['with_content']} içerikli)")
             for tur, count in stats.get("by_type", {}).items():
                 print(f"   - {tur}: {count}")
+            if args.exact and not stats["counters_match"]:
+                print(f"   ⚠ Sayaçlar tam sayımla uyuşmuyor (toplam farkı: {stats['drift']:+})")
             db.close()
     
     print(f"\n✅ İşlem tamamlandı! Toplam {total_count} içtihat işlendi.")
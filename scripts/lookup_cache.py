@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Sözlük (lookup) tabloları için süreç içi önbellek
+
+ictihatlar ve mevzuatlar satırlarında tekrar eden birim, karar türü, kesinleşme
+durumu ve tür adları küçük sözlük tablolarında tutulur; satırlar yalnızca
+tamsayı id (ya da tür kodu) saklar. Scraper'lar her kayıtta veritabanına gitmek
+yerine bu önbelleği kullanır; yeni bir değer ilk görüldüğünde tabloya eklenir.
+"""
+
+from typing import Dict, Optional
+
+
+class LookupCache:
+    """Bir sözlük tablosunun anahtar -> id eşlemesini bellekte tutar"""
+
+    def __init__(self, conn, table: str, key_column: str = "adi",
+                 label_column: Optional[str] = None):
+        self.conn = conn
+        self.table = table
+        self.key_column = key_column
+        # Anahtar bir kod ise (örn. ictihat_turleri.kod) açıklama ayrı kolona yazılır
+        self.label_column = label_column
+        self.ids: Dict[str, int] = {}
+
+    def load(self) -> "LookupCache":
+        """Tablonun tamamını önbelleğe al"""
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT {self.key_column}, id FROM {self.table}")
+            self.ids = dict(cur.fetchall())
+        self.conn.commit()
+        return self
+
+    def get_id(self, value: Optional[str], label: Optional[str] = None) -> Optional[int]:
+        """Değerin id'sini döndür; tabloda yoksa ekle"""
+        if not value:
+            return None
+        cached = self.ids.get(value)
+        if cached is not None:
+            return cached
+
+        columns = [self.key_column]
+        params = [value]
+        if self.label_column:
+            columns.append(self.label_column)
+            params.append(label or value)
+
+        with self.conn.cursor() as cur:
+            cur.execute(f"""
+                INSERT INTO {self.table} ({', '.join(columns)})
+                VALUES ({', '.join(['%s'] * len(params))})
+                ON CONFLICT ({self.key_column}) DO NOTHING
+                RETURNING id
+            """, params)
+            row = cur.fetchone()
+            if row is None:
+                # Başka bir süreç aynı değeri eklemiş
+                cur.execute(f"SELECT id FROM {self.table} WHERE {self.key_column} = %s", (value,))
+                row = cur.fetchone()
+        # Ana kaydın transaction'ı geri alınsa bile önbellekteki id geçerli kalmalı
+        self.conn.commit()
+
+        self.ids[value] = row[0]
+        return row[0]
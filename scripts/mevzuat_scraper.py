@@ -7,6 +7,7 @@ PostgreSQL veritabanına kaydeder.
 
 Kullanım:
     python mevzuat_scraper.py [--type MEVZUAT_TURU] [--limit LIMIT]
+    python mevzuat_scraper.py --with-content      # yalnızca güncellenen metinler çekilir
 
 Gereksinimler:
     pip install requests psycopg2-binary tqdm
@@ -19,34 +20,15 @@ Ortam Değişkenleri:
     POSTGRES_PASSWORD - Şifre
 """
 
-import os
 import sys
 import json
 import time
-import base64
 import argparse
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Generator
-from pathlib import Path
-from html.parser import HTMLParser
-
-# .env dosyasını oku
-def load_env_file():
-    """Proje kök dizinindeki .env dosyasını oku"""
-    env_path = Path(__file__).parent.parent / '.env'
-    if env_path.exists():
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    key = key.strip()
-                    value = value.strip().strip('"').strip("'")
-                    if key not in os.environ:
-                        os.environ[key] = value
-
-load_env_file()
+from itertools import islice
+from typing import Dict, List, Optional, Generator, Set, Union
+
+from db_config import POSTGRES_CONFIG
 
 try:
     import requests
@@ -68,6 +50,13 @@ except ImportError:
     def tqdm(iterable, **kwargs):
         return iterable
 
+from lookup_cache import LookupCache
+from content_stream import DEFAULT_CHUNK_BYTES, ContentDecodeError, stream_document_text
+from stats_counters import install_counters, read_counters, exact_counts
+from split_mevzuat_articles import MEVZUAT_MADDELERI_SQL, replace_articles
+from reference_cache import ReferenceCache
+from records import MevzuatRecord
+
 # Logging ayarları
 logging.basicConfig(
     level=logging.INFO,
@@ -87,6 +76,9 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
 }
 
+# Mevzuat API'si sayfa başına en fazla 20 kayıt döndürür
+PAGE_SIZE = 20
+
 # Mevzuat Türleri
 MEVZUAT_TURLERI = {
     "KANUN": "Kanunlar",
@@ -103,47 +95,93 @@ MEVZUAT_TURLERI = {
     "MULGA": "Mülga Mevzuat"
 }
 
-# PostgreSQL Konfigürasyonu
-POSTGRES_CONFIG = {
-    "host": os.getenv("POSTGRES_HOST", "localhost"),
-    "port": int(os.getenv("POSTGRES_PORT", "5432")),
-    "database": os.getenv("POSTGRES_DB", "yargisalzeka"),
-    "user": os.getenv("POSTGRES_USER", "postgres"),
-    "password": os.getenv("POSTGRES_PASSWORD", ""),
-}
+# Tür adı mevzuat_turleri sözlüğünden kod ile okunur; eski mevzuat_tur_adi kolonu
+# normalize_lookup_columns.py --drop-columns ile kaldırılana kadar yazılmaya devam eder
+MEVZUAT_UPSERT_COLUMNS = [
+    "mevzuat_id", "mevzuat_no", "mevzuat_adi", "mevzuat_tur", "mevzuat_tertip",
+    "kayit_tarihi", "guncelleme_tarihi", "resmi_gazete_tarihi", "resmi_gazete_sayisi",
+    "url", "icerik", "icerik_guncelleme_tarihi",
+]
 
+# İlk şemadan sonra eklenen kolonlar; eski tablolara create_tables'ta eklenir
+MEVZUAT_ADDED_COLUMNS = [
+    # icerik çekildiğinde listedeki guncelleme_tarihi; içerik yalnızca liste daha yeniyse yeniden çekilir
+    ("icerik_guncelleme_tarihi", "TIMESTAMP"),
+]
 
-class HTMLTextExtractor(HTMLParser):
-    """HTML'den düz metin çıkarır"""
-    def __init__(self):
-        super().__init__()
-        self.text_parts = []
-        
-    def handle_data(self, data):
-        self.text_parts.append(data)
-        
-    def get_text(self):
-        return ' '.join(self.text_parts).strip()
+# Değişen metinlerin önceki sürümleri. Her sürüm tam metin olarak saklanır (TOAST
+# sıkıştırmalı; lz4 için tune_text_storage.py); böylece herhangi bir sürüm zincir
+# çözmeden doğrudan SQL ile okunabilir
+MEVZUAT_VERSIYONLARI_SQL = """
+CREATE TABLE IF NOT EXISTS mevzuat_versiyonlari (
+    id BIGSERIAL PRIMARY KEY,
+    mevzuat_id INTEGER NOT NULL REFERENCES mevzuatlar(id) ON DELETE CASCADE,
+    guncelleme_tarihi TIMESTAMP,
+    icerik TEXT NOT NULL,
+    arsivlenme_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
 
+CREATE INDEX IF NOT EXISTS idx_mevzuat_versiyonlari_mevzuat
+    ON mevzuat_versiyonlari(mevzuat_id, guncelleme_tarihi);
 
-def extract_text_from_html(html_content: str) -> str:
-    """HTML içeriğinden düz metin çıkarır"""
-    parser = HTMLTextExtractor()
-    try:
-        parser.feed(html_content)
-        return parser.get_text()
-    except:
-        return html_content
+-- Bir mevzuatın verilen tarihte geçerli olan metni (güncel ya da arşivlenmiş sürüm)
+CREATE OR REPLACE FUNCTION mevzuat_icerik_tarihinde(p_mevzuat_id VARCHAR, p_tarih TIMESTAMP)
+RETURNS TEXT AS $$
+    SELECT icerik FROM (
+        SELECT COALESCE(m.icerik_guncelleme_tarihi, m.guncelleme_tarihi) AS tarih, m.icerik
+        FROM mevzuatlar m
+        WHERE m.mevzuat_id = p_mevzuat_id AND m.icerik IS NOT NULL
+        UNION ALL
+        SELECT v.guncelleme_tarihi, v.icerik
+        FROM mevzuat_versiyonlari v JOIN mevzuatlar m ON m.id = v.mevzuat_id
+        WHERE m.mevzuat_id = p_mevzuat_id
+    ) surumler
+    WHERE tarih <= p_tarih
+    ORDER BY tarih DESC
+    LIMIT 1
+$$ LANGUAGE sql STABLE;
+"""
 
+# Yeni metin yazılmadan önce farklıysa mevcut metin sürüm olarak saklanır
+ARCHIVE_VERSION_SQL = """
+INSERT INTO mevzuat_versiyonlari (mevzuat_id, guncelleme_tarihi, icerik)
+SELECT id, COALESCE(icerik_guncelleme_tarihi, guncelleme_tarihi), icerik
+FROM mevzuatlar
+WHERE mevzuat_id = %(mevzuat_id)s AND icerik IS NOT NULL AND icerik <> %(icerik)s
+"""
 
-def decode_content(base64_content: str) -> str:
-    """Base64 encoded içeriği decode eder"""
-    try:
-        decoded = base64.b64decode(base64_content).decode('utf-8')
-        return decoded
-    except Exception as e:
-        logger.warning(f"İçerik decode hatası: {e}")
-        return ""
+
+# Eski kolon adlarını bekleyen okuyucular (ES migrasyonu) için view
+MEVZUAT_VIEWS_SQL = """
+CREATE OR REPLACE VIEW mevzuatlar_detay AS
+SELECT
+    m.id,
+    m.mevzuat_id,
+    m.mevzuat_no,
+    m.mevzuat_adi,
+    m.mevzuat_tur,
+    t.adi AS mevzuat_tur_adi,
+    m.mevzuat_tertip,
+    m.kayit_tarihi,
+    m.guncelleme_tarihi,
+    m.resmi_gazete_tarihi,
+    m.resmi_gazete_sayisi,
+    m.url,
+    m.icerik,
+    m.created_at,
+    m.updated_at
+FROM mevzuatlar m
+LEFT JOIN mevzuat_turleri t ON t.kod = m.mevzuat_tur;
+"""
+
+LEGACY_MEVZUAT_VIEWS_SQL = """
+CREATE OR REPLACE VIEW mevzuatlar_detay AS
+SELECT
+    id, mevzuat_id, mevzuat_no, mevzuat_adi, mevzuat_tur, mevzuat_tur_adi,
+    mevzuat_tertip, kayit_tarihi, guncelleme_tarihi, resmi_gazete_tarihi,
+    resmi_gazete_sayisi, url, icerik, created_at, updated_at
+FROM mevzuatlar;
+"""
 
 
 class MevzuatAPI:
@@ -173,6 +211,28 @@ class MevzuatAPI:
         except requests.exceptions.RequestException as e:
             logger.error(f"İstek hatası ({endpoint}): {e}")
             return None
+
+    def _stream_document_text(self, endpoint: str, data: dict) -> Optional[str]:
+        """Belge içeriğini yanıtı bütünüyle belleğe almadan düz metne çevirir"""
+        url = f"{BASE_URL}{endpoint}"
+        try:
+            time.sleep(self.rate_limit_delay)
+            with self.session.post(url, json=data, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                result, text = stream_document_text(response.iter_content(DEFAULT_CHUNK_BYTES))
+        except requests.exceptions.RequestException as e:
+            logger.error(f"İstek hatası ({endpoint}): {e}")
+            return None
+        except ContentDecodeError as e:
+            # Boş metin kaydedilirse mevcut içerik ve maddeler silinir; çekilemedi sayılır
+            logger.warning(f"İçerik decode hatası: {e}")
+            return None
+
+        if result.get("metadata", {}).get("FMTY") != "SUCCESS":
+            error_msg = result.get("metadata", {}).get("FMTE", "Bilinmeyen hata")
+            logger.warning(f"API hatası: {error_msg}")
+            return None
+        return text
     
     def get_mevzuat_types(self) -> List[dict]:
         """Mevzuat türlerini getirir"""
@@ -204,17 +264,13 @@ class MevzuatAPI:
             },
             "applicationName": "UyapMevzuat"
         }
-        result = self._make_request("/mevzuat/getDocumentContent", payload)
-        if result and result.get("content"):
-            html_content = decode_content(result["content"])
-            return extract_text_from_html(html_content)
-        return None
+        return self._stream_document_text("/mevzuat/getDocumentContent", payload)
     
     def fetch_all_mevzuat(self, mevzuat_tur: str, 
-                          limit: Optional[int] = None) -> Generator[dict, None, None]:
+                          limit: Optional[int] = None) -> Generator[MevzuatRecord, None, None]:
         """Belirli türdeki tüm mevzuatları getirir"""
         page_number = 1
-        page_size = 20  # API limiti maksimum 20
+        page_size = PAGE_SIZE  # API limiti maksimum 20
         total_fetched = 0
         
         while True:
@@ -224,7 +280,7 @@ class MevzuatAPI:
             if not result or not result.get("mevzuatList"):
                 break
                 
-            mevzuat_list = result["mevzuatList"]
+            mevzuat_list = MevzuatRecord.from_page(result["mevzuatList"])
             total = result.get("total", 0)
             
             for mevzuat in mevzuat_list:
@@ -248,6 +304,9 @@ class MevzuatDatabase:
     
     def __init__(self):
         self.conn = None
+        self.legacy_tur_adi = False
+        self.tur_cache = None
+        self._upsert_sql = None
         
     def connect(self):
         """Veritabanına bağlan"""
@@ -266,13 +325,20 @@ class MevzuatDatabase:
     def create_tables(self):
         """Mevzuat tablolarını oluştur"""
         create_sql = """
+        CREATE TABLE IF NOT EXISTS mevzuat_turleri (
+            id SERIAL PRIMARY KEY,
+            kod VARCHAR(50) UNIQUE NOT NULL,
+            adi VARCHAR(200) NOT NULL,
+            aciklama TEXT,
+            aktif BOOLEAN DEFAULT TRUE
+        );
+        
         CREATE TABLE IF NOT EXISTS mevzuatlar (
             id SERIAL PRIMARY KEY,
             mevzuat_id VARCHAR(50) UNIQUE NOT NULL,
             mevzuat_no INTEGER,
             mevzuat_adi TEXT NOT NULL,
             mevzuat_tur VARCHAR(50),
-            mevzuat_tur_adi VARCHAR(200),
             mevzuat_tertip INTEGER,
             kayit_tarihi TIMESTAMP,
             guncelleme_tarihi TIMESTAMP,
@@ -280,6 +346,7 @@ class MevzuatDatabase:
             resmi_gazete_sayisi VARCHAR(50),
             url TEXT,
             icerik TEXT,
+            icerik_guncelleme_tarihi TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
@@ -297,101 +364,97 @@ class MevzuatDatabase:
         
         with self.conn.cursor() as cur:
             cur.execute(create_sql)
+            cur.execute("""
+                SELECT COUNT(*) FROM pg_attribute
+                WHERE attrelid = 'mevzuatlar'::regclass AND attname = 'mevzuat_tur_adi' AND NOT attisdropped
+            """)
+            self.legacy_tur_adi = cur.fetchone()[0] > 0
+            cur.execute(LEGACY_MEVZUAT_VIEWS_SQL if self.legacy_tur_adi else MEVZUAT_VIEWS_SQL)
+            cur.execute("""
+                SELECT attname FROM pg_attribute
+                WHERE attrelid = 'mevzuatlar'::regclass AND attnum > 0 AND NOT attisdropped
+            """)
+            existing = {row[0] for row in cur.fetchall()}
+            missing = [(name, definition) for name, definition in MEVZUAT_ADDED_COLUMNS
+                       if name not in existing]
+            if missing:
+                cur.execute("ALTER TABLE mevzuatlar " + ", ".join(
+                    f"ADD COLUMN IF NOT EXISTS {name} {definition}" for name, definition in missing))
+            cur.execute(MEVZUAT_MADDELERI_SQL)
+            cur.execute(MEVZUAT_VERSIYONLARI_SQL)
         self.conn.commit()
-        logger.info("Mevzuat tabloları oluşturuldu")
         
-    def upsert_mevzuat(self, mevzuat: dict, icerik: Optional[str] = None):
-        """Mevzuat ekle veya güncelle"""
-        upsert_sql = """
-        INSERT INTO mevzuatlar (
-            mevzuat_id, mevzuat_no, mevzuat_adi, mevzuat_tur, mevzuat_tur_adi,
-            mevzuat_tertip, kayit_tarihi, guncelleme_tarihi, resmi_gazete_tarihi,
-            resmi_gazete_sayisi, url, icerik, updated_at
-        ) VALUES (
-            %(mevzuat_id)s, %(mevzuat_no)s, %(mevzuat_adi)s, %(mevzuat_tur)s,
-            %(mevzuat_tur_adi)s, %(mevzuat_tertip)s, %(kayit_tarihi)s,
-            %(guncelleme_tarihi)s, %(resmi_gazete_tarihi)s, %(resmi_gazete_sayisi)s,
-            %(url)s, %(icerik)s, CURRENT_TIMESTAMP
+        columns = MEVZUAT_UPSERT_COLUMNS + (["mevzuat_tur_adi"] if self.legacy_tur_adi else [])
+        updates = ",\n            ".join(
+            f"{c} = EXCLUDED.{c}" for c in columns
+            if c not in ("mevzuat_id", "icerik", "icerik_guncelleme_tarihi")
         )
+        self._upsert_sql = f"""
+        INSERT INTO mevzuatlar ({', '.join(columns)}, updated_at)
+        VALUES ({', '.join(f'%({c})s' for c in columns)}, CURRENT_TIMESTAMP)
         ON CONFLICT (mevzuat_id) DO UPDATE SET
-            mevzuat_no = EXCLUDED.mevzuat_no,
-            mevzuat_adi = EXCLUDED.mevzuat_adi,
-            mevzuat_tur = EXCLUDED.mevzuat_tur,
-            mevzuat_tur_adi = EXCLUDED.mevzuat_tur_adi,
-            mevzuat_tertip = EXCLUDED.mevzuat_tertip,
-            kayit_tarihi = EXCLUDED.kayit_tarihi,
-            guncelleme_tarihi = EXCLUDED.guncelleme_tarihi,
-            resmi_gazete_tarihi = EXCLUDED.resmi_gazete_tarihi,
-            resmi_gazete_sayisi = EXCLUDED.resmi_gazete_sayisi,
-            url = EXCLUDED.url,
+            {updates},
             icerik = COALESCE(EXCLUDED.icerik, mevzuatlar.icerik),
+            icerik_guncelleme_tarihi = CASE WHEN EXCLUDED.icerik IS NOT NULL
+                THEN EXCLUDED.icerik_guncelleme_tarihi ELSE mevzuatlar.icerik_guncelleme_tarihi END,
             updated_at = CURRENT_TIMESTAMP
+        RETURNING id
         """
+        if install_counters(self.conn, "mevzuatlar"):
+            logger.info("İstatistik sayaçları kuruldu ve mevcut kayıtlarla dolduruldu")
         
-        # Tarih dönüşümleri
-        kayit_tarihi = None
-        if mevzuat.get("kayitTarihi"):
-            try:
-                kayit_tarihi = datetime.fromisoformat(
-                    mevzuat["kayitTarihi"].replace("Z", "+00:00").split(".")[0]
-                )
-            except:
-                pass
-                
-        guncelleme_tarihi = None
-        if mevzuat.get("guncellemeTarihi"):
-            try:
-                guncelleme_tarihi = datetime.fromisoformat(
-                    mevzuat["guncellemeTarihi"].replace("Z", "+00:00").split(".")[0]
-                )
-            except:
-                pass
-                
-        resmi_gazete_tarihi = None
-        if mevzuat.get("resmiGazeteTarihi"):
-            try:
-                resmi_gazete_tarihi = datetime.fromisoformat(
-                    mevzuat["resmiGazeteTarihi"].replace("Z", "+00:00").split(".")[0]
-                ).date()
-            except:
-                pass
+        self.tur_cache = LookupCache(self.conn, "mevzuat_turleri", key_column="kod", label_column="adi").load()
+        logger.info("Mevzuat tabloları oluşturuldu")
         
-        mevzuat_tur = mevzuat.get("mevzuatTur", {})
+    def upsert_mevzuat(self, mevzuat: Union[MevzuatRecord, dict], icerik: Optional[str] = None):
+        """Mevzuat ekle veya güncelle"""
+        if isinstance(mevzuat, dict):
+            mevzuat = MevzuatRecord.from_api(mevzuat)
         
-        params = {
-            "mevzuat_id": mevzuat.get("mevzuatId"),
-            "mevzuat_no": mevzuat.get("mevzuatNo"),
-            "mevzuat_adi": mevzuat.get("mevzuatAdi"),
-            "mevzuat_tur": mevzuat_tur.get("name") if isinstance(mevzuat_tur, dict) else None,
-            "mevzuat_tur_adi": mevzuat_tur.get("description") if isinstance(mevzuat_tur, dict) else None,
-            "mevzuat_tertip": mevzuat.get("mevzuatTertip"),
-            "kayit_tarihi": kayit_tarihi,
-            "guncelleme_tarihi": guncelleme_tarihi,
-            "resmi_gazete_tarihi": resmi_gazete_tarihi,
-            "resmi_gazete_sayisi": mevzuat.get("resmiGazeteSayisi"),
-            "url": mevzuat.get("url"),
-            "icerik": icerik
-        }
+        if mevzuat.mevzuat_tur:
+            # Tür sözlükte yoksa API açıklamasıyla eklenir
+            self.tur_cache.get_id(mevzuat.mevzuat_tur, mevzuat.mevzuat_tur_adi)
+        
+        # Boş içerik mevcut metnin ve maddelerin üzerine yazılmaz
+        icerik = icerik or None
+        mevzuat.icerik = icerik
+        mevzuat.icerik_guncelleme_tarihi = mevzuat.guncelleme_tarihi if icerik is not None else None
         
         with self.conn.cursor() as cur:
-            cur.execute(upsert_sql, params)
+            if icerik is not None:
+                # Metin değiştiyse önceki sürüm üzerine yazılmadan önce arşivlenir
+                cur.execute(ARCHIVE_VERSION_SQL, mevzuat)
+                if cur.rowcount:
+                    logger.info(f"Önceki metin sürümü arşivlendi: {mevzuat.mevzuat_id}")
+            cur.execute(self._upsert_sql, mevzuat)
+            # İçerik çekildiyse madde tablosu aynı transaction'da güncellenir
+            if icerik is not None:
+                replace_articles(cur, cur.fetchone()[0], icerik)
         self.conn.commit()
         
-    def get_stats(self) -> dict:
-        """Veritabanı istatistiklerini getir"""
+    def stale_content(self, mevzuatlar: List[MevzuatRecord]) -> Set[str]:
+        """İçeriği hiç çekilmemiş (ya da boş) veya listedeki guncelleme_tarihi çekildiği tarihten yeni olanlar"""
+        listed = {m.mevzuat_id: m.guncelleme_tarihi for m in mevzuatlar if m.mevzuat_id}
         with self.conn.cursor() as cur:
             cur.execute("""
-                SELECT mevzuat_tur, COUNT(*) as count 
-                FROM mevzuatlar 
-                GROUP BY mevzuat_tur 
-                ORDER BY count DESC
-            """)
-            stats = dict(cur.fetchall())
-            
-            cur.execute("SELECT COUNT(*) FROM mevzuatlar")
-            total = cur.fetchone()[0]
-            
-        return {"total": total, "by_type": stats}
+                SELECT mevzuat_id, COALESCE(icerik_guncelleme_tarihi, guncelleme_tarihi),
+                       COALESCE(icerik, '') <> ''
+                FROM mevzuatlar WHERE mevzuat_id = ANY(%s)
+            """, (list(listed),))
+            stored = {mevzuat_id: (tarih, has_icerik) for mevzuat_id, tarih, has_icerik in cur.fetchall()}
+        self.conn.commit()
+        stale = set()
+        for mevzuat_id, listed_tarih in listed.items():
+            tarih, has_icerik = stored.get(mevzuat_id, (None, False))
+            if not has_icerik or (listed_tarih and (tarih is None or listed_tarih > tarih)):
+                stale.add(mevzuat_id)
+        return stale
+        
+    def get_stats(self, exact: bool = False) -> dict:
+        """Veritabanı istatistiklerini getir (varsayılan: sayaçlardan, exact ile tam sayım)"""
+        if exact:
+            return exact_counts(self.conn, "mevzuatlar")
+        return read_counters(self.conn, "mevzuatlar")
 
 
 def main():
@@ -402,10 +465,14 @@ def main():
                         help="Her tür için maksimum kayıt sayısı")
     parser.add_argument("--with-content", "-c", action="store_true",
                         help="İçerikleri de çek (yavaş)")
+    parser.add_argument("--force-content", action="store_true",
+                        help="--with-content ile güncel olanlar dahil tüm içerikleri yeniden çek")
     parser.add_argument("--delay", "-d", type=float, default=0.5,
                         help="İstekler arası bekleme süresi (saniye)")
     parser.add_argument("--dry-run", action="store_true",
                         help="Veritabanına kaydetmeden test et")
+    parser.add_argument("--exact", action="store_true",
+                        help="İstatistikleri sayaçlar yerine tam tablo taramasıyla hesapla")
     
     args = parser.parse_args()
     
@@ -428,6 +495,12 @@ def main():
         db.connect()
         db.create_tables()
     
+    # Tür adları referans önbelleğinden (TTL dolmadıkça ağ isteği yapılmaz)
+    type_names = MEVZUAT_TURLERI
+    if db:
+        reference = ReferenceCache(db.conn, mevzuat_api=api).install()
+        type_names = reference.mevzuat_types(seed=MEVZUAT_TURLERI)
+    
     # Çekilecek türler
     types_to_fetch = [args.type] if args.type else list(MEVZUAT_TURLERI.keys())
     
@@ -435,24 +508,33 @@ def main():
     
     try:
         for mevzuat_tur in types_to_fetch:
-            print(f"\n📁 {MEVZUAT_TURLERI[mevzuat_tur]} çekiliyor...")
+            print(f"\n📁 {type_names.get(mevzuat_tur, MEVZUAT_TURLERI[mevzuat_tur])} çekiliyor...")
             
             count = 0
-            for mevzuat in tqdm(api.fetch_all_mevzuat(mevzuat_tur, args.limit),
-                               desc=mevzuat_tur):
-                
-                icerik = None
-                if args.with_content:
-                    mevzuat_id = mevzuat.get("mevzuatId")
-                    if mevzuat_id:
-                        icerik = api.get_mevzuat_content(mevzuat_id)
+            skipped = 0
+            records = tqdm(api.fetch_all_mevzuat(mevzuat_tur, args.limit), desc=mevzuat_tur)
+            # Kayıtlar API sayfası boyunda gruplanır; güncel içerikler tek sorguyla ayıklanır
+            for page in iter(lambda: list(islice(records, PAGE_SIZE)), []):
+                stale = None
+                if args.with_content and db and not args.force_content:
+                    stale = db.stale_content(page)
                 
-                if db:
-                    db.upsert_mevzuat(mevzuat, icerik)
+                for mevzuat in page:
+                    icerik = None
+                    mevzuat_id = mevzuat.mevzuat_id
+                    if args.with_content and mevzuat_id:
+                        if stale is None or mevzuat_id in stale:
+                            icerik = api.get_mevzuat_content(mevzuat_id)
+                        else:
+                            skipped += 1
                     
-                count += 1
+                    if db:
+                        db.upsert_mevzuat(mevzuat, icerik)
+                        
+                    count += 1
                 
-            print(f"  ✓ {count} kayıt işlendi")
+            print(f"  ✓ {count} kayıt işlendi"
+                  + (f", {skipped} içerik güncel olduğu için atlandı" if skipped else ""))
             total_count += count
             
     except KeyboardInterrupt:
@@ -460,11 +542,13 @@ def main():
         
     finally:
         if db:
-            stats = db.get_stats()
-            print(f"\n📊 Veritabanı İstatistikleri:")
-            print(f"   Toplam: {stats['total']} kayıt")
+            stats = db.get_stats(exact=args.exact)
+            print(f"\n📊 Veritabanı İstatistikleri{' (tam sayım)' if args.exact else ''}:")
+            print(f"   Toplam: {stats['total']} kayıt ({stats['with_content']} içerikli)")
             for tur, count in stats.get("by_type", {}).items():
                 print(f"   - {tur}: {count}")
+            if args.exact and not stats["counters_match"]:
+                print(f"   ⚠ Sayaçlar tam sayımla uyuşmuyor (toplam farkı: {stats['drift']:+})")
             db.close()
     
     print(f"\n✅ İşlem tamamlandı! Toplam {total_count} mevzuat işlendi.")
@@ -0,0 +1,1016 @@
+#!/usr/bin/env python3
+"""
+PostgreSQL'den Elasticsearch'e Genel Tablo Aktarım Motoru
+
+Her kaynak tablo, elasticsearch_table_specs.json içindeki bildirimsel bir
+tanımla (spec) aktarılır: tablo ve index adı, id kolonu, mapping dosyası,
+artımlı senkronizasyon kolonu ve kolon → alan eşlemeleri (dönüşümleriyle).
+Tüm tablolar aynı akış (server-side cursor), paralel (id aralıklarına bölünmüş
+iş parçacıkları) ve artımlı (updated_at yüksek su işareti) yolu kullanır.
+--passages ile uzun metinler örtüşen pasajlara bölünüp spec'teki `*_passages`
+index'ine üst belge id'siyle birlikte aynı bulk akışında yazılır.
+
+Kullanım:
+    python migrate_tables_to_elasticsearch.py                       # Tüm tablolar
+    python migrate_tables_to_elasticsearch.py --tables mevzuatlar
+    python migrate_tables_to_elasticsearch.py --incremental --workers 4
+    python migrate_tables_to_elasticsearch.py --tables ictihatlar --filter canonical
+    python migrate_tables_to_elasticsearch.py --tables ictihatlar --passages
+    python migrate_tables_to_elasticsearch.py --tables ictihatlar --profile serving --index ictihatlar_serving
+
+Gereksinimler:
+    pip install psycopg2-binary elasticsearch
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre
+    ELASTICSEARCH_URL - Elasticsearch URL (varsayılan: http://localhost:9200)
+"""
+
+import os
+import sys
+import copy
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, date
+from concurrent.futures import ThreadPoolExecutor
+from typing import Generator, Dict, Any, List, Optional, Tuple
+from pathlib import Path
+
+from db_config import POSTGRES_CONFIG, create_connection
+
+try:
+    from psycopg2 import sql
+except ImportError:
+    print("❌ psycopg2 yüklü değil. Lütfen çalıştırın: pip install psycopg2-binary")
+    sys.exit(1)
+
+try:
+    from elasticsearch import Elasticsearch
+    from elasticsearch.exceptions import TransportError, ConnectionError
+except ImportError:
+    print("❌ elasticsearch yüklü değil. Lütfen çalıştırın: pip install elasticsearch")
+    sys.exit(1)
+
+from passage_chunker import DEFAULT_MAX_CHARS, DEFAULT_OVERLAP, split_passages
+
+
+# Konfigürasyon
+ELASTICSEARCH_URL = os.getenv("ELASTICSEARCH_URL", "http://localhost:9200")
+BATCH_SIZE = 1000
+MAX_CHUNK_BYTES = 20 * 1024 * 1024
+
+# Sorgu profillerinde shard sayısı üst sınırı (spec'te max_shards ile değiştirilebilir)
+DEFAULT_MAX_SHARDS = 16
+
+# Bulk yeniden deneme ayarları
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+MAX_RETRIES = 6
+INITIAL_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+SCRIPT_DIR = Path(__file__).parent
+SPECS_FILE = SCRIPT_DIR / "elasticsearch_table_specs.json"
+STATE_FILE = SCRIPT_DIR / ".elasticsearch_sync_state.json"
+DEAD_LETTER_DIR = SCRIPT_DIR / "dead_letter"
+
+# encode_dense_vectors.py çıktısı: vectors/<tablo>/{manifest.json, vectors.f16, ids.i64}
+VECTORS_DIR = SCRIPT_DIR / "vectors"
+VECTOR_MANIFEST_NAME = "manifest.json"
+VECTOR_FILE_NAME = "vectors.f16"
+VECTOR_IDS_NAME = "ids.i64"
+DEFAULT_VECTOR_FIELD = "embedding"
+
+
+def _to_date(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+def _to_datetime(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        # strftime'dan hızlı; saat dilimi eki kırpılır
+        return value.isoformat(timespec='seconds')[:19]
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:19]
+
+
+def _empty_string(value):
+    return value if value is not None else ''
+
+
+def shard_count(doc_count: int, docs_per_shard: int, max_shards: int = DEFAULT_MAX_SHARDS) -> int:
+    """Belge sayısından birincil shard sayısı (en az 1, en fazla max_shards)"""
+    return max(1, min(max_shards, math.ceil(doc_count / docs_per_shard)))
+
+
+def apply_profile(mapping: dict, profile: dict, doc_count: int) -> dict:
+    """
+    Spec'teki sorgu profilini mapping'in bir kopyasına uygula:
+      sort                  -> index.sort.field / index.sort.order
+      eager_global_ordinals -> facet keyword alanlarında refresh sırasında ordinals
+      offsets               -> metin alanlarında index_options: offsets (postings ile highlight)
+      docs_per_shard        -> number_of_shards = belge sayısı / docs_per_shard
+    """
+    mapping = copy.deepcopy(mapping)
+    settings = mapping.setdefault("settings", {})
+    properties = mapping["mappings"]["properties"]
+    sort = profile.get("sort")
+    if sort:
+        settings["index.sort.field"] = list(sort)
+        settings["index.sort.order"] = list(sort.values())
+    for field in profile.get("eager_global_ordinals", []):
+        properties[field]["eager_global_ordinals"] = True
+    for field in profile.get("offsets", []):
+        properties[field]["index_options"] = "offsets"
+    if profile.get("docs_per_shard"):
+        settings["number_of_shards"] = shard_count(
+            doc_count, profile["docs_per_shard"], profile.get("max_shards", DEFAULT_MAX_SHARDS))
+    return mapping
+
+
+# Spec dosyasında kullanılabilecek alan dönüşümleri
+TRANSFORMS = {
+    None: lambda value: value,
+    "date": _to_date,
+    "datetime": _to_datetime,
+    "empty_string": _empty_string,
+}
+
+
+class PassageSpec:
+    """Bir tablonun metin kolonunun pasaj index'ine nasıl bölüneceğini tanımlar"""
+
+    def __init__(self, spec: dict):
+        self.index = spec["index"]
+        self.mapping_file = spec["mapping"]
+        self.text_column = spec["text_column"]
+        # Pasajlarda filtreleme için kopyalanan üst belge alanları
+        self.parent_fields: List[str] = spec.get("parent_fields", [])
+        self.max_chars = spec.get("max_chars", DEFAULT_MAX_CHARS)
+        self.overlap = spec.get("overlap", DEFAULT_OVERLAP)
+
+    def load_mapping(self) -> dict:
+        with open(SCRIPT_DIR / self.mapping_file, encoding="utf-8") as f:
+            return json.load(f)
+
+    def to_actions(self, parent_id, text: Optional[str], parent_source: dict,
+                   index_name: str) -> List[dict]:
+        parent = {field: parent_source.get(field) for field in self.parent_fields}
+        return [
+            {
+                "_index": index_name,
+                "_id": f"{parent_id}-{passage_no}",
+                "_source": {
+                    "parentId": parent_id,
+                    "passageNo": passage_no,
+                    "startOffset": start,
+                    "endOffset": end,
+                    "text": text[start:end],
+                    **parent,
+                },
+            }
+            for passage_no, (start, end) in enumerate(
+                split_passages(text or "", self.max_chars, self.overlap))
+        ]
+
+
+class VectorStore:
+    """
+    Bir tablonun offline üretilmiş vektörleri (memory-map). Vektör alanı
+    mapping'e ve her belgenin _source'una buradan eklenir; böylece tam `index`
+    action'ları (artımlı senkron, --resync, DLQ, snapshot) alanı silmez.
+    """
+
+    def __init__(self, directory: Path):
+        try:
+            import numpy as np
+        except ImportError:
+            print(f"❌ {directory} altında vektör var ama numpy yüklü değil. "
+                  "Lütfen çalıştırın: pip install numpy")
+            sys.exit(1)
+        self._np = np
+        with open(directory / VECTOR_MANIFEST_NAME, encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.field = self.manifest.get("field", DEFAULT_VECTOR_FIELD)
+        self.dims = self.manifest["dims"]
+        count = self.manifest["count"]
+        self.ids = np.memmap(directory / VECTOR_IDS_NAME, dtype=np.int64, mode="r", shape=(count,))
+        self.vectors = np.memmap(directory / VECTOR_FILE_NAME, dtype=np.float16, mode="r",
+                                 shape=(count, self.dims))
+        # encode ORDER BY id ile yazar; sıralı değilse arama için sıralama dizini tutulur
+        self._order = None
+        self._sorted_ids = self.ids
+        if count > 1 and not (self.ids[1:] >= self.ids[:-1]).all():
+            self._order = np.argsort(self.ids, kind="stable")
+            self._sorted_ids = self.ids[self._order]
+
+    @classmethod
+    def open(cls, table: str, directory: Path = VECTORS_DIR) -> Optional["VectorStore"]:
+        if not (directory / table / VECTOR_MANIFEST_NAME).exists():
+            return None
+        return cls(directory / table)
+
+    def mapping(self) -> dict:
+        # dense_vector boyutu kodlayıcıya bağlı olduğundan mapping dosyasında değil, manifest'tedir
+        return {"type": "dense_vector", "dims": self.dims}
+
+    def get(self, doc_id) -> Optional[List[float]]:
+        """Belgenin vektörü (encode'dan sonra eklenen belgeler için None)"""
+        position = int(self._sorted_ids.searchsorted(doc_id))
+        if position >= len(self._sorted_ids) or self._sorted_ids[position] != doc_id:
+            return None
+        row = self._order[position] if self._order is not None else position
+        return self.vectors[row].astype(self._np.float32).round(5).tolist()
+
+
+class TableSpec:
+    """Bir tablonun Elasticsearch'e nasıl aktarılacağını tanımlar"""
+
+    def __init__(self, name: str, spec: dict):
+        self.name = name
+        self.table = spec.get("table", name)
+        self.index = spec.get("index", name)
+        self.id_column = spec.get("id_column", "id")
+        self.mapping_file = spec["mapping"]
+        self.incremental_column = spec.get("incremental_column")
+        # Adlandırılmış SQL koşulları (örn. yalnızca kanonik belgeler); --filter ile etkinleşir
+        self.filters: Dict[str, str] = spec.get("filters", {})
+        self.where: Optional[str] = None
+        # Adlandırılmış mapping profilleri (örn. serving); --profile ile index oluşturulurken uygulanır
+        self.profiles: Dict[str, dict] = spec.get("profiles", {})
+        self.passages: Optional[PassageSpec] = (
+            PassageSpec(spec["passages"]) if "passages" in spec else None
+        )
+
+        self.fields: List[Tuple[str, str, Any]] = []
+        for field in spec["fields"]:
+            transform = field.get("transform")
+            if transform not in TRANSFORMS:
+                raise ValueError(f"{name}: bilinmeyen dönüşüm '{transform}' ({field['field']})")
+            self.fields.append((field["column"], field["field"], TRANSFORMS[transform]))
+
+        # Aynı kolon birden fazla alana eşlenebilir; sorguda bir kez seçilir
+        self.columns: List[str] = list(dict.fromkeys(
+            [self.id_column] + [column for column, _, _ in self.fields]
+            + ([self.passages.text_column] if self.passages else [])
+        ))
+        # fetch_records satırları demet olarak üretir; alanlar kolon sırasıyla okunur
+        self.id_position = 0
+        self.positions: List[Tuple[int, str, Any]] = [
+            (self.columns.index(column), field, transform) for column, field, transform in self.fields
+        ]
+        self.text_position: Optional[int] = (
+            self.columns.index(self.passages.text_column) if self.passages else None
+        )
+        # vectors/<tablo>/ ilk kullanımda açılır (encode sırasında dosyalar yeniden yazılır)
+        self._vectors: Any = False
+
+    def use_filters(self, names: Optional[List[str]]) -> List[str]:
+        """Spec'te tanımlı olan filtreleri etkinleştir, uygulananları döndür"""
+        applied = [name for name in names or [] if name in self.filters]
+        self.where = " AND ".join(f"({self.filters[name]})" for name in applied) or None
+        return applied
+
+    @property
+    def vectors(self) -> Optional[VectorStore]:
+        if self._vectors is False:
+            self._vectors = VectorStore.open(self.name)
+        return self._vectors
+
+    def load_mapping(self, profile: Optional[str] = None, doc_count: int = 0) -> dict:
+        with open(SCRIPT_DIR / self.mapping_file, encoding="utf-8") as f:
+            mapping = json.load(f)
+        if profile in self.profiles:
+            mapping = apply_profile(mapping, self.profiles[profile], doc_count)
+        if self.vectors is not None:
+            mapping["mappings"]["properties"][self.vectors.field] = self.vectors.mapping()
+        return mapping
+
+    def to_source(self, record: tuple) -> dict:
+        source = {field: transform(record[position]) for position, field, transform in self.positions}
+        vectors = self.vectors
+        if vectors is not None:
+            vector = vectors.get(record[self.id_position])
+            if vector is not None:
+                source[vectors.field] = vector
+        return source
+
+    def to_action(self, record: tuple, index_name: Optional[str] = None) -> dict:
+        return {
+            "_index": index_name or self.index,
+            "_id": str(record[self.id_position]),
+            "_source": self.to_source(record),
+        }
+
+    def passage_index(self, index_name: Optional[str] = None) -> Optional[str]:
+        """Hedef index'e karşılık gelen pasaj index'i (--index ile verilen ada `_passages` eklenir)"""
+        if self.passages is None:
+            return None
+        if index_name is None or index_name == self.index:
+            return self.passages.index
+        return f"{index_name}_passages"
+
+
+def load_table_specs(path: Path = SPECS_FILE) -> Dict[str, TableSpec]:
+    """Spec dosyasını oku"""
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    return {name: TableSpec(name, spec) for name, spec in raw.items()}
+
+
+def create_elasticsearch_client():
+    """Elasticsearch client oluştur"""
+    try:
+        es = Elasticsearch([ELASTICSEARCH_URL], timeout=120)
+        if not es.ping():
+            raise Exception("Elasticsearch'e ping atılamadı")
+        info = es.info()
+        print(f"✓ Elasticsearch bağlantısı kuruldu: {ELASTICSEARCH_URL}")
+        print(f"  Cluster: {info['cluster_name']}, Version: {info['version']['number']}")
+        return es
+    except Exception as e:
+        print(f"❌ Elasticsearch bağlantı hatası: {e}")
+        sys.exit(1)
+
+
+def table_exists(conn, table_name: str) -> bool:
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT EXISTS (
+                SELECT FROM information_schema.tables
+                WHERE table_name = %s
+            )
+        """, (table_name,))
+        return cur.fetchone()[0]
+
+
+def build_filters(spec: TableSpec, id_range: Optional[Tuple[int, int]] = None,
+                  since=None, until=None) -> Tuple[sql.Composable, list]:
+    """id aralığı, artımlı kolon ve etkin spec filtreleri için WHERE ifadesi oluştur"""
+    conditions = []
+    params = []
+    if spec.where:
+        conditions.append(sql.SQL(spec.where))
+    if id_range is not None:
+        conditions.append(sql.SQL("{} BETWEEN %s AND %s").format(sql.Identifier(spec.id_column)))
+        params.extend(id_range)
+    if since is not None:
+        conditions.append(sql.SQL("{} > %s").format(sql.Identifier(spec.incremental_column)))
+        params.append(since)
+    if until is not None:
+        conditions.append(sql.SQL("{} <= %s").format(sql.Identifier(spec.incremental_column)))
+        params.append(until)
+
+    if not conditions:
+        return sql.SQL(""), params
+    return sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions), params
+
+
+def fetch_records(conn, spec: TableSpec, id_range: Optional[Tuple[int, int]] = None,
+                  since=None, until=None, batch_size: int = BATCH_SIZE,
+                  cursor_name: str = "migrate_cursor") -> Generator[tuple, None, None]:
+    """Spec'teki kolonları (spec.columns sırasıyla demet olarak) server-side cursor ile batch halinde getir"""
+    where, params = build_filters(spec, id_range, since, until)
+    query = sql.SQL("SELECT {columns} FROM {table}{where} ORDER BY {id}").format(
+        columns=sql.SQL(", ").join(sql.Identifier(c) for c in spec.columns),
+        table=sql.Identifier(spec.table),
+        where=where,
+        id=sql.Identifier(spec.id_column),
+    )
+    # Satır başına sözlük kurulmaz; alanlar TableSpec.positions ile okunur
+    with conn.cursor(name=cursor_name) as cur:
+        cur.itersize = batch_size
+        cur.execute(query, params)
+        for record in cur:
+            yield record
+
+
+def generate_actions(records, spec: TableSpec, index_name: Optional[str] = None,
+                     passage_index: Optional[str] = None,
+                     passage_counts: Optional[Dict[Any, int]] = None) -> Generator[Dict, None, None]:
+    """Elasticsearch bulk API için action'lar oluştur (istenirse belgenin pasajlarıyla birlikte)"""
+    for record in records:
+        action = spec.to_action(record, index_name)
+        yield action
+        if passage_index:
+            doc_id = record[spec.id_position]
+            passages = spec.passages.to_actions(
+                doc_id, record[spec.text_position], action["_source"], passage_index)
+            if passage_counts is not None:
+                passage_counts[doc_id] = len(passages)
+            yield from passages
+
+
+def count_records(conn, spec: TableSpec, id_range: Optional[Tuple[int, int]] = None,
+                  since=None, until=None) -> int:
+    where, params = build_filters(spec, id_range, since, until)
+    with conn.cursor() as cur:
+        cur.execute(sql.SQL("SELECT COUNT(*) FROM {}{}").format(sql.Identifier(spec.table), where), params)
+        return cur.fetchone()[0]
+
+
+def get_id_bounds(conn, spec: TableSpec, since=None, until=None) -> Tuple[Optional[int], Optional[int]]:
+    where, params = build_filters(spec, since=since, until=until)
+    with conn.cursor() as cur:
+        cur.execute(sql.SQL("SELECT MIN({id}), MAX({id}) FROM {table}{where}").format(
+            id=sql.Identifier(spec.id_column), table=sql.Identifier(spec.table), where=where
+        ), params)
+        return cur.fetchone()
+
+
+def get_high_water_mark(conn, spec: TableSpec):
+    with conn.cursor() as cur:
+        cur.execute(sql.SQL("SELECT MAX({}) FROM {}").format(
+            sql.Identifier(spec.incremental_column), sql.Identifier(spec.table)
+        ))
+        return cur.fetchone()[0]
+
+
+def split_id_range(min_id: int, max_id: int, parts: int) -> List[Tuple[int, int]]:
+    """[min_id, max_id] aralığını yaklaşık eşit parçalara böl"""
+    parts = max(1, min(parts, max_id - min_id + 1))
+    step = (max_id - min_id + parts) // parts
+    ranges = []
+    start = min_id
+    while start <= max_id:
+        end = min(start + step - 1, max_id)
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
+
+
+def load_sync_state() -> dict:
+    if STATE_FILE.exists():
+        with open(STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_sync_state(state: dict):
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+
+def setup_index(es: Elasticsearch, spec: TableSpec, index_name: str, recreate: bool = True,
+                mapping: Optional[dict] = None):
+    """Index'i spec'teki mapping dosyasıyla (ya da verilen profil uygulanmış mapping ile) oluştur"""
+    try:
+        if es.indices.exists(index=index_name):
+            if not recreate:
+                return
+            print(f"⚠ Index '{index_name}' zaten mevcut. Siliniyor...")
+            es.indices.delete(index=index_name)
+
+        es.indices.create(index=index_name, body=mapping or spec.load_mapping())
+        print(f"✓ Index '{index_name}' oluşturuldu ({spec.mapping_file})")
+    except Exception as e:
+        print(f"❌ Index oluşturma hatası: {e}")
+        sys.exit(1)
+
+
+class DeadLetterQueue:
+    """Kalıcı olarak indekslenemeyen belgeleri index başına bir NDJSON dosyasında tutar"""
+
+    def __init__(self, directory: Path = DEAD_LETTER_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.written = 0
+
+    def path_for(self, index_name: str) -> Path:
+        return self.directory / f"{index_name}.ndjson"
+
+    def write(self, entries: List[dict]):
+        if not entries:
+            return
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            by_index: Dict[str, List[dict]] = {}
+            for entry in entries:
+                by_index.setdefault(entry["index"], []).append(entry)
+            for index_name, index_entries in by_index.items():
+                with open(self.path_for(index_name), "a", encoding="utf-8") as f:
+                    for entry in index_entries:
+                        f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            self.written += len(entries)
+
+    def read(self, index_name: str) -> List[dict]:
+        path = self.path_for(index_name)
+        if not path.exists():
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def replace(self, index_name: str, entries: List[dict]):
+        """Replay sonrası dosyayı yalnızca hâlâ başarısız olan kayıtlarla değiştir"""
+        path = self.path_for(index_name)
+        with self._lock:
+            if not entries:
+                path.unlink(missing_ok=True)
+                return
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            os.replace(tmp_path, path)
+
+
+def encode_action(action: dict) -> Tuple[bytes, bytes]:
+    """Bulk action'ını (action satırı, kaynak satırı) çiftine çevir"""
+    meta = {"_id": action["_id"]}
+    if action.get("_index"):
+        meta["_index"] = action["_index"]
+    return (
+        (json.dumps({"index": meta}) + "\n").encode("utf-8"),
+        (json.dumps(action["_source"], ensure_ascii=False, default=str) + "\n").encode("utf-8"),
+    )
+
+
+def encode_delete(doc_id, index_name: Optional[str] = None) -> bytes:
+    """Silme action satırı (kaynak satırı yoktur)"""
+    meta = {"_id": str(doc_id)}
+    if index_name:
+        meta["_index"] = index_name
+    return (json.dumps({"delete": meta}) + "\n").encode("utf-8")
+
+
+def _dead_letter_entry(pair: Tuple[bytes, bytes], index_name: Optional[str], status, error) -> dict:
+    op_type, meta = next(iter(json.loads(pair[0]).items()))
+    return {
+        "op_type": op_type,
+        "index": meta.get("_index") or index_name,
+        "id": meta.get("_id"),
+        "status": status,
+        "error": error,
+        "failed_at": datetime.now().isoformat(timespec="seconds"),
+        "source": json.loads(pair[1]) if pair[1] else None,
+    }
+
+
+def send_bulk(es: Elasticsearch, pairs: List[Tuple[bytes, bytes]], index_name: Optional[str] = None,
+              dead_letters: Optional[DeadLetterQueue] = None,
+              max_retries: int = MAX_RETRIES) -> Tuple[int, List[dict]]:
+    """
+    Bir `_bulk` isteği gönder. Yeniden denenebilir durumlar (429, 5xx, bağlantı
+    hataları) yalnızca başarısız belgeler için üstel bekleme ile tekrar gönderilir;
+    kalıcı hatalar dead-letter kuyruğuna yazılır.
+    """
+    success = 0
+    failures: List[dict] = []
+    pending = [(pair, None, None) for pair in pairs]
+
+    for attempt in range(max_retries + 1):
+        if attempt:
+            backoff = min(MAX_BACKOFF, INITIAL_BACKOFF * 2 ** (attempt - 1))
+            time.sleep(backoff * (0.5 + random.random() / 2))
+
+        body = b"".join(pair[0] + pair[1] for pair, _, _ in pending)
+        try:
+            response = es.bulk(body=body, index=index_name)
+        except TransportError as e:
+            retryable = isinstance(e, ConnectionError) or e.status_code in RETRYABLE_STATUSES
+            pending = [(pair, e.status_code, str(e)) for pair, _, _ in pending]
+            if retryable:
+                continue
+            break
+
+        retry = []
+        for (pair, _, _), item in zip(pending, response["items"]):
+            op_type, info = next(iter(item.items()))
+            status = info.get("status", 500)
+            if 200 <= status < 300 or (op_type == "delete" and status == 404):
+                success += 1
+            elif status in RETRYABLE_STATUSES:
+                retry.append((pair, status, info.get("error")))
+            else:
+                failures.append(_dead_letter_entry(pair, index_name, status, info.get("error")))
+        pending = retry
+        if not pending:
+            break
+
+    # Denemeler tükendiyse kalanlar da kalıcı hata sayılır
+    failures.extend(_dead_letter_entry(pair, index_name, status, error) for pair, status, error in pending)
+
+    if dead_letters is not None:
+        dead_letters.write(failures)
+    return success, failures
+
+
+def index_actions(es: Elasticsearch, actions, batch_size: int = BATCH_SIZE,
+                  dead_letters: Optional[DeadLetterQueue] = None) -> Tuple[int, List[dict]]:
+    """Action'ları batch'ler halinde gönder, başarılı sayıyı ve kalıcı hataları döndür"""
+    success = 0
+    failures: List[dict] = []
+    pairs: List[Tuple[bytes, bytes]] = []
+    size = 0
+
+    for action in actions:
+        pair = encode_action(action)
+        pairs.append(pair)
+        size += len(pair[0]) + len(pair[1])
+        if len(pairs) >= batch_size or size >= MAX_CHUNK_BYTES:
+            chunk_success, chunk_failures = send_bulk(es, pairs, dead_letters=dead_letters)
+            success += chunk_success
+            failures.extend(chunk_failures)
+            pairs, size = [], 0
+
+    if pairs:
+        chunk_success, chunk_failures = send_bulk(es, pairs, dead_letters=dead_letters)
+        success += chunk_success
+        failures.extend(chunk_failures)
+    return success, failures
+
+
+def replay_dead_letters(es: Elasticsearch, index_name: str,
+                        dead_letters: DeadLetterQueue, batch_size: int = BATCH_SIZE) -> Tuple[int, int]:
+    """Dead-letter kuyruğundaki belgeleri yeniden gönder; başaramayanlar kuyrukta kalır"""
+    entries = dead_letters.read(index_name)
+    print(f"\n🔁 {index_name}: dead-letter kuyruğunda {len(entries):,} belge")
+    if not entries:
+        return 0, 0
+
+    deletes = [entry for entry in entries if entry.get("op_type") == "delete"]
+    actions = (
+        {"_index": entry["index"], "_id": entry["id"], "_source": entry["source"]}
+        for entry in entries if entry.get("op_type", "index") == "index"
+    )
+    success, failures = index_actions(es, actions, batch_size)
+    if deletes:
+        pairs = [(encode_delete(entry["id"], entry["index"]), b"") for entry in deletes]
+        delete_success, delete_failures = send_bulk(es, pairs)
+        success += delete_success
+        failures.extend(delete_failures)
+    # Kısmi update'ler (örn. encode_dense_vectors.py vektörleri) kaynak satırıyla aynen gönderilir
+    updates = [entry for entry in entries if entry.get("op_type") == "update"]
+    if updates:
+        pairs = [
+            ((json.dumps({"update": {"_index": entry["index"], "_id": entry["id"]}}) + "\n").encode("utf-8"),
+             (json.dumps(entry["source"], ensure_ascii=False) + "\n").encode("utf-8"))
+            for entry in updates
+        ]
+        update_success, update_failures = send_bulk(es, pairs)
+        success += update_success
+        failures.extend(update_failures)
+    dead_letters.replace(index_name, failures)
+
+    print(f"✓ {success:,} belge yeniden indekslendi, {len(failures):,} belge kuyrukta kaldı")
+    for failure in failures[:5]:
+        print(f"   - {failure['id']}: {failure['status']} {failure['error']}")
+    return success, len(failures)
+
+
+def prune_passages(es: Elasticsearch, passage_index: str, passage_counts: Dict[Any, int],
+                   batch_size: int = 500) -> int:
+    """Metni kısalan belgelerin artık üretilmeyen eski pasajlarını (passageNo >= yeni sayı) sil"""
+    deleted = 0
+    items = list(passage_counts.items())
+    for i in range(0, len(items), batch_size):
+        should = [
+            {"bool": {"filter": [
+                {"term": {"parentId": doc_id}},
+                {"range": {"passageNo": {"gte": count}}},
+            ]}}
+            for doc_id, count in items[i:i + batch_size]
+        ]
+        response = es.delete_by_query(
+            index=passage_index,
+            body={"query": {"bool": {"should": should, "minimum_should_match": 1}}},
+            conflicts="proceed",
+        )
+        deleted += response.get("deleted", 0)
+    return deleted
+
+
+def delete_passages(es: Elasticsearch, passage_index: str, parent_ids: List[Any],
+                    batch_size: int = BATCH_SIZE) -> int:
+    """Verilen üst belgelerin tüm pasajlarını sil"""
+    deleted = 0
+    for i in range(0, len(parent_ids), batch_size):
+        response = es.delete_by_query(
+            index=passage_index,
+            body={"query": {"terms": {"parentId": parent_ids[i:i + batch_size]}}},
+            conflicts="proceed",
+        )
+        deleted += response.get("deleted", 0)
+    return deleted
+
+
+def delete_filtered(conn, es: Elasticsearch, spec: TableSpec, index_name: str, since, until,
+                    dead_letters: DeadLetterQueue, batch_size: int = BATCH_SIZE,
+                    passage_index: Optional[str] = None) -> int:
+    """Artımlı senkronizasyonda artık filtreye uymayan (örn. kopya olarak işaretlenen) belgeleri sil"""
+    conditions = [sql.SQL("NOT ({})").format(sql.SQL(spec.where))]
+    params = []
+    if since is not None:
+        conditions.append(sql.SQL("{} > %s").format(sql.Identifier(spec.incremental_column)))
+        params.append(since)
+    if until is not None:
+        conditions.append(sql.SQL("{} <= %s").format(sql.Identifier(spec.incremental_column)))
+        params.append(until)
+    with conn.cursor() as cur:
+        cur.execute(sql.SQL("SELECT {id} FROM {table} WHERE {where}").format(
+            id=sql.Identifier(spec.id_column), table=sql.Identifier(spec.table),
+            where=sql.SQL(" AND ").join(conditions)
+        ), params)
+        ids = [row[0] for row in cur.fetchall()]
+
+    deleted = 0
+    pairs = [(encode_delete(doc_id, index_name), b"") for doc_id in ids]
+    for i in range(0, len(pairs), batch_size):
+        success, _ = send_bulk(es, pairs[i:i + batch_size], dead_letters=dead_letters)
+        deleted += success
+    if ids:
+        print(f"🗑  Filtre dışı kalan {deleted:,} belge index'ten silindi")
+        if passage_index and es.indices.exists(index=passage_index):
+            delete_passages(es, passage_index, ids, batch_size)
+    return deleted
+
+
+def migrate_range(es: Elasticsearch, spec: TableSpec, index_name: str,
+                  id_range: Optional[Tuple[int, int]], since, until,
+                  batch_size: int, dead_letters: DeadLetterQueue,
+                  worker_no: int = 0, passage_index: Optional[str] = None,
+                  prune: bool = False) -> Tuple[int, List[dict]]:
+    """Bir id aralığını kendi bağlantısıyla aktar (iş parçacığı başına bir bağlantı)"""
+    conn = create_connection()
+    passage_counts: Optional[Dict[Any, int]] = {} if passage_index and prune else None
+    try:
+        records = fetch_records(conn, spec, id_range, since, until, batch_size,
+                                cursor_name=f"migrate_cursor_{worker_no}")
+        result = index_actions(
+            es, generate_actions(records, spec, index_name, passage_index, passage_counts),
+            batch_size, dead_letters,
+        )
+    finally:
+        conn.close()
+    if passage_counts:
+        prune_passages(es, passage_index, passage_counts)
+    return result
+
+
+def migrate_table(conn, es: Elasticsearch, spec: TableSpec, index_name: Optional[str] = None,
+                  incremental: bool = False, workers: int = 1,
+                  batch_size: int = BATCH_SIZE, passages: bool = False,
+                  profile: Optional[str] = None) -> Tuple[int, int]:
+    """Bir tabloyu spec'e göre Elasticsearch'e aktar"""
+    index_name = index_name or spec.index
+    passage_index = spec.passage_index(index_name) if passages else None
+    print(f"\n{'='*60}")
+    print(f"📊 {spec.table} -> {index_name}" + (f" + {passage_index}" if passage_index else ""))
+    print("="*60)
+
+    state = load_sync_state()
+    since = None
+    until = None
+    id_floor = None
+
+    if incremental and spec.incremental_column:
+        since = state.get(index_name, {}).get("high_water_mark")
+        until = get_high_water_mark(conn, spec)
+        print(f"Artımlı senkronizasyon: {spec.incremental_column} > {since or '-'}")
+    elif incremental:
+        # Artımlı kolonu olmayan tablolar için yalnızca yeni id'ler aktarılır
+        id_floor = state.get(index_name, {}).get("last_id")
+        print(f"Artımlı senkronizasyon: {spec.id_column} > {id_floor or '-'}")
+
+    dead_letters = DeadLetterQueue()
+    if spec.where and incremental and since is not None and es.indices.exists(index=index_name):
+        delete_filtered(conn, es, spec, index_name, since, until, dead_letters, batch_size,
+                        passage_index)
+
+    min_id, max_id = get_id_bounds(conn, spec, since, until)
+    if id_floor is not None and min_id is not None:
+        min_id = max(min_id, id_floor + 1)
+
+    total_count = 0
+    if min_id is not None and min_id <= max_id:
+        total_count = count_records(conn, spec, (min_id, max_id), since, until)
+    print(f"Aktarılacak kayıt sayısı: {total_count:,}")
+
+    if total_count == 0:
+        print("⚠ Aktarılacak kayıt bulunamadı!")
+        return 0, 0
+
+    mapping = None
+    if profile in spec.profiles and not (incremental and es.indices.exists(index=index_name)):
+        # Shard sayısı artımlı farktan değil, (filtreli) tablonun tamamından hesaplanır
+        doc_count = count_records(conn, spec) if incremental else total_count
+        mapping = spec.load_mapping(profile, doc_count)
+        print(f"🎛  Profil '{profile}': {mapping['settings']['number_of_shards']} shard "
+              f"({doc_count:,} belge)")
+    setup_index(es, spec, index_name, recreate=not incremental, mapping=mapping)
+    target_indexes = [index_name]
+    if passage_index:
+        setup_index(es, spec.passages, passage_index, recreate=not incremental)
+        target_indexes.append(passage_index)
+    for target in target_indexes:
+        es.indices.put_settings(index=target, body={"index": {"refresh_interval": "-1"}})
+
+    ranges = split_id_range(min_id, max_id, workers)
+    print(f"🚀 Veri aktarımı başlıyor (batch size: {batch_size}, {len(ranges)} iş parçacığı)...")
+
+    started = time.time()
+    success_count = 0
+    errors: List[dict] = []
+    try:
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [
+                executor.submit(migrate_range, es, spec, index_name, id_range,
+                                since, until, batch_size, dead_letters, worker_no,
+                                passage_index, incremental)
+                for worker_no, id_range in enumerate(ranges)
+            ]
+            for future in futures:
+                range_success, range_errors = future.result()
+                success_count += range_success
+                errors.extend(range_errors)
+    finally:
+        for target in target_indexes:
+            es.indices.put_settings(index=target, body={"index": {"refresh_interval": "1s"}})
+            es.indices.refresh(index=target)
+
+    elapsed = time.time() - started
+    rate = success_count / elapsed if elapsed > 0 else 0
+    if errors:
+        print(f"⚠ {len(errors)} kayıt indekslenemedi, dead-letter kuyruğuna yazıldı: "
+              f"{dead_letters.path_for(index_name)}")
+        for err in errors[:5]:
+            print(f"   - {err['id']}: {err['status']} {err['error']}")
+        print("  Yeniden göndermek için: --replay-dlq")
+    print(f"✓ {success_count:,} kayıt aktarıldı ({elapsed:.1f} sn, {rate:,.0f} kayıt/sn)")
+
+    # Hatalı belgeler dead-letter kuyruğunda kalıcı olduğu için yüksek su işareti ilerletilebilir
+    if success_count or not errors:
+        entry = state.setdefault(index_name, {})
+        if spec.incremental_column:
+            entry["high_water_mark"] = str(until) if until is not None else since
+        entry["last_id"] = max_id
+        entry["synced_at"] = datetime.now().isoformat(timespec="seconds")
+        save_sync_state(state)
+
+    return success_count, len(errors)
+
+
+def migrate(table_names: Optional[List[str]] = None, index_name: Optional[str] = None,
+            incremental: bool = False, workers: int = 1, batch_size: int = BATCH_SIZE,
+            filters: Optional[List[str]] = None, passages: bool = False,
+            profile: Optional[str] = None):
+    """Ana migrasyon fonksiyonu"""
+    print("=" * 60)
+    print("PostgreSQL → Elasticsearch Migrasyon Aracı")
+    print("=" * 60)
+    print()
+
+    if not POSTGRES_CONFIG["password"]:
+        print("❌ POSTGRES_PASSWORD tanımlı değil! .env dosyasını kontrol edin.")
+        sys.exit(1)
+
+    specs = load_table_specs()
+    table_names = table_names or list(specs.keys())
+    if index_name and len(table_names) > 1:
+        print("❌ --index yalnızca tek tablo ile kullanılabilir")
+        sys.exit(1)
+
+    conn = create_connection()
+    print(f"✓ PostgreSQL bağlantısı kuruldu: {POSTGRES_CONFIG['host']}:{POSTGRES_CONFIG['port']}/{POSTGRES_CONFIG['database']}")
+    es = create_elasticsearch_client()
+    print()
+
+    total_migrated = 0
+    total_errors = 0
+    loaded_indexes: List[str] = []
+
+    try:
+        for table_name in table_names:
+            spec = specs[table_name]
+            if not table_exists(conn, spec.table):
+                print(f"⚠ {spec.table} tablosu bulunamadı")
+                continue
+            applied = spec.use_filters(filters)
+            if applied:
+                print(f"🔎 {table_name}: filtre uygulanıyor: {', '.join(applied)}")
+            if passages and spec.passages is None:
+                print(f"⚠ {table_name}: spec'te pasaj tanımı yok, pasajlar atlanıyor")
+            if profile and profile not in spec.profiles:
+                print(f"⚠ {table_name}: spec'te '{profile}' profili yok, varsayılan mapping kullanılıyor")
+            success, failed = migrate_table(conn, es, spec, index_name, incremental, workers, batch_size,
+                                            passages and spec.passages is not None, profile)
+            total_migrated += success
+            total_errors += failed
+            if success or failed:
+                target = index_name or spec.index
+                loaded_indexes.append(target)
+                if passages and spec.passages is not None:
+                    loaded_indexes.append(spec.passage_index(target))
+    finally:
+        conn.close()
+
+    print()
+    print("=" * 60)
+    print("📈 MİGRASYON SONUÇLARI")
+    print("=" * 60)
+    print(f"  Toplam aktarılan: {total_migrated:,} kayıt")
+    print(f"  Hatalı          : {total_errors:,}")
+    print()
+
+    # Index durumunu kontrol et (refresh migrate_table sonunda yapıldı)
+    if loaded_indexes:
+        print("  Elasticsearch'te:")
+        for name in loaded_indexes:
+            try:
+                indexed_count = es.count(index=name)["count"]
+                print(f"    {name:<30}: {indexed_count:,} kayıt")
+            except Exception as e:
+                print(f"    {name:<30}: index sayım hatası: {e}")
+        print()
+
+    if total_errors == 0 and total_migrated > 0:
+        print("✅ Migrasyon başarıyla tamamlandı!")
+    elif total_migrated > 0:
+        print("⚠ Migrasyon bazı hatalarla tamamlandı.")
+    else:
+        print("⚠ Aktarılacak kayıt bulunamadı.")
+
+    print()
+
+
+def replay(table_names: Optional[List[str]] = None, index_name: Optional[str] = None,
+           batch_size: int = BATCH_SIZE):
+    """Dead-letter kuyruklarını yeniden gönder (PostgreSQL'e bağlanmaz)"""
+    print("=" * 60)
+    print("Elasticsearch Dead-Letter Replay")
+    print("=" * 60)
+    print()
+
+    specs = load_table_specs()
+    if index_name:
+        index_names = [index_name]
+    else:
+        index_names = [specs[name].index for name in (table_names or list(specs.keys()))]
+
+    es = create_elasticsearch_client()
+    dead_letters = DeadLetterQueue()
+
+    total_success = 0
+    total_remaining = 0
+    for name in index_names:
+        success, remaining = replay_dead_letters(es, name, dead_letters, batch_size)
+        total_success += success
+        total_remaining += remaining
+
+    print()
+    print(f"  Yeniden indekslenen: {total_success:,}")
+    print(f"  Kuyrukta kalan     : {total_remaining:,}")
+    print()
+
+
+def main():
+    specs = load_table_specs()
+
+    parser = argparse.ArgumentParser(description="PostgreSQL → Elasticsearch genel tablo aktarımı")
+    parser.add_argument("--tables", "-t", nargs="+", choices=list(specs.keys()),
+                        help="Aktarılacak tablolar (varsayılan: tümü)")
+    parser.add_argument("--index", type=str,
+                        help="Hedef index adı (yalnızca tek tablo ile)")
+    parser.add_argument("--incremental", "-i", action="store_true",
+                        help="Yalnızca son senkronizasyondan beri değişen kayıtları aktar")
+    parser.add_argument("--workers", "-w", type=int, default=1,
+                        help="Paralel aktarım iş parçacığı sayısı")
+    parser.add_argument("--batch-size", "-b", type=int, default=BATCH_SIZE,
+                        help="Cursor ve bulk batch boyutu")
+    parser.add_argument("--replay-dlq", action="store_true",
+                        help="Yalnızca dead-letter kuyruğundaki başarısız belgeleri yeniden gönder")
+    parser.add_argument("--filter", action="append",
+                        choices=sorted({name for spec in specs.values() for name in spec.filters}),
+                        help="Spec'te tanımlı filtreyi uygula (örn. canonical: yalnızca kanonik kararlar)")
+    parser.add_argument("--passages", action="store_true",
+                        help="Metinleri örtüşen pasajlara bölüp *_passages index'ine de yaz")
+    parser.add_argument("--profile",
+                        choices=sorted({name for spec in specs.values() for name in spec.profiles}),
+                        help="Index oluşturulurken spec'teki mapping profilini uygula (örn. serving)")
+
+    args = parser.parse_args()
+    if args.replay_dlq:
+        replay(args.tables, args.index, args.batch_size)
+    else:
+        migrate(args.tables, args.index, args.incremental, args.workers, args.batch_size, args.filter,
+                args.passages, args.profile)
+
+
+if __name__ == "__main__":
+    main()
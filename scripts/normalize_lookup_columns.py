@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Tekrar Eden Metadata Kolonlarını Sözlük Tablolarına Taşıma
+
+ictihatlar tablosunda birim_adi, karar_turu, kesinlesme_durumu ve item_type_adi;
+mevzuatlar tablosunda mevzuat_tur_adi her satırda aynı birkaç yüz değerin metin
+kopyasını tutar. Bu script mevcut bir veritabanını yeni şemaya geçirir:
+
+  1. birimler / karar_turleri / kesinlesme_durumlari sözlük tablolarını ve
+     ictihatlar üzerindeki id kolonlarını (birim_ref, karar_turu_id,
+     kesinlesme_durumu_id) ekler (yalnızca katalog değişikliği)
+  2. Sözlükleri mevcut farklı değerlerle doldurur (tür adları ictihat_turleri /
+     mevzuat_turleri tablolarına kod ile eklenir)
+  3. id kolonlarını id aralıklarıyla, kısa transaction'larda doldurur
+  4. idx_ictihatlar_birim_ref indeksini CONCURRENTLY oluşturur
+  5. ictihatlar_detay / mevzuatlar_detay / kararlar_view view'larını ve
+     istatistik/arama fonksiyonlarını sözlük tablolarını kullanacak şekilde günceller
+  6. --drop-columns ile eski metin kolonlarını kaldırır
+
+Scraper'lar eski kolonlar durduğu sürece hem id'leri hem metinleri yazar; bu
+yüzden adımlar scraper'lar çalışırken uygulanabilir. --drop-columns öncesinde
+çalışan scraper'lar durdurulmalı, sonrasında yeniden başlatılmalıdır. DROP COLUMN
+yalnızca katalog değişikliğidir; disk alanı satırlar yeniden yazıldıkça
+(ya da VACUUM FULL / pg_repack ile) geri kazanılır.
+
+Kullanım:
+    python normalize_lookup_columns.py
+    python normalize_lookup_columns.py --tables ictihatlar --batch-size 2000 --pause 0.2
+    python normalize_lookup_columns.py --drop-columns
+
+Gereksinimler:
+    pip install psycopg2-binary
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre
+"""
+
+import sys
+import time
+import argparse
+from typing import List
+
+try:
+    from psycopg2 import errors
+except ImportError:
+    print("❌ psycopg2 yüklü değil. Lütfen çalıştırın: pip install psycopg2-binary")
+    sys.exit(1)
+
+from add_weighted_search_vectors import SEARCH_FUNCTIONS, add_column_and_trigger
+from db_config import POSTGRES_CONFIG, create_connection
+from ictihat_scraper import (
+    ICTIHAT_VIEWS_SQL, LEGACY_LOOKUP_COLUMNS, LOOKUP_TABLES_SQL, build_partitioned_index,
+)
+from mevzuat_scraper import MEVZUAT_VIEWS_SQL
+
+DEFAULT_BATCH_SIZE = 5000
+
+# id kolonu -> (sözlük tablosu, eski metin kolonu)
+ICTIHAT_LOOKUPS = {
+    "birim_ref": ("birimler", "birim_adi"),
+    "karar_turu_id": ("karar_turleri", "karar_turu"),
+    "kesinlesme_durumu_id": ("kesinlesme_durumlari", "kesinlesme_durumu"),
+}
+
+STATS_FUNCTIONS_SQL = """
+CREATE OR REPLACE FUNCTION get_mevzuat_stats()
+RETURNS TABLE (
+    tur VARCHAR(50),
+    tur_adi VARCHAR(200),
+    kayit_sayisi BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        m.mevzuat_tur,
+        mt.adi as tur_adi,
+        COUNT(*) as kayit_sayisi
+    FROM mevzuatlar m
+    LEFT JOIN mevzuat_turleri mt ON m.mevzuat_tur = mt.kod
+    GROUP BY m.mevzuat_tur, mt.adi
+    ORDER BY kayit_sayisi DESC;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION get_ictihat_stats()
+RETURNS TABLE (
+    tur VARCHAR(50),
+    tur_adi VARCHAR(200),
+    kayit_sayisi BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        i.item_type,
+        it.adi as tur_adi,
+        COUNT(*) as kayit_sayisi
+    FROM ictihatlar i
+    LEFT JOIN ictihat_turleri it ON i.item_type = it.kod
+    GROUP BY i.item_type, it.adi
+    ORDER BY kayit_sayisi DESC;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# search_vector kolonu olmayan veritabanları için (create_schema.sql ile aynı)
+EXPRESSION_SEARCH_ICTIHAT_SQL = """
+CREATE OR REPLACE FUNCTION search_ictihat(
+    arama_metni TEXT,
+    ictihat_turu VARCHAR(50) DEFAULT NULL,
+    birim VARCHAR(200) DEFAULT NULL,
+    sayfa INTEGER DEFAULT 1,
+    sayfa_boyutu INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id INTEGER,
+    document_id VARCHAR(50),
+    item_type VARCHAR(50),
+    birim_adi VARCHAR(200),
+    esas_no VARCHAR(50),
+    karar_no VARCHAR(50),
+    karar_tarihi DATE,
+    rank REAL
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        i.id,
+        i.document_id,
+        i.item_type,
+        b.adi,
+        i.esas_no,
+        i.karar_no,
+        i.karar_tarihi,
+        ts_rank(
+            to_tsvector('turkish', COALESCE(i.karar_metni, '')),
+            plainto_tsquery('turkish', arama_metni)
+        ) as rank
+    FROM ictihatlar i
+    LEFT JOIN birimler b ON b.id = i.birim_ref
+    WHERE
+        (ictihat_turu IS NULL OR i.item_type = ictihat_turu)
+        AND (birim IS NULL OR b.adi ILIKE '%' || birim || '%')
+        AND (
+            to_tsvector('turkish', COALESCE(i.karar_metni, ''))
+            @@ plainto_tsquery('turkish', arama_metni)
+        )
+    ORDER BY rank DESC, i.karar_tarihi DESC
+    LIMIT sayfa_boyutu
+    OFFSET (sayfa - 1) * sayfa_boyutu;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def table_columns(conn, table: str) -> List[str]:
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT attname FROM pg_attribute
+            WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+        """, (table,))
+        columns = [row[0] for row in cur.fetchall()]
+    conn.commit()
+    return columns
+
+
+def function_exists(conn, name: str) -> bool:
+    with conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM pg_proc WHERE proname = %s", (name,))
+        found = cur.fetchone() is not None
+    conn.commit()
+    return found
+
+
+def prepare_ictihatlar(conn):
+    """Sözlük tablolarını ve id kolonlarını ekle"""
+    with conn.cursor() as cur:
+        cur.execute("SET lock_timeout = '5s'")
+        cur.execute(LOOKUP_TABLES_SQL)
+        cur.execute("""
+            ALTER TABLE ictihatlar
+                ADD COLUMN IF NOT EXISTS birim_ref INTEGER REFERENCES birimler(id),
+                ADD COLUMN IF NOT EXISTS karar_turu_id SMALLINT REFERENCES karar_turleri(id),
+                ADD COLUMN IF NOT EXISTS kesinlesme_durumu_id SMALLINT REFERENCES kesinlesme_durumlari(id)
+        """)
+        cur.execute("SET lock_timeout = DEFAULT")
+    conn.commit()
+    print("✓ Sözlük tabloları ve id kolonları hazır")
+
+
+def populate_ictihat_lookups(conn):
+    """Sözlükleri tablodaki farklı değerlerle doldur"""
+    with conn.cursor() as cur:
+        for lookup_table, column in ICTIHAT_LOOKUPS.values():
+            cur.execute(f"""
+                INSERT INTO {lookup_table} (adi)
+                SELECT DISTINCT {column} FROM ictihatlar WHERE {column} IS NOT NULL
+                ON CONFLICT (adi) DO NOTHING
+            """)
+            print(f"  {lookup_table}: {cur.rowcount:,} yeni değer")
+        cur.execute("""
+            INSERT INTO ictihat_turleri (kod, adi)
+            SELECT DISTINCT ON (item_type) item_type, COALESCE(item_type_adi, item_type)
+            FROM ictihatlar
+            ORDER BY item_type, item_type_adi NULLS LAST
+            ON CONFLICT (kod) DO NOTHING
+        """)
+        print(f"  ictihat_turleri: {cur.rowcount:,} yeni tür")
+    conn.commit()
+
+
+def backfill_ictihatlar(conn, batch_size: int, pause: float):
+    """Boş id kolonlarını id aralıklarıyla, kısa transaction'larda doldur"""
+    assignments = ",\n".join(
+        f"{ref} = COALESCE({ref}, (SELECT id FROM {lookup} WHERE adi = {column}))"
+        for ref, (lookup, column) in ICTIHAT_LOOKUPS.items()
+    )
+    missing = " OR ".join(
+        f"({ref} IS NULL AND {column} IS NOT NULL)"
+        for ref, (_, column) in ICTIHAT_LOOKUPS.items()
+    )
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT MIN(id), MAX(id) FROM ictihatlar")
+        min_id, max_id = cur.fetchone()
+    conn.commit()
+
+    if min_id is None:
+        print("✓ ictihatlar: doldurulacak satır yok")
+        return
+
+    # updated_at ve search_vector trigger'larının backfill sırasında çalışmaması
+    # için (ES artımlı senkronizasyonu tüm tabloyu değişmiş sanmasın)
+    replica_role = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET session_replication_role = replica")
+        conn.commit()
+    except errors.InsufficientPrivilege:
+        conn.rollback()
+        replica_role = False
+        print("⚠ session_replication_role ayarlanamadı (superuser değil); "
+              "backfill updated_at değerlerini güncelleyecek")
+
+    started = time.time()
+    updated = 0
+    start = min_id
+    try:
+        while start <= max_id:
+            end = start + batch_size - 1
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    UPDATE ictihatlar
+                    SET {assignments}
+                    WHERE id BETWEEN %s AND %s AND ({missing})
+                """, (start, end))
+                updated += cur.rowcount
+            conn.commit()
+
+            done = (end - min_id + 1) / (max_id - min_id + 1)
+            elapsed = time.time() - started
+            print(f"  ictihatlar: id {end:,}/{max_id:,} ({min(done, 1):.1%}), "
+                  f"{updated:,} satır, {updated / elapsed if elapsed else 0:,.0f} satır/sn", end="\r")
+            start = end + 1
+            if pause:
+                time.sleep(pause)
+    finally:
+        if replica_role:
+            with conn.cursor() as cur:
+                cur.execute("SET session_replication_role = DEFAULT")
+            conn.commit()
+
+    print()
+    print(f"✓ ictihatlar: {updated:,} satır {time.time() - started:.1f} sn'de dolduruldu")
+
+
+def create_birim_index():
+    """birim_ref indeksini CONCURRENTLY oluştur (yarım kalmış geçersiz indeks varsa yeniden kur)"""
+    conn = create_connection(autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = 'ictihatlar'::regclass")
+            if cur.fetchone()[0] == "p":
+                # Bölümlenmiş tabloda CONCURRENTLY desteklenmez; bölüm bazında kurulur
+                build_partitioned_index(cur, "ictihatlar", "idx_ictihatlar_birim_ref",
+                                        "(birim_ref)", "birim_ref")
+            else:
+                cur.execute("""
+                    SELECT i.indisvalid FROM pg_index i
+                    JOIN pg_class c ON c.oid = i.indexrelid
+                    WHERE c.relname = 'idx_ictihatlar_birim_ref'
+                """)
+                row = cur.fetchone()
+                if row is not None and not row[0]:
+                    print("⚠ idx_ictihatlar_birim_ref geçersiz durumda, yeniden oluşturuluyor")
+                    cur.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_ictihatlar_birim_ref")
+                cur.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ictihatlar_birim_ref "
+                            "ON ictihatlar (birim_ref)")
+            cur.execute("ANALYZE ictihatlar")
+        print("✓ idx_ictihatlar_birim_ref oluşturuldu")
+    finally:
+        conn.close()
+
+
+def populate_mevzuat_lookups(conn):
+    """mevzuat_turleri'ni tablodaki tür kodlarıyla tamamla"""
+    if "mevzuat_tur_adi" not in table_columns(conn, "mevzuatlar"):
+        print("✓ mevzuatlar: eski mevzuat_tur_adi kolonu yok")
+        return
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO mevzuat_turleri (kod, adi)
+            SELECT DISTINCT ON (mevzuat_tur) mevzuat_tur, COALESCE(mevzuat_tur_adi, mevzuat_tur)
+            FROM mevzuatlar
+            WHERE mevzuat_tur IS NOT NULL
+            ORDER BY mevzuat_tur, mevzuat_tur_adi NULLS LAST
+            ON CONFLICT (kod) DO NOTHING
+        """)
+        print(f"  mevzuat_turleri: {cur.rowcount:,} yeni tür")
+    conn.commit()
+
+
+def switch_readers(conn, tables: List[str]):
+    """View'ları ve fonksiyonları sözlük tablolarını okuyacak şekilde güncelle"""
+    has_vector = "ictihatlar" in tables and "search_vector" in table_columns(conn, "ictihatlar")
+    with conn.cursor() as cur:
+        if "ictihatlar" in tables:
+            cur.execute(ICTIHAT_VIEWS_SQL)
+            if has_vector:
+                cur.execute(SEARCH_FUNCTIONS["ictihatlar"])
+            else:
+                cur.execute(EXPRESSION_SEARCH_ICTIHAT_SQL)
+        if "mevzuatlar" in tables:
+            cur.execute(MEVZUAT_VIEWS_SQL)
+        cur.execute(STATS_FUNCTIONS_SQL)
+    conn.commit()
+
+    # Ağırlıklı search_vector trigger'ı eski birim_adi kolonunu okuyor olabilir
+    if "ictihatlar" in tables and function_exists(conn, "ictihatlar_search_vector_update"):
+        add_column_and_trigger(conn, "ictihatlar")
+    print("✓ View'lar ve fonksiyonlar sözlük tablolarına geçirildi")
+
+
+def drop_legacy_columns(conn, tables: List[str]):
+    """Eski metin kolonlarını kaldır (yalnızca katalog değişikliği)"""
+    drops = {
+        "ictihatlar": LEGACY_LOOKUP_COLUMNS,
+        "mevzuatlar": ["mevzuat_tur_adi"],
+    }
+    for table in tables:
+        present = [c for c in drops[table] if c in table_columns(conn, table)]
+        if not present:
+            print(f"✓ {table}: kaldırılacak eski kolon yok")
+            continue
+        with conn.cursor() as cur:
+            cur.execute("SET lock_timeout = '5s'")
+            cur.execute(f"ALTER TABLE {table} "
+                        + ", ".join(f"DROP COLUMN IF EXISTS {c}" for c in present))
+            if table == "ictihatlar":
+                # Eski birim_adi indeksinin ertelenmiş tanımı yeniden kurulmasın
+                cur.execute("SELECT to_regclass('ertelenen_indeksler')")
+                if cur.fetchone()[0] is not None:
+                    cur.execute("DELETE FROM ertelenen_indeksler WHERE index_name = 'idx_ictihatlar_birim'")
+            cur.execute("SET lock_timeout = DEFAULT")
+        conn.commit()
+        print(f"✓ {table}: {', '.join(present)} kaldırıldı")
+    print("ℹ Disk alanı satırlar yeniden yazıldıkça geri kazanılır (VACUUM FULL / pg_repack)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tekrar eden metadata kolonlarını sözlük tablolarına taşı")
+    parser.add_argument("--tables", "-t", nargs="+", choices=["ictihatlar", "mevzuatlar"],
+                        default=["ictihatlar", "mevzuatlar"],
+                        help="İşlenecek tablolar (varsayılan: tümü)")
+    parser.add_argument("--batch-size", "-b", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Backfill id aralığı genişliği")
+    parser.add_argument("--pause", type=float, default=0.0,
+                        help="Backfill batch'leri arasında bekleme (saniye)")
+    parser.add_argument("--drop-columns", action="store_true",
+                        help="Geçişten sonra eski metin kolonlarını kaldır (scraper'lar durdurulmalı)")
+    args = parser.parse_args()
+
+    if not POSTGRES_CONFIG["password"]:
+        print("❌ POSTGRES_PASSWORD tanımlı değil! .env dosyasını kontrol edin.")
+        sys.exit(1)
+
+    conn = create_connection()
+    try:
+        if "ictihatlar" in args.tables:
+            print(f"\n{'='*60}")
+            print("📚 ictihatlar")
+            print("="*60)
+            prepare_ictihatlar(conn)
+            legacy = [c for c in LEGACY_LOOKUP_COLUMNS if c in table_columns(conn, "ictihatlar")]
+            if len(legacy) == len(LEGACY_LOOKUP_COLUMNS):
+                populate_ictihat_lookups(conn)
+                backfill_ictihatlar(conn, args.batch_size, args.pause)
+            elif legacy:
+                print(f"❌ ictihatlar eski kolonların yalnızca bir kısmını içeriyor: {', '.join(legacy)}")
+                sys.exit(1)
+            else:
+                print("✓ ictihatlar: eski metin kolonları yok, backfill atlandı")
+            create_birim_index()
+
+        if "mevzuatlar" in args.tables:
+            print(f"\n{'='*60}")
+            print("📜 mevzuatlar")
+            print("="*60)
+            populate_mevzuat_lookups(conn)
+
+        switch_readers(conn, args.tables)
+
+        if args.drop_columns:
+            drop_legacy_columns(conn, args.tables)
+    finally:
+        conn.close()
+
+    print("\n✅ Geçiş tamamlandı."
+          + ("" if args.drop_columns else " Eski kolonları kaldırmak için: --drop-columns"))
+
+
+if __name__ == "__main__":
+    main()
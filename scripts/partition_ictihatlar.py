@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+ictihatlar Tablosunu Karar Yılına Göre Bölümlenmiş Yapıya Çevrimiçi Taşıma
+
+Tek heap tablo olan ictihatlar'ı, yazmaları durdurmadan karar_no_yil'e göre
+RANGE bölümlenmiş (istenirse yıl içinde item_type'a göre LIST alt bölümlü)
+bir tabloya taşır. Adımlar:
+
+  prepare  ictihatlar_yeni bölümlenmiş tablosunu (aynı id sequence'ı ve
+           sözlük tablolarına giden yabancı anahtarlarla) ve mevcut yılların
+           bölümlerini oluşturur; ictihatlar'a her yazmayı yeni tabloya
+           yansıtan bir trigger kurar
+  copy     Mevcut satırları id aralıklarıyla, kısa transaction'larda kopyalar
+           (ON CONFLICT DO NOTHING; trigger'ın yazdığı güncel satırlar korunur)
+  index    Eski tablodaki indeksleri her bölümde CONCURRENTLY oluşturup üst
+           indekse bağlar
+  swap     Eksik/fazla satır kontrolünden sonra kısa bir kilitle tabloları
+           yeniden adlandırır; trigger'ları ve bağımlı view'ları (kararlar_view)
+           yeni tabloya taşır. Eski tablo ictihatlar_eski olarak kalır
+  drop-old ictihatlar_eski tablosunu siler (all adımına dahil değildir)
+
+Kullanım:
+    python partition_ictihatlar.py all
+    python partition_ictihatlar.py prepare --layout year-type
+    python partition_ictihatlar.py copy --batch-size 5000 --pause 0.1
+    python partition_ictihatlar.py swap
+
+Gereksinimler:
+    pip install psycopg2-binary requests
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre
+"""
+
+import sys
+import time
+import argparse
+from datetime import datetime
+from typing import List
+
+try:
+    from psycopg2 import errors
+except ImportError:
+    print("❌ psycopg2 yüklü değil. Lütfen çalıştırın: pip install psycopg2-binary")
+    sys.exit(1)
+
+from db_config import POSTGRES_CONFIG, create_connection
+from ictihat_scraper import (
+    build_partitioned_index,
+    default_partition_sql,
+    year_partition_sql,
+)
+
+
+TABLE = "ictihatlar"
+NEW_TABLE = "ictihatlar_yeni"
+OLD_TABLE = "ictihatlar_eski"
+MIRROR_FUNCTION = "ictihatlar_bolum_aynala"
+MIRROR_TRIGGER = "ictihatlar_bolum_aynala_trigger"
+INDEX_PREFIX = "idx_ictihatlar_"
+
+DEFAULT_BATCH_SIZE = 5000
+STEPS = ["prepare", "copy", "index", "swap", "drop-old", "all"]
+
+
+def relkind(cur, table: str):
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def table_columns(cur, table: str) -> List[str]:
+    cur.execute("""
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum
+    """, (table,))
+    return [name for (name,) in cur.fetchall()]
+
+
+def constraint_columns(cur, table: str, contype: str) -> List[List[str]]:
+    cur.execute("""
+        SELECT array_agg(a.attname::text ORDER BY k.ord)
+        FROM pg_constraint con
+        CROSS JOIN LATERAL unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+        WHERE con.conrelid = %s::regclass AND con.contype = %s
+        GROUP BY con.oid
+    """, (table, contype))
+    return [columns for (columns,) in cur.fetchall()]
+
+
+def add_foreign_keys(cur) -> List[str]:
+    """
+    Eski tablonun sözlük tablolarına giden FK'larını (birim_ref, karar_turu_id,
+    kesinlesme_durumu_id ...) yeni tabloda aynı adla oluştur; LIKE bunları
+    kopyalamaz. Yalnızca eksik olanlar eklenir, eklenenlerin adları döner.
+    """
+    cur.execute("""
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'f'
+        ORDER BY conname
+    """, (TABLE,))
+    foreign_keys = cur.fetchall()
+    cur.execute("SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+                (NEW_TABLE,))
+    existing = {name for (name,) in cur.fetchall()}
+    added = []
+    for name, definition in foreign_keys:
+        if name not in existing:
+            cur.execute(f"ALTER TABLE {NEW_TABLE} ADD CONSTRAINT {name} {definition}")
+            added.append(name)
+    return added
+
+
+def partition_keys(cur) -> List[str]:
+    """Yeni tablonun bölüm anahtarları (birincil anahtarın id dışındaki kolonları)"""
+    return constraint_columns(cur, NEW_TABLE, "p")[0][1:]
+
+
+def source_expression(column: str) -> str:
+    # Bölüm anahtarı NULL olamaz; yılı bilinmeyen kararlar 0 olarak taşınır
+    return "COALESCE({p}karar_no_yil, 0)" if column == "karar_no_yil" else "{p}" + column
+
+
+def existing_years(cur) -> List[int]:
+    """idx_ictihatlar_karar üzerinde loose index scan ile mevcut karar yılları"""
+    cur.execute(f"""
+        WITH RECURSIVE yillar AS (
+            (SELECT karar_no_yil AS yil FROM {TABLE}
+             WHERE karar_no_yil IS NOT NULL ORDER BY karar_no_yil LIMIT 1)
+            UNION ALL
+            SELECT (SELECT karar_no_yil FROM {TABLE}
+                    WHERE karar_no_yil > y.yil ORDER BY karar_no_yil LIMIT 1)
+            FROM yillar y WHERE y.yil IS NOT NULL
+        )
+        SELECT yil FROM yillar WHERE yil IS NOT NULL
+    """)
+    return [year for (year,) in cur.fetchall()]
+
+
+def mirror_function_sql(columns: List[str], keys: List[str]) -> str:
+    """Eski tabloya yapılan her yazmayı yeni tabloya yansıtan trigger fonksiyonu"""
+    values = ", ".join(source_expression(c).format(p="NEW.") for c in columns)
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c not in ["id"] + keys)
+    old_match = " AND ".join(f"{k} = {source_expression(k).format(p='OLD.')}" for k in keys)
+    key_changed = " OR ".join(f"OLD.{k} IS DISTINCT FROM NEW.{k}" for k in keys)
+    return f"""
+        CREATE OR REPLACE FUNCTION {MIRROR_FUNCTION}()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND ({key_changed})) THEN
+                DELETE FROM {NEW_TABLE} WHERE id = OLD.id AND {old_match};
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {NEW_TABLE} ({', '.join(columns)}) VALUES ({values})
+                ON CONFLICT (id, {', '.join(keys)}) DO UPDATE SET {updates};
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+
+
+def prepare(conn, by_type: bool):
+    """Bölümlenmiş tabloyu, bölümleri ve yansıtma trigger'ını oluştur"""
+    with conn.cursor() as cur:
+        kind = relkind(cur, TABLE)
+        if kind == "p":
+            print(f"✓ {TABLE} zaten bölümlenmiş")
+            sys.exit(0)
+        if kind != "r":
+            print(f"❌ {TABLE} tablosu bulunamadı")
+            sys.exit(1)
+
+        if relkind(cur, NEW_TABLE) is None:
+            keys = "karar_no_yil, item_type" if by_type else "karar_no_yil"
+            # LIKE ... INCLUDING DEFAULTS id'nin nextval varsayılanını da kopyalar;
+            # iki tablo aynı sequence'ı paylaşır, trigger'sız eklemeler de çakışmaz
+            cur.execute(f"""
+                CREATE TABLE {NEW_TABLE} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS)
+                    PARTITION BY RANGE (karar_no_yil)
+            """)
+            cur.execute(f"ALTER TABLE {NEW_TABLE} ALTER COLUMN karar_no_yil SET DEFAULT 0, "
+                        f"ALTER COLUMN karar_no_yil SET NOT NULL")
+            cur.execute(f"ALTER TABLE {NEW_TABLE} ADD CONSTRAINT {NEW_TABLE}_pkey PRIMARY KEY (id, {keys})")
+            cur.execute(f"ALTER TABLE {NEW_TABLE} ADD CONSTRAINT {NEW_TABLE}_document_id_key "
+                        f"UNIQUE (document_id, {keys})")
+            print(f"✓ {NEW_TABLE} oluşturuldu (bölüm anahtarı: {keys})")
+        else:
+            print(f"✓ {NEW_TABLE} zaten var, eksik bölümler tamamlanıyor")
+
+        keys = partition_keys(cur)
+        years = sorted(set(existing_years(cur)) | {0, datetime.now().year, datetime.now().year + 1})
+        for year in years:
+            for statement in year_partition_sql(NEW_TABLE, year, "item_type" in keys):
+                cur.execute(statement)
+        cur.execute(default_partition_sql(NEW_TABLE))
+        print(f"✓ {len(years)} yıl bölümü hazır (yılı bilinmeyenler ve varsayılan bölüm dahil)")
+        foreign_keys = add_foreign_keys(cur)
+        if foreign_keys:
+            print(f"✓ Yabancı anahtarlar eklendi: {', '.join(foreign_keys)}")
+
+        # Trigger kurulumu tabloyu kısa süreliğine kilitler; uzun sorguların arkasında beklememek için
+        cur.execute("SET lock_timeout = '5s'")
+        cur.execute(mirror_function_sql(table_columns(cur, TABLE), keys))
+        cur.execute(f"DROP TRIGGER IF EXISTS {MIRROR_TRIGGER} ON {TABLE}")
+        cur.execute(f"""
+            CREATE TRIGGER {MIRROR_TRIGGER}
+                AFTER INSERT OR UPDATE OR DELETE ON {TABLE}
+                FOR EACH ROW
+                EXECUTE FUNCTION {MIRROR_FUNCTION}()
+        """)
+    conn.commit()
+    print(f"✓ {TABLE} -> {NEW_TABLE} yansıtma trigger'ı kuruldu")
+
+
+def copy_rows(conn, batch_size: int, pause: float, start_id: int = None):
+    """Mevcut satırları id aralıklarıyla yeni tabloya kopyala"""
+    with conn.cursor() as cur:
+        columns = table_columns(cur, TABLE)
+        cur.execute(f"SELECT MIN(id), MAX(id) FROM {TABLE}")
+        min_id, max_id = cur.fetchone()
+    conn.commit()
+
+    if min_id is None:
+        print(f"✓ {TABLE} boş, kopyalanacak satır yok")
+        return
+
+    select_list = ", ".join(source_expression(c).format(p="") for c in columns)
+    copy_sql = f"""
+        INSERT INTO {NEW_TABLE} ({', '.join(columns)})
+        SELECT {select_list} FROM {TABLE}
+        WHERE id BETWEEN %s AND %s
+        ON CONFLICT DO NOTHING
+    """
+
+    started = time.time()
+    copied = 0
+    start = max(min_id, start_id or min_id)
+    while start <= max_id:
+        end = start + batch_size - 1
+        with conn.cursor() as cur:
+            cur.execute(copy_sql, (start, end))
+            copied += cur.rowcount
+        conn.commit()
+
+        done = (end - min_id + 1) / (max_id - min_id + 1)
+        elapsed = time.time() - started
+        print(f"  {TABLE}: id {end:,}/{max_id:,} ({min(done, 1):.1%}), "
+              f"{copied:,} satır, {copied / elapsed if elapsed else 0:,.0f} satır/sn", end="\r")
+        start = end + 1
+        if pause:
+            time.sleep(pause)
+
+    print()
+    print(f"✓ {copied:,} satır {time.time() - started:.1f} sn'de kopyalandı")
+
+
+def index_definitions(cur, table: str):
+    """Kısıt dışı indekslerin (ad, USING ... tanımı) listesi"""
+    cur.execute("""
+        SELECT c.relname, pg_get_indexdef(i.indexrelid), i.indisunique
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        LEFT JOIN pg_constraint con ON con.conindid = i.indexrelid AND con.conrelid = i.indrelid
+        WHERE i.indrelid = %s::regclass AND con.oid IS NULL
+        ORDER BY c.relname
+    """, (table,))
+    definitions = []
+    for name, indexdef, unique in cur.fetchall():
+        if unique:
+            # Bölümlenmiş tabloda benzersiz indeks bölüm anahtarını içermek zorundadır
+            print(f"⚠ {name} benzersiz indeks, bölümlenmiş tabloya otomatik taşınmıyor")
+            continue
+        definitions.append((name, "USING " + indexdef.split(" USING ", 1)[1]))
+    return definitions
+
+
+def build_indexes():
+    """Eski tablonun indekslerini yeni tabloda bölüm bölüm CONCURRENTLY oluştur"""
+    conn = create_connection(autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            for name, definition in index_definitions(cur, TABLE):
+                suffix = name[len(INDEX_PREFIX):] if name.startswith(INDEX_PREFIX) else name
+                started = time.time()
+                build_partitioned_index(cur, NEW_TABLE, f"{name}_yeni", definition, suffix)
+                print(f"✓ {name}_yeni oluşturuldu ({time.time() - started:.1f} sn)")
+            cur.execute(f"ANALYZE {NEW_TABLE}")
+    finally:
+        conn.close()
+
+
+def verify_copy(conn, keys: List[str]) -> bool:
+    """Eski tablodan silinmiş/yılı değişmiş artıkları temizle, eksik satır kalmadığını doğrula"""
+    match = " AND ".join(f"n.{k} = {source_expression(k).format(p='o.')}" for k in keys)
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            DELETE FROM {NEW_TABLE} n
+            WHERE NOT EXISTS (SELECT 1 FROM {TABLE} o WHERE o.id = n.id AND {match})
+        """)
+        stale = cur.rowcount
+        cur.execute(f"""
+            SELECT COUNT(*) FROM {TABLE} o
+            WHERE NOT EXISTS (SELECT 1 FROM {NEW_TABLE} n WHERE n.id = o.id AND {match})
+        """)
+        missing = cur.fetchone()[0]
+    conn.commit()
+
+    if stale:
+        print(f"✓ {stale:,} artık satır temizlendi")
+    if missing:
+        print(f"❌ Yeni tabloda {missing:,} satır eksik; copy adımını tekrar çalıştırın")
+        return False
+    print("✓ Satırlar eşleşiyor")
+    return True
+
+
+def swap(conn, retries: int):
+    """Kısa bir ACCESS EXCLUSIVE kilitle tabloları yer değiştir"""
+    with conn.cursor() as cur:
+        if relkind(cur, NEW_TABLE) != "p":
+            print(f"❌ {NEW_TABLE} bulunamadı; önce prepare ve copy adımlarını çalıştırın")
+            sys.exit(1)
+        keys = partition_keys(cur)
+        indexes = [name for name, _ in index_definitions(cur, TABLE)]
+        cur.execute("""
+            SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = ANY(%s) AND NOT i.indisvalid
+        """, ([f"{name}_yeni" for name in indexes],))
+        invalid = [name for (name,) in cur.fetchall()]
+        cur.execute("SELECT to_regclass(name) IS NULL FROM unnest(%s::text[]) AS name",
+                    ([f"{name}_yeni" for name in indexes],))
+        if invalid or any(missing for (missing,) in cur.fetchall()):
+            print("❌ Yeni tablonun indeksleri eksik veya geçersiz; önce index adımını çalıştırın")
+            sys.exit(1)
+        # Bu düzeltmeden önce hazırlanmış tablolarda FK'lar yoktur; kilitten önce eklenir
+        # (bölümlenmiş tabloda NOT VALID desteklenmediğinden mevcut satırlar doğrulanır)
+        foreign_keys = add_foreign_keys(cur)
+        if foreign_keys:
+            print(f"✓ Eksik yabancı anahtarlar eklendi: {', '.join(foreign_keys)}")
+
+        # Kilit altında çalıştırılacak yeniden oluşturma ifadeleri, eski tablo adıyla
+        # alınır; yeniden adlandırmadan sonra çalıştırıldıklarında yeni tabloya bağlanırlar
+        cur.execute("""
+            SELECT pg_get_triggerdef(oid) FROM pg_trigger
+            WHERE tgrelid = %s::regclass AND NOT tgisinternal AND tgname <> %s
+        """, (TABLE, MIRROR_TRIGGER))
+        triggers = [definition for (definition,) in cur.fetchall()]
+        cur.execute("""
+            SELECT DISTINCT v.oid::regclass::text, pg_get_viewdef(v.oid)
+            FROM pg_depend d
+            JOIN pg_rewrite r ON r.oid = d.objid
+            JOIN pg_class v ON v.oid = r.ev_class
+            WHERE d.classid = 'pg_rewrite'::regclass
+              AND d.refobjid = %s::regclass
+              AND v.relkind = 'v'
+        """, (TABLE,))
+        views = cur.fetchall()
+        cur.execute("SELECT pg_get_serial_sequence(%s, 'id')", (TABLE,))
+        sequence = cur.fetchone()[0]
+        cur.execute("""
+            SELECT conname, contype FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype IN ('p', 'u')
+        """, (TABLE,))
+        old_constraints = dict(cur.fetchall())
+    conn.commit()
+
+    if not verify_copy(conn, keys):
+        sys.exit(1)
+
+    pkey = next((name for name, kind in old_constraints.items() if kind == "p"), f"{TABLE}_pkey")
+    unique = next((name for name, kind in old_constraints.items() if kind == "u"), f"{TABLE}_document_id_key")
+
+    for attempt in range(1, retries + 1):
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL lock_timeout = '5s'")
+                cur.execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+                started = time.time()
+                cur.execute(f"DROP TRIGGER IF EXISTS {MIRROR_TRIGGER} ON {TABLE}")
+                cur.execute(f"ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}")
+                for name in old_constraints:
+                    cur.execute(f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT {name} TO {name}_eski")
+                for name in indexes:
+                    cur.execute(f"ALTER INDEX {name} RENAME TO {name}_eski")
+                    cur.execute(f"ALTER INDEX {name}_yeni RENAME TO {name}")
+                cur.execute(f"ALTER TABLE {NEW_TABLE} RENAME TO {TABLE}")
+                cur.execute(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {NEW_TABLE}_pkey TO {pkey}")
+                cur.execute(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {NEW_TABLE}_document_id_key TO {unique}")
+                if sequence:
+                    # Sequence eski tabloya bağlı kalırsa drop-old ile birlikte silinirdi
+                    cur.execute(f"ALTER SEQUENCE {sequence} OWNED BY {TABLE}.id")
+                for definition in triggers:
+                    cur.execute(definition)
+                for view, definition in views:
+                    cur.execute(f"CREATE OR REPLACE VIEW {view} AS {definition}")
+            conn.commit()
+            print(f"✓ Tablolar yer değiştirdi (kilit süresi {time.time() - started:.2f} sn); "
+                  f"eski tablo: {OLD_TABLE}")
+            break
+        except errors.LockNotAvailable:
+            conn.rollback()
+            print(f"⚠ Kilit alınamadı (deneme {attempt}/{retries}), tekrar denenecek")
+            time.sleep(min(2 ** attempt, 30))
+    else:
+        print("❌ Tablo kilidi alınamadı; yoğun olmayan bir zamanda swap adımını tekrar çalıştırın")
+        sys.exit(1)
+
+    with conn.cursor() as cur:
+        cur.execute(f"DROP FUNCTION IF EXISTS {MIRROR_FUNCTION}()")
+        cur.execute(f"ANALYZE {TABLE}")
+    conn.commit()
+
+
+def drop_old(conn):
+    with conn.cursor() as cur:
+        if relkind(cur, OLD_TABLE) is None:
+            print(f"✓ {OLD_TABLE} zaten yok")
+            return
+        cur.execute(f"DROP TABLE {OLD_TABLE}")
+    conn.commit()
+    print(f"✓ {OLD_TABLE} silindi")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ictihatlar tablosunu karar yılına göre bölümle")
+    parser.add_argument("step", choices=STEPS, nargs="?", default="all",
+                        help="Çalıştırılacak adım (varsayılan: all = prepare, copy, index, swap)")
+    parser.add_argument("--layout", choices=["year", "year-type"], default="year",
+                        help="year: karar yılına göre, year-type: yıl + içtihat türüne göre")
+    parser.add_argument("--batch-size", "-b", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Kopyalama id aralığı genişliği")
+    parser.add_argument("--pause", type=float, default=0.0,
+                        help="Kopyalama batch'leri arasında bekleme (saniye)")
+    parser.add_argument("--start-id", type=int,
+                        help="Kopyalamaya bu id'den devam et")
+    parser.add_argument("--swap-retries", type=int, default=10,
+                        help="Tablo kilidi için deneme sayısı")
+    args = parser.parse_args()
+
+    if not POSTGRES_CONFIG["password"]:
+        print("❌ POSTGRES_PASSWORD tanımlı değil! .env dosyasını kontrol edin.")
+        sys.exit(1)
+
+    steps = ["prepare", "copy", "index", "swap"] if args.step == "all" else [args.step]
+
+    print("=" * 60)
+    print(f"🗂  ictihatlar bölümleme: {', '.join(steps)}")
+    print("=" * 60)
+
+    conn = create_connection()
+    try:
+        for step in steps:
+            print(f"\n▶ {step}")
+            if step == "prepare":
+                prepare(conn, args.layout == "year-type")
+            elif step == "copy":
+                copy_rows(conn, args.batch_size, args.pause, args.start_id)
+            elif step == "index":
+                build_indexes()
+            elif step == "swap":
+                swap(conn, args.swap_retries)
+            elif step == "drop-old":
+                drop_old(conn)
+    finally:
+        conn.close()
+
+    print("\n✅ Tamamlandı")
+
+
+if __name__ == "__main__":
+    main()
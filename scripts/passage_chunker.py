@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Uzun karar / mevzuat metinlerini pasajlara bölme
+
+100 KB'ı aşan karar metinlerinde highlight ve alaka hesabı yavaştır; AI servisi
+de tüm kararı çekmek zorunda kalır. Bu modül metni paragraf ve madde
+sınırlarından, birbiriyle örtüşen küçük pasajlara böler. Pasajlar orijinal
+metindeki (başlangıç, bitiş) karakter aralıkları olarak döner; böylece metin
+kopyalanmadan dilimlenir ve vurgulanan pasaj üst belgede konumlandırılabilir.
+
+split_articles ise mevzuat metnini madde numarasıyla anahtarlanmış madde
+aralıklarına ayırır (mevzuat_maddeleri tablosu için).
+"""
+
+import re
+from typing import List, Tuple
+
+DEFAULT_MAX_CHARS = 1500
+DEFAULT_OVERLAP = 200
+
+# Paragraf sınırı: bir veya daha fazla satır sonu
+PARAGRAPH_RE = re.compile(r"\n\s*")
+# Tek başına sınırı aşan paragraflar cümle sonlarından, o da yoksa boşluklardan bölünür
+SENTENCE_END_RE = re.compile(r"[.!?;:]\s+")
+
+# Madde başlığı: "MADDE 166-", "Madde 5/A –", "GEÇİCİ MADDE 2-"; pasaj bölmede
+# yeni pasaj açar, split_articles'ta madde aralıklarını belirler.
+# HTML'den çıkarılan metinde satır sonu olmayabileceği için satır başı yerine
+# önünde boşluk aranır; tırnakla başlayan ("“MADDE 5-") değişiklik metinleri ve
+# "166 ncı madde" gibi iç atıflar başlık sayılmaz.
+ARTICLE_HEADER_RE = re.compile(
+    r"(?:^|(?<=\s))(?P<tur>(?:GEÇİCİ|Geçici|EK|Ek)\s+)?(?:MADDE|Madde)\s+(?P<no>\d{1,4})"
+    r"(?:\s*/\s*(?P<harf>[A-Za-zÇĞİÖŞÜçğıöşü])\b)?\s*[-–—]"
+)
+
+# (başlangıç, bitiş, madde başlangıcı mı)
+Unit = Tuple[int, int, bool]
+
+
+def _trim(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _split_long(text: str, start: int, end: int, max_chars: int) -> List[Tuple[int, int]]:
+    """max_chars'ı aşan bir aralığı cümle sonu / boşluk konumlarından parçala"""
+    parts = []
+    while end - start > max_chars:
+        limit = start + max_chars
+        cut = None
+        for match in SENTENCE_END_RE.finditer(text, start + max_chars // 2, limit):
+            cut = match.end()
+        if cut is None:
+            space = text.rfind(" ", start + max_chars // 2, limit)
+            cut = space + 1 if space != -1 else limit
+        part = _trim(text, start, cut)
+        if part[1] > part[0]:
+            parts.append(part)
+        start = cut
+    part = _trim(text, start, end)
+    if part[1] > part[0]:
+        parts.append(part)
+    return parts
+
+
+def split_units(text: str, max_chars: int = DEFAULT_MAX_CHARS, overlap: int = 0) -> List[Unit]:
+    """
+    Metni paragraf ve madde sınırlarından birimlere ayır. Uzun aralıklar
+    max_chars yerine max_chars - overlap (ve boşluk / kelime sınırı payı) ile
+    kesilir: HTML'den çıkarılan metinde satır sonu olmadığından birimlerin çoğu
+    bu sınırdadır ve önceki pasajın sonu bir sonraki pasaja sığabilmelidir.
+    """
+    unit_chars = max_chars
+    if overlap > 0:
+        unit_chars = max(max_chars // 2, max_chars - overlap - overlap // 4)
+    boundaries = {0, len(text)}
+    boundaries.update(match.end() for match in PARAGRAPH_RE.finditer(text))
+    articles = {match.start() for match in ARTICLE_HEADER_RE.finditer(text)}
+    boundaries.update(articles)
+
+    units: List[Unit] = []
+    ordered = sorted(boundaries)
+    for start, end in zip(ordered, ordered[1:]):
+        is_article = start in articles
+        for part_start, part_end in _split_long(text, start, end, unit_chars):
+            units.append((part_start, part_end, is_article))
+            is_article = False
+    return units
+
+
+def split_passages(text: str, max_chars: int = DEFAULT_MAX_CHARS,
+                   overlap: int = DEFAULT_OVERLAP) -> List[Tuple[int, int]]:
+    """
+    Birimleri max_chars'a kadar pasajlarda birleştir. Ardışık pasajlar yaklaşık
+    `overlap` karakter örtüşür (kelime sınırından); yeni bir madde her zaman
+    yeni pasaj başlatır ve önceki maddeyle örtüşmez.
+    """
+    if not text:
+        return []
+    units = split_units(text, max_chars, overlap)
+    # Çok kısa bir pasajı yalnızca madde sınırı yüzünden kapatma
+    min_chars = max_chars // 4
+
+    passages: List[Tuple[int, int]] = []
+    first = 0
+    start = units[0][0] if units else 0
+    while first < len(units):
+        j = first + 1
+        while j < len(units) and units[j][1] - start <= max_chars:
+            if units[j][2] and units[j - 1][1] - start >= min_chars:
+                break
+            j += 1
+        end = units[j - 1][1]
+        passages.append((start, end))
+        if j >= len(units):
+            break
+
+        next_first, next_start = j, units[j][0]
+        if not units[j][2] and overlap > 0:
+            # Örtüşme başlangıcı: sondan `overlap` karakter geri, ilk kelime sınırına yuvarlanır
+            target = max(end - overlap, start + 1)
+            k = j - 1
+            while k > first and units[k][0] > target:
+                k -= 1
+            if units[k][0] >= target:
+                candidate = units[k][0]
+            else:
+                space = text.find(" ", target, units[k][1])
+                candidate = space + 1 if space != -1 else None
+            # Örtüşme, sıradaki birimin pasaja sığmasını engellememeli
+            if candidate is not None and units[j][1] - candidate <= max_chars:
+                next_first, next_start = k, candidate
+        first, start = next_first, next_start
+    return passages
+
+
+def article_key(match) -> str:
+    """Madde başlığından anahtar: 166, 5/A, EK-1, GEÇİCİ-2"""
+    no = match.group("no").lstrip("0") or "0"
+    if match.group("harf"):
+        no = f"{no}/{match.group('harf').upper()}"
+    tur = match.group("tur")
+    if tur:
+        no = ("GEÇİCİ-" if tur[0] == "G" else "EK-") + no
+    return no
+
+
+def split_articles(text: str) -> List[Tuple[str, int, int]]:
+    """
+    Mevzuat metnini (madde_no, başlangıç, bitiş) aralıklarına böl. İlk maddeden
+    önceki başlık / giriş kısmı atlanır; aynı madde numarası tekrar geçerse
+    (metin içinde aktarılan bir madde) yeni madde açılmaz, önceki maddeye dahil edilir.
+    """
+    if not text:
+        return []
+    headers = []
+    seen = set()
+    for match in ARTICLE_HEADER_RE.finditer(text):
+        key = article_key(match)
+        if key not in seen:
+            seen.add(key)
+            headers.append((key, match.start()))
+
+    articles = []
+    for index, (key, start) in enumerate(headers):
+        end = headers[index + 1][1] if index + 1 < len(headers) else len(text)
+        start, end = _trim(text, start, end)
+        articles.append((key, start, end))
+    return articles
+
+
+if __name__ == "__main__":
+    # Satır sonu içermeyen (HTML'den çıkarılmış) metinde ardışık pasajlar örtüşmeli
+    sample = " ".join(f"Davacı vekili {i}. dilekçesinde kira bedelinin tespitini talep etmiştir."
+                      for i in range(200))
+    passages = split_passages(sample)
+    overlaps = [previous[1] - current[0] for previous, current in zip(passages, passages[1:])]
+    assert all(end - start <= DEFAULT_MAX_CHARS for start, end in passages), passages
+    assert overlaps and all(value > 0 for value in overlaps), overlaps
+    print(f"✓ {len(passages)} pasaj, örtüşme {min(overlaps)}-{max(overlaps)} karakter")
+
+    # Satır sonu olmayan mevzuat metninde her madde yeni bir pasaj başlatmalı
+    # (kısa giriş kısmı ilk maddeyle aynı pasajda kalabilir)
+    law = "KİRA KANUNU Amaç ve kapsam " + " ".join(
+        f"MADDE {no}- " + " ".join(f"({i}) Kiracı kira bedelini {no}. madde uyarınca öder." for i in range(12))
+        for no in range(1, 15))
+    headers = [match.start() for match in ARTICLE_HEADER_RE.finditer(law)]
+    passages = split_passages(law)
+    starts = {start for start, _ in passages}
+    assert len(headers) == 14, headers
+    assert all(header in starts for header in headers[1:]), (headers, passages)
+    assert not any(start < header < end for start, end in passages for header in headers[1:]), passages
+    print(f"✓ {len(headers)} madde, {len(passages)} pasaj; her madde yeni pasajla başlıyor")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Çok ifadeli (fan-out) içtihat araması
+
+Konu taraması için yüzlerce anahtar kelimeyi ayrı ayrı çalıştırmak, birbiriyle
+örtüşen kararları her ifadede yeniden indirir ve yazar. PhraseFanout (ifade,
+içtihat türü) aramalarını iş parçacıklarında eşzamanlı sayfalar; sonuçlar tek
+bir tüketicide birleşir:
+
+  - çalıştırma boyunca görülen documentId'ler tek bir kümede tutulur, her karar
+    (metadata ve içerik) yalnızca ilk görüldüğünde işlenir
+  - her ifadenin isabetleri (sıra numarasıyla) ictihat_arama_sonuclari eşleme
+    tablosuna yazılır; bir karar birden fazla ifadede bulunabilir
+
+Her iş parçacığı kendi API istemcisini (oturum ve --delay) kullanır; toplam
+istek hızı iş parçacığı sayısıyla çarpılır.
+"""
+
+import queue
+import logging
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from records import IctihatRecord
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PHRASE_WORKERS = 4
+
+PHRASE_HITS_SQL = """
+CREATE TABLE IF NOT EXISTS ictihat_arama_sonuclari (
+    arama_ifadesi VARCHAR(200) NOT NULL,
+    document_id VARCHAR(50) NOT NULL,
+    item_type VARCHAR(50) NOT NULL,
+    sira INTEGER NOT NULL,
+    bulunma_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (arama_ifadesi, document_id)
+);
+
+-- Bir kararın hangi ifadelerde bulunduğu
+CREATE INDEX IF NOT EXISTS idx_ictihat_arama_sonuclari_document
+    ON ictihat_arama_sonuclari(document_id);
+"""
+
+# (ifade, içtihat türü, documentId, sıra)
+Hit = Tuple[str, str, str, int]
+
+
+def read_phrases(path: str) -> List[str]:
+    """Satır başına bir ifade; boş satırlar, # yorumları ve tekrarlar atlanır"""
+    phrases: Dict[str, None] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            phrase = line.split("#", 1)[0].strip()
+            if phrase:
+                phrases.setdefault(phrase, None)
+    return list(phrases)
+
+
+def install_phrase_hits(conn):
+    with conn.cursor() as cur:
+        cur.execute(PHRASE_HITS_SQL)
+    conn.commit()
+
+
+def save_hits(conn, hits: List[Hit]) -> int:
+    """İsabetleri eşleme tablosuna yaz (aynı ifade + karar için ilk sıra geçerli)"""
+    unique: Dict[Tuple[str, str], Hit] = {}
+    for hit in hits:
+        unique.setdefault((hit[0], hit[2]), hit)
+    if not unique:
+        return 0
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO ictihat_arama_sonuclari (arama_ifadesi, item_type, document_id, sira)
+            VALUES %s
+            ON CONFLICT (arama_ifadesi, document_id) DO UPDATE SET
+                sira = EXCLUDED.sira,
+                bulunma_tarihi = CURRENT_TIMESTAMP
+        """, list(unique.values()))
+    conn.commit()
+    return len(unique)
+
+
+class PhraseFanout:
+    """İfade aramalarını eşzamanlı sayfalar, sonuçları documentId'ye göre tekilleştirir"""
+
+    def __init__(self, make_api: Callable[[], object], phrases: List[str], types: List[str],
+                 workers: int = DEFAULT_PHRASE_WORKERS, limit: Optional[int] = None):
+        self.make_api = make_api
+        self.jobs = [(phrase, item_type) for phrase in phrases for item_type in types]
+        self.workers = max(1, min(workers, len(self.jobs)))
+        self.limit = limit
+        self.seen = set()
+        self.hits: List[Hit] = []
+        self.hit_count = 0
+        self.duplicates = 0
+        self.failed_jobs = 0
+        self._stop = threading.Event()
+
+    def take_hits(self) -> List[Hit]:
+        """Son çağrıdan bu yana toplanan isabetleri döndür"""
+        hits, self.hits = self.hits, []
+        return hits
+
+    def _put(self, results: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                results.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker(self, jobs: queue.Queue, results: queue.Queue):
+        api = self.make_api()
+        try:
+            while not self._stop.is_set():
+                try:
+                    phrase, item_type = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    for rank, ictihat in enumerate(api.fetch_ictihat_by_phrase(item_type, phrase, self.limit), 1):
+                        if not self._put(results, (phrase, item_type, rank, ictihat)):
+                            return
+                except Exception as e:
+                    self.failed_jobs += 1
+                    logger.error(f"Arama hatası ({item_type}, '{phrase}'): {e}")
+        finally:
+            self._put(results, None)
+
+    def run(self) -> Iterator[IctihatRecord]:
+        """Her kararı çalıştırma boyunca bir kez üret; isabetler self.hits'te birikir"""
+        jobs: queue.Queue = queue.Queue()
+        for job in self.jobs:
+            jobs.put(job)
+        # Tüketici (içerik + yazma) geride kalırsa sayfalama da bekler
+        results: queue.Queue = queue.Queue(maxsize=1000)
+        threads = [threading.Thread(target=self._worker, args=(jobs, results), daemon=True,
+                                    name=f"phrase-{i}") for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        finished = 0
+        try:
+            while finished < len(threads):
+                item = results.get()
+                if item is None:
+                    finished += 1
+                    continue
+                phrase, item_type, rank, ictihat = item
+                document_id = ictihat.document_id
+                if not document_id:
+                    continue
+                self.hits.append((phrase, item_type, document_id, rank))
+                self.hit_count += 1
+                if document_id in self.seen:
+                    self.duplicates += 1
+                    continue
+                self.seen.add(document_id)
+                yield ictihat
+        finally:
+            self._stop.set()
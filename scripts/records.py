@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Normalize edilmiş API kayıtları
+
+Liste yanıtlarındaki her içtihat / mevzuat, sayfa alınır alınmaz bir kez
+IctihatRecord / MevzuatRecord'a dönüştürülür; tarih ayrıştırma, iç içe tür
+nesnelerinin açılması ve kolon adlarına eşleme burada yapılır. Kayıtlar
+__slots__ kullanır (kayıt başına __dict__ yok) ve kolon adlarıyla
+indekslenebilir; psycopg2'ye %(kolon)s parametresi olarak doğrudan verilir,
+upsert başına ikinci bir parametre sözlüğü kurulmaz.
+
+Tarihler sayfa başına toplu ayrıştırılır (parse_api_dates): aynı sayfadaki
+tekrar eden dizgiler bir kez çözülür; sabit biçimli "YYYY-MM-DDTHH:MM:SS"
+dizgileri fromisoformat'a gitmeden dilimlenir.
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+# MevzuatRecord.from_page bu alanları kolon kolon ayrıştırır
+MEVZUAT_DATE_FIELDS = ("kayitTarihi", "guncellemeTarihi", "resmiGazeteTarihi")
+
+
+@lru_cache(maxsize=65536)
+def _parse(value: str) -> Optional[datetime]:
+    # Hızlı yol: API'nin sabit konumlu biçimi (kesir ve saat dilimi yok sayılır)
+    if len(value) >= 19 and value[4] == "-" and value[7] == "-" and value[10] in "T " \
+            and value[13] == ":" and value[16] == ":" and (len(value) == 19 or value[19] in ".Z+-"):
+        try:
+            return datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                            int(value[11:13]), int(value[14:16]), int(value[17:19]))
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00").split(".")[0]).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def parse_api_datetime(value: Optional[str]) -> Optional[datetime]:
+    """API tarih dizgisi (örn. 2024-05-01T10:00:00.000Z) -> saat dilimsiz datetime"""
+    if not value or not isinstance(value, str):
+        return None
+    return _parse(value)
+
+
+def parse_api_dates(values: Sequence[Optional[str]]) -> List[Optional[datetime]]:
+    """Bir sayfanın tarih dizgilerini toplu ayrıştır (tekrar eden değerler bir kez çözülür)"""
+    parsed = {value: parse_api_datetime(value) for value in set(values)}
+    return [parsed[value] for value in values]
+
+
+def _as_date(value: Optional[datetime]) -> Optional[date]:
+    return value.date() if value is not None else None
+
+
+def _type_fields(value) -> tuple:
+    """{"name": ..., "description": ...} tür nesnesini (kod, ad) olarak aç"""
+    if isinstance(value, dict):
+        return value.get("name"), value.get("description")
+    return None, None
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    """Öğeleri en fazla `size` uzunluğunda listeler halinde üret"""
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+class _Record:
+    __slots__ = ()
+
+    def __getitem__(self, name: str):
+        # psycopg2 %(kolon)s parametreleri kayıttan doğrudan okunur
+        return getattr(self, name)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[:3])
+        return f"{type(self).__name__}({fields}, ...)"
+
+
+class IctihatRecord(_Record):
+    """searchDocuments emsalKararList öğesi, ictihatlar kolonlarıyla"""
+
+    __slots__ = (
+        "document_id", "item_type", "item_type_adi", "birim_id", "birim_adi",
+        "esas_no_yil", "esas_no_sira", "karar_no_yil", "karar_no_sira", "esas_no", "karar_no",
+        "karar_turu", "karar_tarihi", "karar_tarihi_str", "kesinlesme_durumu",
+        # Sözlük id'leri ve içerik yazma sırasında IctihatDatabase tarafından doldurulur
+        "birim_ref", "karar_turu_id", "kesinlesme_durumu_id", "karar_metni", "metin_ozeti",
+    )
+
+    @classmethod
+    def from_api(cls, item: dict, karar_tarihi: Optional[datetime] = None) -> "IctihatRecord":
+        get = item.get
+        self = cls.__new__(cls)
+        self.document_id = get("documentId")
+        self.item_type, self.item_type_adi = _type_fields(get("itemType"))
+        self.birim_id = get("birimId")
+        self.birim_adi = get("birimAdi")
+        self.esas_no_yil = get("esasNoYil")
+        self.esas_no_sira = get("esasNoSira")
+        self.karar_no_yil = get("kararNoYil")
+        self.karar_no_sira = get("kararNoSira")
+        self.esas_no = get("esasNo")
+        self.karar_no = get("kararNo")
+        self.karar_turu = get("kararTuru")
+        self.karar_tarihi = _as_date(karar_tarihi or parse_api_datetime(get("kararTarihi")))
+        self.karar_tarihi_str = get("kararTarihiStr")
+        self.kesinlesme_durumu = get("kesinlesmeDurumu")
+        self.birim_ref = self.karar_turu_id = self.kesinlesme_durumu_id = None
+        self.karar_metni = self.metin_ozeti = None
+        return self
+
+    @classmethod
+    def from_page(cls, items: Sequence[dict]) -> List["IctihatRecord"]:
+        dates = parse_api_dates([item.get("kararTarihi") for item in items])
+        return [cls.from_api(item, karar_tarihi) for item, karar_tarihi in zip(items, dates)]
+
+
+class MevzuatRecord(_Record):
+    """searchDocuments mevzuatList öğesi, mevzuatlar kolonlarıyla"""
+
+    __slots__ = (
+        "mevzuat_id", "mevzuat_no", "mevzuat_adi", "mevzuat_tur", "mevzuat_tur_adi",
+        "mevzuat_tertip", "kayit_tarihi", "guncelleme_tarihi", "resmi_gazete_tarihi",
+        "resmi_gazete_sayisi", "url",
+        # İçerik çekildiyse MevzuatDatabase tarafından doldurulur
+        "icerik", "icerik_guncelleme_tarihi",
+    )
+
+    @classmethod
+    def from_api(cls, item: dict, dates: Optional[tuple] = None) -> "MevzuatRecord":
+        get = item.get
+        if dates is None:
+            dates = tuple(parse_api_datetime(get(name)) for name in MEVZUAT_DATE_FIELDS)
+        self = cls.__new__(cls)
+        self.mevzuat_id = get("mevzuatId")
+        self.mevzuat_no = get("mevzuatNo")
+        self.mevzuat_adi = get("mevzuatAdi")
+        self.mevzuat_tur, self.mevzuat_tur_adi = _type_fields(get("mevzuatTur"))
+        self.mevzuat_tertip = get("mevzuatTertip")
+        self.kayit_tarihi, self.guncelleme_tarihi, resmi_gazete_tarihi = dates
+        self.resmi_gazete_tarihi = _as_date(resmi_gazete_tarihi)
+        self.resmi_gazete_sayisi = get("resmiGazeteSayisi")
+        self.url = get("url")
+        self.icerik = self.icerik_guncelleme_tarihi = None
+        return self
+
+    @classmethod
+    def from_page(cls, items: Sequence[dict]) -> List["MevzuatRecord"]:
+        columns = [parse_api_dates([item.get(name) for item in items]) for name in MEVZUAT_DATE_FIELDS]
+        return [cls.from_api(item, dates) for item, dates in zip(items, zip(*columns))]
+
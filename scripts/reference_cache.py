@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+API referans verileri (içtihat / mevzuat türleri, birimler) için önbellek
+
+getItemTypes, mevzuatTypes ve getBirimler yanıtları nadiren değişir; her
+planlama adımında ağdan istemek yerine PostgreSQL'de (ictihat_turleri,
+mevzuat_turleri, ictihat_birimleri) ve süreç belleğinde tutulur. Her kaynağın
+son yenilenme zamanı referans_yenilemeleri tablosundadır; süresi (TTL) dolan
+kaynak, bir API istemcisi verilmişse ağdan yenilenir. İstemci verilmezse
+(migrasyon ve raporlama araçları) ya da istek başarısız olursa veritabanındaki
+son bilinen liste kullanılır. ICTIHAT_TURLERI / MEVZUAT_TURLERI yalnızca boş
+tabloda başlangıç değeridir.
+
+TTL REFERENCE_TTL_HOURS ortam değişkeniyle ayarlanır (varsayılan: 168 saat).
+"""
+
+import os
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = int(float(os.getenv("REFERENCE_TTL_HOURS", "168")) * 3600)
+
+REFERENCE_SQL = """
+CREATE TABLE IF NOT EXISTS ictihat_birimleri (
+    item_type VARCHAR(50) NOT NULL,
+    birim_id VARCHAR(50) NOT NULL,
+    adi VARCHAR(200) NOT NULL,
+    aktif BOOLEAN NOT NULL DEFAULT TRUE,
+    PRIMARY KEY (item_type, birim_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ictihat_birimleri_adi ON ictihat_birimleri(adi);
+
+CREATE TABLE IF NOT EXISTS referans_yenilemeleri (
+    kaynak VARCHAR(100) PRIMARY KEY,
+    yenilenme_tarihi TIMESTAMP NOT NULL
+);
+"""
+
+# Tür kaynağı -> sözlük tablosu
+TYPE_TABLES = {
+    "ictihat_turleri": "ictihat_turleri",
+    "mevzuat_turleri": "mevzuat_turleri",
+}
+
+
+def _field(item: dict, *names: str) -> Optional[str]:
+    for name in names:
+        value = item.get(name)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+class ReferenceCache:
+    """Tür ve birim listeleri: bellek -> PostgreSQL -> (TTL dolduysa) API"""
+
+    def __init__(self, conn, ictihat_api=None, mevzuat_api=None, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.conn = conn
+        self.ictihat_api = ictihat_api
+        self.mevzuat_api = mevzuat_api
+        self.ttl_seconds = ttl_seconds
+        # kaynak -> (yüklenme zamanı, değer)
+        self._memory: Dict[str, Tuple[float, object]] = {}
+
+    def install(self) -> "ReferenceCache":
+        with self.conn.cursor() as cur:
+            cur.execute(REFERENCE_SQL)
+        self.conn.commit()
+        return self
+
+    # --- Yenileme ----------------------------------------------------------
+
+    def _is_fresh(self, kaynak: str) -> bool:
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT yenilenme_tarihi > CURRENT_TIMESTAMP - make_interval(secs => %s)
+                FROM referans_yenilemeleri WHERE kaynak = %s
+            """, (self.ttl_seconds, kaynak))
+            row = cur.fetchone()
+        self.conn.commit()
+        return bool(row and row[0])
+
+    def _mark_refreshed(self, cur, kaynak: str):
+        cur.execute("""
+            INSERT INTO referans_yenilemeleri (kaynak, yenilenme_tarihi) VALUES (%s, CURRENT_TIMESTAMP)
+            ON CONFLICT (kaynak) DO UPDATE SET yenilenme_tarihi = EXCLUDED.yenilenme_tarihi
+        """, (kaynak,))
+
+    def _refresh_types(self, kaynak: str, items: List[dict]) -> bool:
+        rows = {}
+        for item in items:
+            kod = _field(item, "name", "kod", "itemType", "mevzuatTur")
+            if kod:
+                rows[kod] = _field(item, "description", "adi", "aciklama") or kod
+        if not rows:
+            return False
+        table = TYPE_TABLES[kaynak]
+        with self.conn.cursor() as cur:
+            execute_values(cur, f"""
+                INSERT INTO {table} (kod, adi) VALUES %s
+                ON CONFLICT (kod) DO UPDATE SET adi = EXCLUDED.adi, aktif = TRUE
+            """, list(rows.items()))
+            cur.execute(f"UPDATE {table} SET aktif = FALSE WHERE aktif AND NOT (kod = ANY(%s))", (list(rows),))
+            self._mark_refreshed(cur, kaynak)
+        self.conn.commit()
+        return True
+
+    def _refresh_birimler(self, item_type: str, items: List[dict]) -> bool:
+        rows = {}
+        for item in items:
+            birim_id = _field(item, "birimId", "id")
+            if birim_id:
+                rows[birim_id] = _field(item, "birimAdi", "adi", "name", "description") or birim_id
+        if not rows:
+            return False
+        with self.conn.cursor() as cur:
+            execute_values(cur, """
+                INSERT INTO ictihat_birimleri (item_type, birim_id, adi) VALUES %s
+                ON CONFLICT (item_type, birim_id) DO UPDATE SET adi = EXCLUDED.adi, aktif = TRUE
+            """, [(item_type, birim_id, adi) for birim_id, adi in rows.items()])
+            cur.execute("""
+                UPDATE ictihat_birimleri SET aktif = FALSE
+                WHERE item_type = %s AND aktif AND NOT (birim_id = ANY(%s))
+            """, (item_type, list(rows)))
+            self._mark_refreshed(cur, f"birimler:{item_type}")
+        self.conn.commit()
+        return True
+
+    def _load(self, kaynak: str, fetch, store, read, force: bool = False):
+        """Bellekte taze değilse: veritabanı taze değilse (ve istemci varsa) ağdan yenile, sonra oku"""
+        cached = self._memory.get(kaynak)
+        if cached and not force and time.time() - cached[0] < self.ttl_seconds:
+            return cached[1]
+        if fetch is not None and (force or not self._is_fresh(kaynak)):
+            try:
+                if store(fetch()):
+                    logger.info(f"Referans verisi yenilendi: {kaynak}")
+                else:
+                    logger.warning(f"Referans verisi boş döndü, son bilinen liste kullanılıyor: {kaynak}")
+            except Exception as e:
+                self.conn.rollback()
+                logger.warning(f"Referans verisi yenilenemedi ({kaynak}): {e}")
+        value = read()
+        self._memory[kaynak] = (time.time(), value)
+        return value
+
+    def _read_types(self, table: str, seed: Dict[str, str]) -> Dict[str, str]:
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT kod, adi FROM {table} WHERE aktif ORDER BY id")
+            types = dict(cur.fetchall())
+        self.conn.commit()
+        return types or dict(seed)
+
+    def _read_birimler(self, item_type: str) -> Dict[str, str]:
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT birim_id, adi FROM ictihat_birimleri WHERE item_type = %s AND aktif "
+                        "ORDER BY adi", (item_type,))
+            birimler = dict(cur.fetchall())
+        self.conn.commit()
+        return birimler
+
+    # --- Okuma -------------------------------------------------------------
+
+    def item_types(self, seed: Optional[Dict[str, str]] = None, force: bool = False) -> Dict[str, str]:
+        """İçtihat türü kodu -> adı"""
+        api = self.ictihat_api
+        return self._load("ictihat_turleri", api.get_item_types if api else None,
+                          lambda items: self._refresh_types("ictihat_turleri", items),
+                          lambda: self._read_types("ictihat_turleri", seed or {}), force)
+
+    def mevzuat_types(self, seed: Optional[Dict[str, str]] = None, force: bool = False) -> Dict[str, str]:
+        """Mevzuat türü kodu -> adı"""
+        api = self.mevzuat_api
+        return self._load("mevzuat_turleri", api.get_mevzuat_types if api else None,
+                          lambda items: self._refresh_types("mevzuat_turleri", items),
+                          lambda: self._read_types("mevzuat_turleri", seed or {}), force)
+
+    def birimler(self, item_type: str, force: bool = False) -> Dict[str, str]:
+        """Bir içtihat türünün birimleri: birim_id -> adı"""
+        api = self.ictihat_api
+        return self._load(f"birimler:{item_type}",
+                          (lambda: api.get_birimler(item_type)) if api else None,
+                          lambda items: self._refresh_birimler(item_type, items),
+                          lambda: self._read_birimler(item_type), force)
+
+    def birim_adi(self, item_type: str, birim_id: Optional[str]) -> Optional[str]:
+        return self.birimler(item_type).get(birim_id) if birim_id else None
+
+    def birim_id(self, item_type: str, adi: Optional[str]) -> Optional[str]:
+        if not adi:
+            return None
+        for birim_id, birim_adi in self.birimler(item_type).items():
+            if birim_adi == adi:
+                return birim_id
+        return None
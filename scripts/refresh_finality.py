@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Kesinleşmemiş Kararların Kesinleşme Durumunu Yenileme
+
+kesinlesme_durumu zamanla değişir (temyiz aşamasında -> kesinleşti); bu
+değişikliği almanın tek yolu yılların tamamını yeniden çekmekti. Bu script
+yalnızca durumu henüz kesin olmayan ictihatlar satırlarını seçer:
+
+  - en eski karar önce (kesinleşmiş olma olasılığı en yüksek olanlar), yeni
+    verilmiş kararlar (--min-age-days) ve yakın zamanda sorgulanmış satırlar
+    (--recheck-days, kesinlesme_kontrolleri) atlanır
+  - satırlar (içtihat türü, birim, karar yılı) gruplarına ayrılır ve her grup
+    searchDocuments'ın itemTypeList / birimIdList / kararNoYil filtreleriyle,
+    en eski karar önce, gruptaki tüm kararlar bulunana kadar (en fazla
+    --max-pages) sayfa sayfa sorgulanır
+  - yalnızca durumu değişen satırlar tek bir toplu UPDATE ile yazılır
+    (updated_at ilerler, ES migrasyonu bu satırları alır); bulunsun ya da
+    bulunmasın sorgulanan tüm satırların kontrol zamanı kesinlesme_kontrolleri
+    tablosuna yazılır (ictihatlar güncellenmez, updated_at ilerlemez)
+
+Hangi durumların kesin sayıldığı kesinlesme_durumlari.adi üzerinden
+--final-pattern ile belirlenir (varsayılan: "Kesinleşti", "Kesinleşmiştir").
+
+Kullanım:
+    python refresh_finality.py
+    python refresh_finality.py --type YARGITAYKARARI --limit 5000
+    python refresh_finality.py --min-age-days 60 --recheck-days 14 --dry-run
+
+Gereksinimler:
+    pip install requests psycopg2-binary
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre
+"""
+
+import re
+import sys
+import math
+import time
+import argparse
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    from psycopg2.extras import execute_values
+except ImportError:
+    print("❌ psycopg2 yüklü değil. Lütfen çalıştırın: pip install psycopg2-binary")
+    sys.exit(1)
+
+from db_config import POSTGRES_CONFIG
+from ictihat_scraper import ICTIHAT_TURLERI, IctihatAPI, IctihatDatabase
+from crawl_queue import PAGE_SIZE
+from reference_cache import ReferenceCache
+
+DEFAULT_FINAL_PATTERN = r"^kesinle[sş](ti|miş)"
+DEFAULT_LIMIT = 10000
+DEFAULT_MIN_AGE_DAYS = 30
+DEFAULT_RECHECK_DAYS = 7
+DEFAULT_MAX_PAGES = 20
+
+# (içtihat türü, birim_id, karar yılı)
+GroupKey = Tuple[str, Optional[str], Optional[int]]
+
+# Kontrol zamanı ictihatlar'da tutulursa her kontrol updated_at trigger'ını çalıştırır
+KONTROL_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS kesinlesme_kontrolleri (
+    document_id VARCHAR(50) PRIMARY KEY,
+    kontrol_tarihi TIMESTAMP NOT NULL
+)
+"""
+
+PENDING_SQL = """
+SELECT i.document_id, i.item_type, i.birim_id, i.karar_no_yil, i.kesinlesme_durumu_id
+FROM ictihatlar i
+LEFT JOIN kesinlesme_kontrolleri k ON k.document_id = i.document_id
+WHERE i.kesinlesme_durumu_id IS NOT NULL
+  AND NOT (i.kesinlesme_durumu_id = ANY(%(final_ids)s))
+  AND (i.karar_tarihi IS NULL OR i.karar_tarihi <= CURRENT_DATE - %(min_age_days)s)
+  AND (k.kontrol_tarihi IS NULL
+       OR k.kontrol_tarihi < CURRENT_TIMESTAMP - make_interval(days => %(recheck_days)s))
+  AND (%(item_type)s IS NULL OR i.item_type = %(item_type)s)
+ORDER BY i.karar_tarihi NULLS LAST
+LIMIT %(limit)s
+"""
+
+
+def turkish_lower(text: str) -> str:
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def final_status_ids(conn, pattern: str) -> List[int]:
+    """kesinlesme_durumlari'nda adı kalıba uyan (kesin) durumların id'leri"""
+    final_re = re.compile(pattern)
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, adi FROM kesinlesme_durumlari")
+        rows = cur.fetchall()
+    conn.commit()
+    return [status_id for status_id, adi in rows if final_re.search(turkish_lower(adi.strip()))]
+
+
+def load_pending(conn, final_ids: List[int], args) -> "OrderedDict[GroupKey, Dict[str, int]]":
+    """Kesinleşmemiş satırları en eski karar önce seç ve sorgu gruplarına ayır"""
+    groups: "OrderedDict[GroupKey, Dict[str, int]]" = OrderedDict()
+    with conn.cursor() as cur:
+        cur.execute(PENDING_SQL, {
+            "final_ids": final_ids, "min_age_days": args.min_age_days,
+            "recheck_days": args.recheck_days, "item_type": args.type, "limit": args.limit,
+        })
+        for document_id, item_type, birim_id, karar_no_yil, status_id in cur.fetchall():
+            # Grup sırası, grubun en eski kararının sırasıdır
+            groups.setdefault((item_type, birim_id, karar_no_yil), {})[document_id] = status_id
+    conn.commit()
+    return groups
+
+
+def query_group(api: IctihatAPI, key: GroupKey, pending: Set[str],
+                max_pages: int) -> Tuple[Dict[str, Optional[str]], int, int, bool]:
+    """
+    Grubu filtreyle sayfa sayfa sorgula; gruptaki kararların güncel durumlarını,
+    yapılan istek sayısını, grubun toplam kayıt sayısını ve sorgunun hatasız
+    tamamlanıp tamamlanmadığını döndür. Bekleyen
+    satırlar en eski kararlar olduğundan sayfalar eskiden yeniye okunur;
+    azalan sırada --max-pages en eski kararlara hiç ulaşmaz.
+    """
+    item_type, birim_id, karar_yil = key
+    remaining = set(pending)
+    found: Dict[str, Optional[str]] = {}
+    total = 0
+    page = 0
+    while remaining and page < max_pages:
+        page += 1
+        result = api.search_ictihat(item_type, page, PAGE_SIZE, birim_id=birim_id,
+                                    karar_yil=karar_yil, sort_direction="asc")
+        if result is None:
+            # Ağ / API hatası "bulunamadı" değildir; kalan satırlar işaretlenmez
+            return found, page, total, False
+        records = result.get("emsalKararList") or []
+        total = result.get("total", total)
+        for ictihat in records:
+            document_id = ictihat.get("documentId")
+            if document_id in remaining:
+                remaining.discard(document_id)
+                found[document_id] = ictihat.get("kesinlesmeDurumu")
+        if len(records) < PAGE_SIZE:
+            break
+    return found, page, total, True
+
+
+def apply_changes(db: IctihatDatabase, pending: Dict[str, int], found: Dict[str, Optional[str]],
+                  dry_run: bool = False, queried: bool = True) -> int:
+    """
+    Durumu değişen satırları yaz ve satırları kontrol edildi olarak işaretle:
+    grup hatasız sorgulandıysa bulunamayanlar dahil tümü, sorgu yarıda
+    kaldıysa (queried=False) yalnızca bulunanlar
+    """
+    lookup = db.lookups["kesinlesme"]
+    changed = []
+    for document_id, durum in found.items():
+        status_id = lookup.get_id(durum)
+        if status_id is not None and status_id != pending[document_id]:
+            changed.append((document_id, status_id, durum))
+    if dry_run:
+        return len(changed)
+
+    legacy_text = "kesinlesme_durumu" in db.legacy_columns
+    with db.conn.cursor() as cur:
+        if changed:
+            execute_values(cur, f"""
+                UPDATE ictihatlar i SET
+                    kesinlesme_durumu_id = v.status_id::smallint,
+                    {"kesinlesme_durumu = v.durum," if legacy_text else ""}
+                    updated_at = CURRENT_TIMESTAMP
+                FROM (VALUES %s) AS v(document_id, status_id, durum)
+                WHERE i.document_id = v.document_id
+                  AND i.kesinlesme_durumu_id IS DISTINCT FROM v.status_id::smallint
+            """, changed)
+        # Hatasız sorgulanan gruplarda bulunamayanlar da işaretlenir; yoksa her
+        # çalıştırmada yeniden seçilirler
+        checked = [(document_id,) for document_id in (pending if queried else found)]
+        if checked:
+            execute_values(cur, """
+                INSERT INTO kesinlesme_kontrolleri (document_id, kontrol_tarihi)
+                VALUES %s
+                ON CONFLICT (document_id) DO UPDATE SET kontrol_tarihi = EXCLUDED.kontrol_tarihi
+            """, checked, template="(%s, CURRENT_TIMESTAMP)")
+    db.conn.commit()
+    return len(changed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kesinleşmemiş kararların kesinleşme durumunu yenile")
+    parser.add_argument("--type", "-t", choices=list(ICTIHAT_TURLERI.keys()),
+                        help="Yalnızca bu içtihat türü")
+    parser.add_argument("--limit", "-l", type=int, default=DEFAULT_LIMIT,
+                        help="Bir çalıştırmada sorgulanacak en fazla karar")
+    parser.add_argument("--min-age-days", type=int, default=DEFAULT_MIN_AGE_DAYS,
+                        help="Bu kadar günden yeni kararları atla (henüz kesinleşemez)")
+    parser.add_argument("--recheck-days", type=int, default=DEFAULT_RECHECK_DAYS,
+                        help="Son bu kadar gün içinde sorgulanmış kararları atla")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES,
+                        help=f"Grup başına en fazla sayfa ({PAGE_SIZE} kayıt/sayfa)")
+    parser.add_argument("--final-pattern", default=DEFAULT_FINAL_PATTERN,
+                        help="Kesin sayılan kesinlesme_durumlari.adi kalıbı (küçük harfle eşleşir)")
+    parser.add_argument("--delay", "-d", type=float, default=0.5,
+                        help="İstekler arası bekleme süresi (saniye)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Değişiklikleri say, veritabanına yazma")
+    args = parser.parse_args()
+
+    if not POSTGRES_CONFIG["password"]:
+        print("❌ POSTGRES_PASSWORD tanımlı değil! .env dosyasını kontrol edin.")
+        sys.exit(1)
+
+    api = IctihatAPI(rate_limit_delay=args.delay)
+    db = IctihatDatabase()
+    db.connect()
+    started = time.time()
+    try:
+        # Sözlük önbellekleri ve kontrol zamanı tablosu
+        db.create_tables()
+        with db.conn.cursor() as cur:
+            cur.execute(KONTROL_TABLE_SQL)
+        db.conn.commit()
+        final_ids = final_status_ids(db.conn, args.final_pattern)
+        if not final_ids:
+            print(f"❌ kesinlesme_durumlari'nda '{args.final_pattern}' kalıbına uyan durum yok")
+            sys.exit(1)
+        # Birim adları yalnızca veritabanındaki referans listesinden okunur (ağ isteği yok)
+        reference = ReferenceCache(db.conn).install()
+        groups = load_pending(db.conn, final_ids, args)
+        selected = sum(len(pending) for pending in groups.values())
+        print(f"🔎 {selected:,} kesinleşmemiş karar, {len(groups):,} sorgu grubu")
+
+        requests_made = full_pages = found_count = changed_count = skipped = failed_groups = 0
+        for index, (key, pending) in enumerate(groups.items(), 1):
+            item_type, birim_id, karar_yil = key
+            if birim_id is None and karar_yil is None:
+                # Filtresiz arama güncel yılı döndürür; bu satırlar gruplanamaz.
+                # İşaretlenmezlerse her çalıştırmada --limit'i yeniden doldururlar
+                skipped += len(pending)
+                apply_changes(db, pending, {}, args.dry_run)
+                continue
+            found, pages, total, queried = query_group(api, key, set(pending), args.max_pages)
+            if not queried:
+                failed_groups += 1
+            requests_made += pages
+            full_pages += max(math.ceil(total / PAGE_SIZE), pages)
+            found_count += len(found)
+            changed_count += apply_changes(db, pending, found, args.dry_run, queried)
+            birim = reference.birim_adi(item_type, birim_id) or birim_id or "-"
+            print(f"  [{index}/{len(groups)}] {item_type} {karar_yil or '-'} {birim}: "
+                  f"{len(found)}/{len(pending)} bulundu, {pages} istek", end="\r")
+    finally:
+        db.close()
+
+    print()
+    print(f"✓ {found_count:,}/{selected:,} karar sorgulandı, {changed_count:,} durum "
+          f"{'değişecek' if args.dry_run else 'güncellendi'} ({time.time() - started:.1f} sn)")
+    print(f"  {requests_made:,} arama isteği (aynı grupların tam taraması: {full_pages:,} sayfa)")
+    if skipped:
+        print(f"  ⚠ {skipped:,} kararın birimi ve karar yılı yok, atlandı")
+    if failed_groups:
+        print(f"  ⚠ {failed_groups:,} grubun araması hata verdi; bulunamayan kararları "
+              "sonraki çalıştırmada yeniden sorgulanacak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Sürekli çalışan scraper servisi (fetch_all_data.py --daemon)
+
+Cron ile her çalıştırmada yeni Python süreçleri başlar: yorumlayıcı açılışı,
+importlar, .env okuma, yeni PostgreSQL bağlantısı, create_tables DDL'i ve soğuk
+bir HTTP oturumu her seferinde yeniden ödenir. Bu servis tek süreçte:
+
+  - API istemcilerini (requests.Session bağlantı havuzu) ve veritabanı
+    bağlantılarını açık tutar; create_tables yalnızca açılışta bir kez çalışır,
+    kopan bağlantı bir sonraki görevde yeniden açılır
+  - her içtihat türünü ve mevzuatları kendi aralığında artımlı senkronize eder
+    (örn. Yargıtay saatlik, mevzuat günlük): liste en yeniden eskiye okunur,
+    yalnızca veritabanında olmayan kayıtlar yazılır, art arda `stop_after_known`
+    sayfa tamamen bilinen kayıtlardan oluşunca tür için çekim durur. Mevzuat
+    listesi (yalnızca üst veri) baştan sona okunur: guncelleme_tarihi ilerlemiş,
+    yani değişiklik görmüş kayıtlar da yeniden yazılır, içerikleri
+    stale_content ile yeniden çekilir
+  - GET /health (200 / 503) ve GET /status (görev bazında son çalışma, süre,
+    kayıt sayısı, hata, sonraki çalışma) uç noktalarını sunar
+
+SIGTERM / SIGINT ile mevcut sayfa bitince düzgün kapanır.
+"""
+
+import re
+import json
+import time
+import signal
+import logging
+import argparse
+import threading
+from datetime import datetime
+from itertools import islice
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import psycopg2
+
+from ictihat_scraper import (
+    ICTIHAT_TURLERI,
+    IctihatAPI,
+    IctihatDatabase,
+    create_content_pipeline,
+    iter_with_content,
+    write_batch_size,
+)
+from mevzuat_scraper import MEVZUAT_TURLERI, MevzuatAPI, MevzuatDatabase
+from content_pipeline import DEFAULT_BATCH_SIZE as CONTENT_BATCH_SIZE
+from records import IctihatRecord, MevzuatRecord, batched
+
+logger = logging.getLogger(__name__)
+
+# Görev adı: içtihat türü kodu ya da "mevzuat" (tüm mevzuat türleri)
+MEVZUAT_TASK = "mevzuat"
+DEFAULT_SCHEDULES = {
+    "YARGITAYKARARI": "1h",
+    "DANISTAYKARAR": "6h",
+    "ISTINAFHUKUK": "6h",
+    "YERELHUKUK": "12h",
+    "KYB": "1d",
+    MEVZUAT_TASK: "1d",
+}
+DEFAULT_PORT = 8085
+DEFAULT_STOP_AFTER_KNOWN = 2
+PAGE_SIZE = 100
+# Döngü bu süre boyunca ilerleme bildirmezse /health 503 döner
+HEARTBEAT_TIMEOUT = 900
+
+INTERVAL_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhd]?)$")
+INTERVAL_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_interval(value: str) -> int:
+    """"90s", "15m", "1h", "1d" ya da saniye"""
+    match = INTERVAL_RE.match(value.strip().lower())
+    if not match:
+        raise ValueError(f"Geçersiz aralık: {value}")
+    return int(float(match.group(1)) * INTERVAL_UNITS[match.group(2)])
+
+
+def parse_schedules(items: Optional[List[str]]) -> Dict[str, int]:
+    """Varsayılan takvimi TÜR=ARALIK girdileriyle güncelle (ARALIK 0: görevi kapat)"""
+    schedules = dict(DEFAULT_SCHEDULES)
+    for item in items or []:
+        name, _, interval = item.partition("=")
+        name = name.strip()
+        if name != MEVZUAT_TASK and name not in ICTIHAT_TURLERI:
+            raise ValueError(f"Bilinmeyen görev: {name} "
+                             f"(seçenekler: {', '.join(list(ICTIHAT_TURLERI) + [MEVZUAT_TASK])})")
+        schedules[name] = interval
+    return {name: parse_interval(interval) for name, interval in schedules.items()
+            if parse_interval(interval) > 0}
+
+
+class SyncTask:
+    """Bir senkronizasyon görevinin takvimi ve son çalışma durumu"""
+
+    def __init__(self, name: str, interval: int):
+        self.name = name
+        self.interval = interval
+        self.next_run = time.time()
+        self.running = False
+        self.runs = 0
+        self.last_started: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_count: Optional[int] = None
+        self.last_error: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        def iso(ts):
+            return datetime.fromtimestamp(ts).isoformat(timespec="seconds") if ts else None
+        return {
+            "interval_seconds": self.interval,
+            "running": self.running,
+            "runs": self.runs,
+            "last_started": iso(self.last_started),
+            "last_duration_seconds": round(self.last_duration, 1) if self.last_duration is not None else None,
+            "last_count": self.last_count,
+            "last_error": self.last_error,
+            "next_run": iso(self.next_run),
+        }
+
+
+class ScraperDaemon:
+    """Sıcak HTTP/DB bağlantılarıyla takvime göre artımlı senkronizasyon"""
+
+    def __init__(self, schedules: Dict[str, int], with_content: bool = False, delay: float = 0.5,
+                 port: int = DEFAULT_PORT, stop_after_known: int = DEFAULT_STOP_AFTER_KNOWN,
+                 processes: int = 0, download_workers: int = 1):
+        self.tasks = {name: SyncTask(name, interval) for name, interval in schedules.items()}
+        self.with_content = with_content
+        self.port = port
+        self.stop_after_known = stop_after_known
+        # iter_with_content'in beklediği ayarlar
+        self.content_args = argparse.Namespace(with_content=with_content, processes=processes,
+                                               download_workers=download_workers,
+                                               content_batch_size=CONTENT_BATCH_SIZE)
+        self.ictihat_api = IctihatAPI(rate_limit_delay=delay)
+        # Süreç havuzu (--processes) servis boyunca bir kez kurulur, senkron / yıl başına değil
+        self.content_pipeline = create_content_pipeline(self.ictihat_api, self.content_args)
+        self.mevzuat_api = MevzuatAPI(rate_limit_delay=delay)
+        self.ictihat_db = IctihatDatabase()
+        self.mevzuat_db = MevzuatDatabase()
+        self.stopping = threading.Event()
+        self.started_at = time.time()
+        self.heartbeat = time.time()
+
+    # --- Bağlantılar -------------------------------------------------------
+
+    def open_databases(self):
+        """Bağlan ve DDL'i süreç ömründe bir kez çalıştır"""
+        if any(name != MEVZUAT_TASK for name in self.tasks):
+            self.ictihat_db.connect()
+            self.ictihat_db.create_tables()
+        if MEVZUAT_TASK in self.tasks:
+            self.mevzuat_db.connect()
+            self.mevzuat_db.create_tables()
+
+    def ensure_connection(self, db):
+        """Kopan bağlantıyı yeniden aç (tablo ve önbellekler açılıştan geçerli)"""
+        try:
+            if db.conn is not None and not db.conn.closed:
+                # Önceki görevden yarım kalmış işlem varsa geri al
+                db.conn.rollback()
+                with db.conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                db.conn.rollback()
+                return
+        except psycopg2.Error as e:
+            logger.warning(f"Veritabanı bağlantısı kopmuş, yeniden bağlanılıyor: {e}")
+        db.connect()
+        for cache in getattr(db, "lookups", {}).values():
+            cache.conn = db.conn
+        if getattr(db, "tur_cache", None) is not None:
+            db.tur_cache.conn = db.conn
+
+    def close(self):
+        if self.content_pipeline:
+            self.content_pipeline.close()
+        for db in (self.ictihat_db, self.mevzuat_db):
+            db.close()
+
+    # --- Senkronizasyon ----------------------------------------------------
+
+    def _known_ids(self, db, table: str, column: str, ids: List[str]) -> set:
+        with db.conn.cursor() as cur:
+            cur.execute(f"SELECT {column} FROM {table} WHERE {column} = ANY(%s)", (ids,))
+            known = {row[0] for row in cur.fetchall()}
+        db.conn.commit()
+        return known
+
+    def _changed(self, records: Iterable, select: Callable[[list], list],
+                 early_stop: bool = True) -> Iterator:
+        """
+        Listeyi (en yeniden eskiye) PAGE_SIZE'lık parçalarla oku ve her parçadan
+        `select`'in yazılacak dediği öğeleri üret; early_stop ile art arda
+        `stop_after_known` parçada yazılacak bir şey çıkmayınca sayfalama durur
+        """
+        records = iter(records)
+        known_streak = 0
+        try:
+            while not self.stopping.is_set():
+                page = list(islice(records, PAGE_SIZE))
+                if not page:
+                    break
+                self.heartbeat = time.time()
+                selected = select(page)
+                if not selected:
+                    known_streak += 1
+                    if early_stop and known_streak >= self.stop_after_known:
+                        break
+                    continue
+                known_streak = 0
+                yield from selected
+        finally:
+            # Sayfalama üretecini kapat: sonraki sayfalar istenmez
+            close = getattr(records, "close", None)
+            if close:
+                close()
+
+    def _new_ictihatlar(self, page: List[IctihatRecord]) -> List[IctihatRecord]:
+        """Veritabanında olmayan içtihatlar"""
+        known = self._known_ids(self.ictihat_db, "ictihatlar", "document_id",
+                                [ictihat.document_id for ictihat in page if ictihat.document_id])
+        return [ictihat for ictihat in page if ictihat.document_id and ictihat.document_id not in known]
+
+    def _changed_mevzuatlar(self, page: List[MevzuatRecord]) -> List[Tuple[MevzuatRecord, bool]]:
+        """
+        Yeni ya da listedeki guncelleme_tarihi ilerlemiş (değişiklik görmüş) mevzuatlar,
+        içeriğin yeniden çekilip çekilmeyeceğiyle birlikte. İçerik kararı
+        MevzuatDatabase.stale_content'e bırakılır (--with-content ile).
+        """
+        db = self.mevzuat_db
+        listed = [mevzuat for mevzuat in page if mevzuat.mevzuat_id]
+        with db.conn.cursor() as cur:
+            cur.execute("SELECT mevzuat_id, guncelleme_tarihi FROM mevzuatlar WHERE mevzuat_id = ANY(%s)",
+                        ([mevzuat.mevzuat_id for mevzuat in listed],))
+            stored = dict(cur.fetchall())
+        db.conn.commit()
+        stale = db.stale_content(listed) if self.with_content else set()
+        changed = []
+        for mevzuat in listed:
+            refetch = mevzuat.mevzuat_id in stale
+            if mevzuat.mevzuat_id not in stored:
+                changed.append((mevzuat, refetch))
+                continue
+            tarih = stored[mevzuat.mevzuat_id]
+            if refetch or (mevzuat.guncelleme_tarihi and (tarih is None or mevzuat.guncelleme_tarihi > tarih)):
+                changed.append((mevzuat, refetch))
+        return changed
+
+    def sync_ictihat(self, item_type: str) -> int:
+        db, api = self.ictihat_db, self.ictihat_api
+        self.ensure_connection(db)
+        year = datetime.now().year
+        written = 0
+        # Önceki yılın geç yayımlanan kararları için bir önceki yıl da taranır
+        for karar_yil in (year, year - 1):
+            new = self._changed(api.fetch_ictihat_by_year(item_type, karar_yil), self._new_ictihatlar)
+            rows = iter_with_content(api, new, self.content_args, self.content_pipeline)
+            for batch in batched(rows, write_batch_size(self.content_args)):
+                written += db.upsert_ictihat_batch(batch)
+        return written
+
+    def sync_mevzuat(self) -> int:
+        db, api = self.mevzuat_db, self.mevzuat_api
+        self.ensure_connection(db)
+        written = 0
+        for mevzuat_tur in MEVZUAT_TURLERI:
+            # Bilinen mevzuatlar da değişiklik (guncelleme_tarihi) gördüyse yeniden yazılır.
+            # Liste resmi gazete tarihine göre sıralı olduğundan eski bir kanunun değişikliği
+            # listenin sonunda kalabilir; mevzuat listesi erken durdurulmadan baştan sona okunur
+            for mevzuat, refetch in self._changed(api.fetch_all_mevzuat(mevzuat_tur),
+                                                  self._changed_mevzuatlar, early_stop=False):
+                icerik = None
+                if refetch:
+                    icerik = api.get_mevzuat_content(mevzuat.mevzuat_id)
+                db.upsert_mevzuat(mevzuat, icerik)
+                written += 1
+        return written
+
+    def run_task(self, task: SyncTask):
+        task.running = True
+        task.last_started = time.time()
+        task.last_error = None
+        logger.info(f"Senkronizasyon başladı: {task.name}")
+        try:
+            if task.name == MEVZUAT_TASK:
+                task.last_count = self.sync_mevzuat()
+            else:
+                task.last_count = self.sync_ictihat(task.name)
+            logger.info(f"Senkronizasyon bitti: {task.name}, {task.last_count} yeni kayıt")
+        except Exception as e:
+            task.last_error = f"{type(e).__name__}: {e}"
+            logger.exception(f"Senkronizasyon hatası: {task.name}")
+        finally:
+            task.running = False
+            task.runs += 1
+            task.last_duration = time.time() - task.last_started
+            task.next_run = task.last_started + task.interval
+            self.heartbeat = time.time()
+
+    def loop(self):
+        """Zamanı gelen görevleri sırayla çalıştır (istekler tek hız sınırını paylaşır)"""
+        while not self.stopping.is_set():
+            self.heartbeat = time.time()
+            due = sorted((t for t in self.tasks.values() if t.next_run <= time.time()),
+                         key=lambda t: t.next_run)
+            if due:
+                self.run_task(due[0])
+                continue
+            next_run = min(t.next_run for t in self.tasks.values())
+            self.stopping.wait(min(max(next_run - time.time(), 0), 60))
+
+    # --- Sağlık / durum ----------------------------------------------------
+
+    def healthy(self) -> bool:
+        connections_open = all(
+            db.conn is not None and not db.conn.closed
+            for db, used in ((self.ictihat_db, any(n != MEVZUAT_TASK for n in self.tasks)),
+                             (self.mevzuat_db, MEVZUAT_TASK in self.tasks))
+            if used
+        )
+        return connections_open and time.time() - self.heartbeat < HEARTBEAT_TIMEOUT
+
+    def status(self) -> dict:
+        return {
+            "healthy": self.healthy(),
+            "uptime_seconds": int(time.time() - self.started_at),
+            "seconds_since_heartbeat": int(time.time() - self.heartbeat),
+            "with_content": self.with_content,
+            "tasks": {name: task.as_dict() for name, task in self.tasks.items()},
+        }
+
+    def serve(self) -> ThreadingHTTPServer:
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/health":
+                    healthy = daemon.healthy()
+                    code, body = (200 if healthy else 503), {"status": "ok" if healthy else "unhealthy"}
+                elif self.path == "/status":
+                    code, body = 200, daemon.status()
+                else:
+                    code, body = 404, {"error": "not found"}
+                payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        server = ThreadingHTTPServer(("0.0.0.0", self.port), Handler)
+        threading.Thread(target=server.serve_forever, name="health-http", daemon=True).start()
+        return server
+
+    def run(self):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: self.stopping.set())
+        self.open_databases()
+        server = self.serve()
+        logger.info(f"Servis başladı (port {self.port}): "
+                    + ", ".join(f"{name} her {task.interval} sn" for name, task in self.tasks.items()))
+        try:
+            self.loop()
+        finally:
+            logger.info("Servis durduruluyor...")
+            server.shutdown()
+            self.close()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Mevzuat Metinlerini Madde Düzeyinde Saklama
+
+mevzuatlar.icerik bir kanunun tamamını tek metin olarak tutar; "TMK m.166"yı
+göstermek için tüm belgeyi çekip taramak gerekir. Bu script icerik'i madde
+başlıklarından (MADDE 166-, GEÇİCİ MADDE 2-, EK MADDE 1-) böler ve
+(mevzuat_id, madde_no) anahtarlı `mevzuat_maddeleri` tablosuna yazar. Her
+maddenin kendi tsvector kolonu ve GIN indeksi vardır; madde getirme birincil
+anahtar okuması, madde araması ise yalnızca ilgili maddeleri döndüren bir
+indeks taramasıdır.
+
+mevzuat_scraper.py içerik çektiğinde maddeleri aynı transaction'da günceller;
+bu script mevcut kayıtlar için (ve --since ile değişenler için) kullanılır.
+
+Kullanım:
+    python split_mevzuat_articles.py
+    python split_mevzuat_articles.py --since "2024-06-01"
+    python split_mevzuat_articles.py --type KANUN --batch-size 100
+
+Gereksinimler:
+    pip install psycopg2-binary
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre
+"""
+
+import sys
+import time
+import argparse
+from typing import List
+
+try:
+    from psycopg2.extras import execute_values
+except ImportError:
+    print("❌ psycopg2 yüklü değil. Lütfen çalıştırın: pip install psycopg2-binary")
+    sys.exit(1)
+
+from db_config import POSTGRES_CONFIG, create_connection
+from passage_chunker import split_articles
+
+DEFAULT_BATCH_SIZE = 200
+
+# mevzuat_id, mevzuatlar.id'ye (SERIAL) başvurur; API kimliği (mevzuatlar.mevzuat_id)
+# yerine tamsayı anahtar atiflar.hedef_mevzuat_id ile doğrudan birleşir
+MEVZUAT_MADDELERI_SQL = """
+CREATE TABLE IF NOT EXISTS mevzuat_maddeleri (
+    mevzuat_id INTEGER NOT NULL REFERENCES mevzuatlar(id) ON DELETE CASCADE,
+    madde_no VARCHAR(20) NOT NULL,
+    sira INTEGER NOT NULL,
+    baslangic INTEGER NOT NULL,
+    bitis INTEGER NOT NULL,
+    metin TEXT NOT NULL,
+    search_vector tsvector GENERATED ALWAYS AS (to_tsvector('turkish', metin)) STORED,
+    PRIMARY KEY (mevzuat_id, madde_no)
+);
+
+CREATE INDEX IF NOT EXISTS idx_mevzuat_maddeleri_search_vector ON mevzuat_maddeleri
+    USING gin(search_vector);
+
+CREATE OR REPLACE FUNCTION search_mevzuat_maddeleri(
+    arama_metni TEXT,
+    mevzuat_turu VARCHAR(50) DEFAULT NULL,
+    sayfa INTEGER DEFAULT 1,
+    sayfa_boyutu INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id INTEGER,
+    mevzuat_no INTEGER,
+    mevzuat_adi TEXT,
+    madde_no VARCHAR(20),
+    metin TEXT,
+    rank REAL
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        m.id,
+        m.mevzuat_no,
+        m.mevzuat_adi,
+        mm.madde_no,
+        mm.metin,
+        ts_rank(mm.search_vector, plainto_tsquery('turkish', arama_metni)) as rank
+    FROM mevzuat_maddeleri mm
+    JOIN mevzuatlar m ON m.id = mm.mevzuat_id
+    WHERE
+        (mevzuat_turu IS NULL OR m.mevzuat_tur = mevzuat_turu)
+        AND mm.search_vector @@ plainto_tsquery('turkish', arama_metni)
+    ORDER BY rank DESC
+    LIMIT sayfa_boyutu
+    OFFSET (sayfa - 1) * sayfa_boyutu;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def article_rows(mevzuat_pk: int, icerik: str) -> List[tuple]:
+    """icerik'ten (mevzuat_id, madde_no, sira, baslangic, bitis, metin) satırları"""
+    return [(mevzuat_pk, madde_no, sira, start, end, icerik[start:end])
+            for sira, (madde_no, start, end) in enumerate(split_articles(icerik), 1)]
+
+
+def replace_articles(cur, mevzuat_pk: int, icerik: str) -> int:
+    """Bir mevzuatın maddelerini silip yeniden yaz (çağıranın transaction'ında)"""
+    rows = article_rows(mevzuat_pk, icerik or "")
+    cur.execute("DELETE FROM mevzuat_maddeleri WHERE mevzuat_id = %s", (mevzuat_pk,))
+    if rows:
+        execute_values(cur, """
+            INSERT INTO mevzuat_maddeleri (mevzuat_id, madde_no, sira, baslangic, bitis, metin)
+            VALUES %s
+        """, rows)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="mevzuatlar.icerik'i mevzuat_maddeleri tablosuna böl")
+    parser.add_argument("--since", type=str,
+                        help="Yalnızca updated_at bu zamandan sonra olan mevzuatları işle")
+    parser.add_argument("--type", "-t", type=str,
+                        help="Yalnızca bu mevzuat türünü işle (örn. KANUN)")
+    parser.add_argument("--batch-size", "-b", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Commit başına mevzuat sayısı")
+    args = parser.parse_args()
+
+    if not POSTGRES_CONFIG["password"]:
+        print("❌ POSTGRES_PASSWORD tanımlı değil! .env dosyasını kontrol edin.")
+        sys.exit(1)
+
+    conditions = ["icerik IS NOT NULL"]
+    params: list = []
+    if args.since:
+        conditions.append("updated_at > %s")
+        params.append(args.since)
+    if args.type:
+        conditions.append("mevzuat_tur = %s")
+        params.append(args.type)
+
+    read_conn = create_connection()
+    write_conn = create_connection()
+    started = time.time()
+    documents = articles = empty = 0
+    try:
+        with write_conn.cursor() as cur:
+            cur.execute(MEVZUAT_MADDELERI_SQL)
+        write_conn.commit()
+
+        with read_conn.cursor(name="article_cursor") as read_cur, write_conn.cursor() as cur:
+            read_cur.itersize = args.batch_size
+            read_cur.execute(f"SELECT id, icerik FROM mevzuatlar WHERE {' AND '.join(conditions)} ORDER BY id",
+                             params)
+            for mevzuat_pk, icerik in read_cur:
+                count = replace_articles(cur, mevzuat_pk, icerik)
+                documents += 1
+                articles += count
+                empty += count == 0
+                if documents % args.batch_size == 0:
+                    write_conn.commit()
+                    elapsed = time.time() - started
+                    print(f"  {documents:,} mevzuat, {articles:,} madde, "
+                          f"{documents / elapsed:,.0f} mevzuat/sn", end="\r")
+        write_conn.commit()
+    finally:
+        read_conn.close()
+        write_conn.close()
+
+    print()
+    print(f"✓ {documents:,} mevzuattan {articles:,} madde yazıldı ({time.time() - started:.1f} sn)")
+    if empty:
+        print(f"  ⚠ {empty:,} mevzuatta madde başlığı bulunamadı (genelge, tebliğ vb. maddesiz metinler)")
+
+
+if __name__ == "__main__":
+    main()
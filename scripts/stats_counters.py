@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tablo istatistikleri için artımlı sayaçlar
+
+ictihatlar ve mevzuatlar için tür, yıl ve içerik var/yok kırılımındaki kayıt
+sayıları kayit_sayaclari tablosunda tutulur. Sayaçları ifade düzeyinde (FOR EACH
+STATEMENT) ve geçiş tablolu (REFERENCING) trigger'lar günceller: her yazma ifadesi
+kendi satırlarını gruplayıp tek bir upsert yapar, boyutları değişmeyen
+güncellemeler (scraper upsert'lerinin çoğu) sayaç satırına hiç dokunmaz.
+Böylece get_stats tam tablo taraması yerine birkaç yüz satırlık bir okuma yapar.
+"""
+
+from collections import Counter
+from typing import Dict
+
+COUNTER_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS kayit_sayaclari (
+    tablo VARCHAR(50) NOT NULL,
+    tur VARCHAR(50) NOT NULL,
+    yil INTEGER NOT NULL,
+    icerikli BOOLEAN NOT NULL,
+    adet BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (tablo, tur, yil, icerikli)
+);
+
+CREATE OR REPLACE FUNCTION kayit_sayaclari_sifirla()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM kayit_sayaclari WHERE tablo = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Tablo -> (tür, yıl, içerik) ifadeleri
+COUNTER_DIMENSIONS = {
+    "ictihatlar": (
+        "COALESCE(item_type, '')",
+        "COALESCE(karar_no_yil, 0)",
+        "COALESCE(karar_metni, '') <> ''",
+    ),
+    "mevzuatlar": (
+        "COALESCE(mevzuat_tur, '')",
+        "COALESCE(EXTRACT(YEAR FROM resmi_gazete_tarihi)::int, 0)",
+        "COALESCE(icerik, '') <> ''",
+    ),
+}
+
+UPSERT_COUNTERS = """
+        ON CONFLICT (tablo, tur, yil, icerikli)
+        DO UPDATE SET adet = kayit_sayaclari.adet + EXCLUDED.adet"""
+
+
+def grouped_sql(table: str, source: str, sign: str = "", with_table: bool = True) -> str:
+    """Kaynak satırları sayaç boyutlarına göre gruplayan SELECT"""
+    tur, yil, icerik = COUNTER_DIMENSIONS[table]
+    label = f"'{table}', " if with_table else ""
+    return (f"SELECT {label}{tur} AS tur, {yil} AS yil, {icerik} AS icerikli, {sign}COUNT(*) "
+            f"FROM {source} GROUP BY tur, yil, icerikli")
+
+
+def counter_function_sql(table: str) -> str:
+    tur, yil, icerik = COUNTER_DIMENSIONS[table]
+    return f"""
+CREATE OR REPLACE FUNCTION {table}_sayaclari_guncelle()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO kayit_sayaclari (tablo, tur, yil, icerikli, adet)
+        {grouped_sql(table, 'yeni_satirlar')}{UPSERT_COUNTERS};
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO kayit_sayaclari (tablo, tur, yil, icerikli, adet)
+        {grouped_sql(table, 'eski_satirlar', '-')}{UPSERT_COUNTERS};
+    ELSE
+        -- Boyutları değişmeyen satırlar birbirini götürür
+        INSERT INTO kayit_sayaclari (tablo, tur, yil, icerikli, adet)
+        SELECT '{table}', d.tur, d.yil, d.icerikli, SUM(d.fark)
+        FROM (
+            SELECT {tur} AS tur, {yil} AS yil, {icerik} AS icerikli, 1 AS fark FROM yeni_satirlar
+            UNION ALL
+            SELECT {tur}, {yil}, {icerik}, -1 FROM eski_satirlar
+        ) d
+        GROUP BY d.tur, d.yil, d.icerikli
+        HAVING SUM(d.fark) <> 0{UPSERT_COUNTERS};
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def trigger_sql(table: str) -> list:
+    function = f"{table}_sayaclari_guncelle"
+    return [
+        f"CREATE TRIGGER {table}_sayac_ekle AFTER INSERT ON {table} "
+        f"REFERENCING NEW TABLE AS yeni_satirlar FOR EACH STATEMENT EXECUTE FUNCTION {function}()",
+        f"CREATE TRIGGER {table}_sayac_guncelle AFTER UPDATE ON {table} "
+        f"REFERENCING OLD TABLE AS eski_satirlar NEW TABLE AS yeni_satirlar "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()",
+        f"CREATE TRIGGER {table}_sayac_sil AFTER DELETE ON {table} "
+        f"REFERENCING OLD TABLE AS eski_satirlar FOR EACH STATEMENT EXECUTE FUNCTION {function}()",
+        f"CREATE TRIGGER {table}_sayac_bosalt AFTER TRUNCATE ON {table} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION kayit_sayaclari_sifirla()",
+    ]
+
+
+def install_counters(conn, table: str) -> bool:
+    """Sayaç tablosunu ve trigger'ları kur; trigger yoksa sayaçları bir kez tam sayımla doldur.
+
+    İlk kurulum sayım süresince tabloya yazmaları bekletir; sonraki çağrılar yalnızca
+    fonksiyon tanımını yeniler. Sayaçlar ilk kez doldurulduysa True döner.
+    """
+    with conn.cursor() as cur:
+        cur.execute(COUNTER_TABLE_SQL)
+        cur.execute(counter_function_sql(table))
+        cur.execute("SELECT 1 FROM pg_trigger WHERE tgrelid = %s::regclass AND tgname = %s",
+                    (table, f"{table}_sayac_ekle"))
+        seeded = cur.fetchone() is None
+        if seeded:
+            # Sayım ile trigger kurulumu arasında yazılan satırlar kaybolmasın
+            cur.execute(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE")
+            cur.execute("DELETE FROM kayit_sayaclari WHERE tablo = %s", (table,))
+            cur.execute(f"INSERT INTO kayit_sayaclari (tablo, tur, yil, icerikli, adet) "
+                        f"{grouped_sql(table, table)}")
+            for statement in trigger_sql(table):
+                cur.execute(statement)
+    conn.commit()
+    return seeded
+
+
+def summarize(rows) -> Dict:
+    """(tür, yıl, içerikli, adet) satırlarını get_stats biçimine dönüştür"""
+    by_type, by_year, with_content = Counter(), Counter(), 0
+    for tur, yil, icerikli, adet in rows:
+        by_type[tur or None] += adet
+        by_year[yil] += adet
+        if icerikli:
+            with_content += adet
+    return {
+        "total": sum(by_type.values()),
+        "by_type": {tur: count for tur, count in by_type.most_common() if count},
+        "by_year": {yil: by_year[yil] for yil in sorted(by_year) if by_year[yil]},
+        "with_content": with_content,
+    }
+
+
+def read_counters(conn, table: str) -> Dict:
+    """Sayaçlardan istatistikleri oku (milisaniyeler)"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT tur, yil, icerikli, adet FROM kayit_sayaclari WHERE tablo = %s", (table,))
+        rows = cur.fetchall()
+    conn.commit()
+    return summarize(rows)
+
+
+def exact_counts(conn, table: str) -> Dict:
+    """Tam tablo taramasıyla say; sayaçlar sonuçla uyuşmuyorsa counters_match False olur
+
+    Tarama sürerken yazan scraper'lar varsa küçük farklar geçicidir.
+    """
+    with conn.cursor() as cur:
+        cur.execute(grouped_sql(table, table, with_table=False))
+        rows = cur.fetchall()
+    conn.commit()
+    stats = summarize(rows)
+    counters = read_counters(conn, table)
+    stats["counters_match"] = all(stats[key] == counters[key] for key in counters)
+    stats["drift"] = stats["total"] - counters["total"]
+    return stats
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Karar/Mevzuat Metinleri için Sıkıştırma ve TOAST Depolama Ayarı
+
+Veritabanı boyutunun büyük kısmı karar_metni ve icerik kolonlarıdır; bu kolonlar
+varsayılan pglz TOAST sıkıştırmasını kullanır. Bu script ictihatlar, kararlar,
+mevzuatlar ve mevzuat_versiyonlari tablolarında:
+
+  1. Metin kolonlarını `COMPRESSION lz4` olarak işaretler (PostgreSQL 14+,
+     lz4 destekli derleme; yalnızca katalog değişikliği)
+  2. --out-of-line ile toast_tuple_target değerini düşürür; böylece birkaç KB'lık
+     metinler de ana tablo (heap) yerine TOAST tablosuna taşınır ve yalnızca
+     metadata okuyan taramalar küçük bir heap üzerinde çalışır
+  3. pglz ile sıkıştırılmış mevcut değerleri id aralıklarıyla, kısa
+     transaction'larda yeniden yazar (yarıda kalırsa kaldığı yerden devam eder)
+  4. Öncesi/sonrası boyut (heap, TOAST, indeks) ve tarama sürelerini raporlar
+
+Yeniden yazma ölü satır bıraktığı için disk alanı VACUUM ile yeniden kullanılır
+hale gelir; dosya boyutunun küçülmesi için VACUUM FULL / pg_repack gerekir.
+
+Kullanım:
+    python tune_text_storage.py --report-only
+    python tune_text_storage.py
+    python tune_text_storage.py --tables ictihatlar --out-of-line --toast-target 256
+    python tune_text_storage.py --batch-size 2000 --pause 0.2
+
+Gereksinimler:
+    pip install psycopg2-binary
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from typing import Dict, List
+
+from db_config import POSTGRES_CONFIG, create_connection
+
+try:
+    from psycopg2 import errors
+except ImportError:
+    print("❌ psycopg2 yüklü değil. Lütfen çalıştırın: pip install psycopg2-binary")
+    sys.exit(1)
+
+
+DEFAULT_BATCH_SIZE = 2000
+# Varsayılan hedef ~2 KB; daha düşük değer orta boy metinleri de TOAST'a taşır
+DEFAULT_TOAST_TARGET = 256
+
+# Tablo -> sıkıştırılacak metin kolonları ve tarama ölçümünde kullanılan metadata kolonu
+TEXT_TABLES = {
+    "ictihatlar": {"columns": ["karar_metni"], "metadata": "karar_tarihi"},
+    "kararlar": {"columns": ["karar_metni"], "metadata": "karar_tarihi"},
+    "mevzuatlar": {"columns": ["icerik"], "metadata": "resmi_gazete_tarihi"},
+    "mevzuat_versiyonlari": {"columns": ["icerik"], "metadata": "guncelleme_tarihi"},
+}
+
+
+def format_size(size: int) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(size) < 1024:
+            return f"{size:,.0f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} TB"
+
+
+def lz4_available(conn) -> bool:
+    with conn.cursor() as cur:
+        cur.execute("SELECT enumvals FROM pg_settings WHERE name = 'default_toast_compression'")
+        row = cur.fetchone()
+    conn.commit()
+    return row is not None and "lz4" in row[0]
+
+
+def leaf_tables(conn, table: str) -> List[str]:
+    """Bölümlenmiş tabloda veri tutan bölümler, düz tabloda tablonun kendisi"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT relid::regclass::text FROM pg_partition_tree(%s) WHERE isleaf", (table,))
+        leaves = [row[0] for row in cur.fetchall()]
+    conn.commit()
+    return leaves
+
+
+def existing_tables(conn, tables: List[str]) -> List[str]:
+    found = []
+    with conn.cursor() as cur:
+        for table in tables:
+            cur.execute("SELECT to_regclass(%s)", (table,))
+            if cur.fetchone()[0] is not None:
+                found.append(table)
+            else:
+                print(f"⚠ {table} tablosu bulunamadı, atlanıyor")
+    conn.commit()
+    return found
+
+
+def measure(conn, table: str, runs: int) -> Dict:
+    """Boyutları, sıkıştırma dağılımını ve tarama sürelerini ölç"""
+    spec = TEXT_TABLES[table]
+    leaves = leaf_tables(conn, table)
+    report = {}
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT
+                COALESCE(SUM(pg_relation_size(c.oid)), 0),
+                COALESCE(SUM(pg_total_relation_size(c.reltoastrelid)), 0),
+                COALESCE(SUM(pg_indexes_size(c.oid)), 0),
+                COALESCE(SUM(pg_total_relation_size(c.oid)), 0)
+            FROM pg_class c
+            WHERE c.oid = ANY(%s::regclass[])
+        """, (leaves,))
+        report["heap"], report["toast"], report["indexes"], report["total"] = map(int, cur.fetchone())
+
+        compression = ", ".join(
+            f"COUNT(*) FILTER (WHERE pg_column_compression({c}) = '{method}')"
+            for c in spec["columns"] for method in ("pglz", "lz4")
+        )
+        cur.execute(f"SELECT {compression} FROM {table}")
+        counts = cur.fetchone()
+        report["pglz"] = sum(counts[0::2])
+        report["lz4"] = sum(counts[1::2])
+
+        # Paralel tarama süreleri dalgalandırmasın
+        cur.execute("SET max_parallel_workers_per_gather = 0")
+        queries = {
+            "metadata_ms": f"SELECT COUNT(*), MAX({spec['metadata']}) FROM {table}",
+            # length() UTF-8 metinde değeri açmayı (decompress) gerektirir
+            "text_ms": f"SELECT {' + '.join(f'SUM(length({c}))' for c in spec['columns'])} FROM {table}",
+        }
+        for key, query in queries.items():
+            cur.execute(query)  # önbelleği ısıt
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                cur.execute(query)
+                cur.fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+            report[key] = statistics.median(timings)
+        cur.execute("RESET max_parallel_workers_per_gather")
+    conn.commit()
+    return report
+
+
+def print_report(table: str, before: Dict, after: Dict = None):
+    rows = [
+        ("Heap", "heap", format_size),
+        ("TOAST", "toast", format_size),
+        ("İndeksler", "indexes", format_size),
+        ("Toplam", "total", format_size),
+        ("pglz değer", "pglz", lambda v: f"{v:,}"),
+        ("lz4 değer", "lz4", lambda v: f"{v:,}"),
+        ("Metadata tarama", "metadata_ms", lambda v: f"{v:,.0f} ms"),
+        ("Metin tarama", "text_ms", lambda v: f"{v:,.0f} ms"),
+    ]
+    print(f"\n📊 {table}")
+    if after is None:
+        for label, key, fmt in rows:
+            print(f"   {label:<16} {fmt(before[key]):>14}")
+        return
+    print(f"   {'':<16} {'Önce':>14} {'Sonra':>14} {'Değişim':>9}")
+    for label, key, fmt in rows:
+        change = f"{(after[key] - before[key]) / before[key]:+.0%}" if before[key] else ""
+        print(f"   {label:<16} {fmt(before[key]):>14} {fmt(after[key]):>14} {change:>9}")
+
+
+def set_storage(conn, table: str, out_of_line: bool, toast_target: int):
+    """Kolonları lz4'e geçir, istenirse toast_tuple_target'ı düşür (katalog değişikliği)"""
+    columns = TEXT_TABLES[table]["columns"]
+    leaves = leaf_tables(conn, table) if out_of_line else []
+    with conn.cursor() as cur:
+        cur.execute("SET lock_timeout = '5s'")
+        # Bölümlenmiş tabloda SET COMPRESSION tüm bölümlere uygulanır
+        cur.execute(f"ALTER TABLE {table} "
+                    + ", ".join(f"ALTER COLUMN {c} SET COMPRESSION lz4" for c in columns))
+        # Depolama parametreleri bölümlenmiş üst tabloya verilemez, bölüm bazında ayarlanır
+        for leaf in leaves:
+            cur.execute(f"ALTER TABLE {leaf} SET (toast_tuple_target = {int(toast_target)})")
+        cur.execute("SET lock_timeout = DEFAULT")
+    conn.commit()
+    print(f"✓ {table}: {', '.join(columns)} -> lz4"
+          + (f", toast_tuple_target={toast_target}" if out_of_line else ""))
+
+
+def rewrite(conn, table: str, batch_size: int, pause: float):
+    """pglz ile sıkıştırılmış değerleri id aralıklarıyla yeniden yaz"""
+    columns = TEXT_TABLES[table]["columns"]
+    # Değer değişmeden atanırsa PostgreSQL sıkıştırılmış veriyi olduğu gibi kopyalar;
+    # || '' yeni bir değer üretir ve kolonun güncel sıkıştırma yöntemiyle yazılır
+    assignments = ", ".join(
+        f"{c} = CASE WHEN pg_column_compression({c}) = 'pglz' THEN {c} || '' ELSE {c} END"
+        for c in columns
+    )
+    pending = " OR ".join(f"pg_column_compression({c}) = 'pglz'" for c in columns)
+
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT MIN(id), MAX(id) FROM {table}")
+        min_id, max_id = cur.fetchone()
+    conn.commit()
+
+    if min_id is None:
+        print(f"✓ {table}: yeniden yazılacak satır yok")
+        return
+
+    # Metin değişmediği için updated_at / search_vector / sayaç trigger'larının
+    # çalışması gereksiz; ES artımlı senkronizasyonu tüm tabloyu değişmiş sanmasın.
+    # (kararlar'daki GENERATED search_vector kolonu yine de yeniden hesaplanır.)
+    replica_role = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET session_replication_role = replica")
+        conn.commit()
+    except errors.InsufficientPrivilege:
+        conn.rollback()
+        replica_role = False
+        print("⚠ session_replication_role ayarlanamadı (superuser değil); "
+              "yeniden yazma updated_at değerlerini güncelleyecek")
+
+    started = time.time()
+    updated = 0
+    start = min_id
+    try:
+        while start <= max_id:
+            end = start + batch_size - 1
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    UPDATE {table}
+                    SET {assignments}
+                    WHERE id BETWEEN %s AND %s AND ({pending})
+                """, (start, end))
+                updated += cur.rowcount
+            conn.commit()
+
+            done = (end - min_id + 1) / (max_id - min_id + 1)
+            elapsed = time.time() - started
+            print(f"  {table}: id {end:,}/{max_id:,} ({min(done, 1):.1%}), "
+                  f"{updated:,} satır, {updated / elapsed if elapsed else 0:,.0f} satır/sn", end="\r")
+            start = end + 1
+            if pause:
+                time.sleep(pause)
+    finally:
+        if replica_role:
+            with conn.cursor() as cur:
+                cur.execute("SET session_replication_role = DEFAULT")
+            conn.commit()
+
+    print()
+    print(f"✓ {table}: {updated:,} satır {time.time() - started:.1f} sn'de yeniden yazıldı")
+
+
+def vacuum(table: str):
+    """Ölü satırları yeniden kullanılabilir hale getir ve istatistikleri güncelle"""
+    conn = create_connection(autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            started = time.time()
+            cur.execute(f"VACUUM (ANALYZE) {table}")
+        print(f"✓ {table}: VACUUM (ANALYZE) {time.time() - started:.1f} sn")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metin kolonları için lz4 sıkıştırma ve TOAST ayarı")
+    parser.add_argument("--tables", "-t", nargs="+", choices=list(TEXT_TABLES.keys()),
+                        default=list(TEXT_TABLES.keys()),
+                        help="İşlenecek tablolar (varsayılan: tümü)")
+    parser.add_argument("--out-of-line", action="store_true",
+                        help="toast_tuple_target'ı düşürerek orta boy metinleri de TOAST'a taşı")
+    parser.add_argument("--toast-target", type=int, default=DEFAULT_TOAST_TARGET,
+                        help=f"--out-of-line için toast_tuple_target (varsayılan: {DEFAULT_TOAST_TARGET})")
+    parser.add_argument("--batch-size", "-b", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Yeniden yazma id aralığı genişliği")
+    parser.add_argument("--pause", type=float, default=0.0,
+                        help="Batch'ler arasında bekleme (saniye)")
+    parser.add_argument("--skip-rewrite", action="store_true",
+                        help="Yalnızca kolon ayarlarını değiştir; mevcut satırları yeniden yazma")
+    parser.add_argument("--report-only", action="store_true",
+                        help="Yalnızca mevcut boyut ve tarama sürelerini raporla")
+    parser.add_argument("--runs", type=int, default=3,
+                        help="Tarama ölçümü tekrar sayısı")
+    args = parser.parse_args()
+
+    if not POSTGRES_CONFIG["password"]:
+        print("❌ POSTGRES_PASSWORD tanımlı değil! .env dosyasını kontrol edin.")
+        sys.exit(1)
+
+    conn = create_connection()
+    try:
+        tables = existing_tables(conn, args.tables)
+        if args.report_only:
+            for table in tables:
+                print_report(table, measure(conn, table, args.runs))
+            return
+
+        if not lz4_available(conn):
+            print("❌ Sunucu lz4 desteklemiyor (PostgreSQL 14+ ve --with-lz4 derlemesi gerekir)")
+            sys.exit(1)
+
+        reports = {}
+        for table in tables:
+            print(f"\n{'='*60}")
+            print(f"🗜  {table}")
+            print("="*60)
+            before = measure(conn, table, args.runs)
+            set_storage(conn, table, args.out_of_line, args.toast_target)
+            if not args.skip_rewrite:
+                rewrite(conn, table, args.batch_size, args.pause)
+                vacuum(table)
+            reports[table] = (before, measure(conn, table, args.runs))
+    finally:
+        conn.close()
+
+    print(f"\n{'='*60}")
+    print("📈 Boyut ve tarama süresi değişimi")
+    print("="*60)
+    for table, (before, after) in reports.items():
+        print_report(table, before, after)
+    print("\nℹ Dosya boyutu VACUUM FULL / pg_repack ile küçülür; yeni bölümler için "
+          "--out-of-line ayarını tekrar çalıştırın.")
+
+
+if __name__ == "__main__":
+    main()
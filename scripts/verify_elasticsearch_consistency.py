@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+PostgreSQL ↔ Elasticsearch Tutarlılık Doğrulama Aracı
+
+id uzayını eşit genişlikte kovalara (bucket) böler ve her kova için iki taraftaki
+belge sayısını ve (id, updated_at) çiftlerinin sıradan bağımsız özetini paralel
+olarak hesaplar. Yalnızca farklı çıkan kovalar yeniden senkronize edilir:
+PostgreSQL'deki kayıtlar yeniden indekslenir, PostgreSQL'de olmayan belgeler
+Elasticsearch'ten silinir. Tam migrasyon gerekmez.
+
+Artımlı kolonu olmayan tablolarda (örn. kararlar) özet yalnızca id'lerden
+hesaplanır; bu durumda eksik/fazla belgeler bulunur, içerik farkları bulunmaz.
+
+Kullanım:
+    python verify_elasticsearch_consistency.py --tables ictihatlar
+    python verify_elasticsearch_consistency.py --tables ictihatlar --buckets 1024 --workers 8
+    python verify_elasticsearch_consistency.py --tables mevzuatlar --resync
+    python verify_elasticsearch_consistency.py --tables ictihatlar --filter canonical
+
+Gereksinimler:
+    pip install psycopg2-binary elasticsearch
+
+Ortam Değişkenleri:
+    POSTGRES_HOST     - PostgreSQL host (varsayılan: localhost)
+    POSTGRES_PORT     - PostgreSQL port (varsayılan: 5432)
+    POSTGRES_DB       - Veritabanı adı (varsayılan: yargisalzeka)
+    POSTGRES_USER     - Kullanıcı adı (varsayılan: postgres)
+    POSTGRES_PASSWORD - Şifre
+    ELASTICSEARCH_URL - Elasticsearch URL (varsayılan: http://localhost:9200)
+"""
+
+import sys
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from db_config import POSTGRES_CONFIG, create_connection
+from migrate_tables_to_elasticsearch import (
+    BATCH_SIZE,
+    DeadLetterQueue,
+    TableSpec,
+    create_elasticsearch_client,
+    encode_delete,
+    get_id_bounds,
+    load_table_specs,
+    migrate_range,
+    send_bulk,
+    table_exists,
+)
+
+from psycopg2 import sql
+
+ES_PAGE_SIZE = 10000
+DEFAULT_BUCKETS = 256
+
+# Her kova için: (belge sayısı, özet toplamı)
+BucketDigest = Tuple[int, int]
+
+
+def row_hash(doc_id, version: Optional[str]) -> int:
+    """Tek bir (id, sürüm) çiftinin 60 bitlik özeti; PostgreSQL tarafıyla aynıdır"""
+    text = f"{doc_id}|{version or ''}"
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:15], 16)
+
+
+class BucketLayout:
+    """id uzayını [min_id, max_id] arasında eşit genişlikte kovalara böler"""
+
+    def __init__(self, min_id: int, max_id: int, buckets: int):
+        self.min_id = min_id
+        self.max_id = max_id
+        self.width = max(1, -(-(max_id - min_id + 1) // buckets))
+        self.count = -(-(max_id - min_id + 1) // self.width)
+
+    def id_range(self, bucket: int) -> Tuple[int, int]:
+        start = self.min_id + bucket * self.width
+        return start, min(start + self.width - 1, self.max_id)
+
+    def bucket_of(self, doc_id: int) -> int:
+        return (doc_id - self.min_id) // self.width
+
+
+def spec_condition(spec: TableSpec) -> sql.Composable:
+    """--filter ile etkinleştirilen spec filtrelerini ek WHERE koşulu olarak döndür"""
+    return sql.SQL(" AND ({})").format(sql.SQL(spec.where)) if spec.where else sql.SQL("")
+
+
+def pg_bucket_digests(spec: TableSpec, layout: BucketLayout,
+                      buckets: List[int]) -> Dict[int, BucketDigest]:
+    """Ardışık kovalar için PostgreSQL tarafındaki sayı ve özetleri hesapla"""
+    start, _ = layout.id_range(buckets[0])
+    _, end = layout.id_range(buckets[-1])
+
+    if spec.incremental_column:
+        version = sql.SQL("""to_char({}, 'YYYY-MM-DD"T"HH24:MI:SS')""").format(
+            sql.Identifier(spec.incremental_column))
+    else:
+        version = sql.SQL("''")
+
+    query = sql.SQL("""
+        SELECT ({id} - %s) / %s AS bucket,
+               COUNT(*),
+               COALESCE(SUM(('x' || substr(md5({id}::text || '|' || COALESCE({version}, '')), 1, 15))::bit(60)::bigint), 0)
+        FROM {table}
+        WHERE {id} BETWEEN %s AND %s{where}
+        GROUP BY 1
+    """).format(id=sql.Identifier(spec.id_column), version=version, table=sql.Identifier(spec.table),
+               where=spec_condition(spec))
+
+    conn = create_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(query, (layout.min_id, layout.width, start, end))
+            return {int(bucket): (count, int(digest)) for bucket, count, digest in cur.fetchall()}
+    finally:
+        conn.close()
+
+
+def es_bucket_ids(es, spec: TableSpec, index_name: str,
+                  id_range: Tuple[int, int]):
+    """Bir id aralığındaki belgelerin (id, sürüm) değerlerini search_after ile getir"""
+    version_field = None
+    docvalue_fields = ["id"]
+    if spec.incremental_column:
+        version_field = next(field for column, field, _ in spec.fields
+                             if column == spec.incremental_column)
+        docvalue_fields.append({"field": version_field, "format": "yyyy-MM-dd'T'HH:mm:ss"})
+
+    body = {
+        "size": ES_PAGE_SIZE,
+        "_source": False,
+        "docvalue_fields": docvalue_fields,
+        "query": {"range": {"id": {"gte": id_range[0], "lte": id_range[1]}}},
+        "sort": [{"id": "asc"}],
+    }
+    while True:
+        hits = es.search(index=index_name, body=body)["hits"]["hits"]
+        for hit in hits:
+            fields = hit.get("fields", {})
+            doc_id = fields["id"][0]
+            version = fields.get(version_field, [None])[0] if version_field else None
+            yield doc_id, version
+        if len(hits) < ES_PAGE_SIZE:
+            break
+        body["search_after"] = hits[-1]["sort"]
+
+
+def es_bucket_digests(es, spec: TableSpec, index_name: str, layout: BucketLayout,
+                      buckets: List[int]) -> Dict[int, BucketDigest]:
+    """Ardışık kovalar için Elasticsearch tarafındaki sayı ve özetleri hesapla"""
+    start, _ = layout.id_range(buckets[0])
+    _, end = layout.id_range(buckets[-1])
+
+    digests: Dict[int, List[int]] = {}
+    for doc_id, version in es_bucket_ids(es, spec, index_name, (start, end)):
+        digest = digests.setdefault(layout.bucket_of(doc_id), [0, 0])
+        digest[0] += 1
+        digest[1] += row_hash(doc_id, version)
+    return {bucket: (count, total) for bucket, (count, total) in digests.items()}
+
+
+def group_buckets(bucket_count: int, groups: int) -> List[List[int]]:
+    """Kovaları iş parçacıkları arasında ardışık gruplara dağıt"""
+    size = max(1, -(-bucket_count // groups))
+    return [list(range(i, min(i + size, bucket_count))) for i in range(0, bucket_count, size)]
+
+
+def compare_table(es, spec: TableSpec, index_name: str, layout: BucketLayout,
+                  workers: int) -> List[int]:
+    """İki tarafı paralel hesapla ve farklı kovaları döndür"""
+    groups = group_buckets(layout.count, workers * 4)
+    pg_digests: Dict[int, BucketDigest] = {}
+    es_digests: Dict[int, BucketDigest] = {}
+
+    with ThreadPoolExecutor(max_workers=workers * 2) as executor:
+        pg_futures = [executor.submit(pg_bucket_digests, spec, layout, group) for group in groups]
+        es_futures = [executor.submit(es_bucket_digests, es, spec, index_name, layout, group)
+                      for group in groups]
+        for future in pg_futures:
+            pg_digests.update(future.result())
+        for future in es_futures:
+            es_digests.update(future.result())
+
+    mismatched = []
+    for bucket in range(layout.count):
+        pg = pg_digests.get(bucket, (0, 0))
+        es_side = es_digests.get(bucket, (0, 0))
+        if pg != es_side:
+            mismatched.append(bucket)
+            id_range = layout.id_range(bucket)
+            print(f"  ✗ kova {bucket} [{id_range[0]}-{id_range[1]}]: "
+                  f"PostgreSQL {pg[0]:,} / Elasticsearch {es_side[0]:,} belge"
+                  f"{'' if pg[0] != es_side[0] else ' (içerik farkı)'}")
+    return mismatched
+
+
+def pg_ids(spec: TableSpec, id_range: Tuple[int, int]) -> Set[int]:
+    conn = create_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("SELECT {id} FROM {table} WHERE {id} BETWEEN %s AND %s{where}").format(
+                id=sql.Identifier(spec.id_column), table=sql.Identifier(spec.table),
+                where=spec_condition(spec)
+            ), id_range)
+            return {row[0] for row in cur.fetchall()}
+    finally:
+        conn.close()
+
+
+def resync_bucket(es, spec: TableSpec, index_name: str, id_range: Tuple[int, int],
+                  dead_letters: DeadLetterQueue, worker_no: int) -> Tuple[int, int]:
+    """Bir kovayı yeniden indeksle ve PostgreSQL'de olmayan belgeleri sil"""
+    indexed, _ = migrate_range(es, spec, index_name, id_range, None, None,
+                               BATCH_SIZE, dead_letters, worker_no)
+
+    stale = {doc_id for doc_id, _ in es_bucket_ids(es, spec, index_name, id_range)} - pg_ids(spec, id_range)
+    if stale:
+        # Silme işlemleri de aynı yeniden deneme yolundan gönderilir
+        pairs = [(encode_delete(doc_id), b"") for doc_id in sorted(stale)]
+        for i in range(0, len(pairs), BATCH_SIZE):
+            send_bulk(es, pairs[i:i + BATCH_SIZE], index_name, dead_letters)
+    return indexed, len(stale)
+
+
+def verify_table(es, spec: TableSpec, index_name: str, buckets: int, workers: int,
+                 resync: bool) -> int:
+    print(f"\n{'='*60}")
+    print(f"🔍 {spec.table} ↔ {index_name}")
+    print("="*60)
+
+    conn = create_connection()
+    try:
+        min_id, max_id = get_id_bounds(conn, spec)
+    finally:
+        conn.close()
+
+    if min_id is None:
+        print("⚠ Tabloda kayıt yok")
+        return 0
+
+    # Elasticsearch'te PostgreSQL aralığının dışında kalan belgeleri de kapsa
+    es_bounds = es.search(index=index_name, body={
+        "size": 0,
+        "aggs": {"min_id": {"min": {"field": "id"}}, "max_id": {"max": {"field": "id"}}},
+    })["aggregations"]
+    if es_bounds["min_id"]["value"] is not None:
+        min_id = min(min_id, int(es_bounds["min_id"]["value"]))
+        max_id = max(max_id, int(es_bounds["max_id"]["value"]))
+
+    layout = BucketLayout(min_id, max_id, buckets)
+    if not spec.incremental_column:
+        print("⚠ Artımlı kolon yok: yalnızca id kümeleri karşılaştırılacak")
+    print(f"id aralığı {min_id}-{max_id}, {layout.count} kova (genişlik {layout.width:,})")
+
+    started = time.time()
+    mismatched = compare_table(es, spec, index_name, layout, workers)
+    print(f"✓ Karşılaştırma {time.time() - started:.1f} sn sürdü: "
+          f"{len(mismatched)}/{layout.count} kova farklı")
+
+    if mismatched and resync:
+        print(f"🔁 {len(mismatched)} kova yeniden senkronize ediliyor...")
+        dead_letters = DeadLetterQueue()
+        indexed = 0
+        deleted = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(resync_bucket, es, spec, index_name, layout.id_range(bucket),
+                                dead_letters, bucket)
+                for bucket in mismatched
+            ]
+            for future in futures:
+                bucket_indexed, bucket_deleted = future.result()
+                indexed += bucket_indexed
+                deleted += bucket_deleted
+        es.indices.refresh(index=index_name)
+        print(f"✓ {indexed:,} belge yeniden indekslendi, {deleted:,} fazla belge silindi")
+        if dead_letters.written:
+            print(f"⚠ {dead_letters.written:,} belge dead-letter kuyruğuna yazıldı")
+
+    return len(mismatched)
+
+
+def main():
+    specs = load_table_specs()
+
+    parser = argparse.ArgumentParser(description="PostgreSQL ↔ Elasticsearch tutarlılık doğrulaması")
+    parser.add_argument("--tables", "-t", nargs="+", choices=list(specs.keys()),
+                        help="Doğrulanacak tablolar (varsayılan: tümü)")
+    parser.add_argument("--index", type=str,
+                        help="Karşılaştırılacak index adı (yalnızca tek tablo ile)")
+    parser.add_argument("--buckets", "-b", type=int, default=DEFAULT_BUCKETS,
+                        help="id uzayının bölüneceği kova sayısı")
+    parser.add_argument("--workers", "-w", type=int, default=4,
+                        help="Paralel iş parçacığı sayısı")
+    parser.add_argument("--resync", action="store_true",
+                        help="Farklı çıkan kovaları yeniden senkronize et")
+    parser.add_argument("--filter", action="append",
+                        choices=sorted({name for spec in specs.values() for name in spec.filters}),
+                        help="Index migrasyonda --filter ile oluşturulduysa aynı filtreyi uygula")
+    args = parser.parse_args()
+
+    if not POSTGRES_CONFIG["password"]:
+        print("❌ POSTGRES_PASSWORD tanımlı değil! .env dosyasını kontrol edin.")
+        sys.exit(1)
+
+    table_names = args.tables or list(specs.keys())
+    if args.index and len(table_names) > 1:
+        print("❌ --index yalnızca tek tablo ile kullanılabilir")
+        sys.exit(1)
+
+    es = create_elasticsearch_client()
+    conn = create_connection()
+    try:
+        existing = [name for name in table_names if table_exists(conn, specs[name].table)]
+    finally:
+        conn.close()
+
+    total_mismatched = 0
+    for name in existing:
+        spec = specs[name]
+        spec.use_filters(args.filter)
+        index_name = args.index or spec.index
+        if not es.indices.exists(index=index_name):
+            print(f"⚠ Index '{index_name}' bulunamadı, atlanıyor")
+            continue
+        total_mismatched += verify_table(es, spec, index_name, args.buckets, args.workers, args.resync)
+
+    print()
+    if total_mismatched == 0:
+        print("✅ PostgreSQL ve Elasticsearch tutarlı")
+    elif args.resync:
+        print(f"⚠ {total_mismatched} kova yeniden senkronize edildi; doğrulamayı tekrar çalıştırın")
+    else:
+        print(f"⚠ {total_mismatched} kova farklı (düzeltmek için --resync)")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()